@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+嵌入后端精度与吞吐基准测试
+
+语料取自 06_Learning_Journal 中的 Markdown 笔记（按 memory_agent 的分块规则切分），
+查询为一组固定的中英文问题。第一个配置作为参考，其余配置报告:
+- 语料编码吞吐（片段/秒）和单条查询延迟
+- 与参考向量的平均余弦相似度
+- 每个查询 top-10 检索结果与参考结果的重合率（recall@10）
+
+配置写法: 后端[:进程数][@最大序列长度]，例如 torch、torch:4、onnx、onnx-int8@256
+
+用法:
+    python benchmarks/bench_embedding_backends.py
+    python benchmarks/bench_embedding_backends.py --configs torch onnx-int8 onnx-int8@64 torch:4
+
+作者: Claude Code
+日期: 2026-01-16
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "01_Active_Projects" / "memory_agent"))
+
+from embedding_service import MIN_TEXTS_PER_WORKER, EmbeddingService
+from chunker import DocumentChunker
+
+JOURNAL_DIR = Path(__file__).parent.parent.parent / "06_Learning_Journal"
+
+QUERIES = [
+    "如何让每次会话自动加载记忆",
+    "市场监管智能体生成开业申请书",
+    "工作区文件整理和清理临时文件",
+    "安全问题修复报告",
+    "智谱 GLM 模型的调用方式",
+    "流程图工具推荐",
+    "管家模式怎么使用",
+    "每日启动器的使用方法",
+    "向量数据库和语义搜索",
+    "版本快照与回滚",
+    "MCP server configuration log",
+    "workspace health check results",
+    "multi-agent workflow engine with checkpoints",
+    "partnership evolution plan",
+    "OCR recognition of business license",
+    "how to open clickable links in the terminal",
+]
+
+
+def _parse_config(spec: str):
+    """解析 '后端[:进程数][@最大序列长度]'"""
+    match = re.fullmatch(r'([a-z0-9-]+)(?::(\d+))?(?:@(\d+))?', spec)
+    if not match:
+        raise argparse.ArgumentTypeError(f"无法解析配置: {spec}")
+    backend, workers, max_seq_length = match.groups()
+    return {
+        'backend': backend,
+        'workers': int(workers or 1),
+        'max_seq_length': int(max_seq_length) if max_seq_length else None,
+    }
+
+
+def _load_corpus(limit: int):
+    chunker = DocumentChunker()
+    texts = []
+    for path in sorted(JOURNAL_DIR.rglob("*.md")):
+        if 'snapshots' in path.parts:
+            continue
+        content = path.read_text(encoding='utf-8', errors='ignore')
+        texts.extend(chunk['text'] for chunk in chunker.chunk(content, '.md'))
+        if len(texts) >= limit:
+            break
+    return texts[:limit]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def _run(model_name: str, config: dict, corpus, batch_size: int):
+    service = EmbeddingService(model_name, batch_size=batch_size, use_cache=False, **config)
+
+    start = time.perf_counter()
+    service.model
+    load_s = time.perf_counter() - start
+
+    # 预热一次，避免计时包含图构建/进程池启动时间
+    service.encode(corpus[:max(batch_size, service.workers * MIN_TEXTS_PER_WORKER)])
+
+    start = time.perf_counter()
+    corpus_vectors = service.encode(corpus)
+    corpus_s = time.perf_counter() - start
+
+    latencies = []
+    query_vectors = []
+    for query in QUERIES:
+        start = time.perf_counter()
+        query_vectors.append(service.encode_one(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    service.close()
+    return {
+        'load_s': load_s,
+        'throughput': len(corpus) / corpus_s,
+        'query_ms': statistics.median(latencies),
+        'corpus': _normalize(corpus_vectors),
+        'queries': _normalize(np.stack(query_vectors)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="嵌入后端精度与吞吐基准")
+    parser.add_argument('--model', default='paraphrase-multilingual-mpnet-base-v2')
+    parser.add_argument('--configs', nargs='+', type=_parse_config,
+                        default=[_parse_config(spec) for spec in ('torch', 'onnx', 'onnx-int8', 'onnx-int8@64')])
+    parser.add_argument('--docs', type=int, default=1000, help='语料片段数上限')
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--top-k', type=int, default=10)
+    args = parser.parse_args()
+
+    corpus = _load_corpus(args.docs)
+    print(f"语料: {len(corpus)} 个片段（{JOURNAL_DIR.name}），查询: {len(QUERIES)} 条，模型: {args.model}\n")
+
+    header = f"{'配置':<22}{'加载(s)':>9}{'吞吐(片段/s)':>14}{'查询(ms)':>10}{'余弦':>8}{f'recall@{args.top_k}':>11}"
+    print(header)
+    print("-" * (len(header) + 4))
+
+    reference = None
+    for config in args.configs:
+        label = config['backend'] + (f":{config['workers']}" if config['workers'] > 1 else '') \
+            + (f"@{config['max_seq_length']}" if config['max_seq_length'] else '')
+        try:
+            result = _run(args.model, config, corpus, args.batch_size)
+        except Exception as e:
+            print(f"{label:<22}失败: {e}")
+            continue
+
+        if reference is None:
+            reference = result
+            reference['top'] = np.argsort(-(reference['queries'] @ reference['corpus'].T), axis=1)[:, :args.top_k]
+
+        cosine = float(np.mean(np.sum(result['corpus'] * reference['corpus'], axis=1)))
+        top = np.argsort(-(result['queries'] @ result['corpus'].T), axis=1)[:, :args.top_k]
+        recall = np.mean([len(set(a) & set(b)) / args.top_k for a, b in zip(top, reference['top'])])
+
+        print(f"{label:<22}{result['load_s']:>9.2f}{result['throughput']:>14.1f}"
+              f"{result['query_ms']:>10.1f}{cosine:>8.4f}{recall:>11.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+混合检索（向量 + BM25 + RRF）召回基准测试
+
+语料取自 06_Learning_Journal 中的 Markdown 笔记（按 memory_agent 的分块规则切分），
+写入临时工作区里的 SemanticMemory。查询为已知答案的两类:
+- 标识符: 片段中只出现在该片段里的标识符/编号/英文词（如函数名、错误名）
+- 片段: 从片段正文中截取的一句原文
+
+分别报告纯向量、纯 BM25 和混合检索的 MRR、recall@k 与单次查询延迟。
+
+用法:
+    python benchmarks/bench_hybrid_search.py
+    python benchmarks/bench_hybrid_search.py --docs 2000 --queries 200 --top-k 10
+
+作者: Claude Code
+日期: 2026-01-16
+"""
+
+import argparse
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "01_Active_Projects" / "memory_agent"))
+
+from semantic_memory import SemanticMemory
+from chunker import DocumentChunker
+
+JOURNAL_DIR = Path(__file__).parent.parent.parent / "06_Learning_Journal"
+
+IDENTIFIER = re.compile(r'[A-Za-z_][A-Za-z0-9_]*[_0-9][A-Za-z0-9_]*|[A-Z][a-z]+[A-Z][A-Za-z]+|\d{6,}')
+SENTENCE = re.compile(r'[^。！？\n]{12,60}')
+
+
+def _load_corpus(limit: int):
+    chunker = DocumentChunker()
+    texts = []
+    for path in sorted(JOURNAL_DIR.rglob("*.md")):
+        if 'snapshots' in path.parts:
+            continue
+        content = path.read_text(encoding='utf-8', errors='ignore')
+        texts.extend(chunk['text'] for chunk in chunker.chunk(content, '.md'))
+        if len(texts) >= limit:
+            break
+    return texts[:limit]
+
+
+def _make_queries(corpus, count: int, seed: int = 42):
+    """生成 (类别, 查询, 正确片段下标) 的已知答案查询"""
+    rng = random.Random(seed)
+    identifier_df = Counter(token for text in corpus for token in set(IDENTIFIER.findall(text)))
+
+    identifiers, fragments = [], []
+    for i, text in enumerate(corpus):
+        unique = [token for token in set(IDENTIFIER.findall(text)) if identifier_df[token] == 1]
+        if unique:
+            identifiers.append(('标识符', rng.choice(sorted(unique)), i))
+        sentences = [s.strip() for s in SENTENCE.findall(text) if not s.strip().startswith('#')]
+        if sentences:
+            fragments.append(('片段', rng.choice(sentences), i))
+
+    rng.shuffle(identifiers)
+    rng.shuffle(fragments)
+    return identifiers[:count // 2] + fragments[:count - count // 2]
+
+
+def _evaluate(label: str, search, queries, top_k: int):
+    rows = {}
+    for kind, query, target in queries:
+        start = time.perf_counter()
+        ids = [r['id'] for r in search(query, top_k)]
+        elapsed = (time.perf_counter() - start) * 1000
+
+        target_id = f"chunk_{target}"
+        rank = ids.index(target_id) + 1 if target_id in ids else None
+        stats = rows.setdefault(kind, {'rr': [], 'hit': [], 'ms': []})
+        stats['rr'].append(1 / rank if rank else 0.0)
+        stats['hit'].append(rank is not None)
+        stats['ms'].append(elapsed)
+
+    for kind, stats in rows.items():
+        print(f"{label:<10}{kind:<8}{statistics.mean(stats['rr']):>8.3f}"
+              f"{statistics.mean(stats['hit']):>12.2%}{statistics.median(stats['ms']):>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="混合检索召回基准")
+    parser.add_argument('--model', default='fast')
+    parser.add_argument('--docs', type=int, default=1000, help='语料片段数上限')
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--depth', type=int, default=50, help='混合检索每一路的候选数')
+    args = parser.parse_args()
+
+    corpus = _load_corpus(args.docs)
+    queries = _make_queries(corpus, args.queries)
+    print(f"语料: {len(corpus)} 个片段（{JOURNAL_DIR.name}），查询: {len(queries)} 条\n")
+
+    with tempfile.TemporaryDirectory() as workspace:
+        memory = SemanticMemory(workspace_root=Path(workspace), model_name=args.model,
+                                collection_name='bench_hybrid', candidate_depth=args.depth)
+        for start in range(0, len(corpus), 256):
+            memory.add_memories_batch([
+                {'id': f"chunk_{i}", 'text': text, 'metadata': {'source': 'journal'}}
+                for i, text in enumerate(corpus[start:start + 256], start)
+            ])
+
+        header = f"{'方式':<10}{'查询':<8}{'MRR':>8}{f'recall@{args.top_k}':>12}{'延迟(ms)':>10}"
+        print(header)
+        print("-" * (len(header) + 4))
+
+        _evaluate('向量', lambda q, k: memory.search(q, top_k=k), queries, args.top_k)
+        _evaluate('BM25', lambda q, k: memory.keyword_search(q, top_k=k), queries, args.top_k)
+        _evaluate('混合', lambda q, k: memory.hybrid_search(q, top_k=k), queries, args.top_k)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+记忆倒排索引查询基准测试
+
+在合成的中英文混合上下文上，对比倒排索引与原有线性扫描的查询延迟。
+
+用法:
+    python benchmarks/bench_memory_index.py --size 100000
+
+作者: Claude Code
+日期: 2026-01-16
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from claude_memory import ImportanceScorer, SemanticRetriever
+from memory_index import MemoryIndex
+
+WORDS = ["工作流引擎", "检查点", "状态管理", "记忆系统", "市场监管", "申请书生成", "可视化",
+         "向量数据库", "自动化", "智能体", "浏览器", "表单填写", "文件整理", "新闻追踪",
+         "LangGraph", "Playwright", "ChromaDB", "Flask", "Python", "SQLite", "OCR", "Jinja2"]
+
+QUERIES = ["工作流引擎", "LangGraph 检查点", "市场监管 OCR", "向量数据库", "Playwright 表单填写",
+           "记忆系统 ChromaDB", "状态管理"]
+
+
+def _make_contexts(size: int, seed: int = 42):
+    rng = random.Random(seed)
+    contexts = []
+    for i in range(size):
+        words = rng.sample(WORDS, 6)
+        contexts.append({
+            'timestamp': f'2026-01-{1 + i % 28:02d}T00:00:{i % 60:02d}.{i:06d}',
+            'topic': f'{words[0]}{words[1]} #{i}',
+            'summary': '，'.join(words[1:4]) + f' 第{i}条记录',
+            'key_points': [f'{w}相关要点' for w in words[3:]],
+            'decisions_made': [],
+            'outcomes': '完成',
+            'priority': rng.choice(['high', 'normal', 'low']),
+            'tags': [rng.choice(WORDS)],
+        })
+    return contexts
+
+
+def _time(fn, repeat: int = 20) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="倒排索引查询延迟基准")
+    parser.add_argument('--size', type=int, default=100000)
+    parser.add_argument('--linear', action='store_true', help='同时测量原有线性扫描（较慢）')
+    args = parser.parse_args()
+
+    contexts = _make_contexts(args.size)
+
+    start = time.perf_counter()
+    index = MemoryIndex()
+    index.rebuild(contexts)
+    print(f"构建索引: {args.size} 条, {(time.perf_counter() - start):.2f} s")
+
+    retriever = SemanticRetriever(ImportanceScorer())
+    rare = contexts[args.size // 2]['topic'].split('#')[1]
+
+    print(f"\n{'查询':<24}{'AND 匹配(ms)':>14}{'BM25 top10(ms)':>16}"
+          + (f"{'线性扫描(ms)':>14}" if args.linear else ''))
+    print("-" * (54 + (14 if args.linear else 0)))
+    for query in QUERIES + [rare]:
+        match_ms = _time(lambda: index.match(query, fields=['topic', 'summary'], require_all=True))
+        top_ms = _time(lambda: index.search(query, top_k=10, fields=['topic', 'summary'],
+                                            require_all=True))
+        line = f"{query:<24}{match_ms:>14.3f}{top_ms:>16.3f}"
+        if args.linear:
+            linear_ms = _time(lambda: retriever.search(contexts, query, top_k=10), repeat=1)
+            line += f"{linear_ms:>14.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
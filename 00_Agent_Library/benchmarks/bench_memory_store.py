@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+MemoryStore 写入基准测试
+
+对比 'json'（整体重写）与 'jsonl'（追加日志）两种后端在不同记忆规模下
+add_context 的单次延迟。追加日志后端的延迟应与已有记忆数量无关。
+
+用法:
+    python benchmarks/bench_memory_store.py                 # 默认 1k/10k/100k
+    python benchmarks/bench_memory_store.py --sizes 1000 10000 --samples 200
+
+作者: Claude Code
+日期: 2026-01-16
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from claude_memory import MemoryStore
+
+
+def _make_context(i: int) -> dict:
+    return {
+        'session_id': f'bench_{i // 50}',
+        'topic': f'基准测试主题 {i % 200}',
+        'summary': '记忆系统写入延迟基准测试，验证追加日志后端的 O(1) 写入。' * 2,
+        'key_points': ['要点一', '要点二', '要点三'],
+        'tools_used': ['Read', 'Write'],
+        'decisions_made': ['使用追加日志'],
+        'outcomes': '完成',
+        'tags': ['benchmark'],
+    }
+
+
+def _prefill(store: MemoryStore, size: int):
+    """直接构造已有记忆并一次性写出，避免预填充本身耗时过长"""
+    contexts = store.memory['contexts']
+    for i in range(size):
+        ctx = _make_context(i)
+        ctx['timestamp'] = '2026-01-01T00:00:00'
+        contexts['contexts'].append(ctx)
+        contexts['contexts_by_topic'][ctx['topic']] = contexts['contexts_by_topic'].get(ctx['topic'], 0) + 1
+    contexts['total_contexts'] = size
+    store.save('contexts')
+
+
+def bench(backend: str, size: int, samples: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        store = MemoryStore(Path(tmp), backend=backend)
+        _prefill(store, size)
+
+        latencies = []
+        for i in range(samples):
+            start = time.perf_counter()
+            store.add_context(_make_context(size + i))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        store.close()
+        reopened = MemoryStore(Path(tmp), backend=backend)
+        load_ms = (time.perf_counter() - start) * 1000
+        assert reopened.memory['contexts']['total_contexts'] == size + samples
+        reopened.close()
+
+    latencies.sort()
+    return {
+        'p50': statistics.median(latencies),
+        'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        'load': load_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MemoryStore add_context 延迟基准")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--samples', type=int, default=100)
+    parser.add_argument('--backends', nargs='+', default=['json', 'jsonl'])
+    args = parser.parse_args()
+
+    print(f"{'后端':<8}{'已有记忆':>10}{'add p50(ms)':>14}{'add p99(ms)':>14}{'重新加载(ms)':>16}")
+    print("-" * 62)
+    for backend in args.backends:
+        for size in args.sizes:
+            # 整体重写在 10 万条时每次写入需要数秒，减少采样次数
+            samples = args.samples if backend != 'json' or size <= 10000 else max(5, args.samples // 20)
+            r = bench(backend, size, samples)
+            print(f"{backend:<8}{size:>10}{r['p50']:>14.3f}{r['p99']:>14.3f}{r['load']:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
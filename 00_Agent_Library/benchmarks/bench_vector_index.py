@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+向量索引后端基准测试（vector_index: numpy / hnswlib / chroma）
+
+数据为合成的聚类向量（归一化，模拟句向量分布），查询取自同一分布的留出样本，
+以精确暴力搜索的 top-k 为基准。每个 (规模, 配置) 在独立子进程中运行，报告:
+- 构建时间（写入全部向量，hnswlib 含建图并写盘）
+- recall@k
+- 单条查询延迟 p50 / p99
+- 构建并查询后的常驻内存增量（RSS，不含生成数据本身）
+
+配置写法: 后端[:M:ef_construction:ef_search]，例如 numpy、chroma、hnswlib:16:200:64
+缺少依赖的后端（如未安装 chromadb）直接跳过；子进程出错、异常退出或超时时
+报告原因并继续下一个配置。
+
+用法:
+    python benchmarks/bench_vector_index.py
+    python benchmarks/bench_vector_index.py --sizes 10000 100000 1000000 \\
+        --configs numpy hnswlib:16:200:64 hnswlib:32:200:128 chroma
+
+作者: Claude Code
+日期: 2026-01-16
+"""
+
+import argparse
+import gc
+import importlib.util
+import multiprocessing
+import queue
+import re
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from vector_index import open_index
+
+BATCH = 5000
+
+# 各后端需要的模块
+BACKEND_MODULES = {'numpy': 'numpy', 'hnswlib': 'hnswlib', 'chroma': 'chromadb'}
+
+
+def _parse_config(spec: str):
+    """解析 '后端[:M:ef_construction:ef_search]'"""
+    match = re.fullmatch(r'(numpy|hnswlib|chroma)(?::(\d+):(\d+):(\d+))?', spec)
+    if not match:
+        raise argparse.ArgumentTypeError(f"无法解析配置: {spec}")
+    backend, m, ef_construction, ef_search = match.groups()
+    hnsw = {'M': int(m), 'ef_construction': int(ef_construction), 'ef_search': int(ef_search)} if m else None
+    return {'label': spec, 'backend': backend, 'hnsw': hnsw}
+
+
+def _make_data(size: int, queries: int, dim: int, seed: int = 42):
+    """聚类向量（每簇约 500 个）与留出的查询向量"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, size // 500), dim)).astype(np.float32)
+
+    def sample(n):
+        labels = rng.integers(0, len(centers), n)
+        points = centers[labels] + 0.6 * rng.standard_normal((n, dim)).astype(np.float32)
+        return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+    return sample(size), sample(queries)
+
+
+def _ground_truth(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """精确余弦 top-k（分块）"""
+    best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+    for start in range(0, len(vectors), 100000):
+        scores = queries @ vectors[start:start + 100000].T
+        ids = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+        scores = np.hstack([best_scores, scores])
+        ids = np.hstack([best_ids, ids])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        best_scores = np.take_along_axis(scores, top, axis=1)
+        best_ids = np.take_along_axis(ids, top, axis=1)
+    return best_ids
+
+
+def _rss_mb() -> float:
+    """当前常驻内存（MB）；没有 /proc 时退回峰值"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _worker(config, size, n_queries, dim, top_k, dtype, results):
+    """子进程：建索引、查询、报告（出错时报告错误信息）"""
+    try:
+        _run(config, size, n_queries, dim, top_k, dtype, results)
+    except BaseException as e:
+        results.put({'error': f"{type(e).__name__}: {e}"})
+        raise
+
+
+def _run(config, size, n_queries, dim, top_k, dtype, results):
+    vectors, queries = _make_data(size, n_queries, dim)
+    ids = [str(i) for i in range(size)]
+    metadatas = [{'bucket': i % 10} for i in range(size)]
+    baseline = _rss_mb() - (vectors.nbytes + queries.nbytes) / (1024 * 1024)
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        index = open_index(config['backend'], Path(directory), 'bench',
+                           metadata={'hnsw:space': 'cosine'}, dtype=dtype, hnsw=config['hnsw'])
+        for i in range(0, size, BATCH):
+            index.add(ids=ids[i:i + BATCH], embeddings=vectors[i:i + BATCH], metadatas=metadatas[i:i + BATCH])
+        index.close()
+        build_s = time.perf_counter() - start
+
+        del vectors, ids, metadatas
+        gc.collect()
+
+        found, latencies = [], []
+        for query in queries:
+            start = time.perf_counter()
+            result = index.query(query_embeddings=[query], n_results=top_k, include=[])
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append([int(doc_id) for doc_id in result['ids'][0]])
+
+        rss = _rss_mb() - baseline - queries.nbytes / (1024 * 1024)
+        index.close()
+
+    latencies.sort()
+    results.put({
+        'build_s': build_s,
+        'p50': statistics.median(latencies),
+        'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        'rss': rss,
+        'found': found,
+    })
+
+
+def _collect(process, results, timeout: float):
+    """等待子进程的结果；子进程退出而没有结果、或超时，抛出 RuntimeError"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return results.get(timeout=1.0)
+        except queue.Empty:
+            pass
+        if not process.is_alive():
+            # 退出前放入的结果可能还在管道里
+            try:
+                return results.get(timeout=1.0)
+            except queue.Empty:
+                raise RuntimeError(f"子进程异常退出 (exitcode={process.exitcode})")
+        if time.monotonic() > deadline:
+            process.terminate()
+            raise RuntimeError(f"超时 ({timeout:.0f} s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="向量索引后端基准")
+    parser.add_argument('--sizes', nargs='+', type=int, default=[10000, 100000, 1000000])
+    parser.add_argument('--configs', nargs='+', type=_parse_config,
+                        default=[_parse_config(spec) for spec in
+                                 ('numpy', 'hnswlib:16:200:64', 'hnswlib:32:200:128', 'chroma')])
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=10)
+    parser.add_argument('--dtype', default='float32', choices=['float32', 'float16'])
+    parser.add_argument('--timeout', type=float, default=7200, help='单个 (规模, 配置) 的超时秒数')
+    args = parser.parse_args()
+
+    configs = []
+    for config in args.configs:
+        module = BACKEND_MODULES[config['backend']]
+        if importlib.util.find_spec(module) is None:
+            print(f"跳过 {config['label']}: 未安装 {module}")
+        else:
+            configs.append(config)
+
+    context = multiprocessing.get_context('spawn')
+    header = f"{'规模':>9}  {'配置':<22}{'构建(s)':>9}{f'recall@{args.top_k}':>11}{'p50(ms)':>9}{'p99(ms)':>9}{'RSS(MB)':>9}"
+    print(header)
+    print("-" * (len(header) + 4))
+
+    for size in args.sizes:
+        vectors, queries = _make_data(size, args.queries, args.dim)
+        truth = _ground_truth(vectors, queries, args.top_k)
+        del vectors
+
+        for config in configs:
+            results = context.Queue()
+            process = context.Process(target=_worker, args=(config, size, args.queries, args.dim,
+                                                            args.top_k, args.dtype, results))
+            process.start()
+            try:
+                result = _collect(process, results, args.timeout)
+            except RuntimeError as e:
+                result = {'error': str(e)}
+            finally:
+                process.join()
+            if 'error' in result:
+                print(f"{size:>9}  {config['label']:<22}失败: {result['error']}")
+                continue
+
+            recall = np.mean([len(set(found) & set(expected)) / args.top_k
+                              for found, expected in zip(result['found'], truth.tolist())])
+            print(f"{size:>9}  {config['label']:<22}{result['build_s']:>9.2f}{recall:>11.2%}"
+                  f"{result['p50']:>9.2f}{result['p99']:>9.2f}{result['rss']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,12 +16,25 @@ Claude Code 记忆持久化系统
 
 import sys
 import json
+import time
+import heapq
+import hashlib
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 import re
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from memory_storage import create_backend, apply_op
+from memory_index import MemoryIndex, query_tokens
+
 # Windows 终端编码修复
 if sys.platform == 'win32':
     try:
@@ -45,6 +58,9 @@ class ImportanceScorer:
     - 内容长度和质量
     - 时间新鲜度
     - 交互频率
+
+    关键词/质量/优先级三部分只取决于记忆内容，按内容哈希缓存；
+    时间新鲜度按天数分档，每次现算。
     """
 
     # 高权重关键词（用户兴趣）
@@ -69,8 +85,20 @@ class ImportanceScorer:
         "文档", "教程", "示例"
     ]
 
+    # 时间新鲜度分档: (最大天数, 分数)，超过最后一档为 RECENCY_FLOOR
+    RECENCY_BUCKETS = [(1, 20.0), (7, 15.0), (30, 10.0), (90, 5.0)]
+    RECENCY_FLOOR = 2.0  # 旧记忆仍有一定价值
+
+    # 参与静态分计算的字段（内容哈希只覆盖这些字段）
+    STATIC_FIELDS = ['topic', 'summary', 'key_points', 'decisions_made',
+                     'outcomes', 'tools_used', 'priority']
+
+    # 静态分缓存上限（超过后清空重建）
+    STATIC_CACHE_SIZE = 200000
+
     def __init__(self):
         self.keyword_weights = self._build_keyword_weights()
+        self._static_cache: Dict[str, float] = {}
 
     def _build_keyword_weights(self) -> Dict[str, float]:
         """构建关键词权重字典"""
@@ -91,25 +119,33 @@ class ImportanceScorer:
         返回:
             重要性分数 (0-100)
         """
-        score = 0.0
-
-        # 1. 关键词匹配度 (0-40分)
-        keyword_score = self._calculate_keyword_score(memory)
-        score += keyword_score
-
-        # 2. 内容质量 (0-25分)
-        quality_score = self._calculate_quality_score(memory)
-        score += quality_score
+        # 关键词 + 质量 + 优先级（缓存）+ 时间新鲜度
+        score = self.static_score(memory) + self._calculate_recency_score(memory)
+        return min(score, 100.0)
 
-        # 3. 时间新鲜度 (0-20分)
-        recency_score = self._calculate_recency_score(memory)
-        score += recency_score
+    @classmethod
+    def content_hash(cls, memory: Dict[str, Any]) -> str:
+        """记忆内容哈希（仅覆盖影响静态分的字段）"""
+        payload = json.dumps([memory.get(f) for f in cls.STATIC_FIELDS],
+                             ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
 
-        # 4. 优先级 (0-15分)
-        priority_score = self._calculate_priority_score(memory)
-        score += priority_score
+    def static_score(self, memory: Dict[str, Any]) -> float:
+        """
+        计算与时间无关的分数（按内容哈希缓存）
 
-        return min(score, 100.0)
+        包含: 关键词匹配度 (0-40分) + 内容质量 (0-25分) + 优先级 (0-15分)
+        """
+        key = self.content_hash(memory)
+        score = self._static_cache.get(key)
+        if score is None:
+            score = (self._calculate_keyword_score(memory)
+                     + self._calculate_quality_score(memory)
+                     + self._calculate_priority_score(memory))
+            if len(self._static_cache) >= self.STATIC_CACHE_SIZE:
+                self._static_cache.clear()
+            self._static_cache[key] = score
+        return score
 
     def _calculate_keyword_score(self, memory: Dict[str, Any]) -> float:
         """计算关键词匹配分数"""
@@ -170,21 +206,18 @@ class ImportanceScorer:
         try:
             timestamp = datetime.fromisoformat(timestamp_str)
             age = datetime.now() - timestamp
-
-            # 越新分数越高
-            if age.days <= 1:
-                return 20.0
-            elif age.days <= 7:
-                return 15.0
-            elif age.days <= 30:
-                return 10.0
-            elif age.days <= 90:
-                return 5.0
-            else:
-                return 2.0  # 旧记忆仍有一定价值
+            return self.recency_from_days(age.days)
         except:
             return 0.0
 
+    @classmethod
+    def recency_from_days(cls, days: int) -> float:
+        """按记忆天数取新鲜度分数（越新分数越高）"""
+        for max_days, score in cls.RECENCY_BUCKETS:
+            if days <= max_days:
+                return score
+        return cls.RECENCY_FLOOR
+
     def _calculate_priority_score(self, memory: Dict[str, Any]) -> float:
         """计算优先级分数"""
         priority = memory.get('priority', 'normal')
@@ -199,18 +232,202 @@ class ImportanceScorer:
             return 10.0
 
 
+class ImportanceRanking:
+    """
+    重要性排名 - 全量记忆的重要性分数与 Top-K
+
+    与 contexts 列表按下标对齐，保存每条记忆的静态分和时间戳（epoch 秒）。
+    总分 = 静态分 + 分档新鲜度，新鲜度对整列时间戳向量化计算（有 NumPy 时）。
+
+    另外维护一个 Top-HEAP_SIZE 小顶堆：新鲜度只在记忆跨过分档边界时变化，
+    在最早的边界时间之前新增记忆只需入堆，get_top_memories 不必全量计算。
+    """
+
+    HEAP_SIZE = 50
+    DAY_SECONDS = 86400.0
+
+    def __init__(self, scorer: ImportanceScorer):
+        self.scorer = scorer
+        self.static: List[float] = []
+        self.timestamps: List[float] = []  # 无效时间戳为 NaN
+        self.last_timestamp = ''
+
+        self._np_cache = None              # (n, static 数组, 时间戳数组)
+        self._heap: List[Tuple[float, int]] = []  # (score, -doc_id)
+        self._valid_until = 0.0            # 堆在此时间之前有效
+
+        # 新鲜度分档边界（天数 +1，age.days 取整后超过该档）
+        self._boundaries = [(d + 1) * self.DAY_SECONDS for d, _ in scorer.RECENCY_BUCKETS]
+
+    @property
+    def doc_count(self) -> int:
+        return len(self.static)
+
+    @staticmethod
+    def _epoch(timestamp_str: str) -> float:
+        try:
+            return datetime.fromisoformat(timestamp_str).timestamp()
+        except Exception:
+            return float('nan')
+
+    # ------------------------------------------------------------------
+    # 维护
+    # ------------------------------------------------------------------
+
+    def add(self, memory: Dict[str, Any], now: Optional[float] = None):
+        """追加一条记忆（必须与 contexts 列表同步追加）"""
+        doc_id = self.doc_count
+        static = self.scorer.static_score(memory)
+        ts = self._epoch(memory.get('timestamp', ''))
+        self.static.append(static)
+        self.timestamps.append(ts)
+        self.last_timestamp = memory.get('timestamp', '')
+
+        now = time.time() if now is None else now
+        if now < self._valid_until:
+            score = self._total(static, ts, now)
+            entry = (score, -doc_id)
+            if len(self._heap) < self.HEAP_SIZE:
+                heapq.heappush(self._heap, entry)
+            elif entry > self._heap[0]:
+                heapq.heapreplace(self._heap, entry)
+            self._valid_until = min(self._valid_until, self._next_boundary(ts, now))
+
+    def rebuild(self, contexts: List[Dict[str, Any]]):
+        """从头重建"""
+        self.static, self.timestamps, self.last_timestamp = [], [], ''
+        self._np_cache, self._heap, self._valid_until = None, [], 0.0
+        for memory in contexts:
+            self.add(memory)
+
+    def sync(self, contexts: List[Dict[str, Any]]):
+        """与 contexts 列表对齐：只追加时增量处理，否则重建"""
+        count = self.doc_count
+        if count == len(contexts) and (
+                count == 0 or contexts[-1].get('timestamp', '') == self.last_timestamp):
+            return
+        if count < len(contexts) and (
+                count == 0 or contexts[count - 1].get('timestamp', '') == self.last_timestamp):
+            for memory in contexts[count:]:
+                self.add(memory)
+            return
+        self.rebuild(contexts)
+
+    # ------------------------------------------------------------------
+    # 计算
+    # ------------------------------------------------------------------
+
+    def _total(self, static: float, ts: float, now: float) -> float:
+        if ts != ts:  # NaN
+            return min(static, 100.0)
+        days = int((now - ts) // self.DAY_SECONDS)
+        return min(static + self.scorer.recency_from_days(days), 100.0)
+
+    def _next_boundary(self, ts: float, now: float) -> float:
+        """该记忆下一次跨过新鲜度分档的时间"""
+        if ts != ts:
+            return float('inf')
+        for boundary in self._boundaries:
+            if ts + boundary > now:
+                return ts + boundary
+        return float('inf')
+
+    def _arrays(self):
+        n = self.doc_count
+        if self._np_cache is None or self._np_cache[0] != n:
+            self._np_cache = (n, np.asarray(self.static, dtype=np.float64),
+                              np.asarray(self.timestamps, dtype=np.float64))
+        return self._np_cache[1], self._np_cache[2]
+
+    def scores(self, now: Optional[float] = None) -> List[float]:
+        """所有记忆的重要性分数（与 contexts 下标对齐）"""
+        now = time.time() if now is None else now
+        if not NUMPY_AVAILABLE:
+            return [self._total(s, t, now) for s, t in zip(self.static, self.timestamps)]
+        return self._score_array(now).tolist()
+
+    def _score_array(self, now: float):
+        static, ts = self._arrays()
+        days = np.floor((now - ts) / self.DAY_SECONDS)
+        conditions = [days <= max_days for max_days, _ in self.scorer.RECENCY_BUCKETS]
+        values = [score for _, score in self.scorer.RECENCY_BUCKETS]
+        recency = np.select(conditions, values, default=self.scorer.RECENCY_FLOOR)
+        recency = np.where(np.isnan(ts), 0.0, recency)
+        return np.minimum(static + recency, 100.0)
+
+    def _earliest_boundary(self, now: float) -> float:
+        if not NUMPY_AVAILABLE:
+            return min((self._next_boundary(t, now) for t in self.timestamps),
+                       default=float('inf'))
+        _, ts = self._arrays()
+        earliest = float('inf')
+        for boundary in self._boundaries:
+            crossing = ts[ts + boundary > now]  # NaN 比较为 False，自动排除
+            if crossing.size:
+                earliest = min(earliest, float(crossing.min()) + boundary)
+        return earliest
+
+    def top(self, k: int, now: Optional[float] = None) -> List[Tuple[int, float]]:
+        """
+        重要性 Top-K
+
+        返回:
+            [(doc_id, score), ...]，分数降序，同分时较早的记忆在前
+        """
+        now = time.time() if now is None else now
+        k = min(k, self.doc_count)
+        if k <= 0:
+            return []
+
+        if k > self.HEAP_SIZE:
+            return self._full_top(k, now)
+        if now >= self._valid_until:
+            self._refresh(now)
+
+        best = heapq.nlargest(k, self._heap)
+        return [(-neg_id, score) for score, neg_id in best]
+
+    def _full_top(self, k: int, now: float) -> List[Tuple[int, float]]:
+        if not NUMPY_AVAILABLE:
+            scores = self.scores(now)
+            best = heapq.nlargest(k, range(len(scores)), key=lambda i: (scores[i], -i))
+            return [(i, scores[i]) for i in best]
+
+        scores = self._score_array(now)
+        if k < scores.size:
+            # 先用 argpartition 取出第 k 大的分数，再把同分的全部纳入以保持稳定排序
+            kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            candidates = np.flatnonzero(scores >= kth)
+        else:
+            candidates = np.arange(scores.size)
+        order = np.lexsort((candidates, -scores[candidates]))[:k]
+        return [(int(candidates[i]), float(scores[candidates[i]])) for i in order]
+
+    def _refresh(self, now: float):
+        """全量计算后重建 Top 堆，并记录其失效时间"""
+        top = self._full_top(min(self.HEAP_SIZE, self.doc_count), now)
+        self._heap = [(score, -doc_id) for doc_id, score in top]
+        heapq.heapify(self._heap)
+        self._valid_until = self._earliest_boundary(now)
+
+
 class SemanticRetriever:
     """
     语义检索器 - LangMem 风格
 
-    基于关键词匹配的轻量级语义检索
+    基于关键词匹配的轻量级语义检索。传入 MemoryIndex 时只对倒排表
+    命中的候选记忆用 BM25 计算文本匹配度，再补上仅凭重要性就够得上
+    min_score 的记忆（有 ImportanceRanking 时从 Top-K 取）；按词项
+    一条都没命中时退回逐条扫描（子串匹配）。
     """
 
     def __init__(self, scorer: ImportanceScorer):
         self.scorer = scorer
 
     def search(self, memories: List[Dict[str, Any]], query: str,
-               top_k: int = 5, min_score: float = 20.0) -> List[Dict[str, Any]]:
+               top_k: int = 5, min_score: float = 20.0,
+               index: Optional[MemoryIndex] = None,
+               ranking: Optional[ImportanceRanking] = None) -> List[Dict[str, Any]]:
         """
         搜索相关记忆
 
@@ -219,16 +436,35 @@ class SemanticRetriever:
             query: 搜索查询
             top_k: 返回前K个结果
             min_score: 最低相关性分数
+            index: 与 memories 同步的倒排索引（可选）
+            ranking: 与 memories 同步的重要性排名（可选，配合 index 使用）
 
         返回:
             排序后的相关记忆列表
         """
         # 计算每条记忆的相关性分数
         scored_memories = []
-        for memory in memories:
-            relevance = self._calculate_relevance(memory, query)
-            if relevance >= min_score:
-                scored_memories.append((memory, relevance))
+        text_matches = {}
+        if index is not None and query_tokens(query):
+            text_matches = self._bm25_text_match(index, query)
+
+        if text_matches:
+            for doc_id, text_match in text_matches.items():
+                memory = memories[doc_id]
+                relevance = text_match + self.scorer.calculate(memory) * 0.5
+                if relevance >= min_score:
+                    scored_memories.append((memory, relevance))
+            # 文本不匹配的记忆仅凭重要性也可能够得上 min_score
+            for doc_id, importance in self._importance_only(memories, text_matches, top_k, ranking):
+                relevance = importance * 0.5
+                if relevance < min_score:
+                    break
+                scored_memories.append((memories[doc_id], relevance))
+        else:
+            for memory in memories:
+                relevance = self._calculate_relevance(memory, query)
+                if relevance >= min_score:
+                    scored_memories.append((memory, relevance))
 
         # 按相关性排序
         scored_memories.sort(key=lambda x: x[1], reverse=True)
@@ -242,6 +478,27 @@ class SemanticRetriever:
 
         return results
 
+    def _importance_only(self, memories: List[Dict[str, Any]], matched: Dict[int, float],
+                         top_k: int, ranking: Optional[ImportanceRanking]) -> List[Tuple[int, float]]:
+        """未命中文本的记忆按重要性降序（有排名时只取前 top_k 条）"""
+        if ranking is not None:
+            top = ranking.top(top_k + len(matched))
+            return [(doc_id, score) for doc_id, score in top if doc_id not in matched][:top_k]
+        rest = [(doc_id, self.scorer.calculate(memory))
+                for doc_id, memory in enumerate(memories) if doc_id not in matched]
+        rest.sort(key=lambda x: x[1], reverse=True)
+        return rest
+
+    @staticmethod
+    def _bm25_text_match(index: MemoryIndex, query: str) -> Dict[int, float]:
+        """用倒排索引计算候选记忆的文本匹配度 (0-50分)"""
+        candidates = index.match(query, require_all=False)
+        if not candidates:
+            return {}
+        upper = index.max_score(query) or 1.0
+        scores = index.score(query, candidates)
+        return {doc_id: min(score / upper, 1.0) * 50.0 for doc_id, score in scores.items()}
+
     def _calculate_relevance(self, memory: Dict[str, Any], query: str) -> float:
         """
         计算记忆与查询的相关性
@@ -308,7 +565,8 @@ class MemoryCleaner:
     def cleanup_low_score(self, memories: List[Dict[str, Any]],
                          threshold: float = 30.0,
                          keep_recent_days: int = 30,
-                         dry_run: bool = False) -> Dict[str, Any]:
+                         dry_run: bool = False,
+                         scores: Optional[List[float]] = None) -> Dict[str, Any]:
         """
         清理低分记忆
 
@@ -317,6 +575,7 @@ class MemoryCleaner:
             threshold: 重要性分数阈值（低于此分数将被清理）
             keep_recent_days: 保留最近N天的记忆（不管分数）
             dry_run: 仅模拟，不实际删除
+            scores: 预先算好的重要性分数（与 memories 对齐，可选）
 
         返回:
             清理统计信息
@@ -324,8 +583,11 @@ class MemoryCleaner:
         cutoff_date = datetime.now() - timedelta(days=keep_recent_days)
         to_remove = []
         to_keep = []
+        removed_scores = []
+        if scores is None:
+            scores = [self.scorer.calculate(m) for m in memories]
 
-        for memory in memories:
+        for memory, score in zip(memories, scores):
             timestamp_str = memory.get('timestamp', '')
             try:
                 timestamp = datetime.fromisoformat(timestamp_str)
@@ -333,13 +595,12 @@ class MemoryCleaner:
             except:
                 is_recent = False
 
-            score = self.scorer.calculate(memory)
-
             # 决定是否保留
             if is_recent or score >= threshold:
                 to_keep.append(memory)
             else:
                 to_remove.append(memory)
+                removed_scores.append(score)
 
         if not dry_run:
             # 实际清理：只保留to_keep
@@ -352,19 +613,21 @@ class MemoryCleaner:
             'original_count': len(memories),
             'removed_count': len(to_remove),
             'kept_count': len(to_keep),
-            'removed_scores': [self.scorer.calculate(m) for m in to_remove],
+            'removed_scores': removed_scores,
             'dry_run': dry_run,
             'cleaned_memories': cleaned_memories if not dry_run else memories
         }
 
-    def suggest_cleanup(self, memories: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def suggest_cleanup(self, memories: List[Dict[str, Any]],
+                        scores: Optional[List[float]] = None) -> Dict[str, Any]:
         """
         建议清理策略（不实际执行）
 
         分析记忆库状态，提供清理建议
         """
         # 统计分数分布
-        scores = [self.scorer.calculate(m) for m in memories]
+        if scores is None:
+            scores = [self.scorer.calculate(m) for m in memories]
 
         if not scores:
             return {
@@ -410,14 +673,17 @@ class MemoryCleaner:
 class MemoryStore:
     """记忆存储 - 持久化Claude Code的所有记忆"""
 
-    def __init__(self, workspace_root: Path):
+    # 默认存储后端: 'jsonl' 追加日志（O(1) 写入），'json' 整体重写（旧版）
+    DEFAULT_BACKEND = 'jsonl'
+
+    def __init__(self, workspace_root: Path, backend: str = None):
         self.workspace_root = Path(workspace_root)
         self.memory_dir = self.workspace_root / "06_Learning_Journal" / "claude_memory"
 
         # 确保目录存在
         self.memory_dir.mkdir(parents=True, exist_ok=True)
 
-        # 记忆文件
+        # 记忆文件（旧版 JSON 路径，追加日志后端首次加载时从这里迁移）
         self.files = {
             'contexts': self.memory_dir / "contexts.json",      # 上下文记忆
             'decisions': self.memory_dir / "decisions.json",    # 决策记忆
@@ -427,29 +693,70 @@ class MemoryStore:
             'conversations': self.memory_dir / "conversations.json" # 对话历史
         }
 
+        # 存储后端
+        self.backend = create_backend(backend or self.DEFAULT_BACKEND,
+                                      self.memory_dir, self.files.keys())
+
         # 加载记忆
         self.memory = self._load_all()
 
+        # 上下文倒排索引（首次查询时加载，close() 时保存；未保存的尾部在加载时补索引）
+        self.index_path = self.memory_dir / "contexts.index.json"
+        self._index: Optional[MemoryIndex] = None
+        self._index_dirty = False
+
         # LangMem 增强组件
         self.scorer = ImportanceScorer()
         self.retriever = SemanticRetriever(self.scorer)
         self.cleaner = MemoryCleaner(self.scorer)
+        self.ranking = ImportanceRanking(self.scorer)
 
     def _load_all(self) -> Dict[str, Any]:
-        """加载所有记忆"""
+        """加载所有记忆（追加日志后端: 快照 + 日志重放）"""
         memory = {}
-        for key, path in self.files.items():
-            if path.exists():
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        memory[key] = json.load(f)
-                except Exception as e:
-                    print(f"⚠️ 加载 {key} 失败: {e}")
-                    memory[key] = self._get_default_structure(key)
-            else:
-                memory[key] = self._get_default_structure(key)
+        for key in self.files.keys():
+            memory[key] = self.backend.load(key, self._get_default_structure(key))
         return memory
 
+    @property
+    def index(self) -> MemoryIndex:
+        """上下文倒排索引（首次访问时加载）"""
+        if self._index is None:
+            self._index = self._load_index()
+        return self._index
+
+    def _load_index(self) -> MemoryIndex:
+        """加载倒排索引，并把记忆中新增的尾部记录补进索引"""
+        index = MemoryIndex.load(self.index_path) or MemoryIndex()
+        self._sync(index)
+        return index
+
+    def _sync(self, index: MemoryIndex):
+        """让索引追上上下文列表，有变化时标记为待保存"""
+        count = index.doc_count
+        if index.sync(self.memory['contexts']['contexts']) or index.doc_count != count:
+            self._index_dirty = True
+
+    def _save_index(self):
+        """保存倒排索引"""
+        try:
+            self._index.save(self.index_path)
+            self._index_dirty = False
+        except Exception as e:
+            print(f"⚠️ 保存记忆索引失败: {e}")
+
+    def _sync_index(self) -> MemoryIndex:
+        """确保索引与上下文列表一致（外部直接修改列表后会整体重建）"""
+        if self._index is None:
+            return self.index
+        self._sync(self._index)
+        return self._index
+
+    def _sync_ranking(self) -> ImportanceRanking:
+        """确保重要性排名与上下文列表一致（首次调用时才全量计算静态分）"""
+        self.ranking.sync(self.memory['contexts']['contexts'])
+        return self.ranking
+
     def _get_default_structure(self, memory_type: str) -> Any:
         """获取默认结构"""
         defaults = {
@@ -487,7 +794,7 @@ class MemoryStore:
         return defaults.get(memory_type, {})
 
     def save(self, memory_type: str = None):
-        """保存记忆"""
+        """保存记忆（整体写出）"""
         if memory_type:
             self._save_one(memory_type)
         else:
@@ -499,12 +806,19 @@ class MemoryStore:
         if memory_type not in self.files:
             return
 
-        path = self.files[memory_type]
-        try:
-            with open(path, 'w', encoding='utf-8') as f:
-                json.dump(self.memory[memory_type], f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"⚠️ 保存 {memory_type} 失败: {e}")
+        self.backend.write(memory_type, self.memory[memory_type])
+
+    def _commit(self, memory_type: str, ops: List[Dict[str, Any]]):
+        """应用增量操作到内存并交给后端记录（追加日志后端只追加 ops）"""
+        for op in ops:
+            apply_op(self.memory[memory_type], op)
+        self.backend.record(memory_type, self.memory[memory_type], ops)
+
+    def close(self):
+        """保存索引（已加载且有变化时），等待后台压缩完成并关闭日志文件"""
+        if self._index is not None and self._index_dirty:
+            self._save_index()
+        self.backend.close()
 
     def add_context(self, context: Dict[str, Any]):
         """添加上下文记忆"""
@@ -521,16 +835,15 @@ class MemoryStore:
             'tags': context.get('tags', [])  # 新增：标签
         }
 
-        self.memory['contexts']['contexts'].append(ctx)
-        self.memory['contexts']['total_contexts'] += 1
-
         # 统计主题
         topic = context.get('topic', 'unknown')
-        if topic not in self.memory['contexts']['contexts_by_topic']:
-            self.memory['contexts']['contexts_by_topic'][topic] = 0
-        self.memory['contexts']['contexts_by_topic'][topic] += 1
 
-        self.save('contexts')
+        self._commit('contexts', [
+            {'op': 'append', 'path': ['contexts'], 'value': ctx},
+            {'op': 'incr', 'path': ['total_contexts'], 'by': 1},
+            {'op': 'incr', 'path': ['contexts_by_topic', topic], 'by': 1},
+        ])
+        # 倒排索引和重要性排名在下次查询时增量补齐，写入路径上不做 O(n) 的工作
 
     def add_decision(self, decision: Dict[str, Any]):
         """添加决策记忆"""
@@ -544,28 +857,30 @@ class MemoryStore:
             'lesson_learned': decision.get('lesson_learned', '')
         }
 
-        self.memory['decisions']['decisions'].append(dec)
-        self.memory['decisions']['total_decisions'] += 1
+        ops = [
+            {'op': 'append', 'path': ['decisions'], 'value': dec},
+            {'op': 'incr', 'path': ['total_decisions'], 'by': 1},
+        ]
 
         # 统计工具使用
         tool = decision.get('tool_chosen', '')
         if tool:
-            if tool not in self.memory['decisions']['tool_usage_stats']:
-                self.memory['decisions']['tool_usage_stats'][tool] = 0
-            self.memory['decisions']['tool_usage_stats'][tool] += 1
+            ops.append({'op': 'incr', 'path': ['tool_usage_stats', tool], 'by': 1})
 
-        self.save('decisions')
+        self._commit('decisions', ops)
 
     def update_preferences(self, preferences: Dict[str, Any]):
         """更新用户偏好"""
+        ops = []
         for key, value in preferences.items():
             if key in self.memory['preferences']:
                 if isinstance(value, dict):
-                    self.memory['preferences'][key].update(value)
-                else:
-                    self.memory['preferences'][key] = value
+                    merged = dict(self.memory['preferences'][key])
+                    merged.update(value)
+                    value = merged
+                ops.append({'op': 'set', 'path': [key], 'value': value})
 
-        self.save('preferences')
+        self._commit('preferences', ops)
 
     def add_conversation(self, conversation: Dict[str, Any]):
         """添加对话记录"""
@@ -580,25 +895,21 @@ class MemoryStore:
             'follow_up_actions': conversation.get('follow_up_actions', [])
         }
 
-        self.memory['conversations']['conversations'].append(conv)
-        self.memory['conversations']['total_conversations'] += 1
-
-        self.save('conversations')
+        self._commit('conversations', [
+            {'op': 'append', 'path': ['conversations'], 'value': conv},
+            {'op': 'incr', 'path': ['total_conversations'], 'by': 1},
+        ])
 
     def get_relevant_contexts(self, topic: str, limit: int = 5) -> List[Dict]:
-        """获取相关的上下文"""
-        contexts = self.memory['contexts']['contexts']
-
-        # 简单的关键词匹配（实际应该用语义搜索）
-        relevant = []
-        for ctx in contexts:
-            if topic.lower() in ctx.get('topic', '').lower() or \
-               topic.lower() in ctx.get('summary', '').lower():
-                relevant.append(ctx)
-                if len(relevant) >= limit:
-                    break
+        """
+        获取相关的上下文
 
-        return relevant
+        主题/摘要包含全部查询词的记忆按 BM25 排序在前；不足 limit 条时，
+        再按记录顺序补上只按子串匹配的记忆（如 "store" 匹配 "MemoryStore"）。
+        """
+        hits = self._sync_index().search(topic, top_k=limit, fields=['topic', 'summary'],
+                                         require_all=True)
+        return self._with_substring_hits(hits, topic, ('topic', 'summary'), limit)
 
     def get_tool_preferences(self, task_type: str) -> Optional[str]:
         """获取工具偏好"""
@@ -625,8 +936,8 @@ class MemoryStore:
     def get_contexts_by_tag(self, tag: str, limit: int = 10) -> List[Dict]:
         """按标签获取记忆"""
         contexts = self.memory['contexts']['contexts']
-        tagged = [ctx for ctx in contexts if tag in ctx.get('tags', [])]
-        return tagged[:limit]
+        doc_ids = self._sync_index().docs_with_tag(tag)[:limit]
+        return [contexts[doc_id] for doc_id in doc_ids]
 
     def get_recent_contexts(self, limit: int = 10) -> List[Dict]:
         """获取最近的记忆"""
@@ -634,26 +945,42 @@ class MemoryStore:
         return contexts[-limit:]
 
     def search_all_contexts(self, keyword: str, limit: int = 20) -> List[Dict]:
-        """全局搜索记忆"""
+        """
+        全局搜索记忆
+
+        标签以外的字段包含全部查询词的记忆按 BM25 排序在前；不足 limit 条时，
+        再按记录顺序补上只按子串匹配的记忆。
+        """
+        hits = self._sync_index().search(keyword, top_k=limit,
+                                         fields=['topic', 'summary', 'body'],
+                                         require_all=True)
+        return self._with_substring_hits(hits, keyword, ('topic', 'summary', 'key_points',
+                                                         'decisions_made', 'outcomes'), limit)
+
+    def _with_substring_hits(self, hits: List[Tuple[int, float]], query: str,
+                             fields: Tuple[str, ...], limit: int) -> List[Dict]:
+        """
+        词项命中之后补上子串命中
+
+        词项匹配按整词/前缀/二元组进行，单词内部的片段（"store" 之于
+        "MemoryStore"）只能靠子串匹配找到。词项命中已满 limit 条时不扫描。
+        """
         contexts = self.memory['contexts']['contexts']
-        results = []
-        keyword_lower = keyword.lower()
-
-        for ctx in contexts:
-            # 在多个字段中搜索
-            searchable_text = ' '.join([
-                ctx.get('topic', ''),
-                ctx.get('summary', ''),
-                ' '.join(ctx.get('key_points', [])),
-                ' '.join(ctx.get('decisions_made', [])),
-                ctx.get('outcomes', '')
-            ]).lower()
-
-            if keyword_lower in searchable_text:
+        results = [contexts[doc_id] for doc_id, _ in hits]
+        if len(results) >= limit:
+            return results
+
+        seen = {doc_id for doc_id, _ in hits}
+        query_lower = query.lower()
+        for doc_id, ctx in enumerate(contexts):
+            if doc_id in seen:
+                continue
+            values = [ctx.get(field) or '' for field in fields]
+            text = ' '.join(' '.join(v) if isinstance(v, list) else str(v) for v in values)
+            if query_lower in text.lower():
                 results.append(ctx)
                 if len(results) >= limit:
                     break
-
         return results
 
     def get_statistics(self) -> Dict[str, Any]:
@@ -664,7 +991,7 @@ class MemoryStore:
             'total_conversations': self.memory['conversations']['total_conversations'],
             'topics_covered': list(self.memory['contexts']['contexts_by_topic'].keys()),
             'most_used_tools': dict(self.memory['decisions']['tool_usage_stats']),
-            'memory_size_kb': sum(f.stat().st_size for f in self.files.values() if f.exists()) / 1024
+            'memory_size_kb': self.backend.storage_size_bytes() / 1024
         }
 
     # ========================================================================
@@ -689,25 +1016,17 @@ class MemoryStore:
             相关记忆列表（包含 _relevance_score 字段）
         """
         contexts = self.memory['contexts']['contexts']
-        return self.retriever.search(contexts, query, top_k, min_score)
+        return self.retriever.search(contexts, query, top_k, min_score,
+                                     index=self._sync_index(), ranking=self._sync_ranking())
 
     def get_top_memories(self, limit: int = 10) -> List[Dict[str, Any]]:
         """获取最重要的记忆（按重要性分数排序）"""
         contexts = self.memory['contexts']['contexts']
 
-        # 计算所有记忆的重要性分数
-        scored_memories = []
-        for ctx in contexts:
-            score = self.scorer.calculate(ctx)
-            scored_memories.append((ctx, score))
-
-        # 按分数排序
-        scored_memories.sort(key=lambda x: x[1], reverse=True)
-
         # 返回top_k（附带分数）
         results = []
-        for memory, score in scored_memories[:limit]:
-            memory_with_score = memory.copy()
+        for doc_id, score in self._sync_ranking().top(limit):
+            memory_with_score = contexts[doc_id].copy()
             memory_with_score['_importance_score'] = round(score, 2)
             results.append(memory_with_score)
 
@@ -716,7 +1035,7 @@ class MemoryStore:
     def analyze_memory_health(self) -> Dict[str, Any]:
         """分析记忆库健康状况"""
         contexts = self.memory['contexts']['contexts']
-        return self.cleaner.suggest_cleanup(contexts)
+        return self.cleaner.suggest_cleanup(contexts, self._sync_ranking().scores())
 
     def cleanup_memories(self, threshold: float = 30.0,
                          keep_recent_days: int = 30,
@@ -734,7 +1053,8 @@ class MemoryStore:
         """
         contexts = self.memory['contexts']['contexts']
         result = self.cleaner.cleanup_low_score(
-            contexts, threshold, keep_recent_days, dry_run
+            contexts, threshold, keep_recent_days, dry_run,
+            scores=self._sync_ranking().scores()
         )
 
         # 如果不是模拟运行，实际更新记忆
@@ -742,13 +1062,14 @@ class MemoryStore:
             self.memory['contexts']['contexts'] = result['cleaned_memories']
             self.memory['contexts']['total_contexts'] = len(result['cleaned_memories'])
             self.save('contexts')
+            self._sync_index()
+            self._sync_ranking()
 
         return result
 
     def get_importance_distribution(self) -> Dict[str, Any]:
         """获取重要性分数分布统计"""
-        contexts = self.memory['contexts']['contexts']
-        scores = [self.scorer.calculate(ctx) for ctx in contexts]
+        scores = self._sync_ranking().scores()
 
         if not scores:
             return {'error': '无记忆数据'}
@@ -785,13 +1106,25 @@ class MemoryStore:
 class ClaudeMemory:
     """Claude Code 记忆管理器 (v2.0 - 支持向量语义搜索)"""
 
-    def __init__(self, workspace_root: Optional[Path] = None, enable_semantic: bool = True):
+    def __init__(self, workspace_root: Optional[Path] = None, enable_semantic: bool = True,
+                 storage_backend: Optional[str] = None, warm_up: bool = False):
+        """
+        初始化记忆管理器
+
+        参数:
+            workspace_root: 工作区根目录
+            enable_semantic: 是否启用语义记忆（模型和向量库在首次语义操作时加载）
+            storage_backend: 存储后端
+            warm_up: 是否在后台线程中提前加载嵌入模型和向量库
+        """
+        start = time.perf_counter()
         if workspace_root is None:
             # 自动检测工作区根目录
             workspace_root = Path(__file__).parent.parent
 
-        self.store = MemoryStore(workspace_root)
+        self.store = MemoryStore(workspace_root, backend=storage_backend)
         self.current_session = self._generate_session_id()
+        self.timings = {'store': time.perf_counter() - start}
 
         # v2.0新增：语义记忆（可选启用）
         self.enable_semantic = enable_semantic
@@ -800,13 +1133,28 @@ class ClaudeMemory:
         if enable_semantic:
             try:
                 from semantic_memory import SemanticMemory
-                self.semantic_memory = SemanticMemory(workspace_root)
-                print("✅ 语义记忆已启用")
+                self.semantic_memory = SemanticMemory(workspace_root, warm_up=warm_up)
+                print("✅ 语义记忆已启用（首次语义操作时加载模型）")
             except ImportError as e:
                 print(f"⚠️ 语义记忆未启用: {e}")
                 print("💡 提示: 运行 pip install chromadb sentence-transformers")
                 self.enable_semantic = False
 
+        self.timings['init'] = time.perf_counter() - start
+
+    def get_timings(self) -> Dict[str, float]:
+        """
+        获取启动与加载耗时
+
+        返回:
+            {'store': ..., 'init': ..., 'semantic.index': ..., 'semantic.model': ...}（秒）
+        """
+        timings = dict(self.timings)
+        if self.semantic_memory is not None:
+            for key, value in self.semantic_memory.get_timings().items():
+                timings[f'semantic.{key}'] = value
+        return timings
+
     def _generate_session_id(self) -> str:
         """生成会话ID"""
         return f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
@@ -923,23 +1271,28 @@ class ClaudeMemory:
             return self.store.semantic_search(query, top_k, min_score)
 
     def hybrid_search(self, query: str, top_k: int = 5,
-                     semantic_weight: float = 0.7) -> List[Dict[str, Any]]:
+                     semantic_weight: float = 0.5,
+                     candidate_depth: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         混合搜索 (v2.0新增)
 
-        结合向量语义搜索和关键词搜索，提供最佳结果
+        向量检索、向量库旁的 BM25 词法检索和 JSON 记忆库的关键词检索
+        按倒数排名融合
 
         参数:
             query: 搜索查询
             top_k: 返回前K个结果
-            semantic_weight: 语义搜索权重 (0-1，默认0.7)
+            semantic_weight: 向量检索权重 (0-1，默认0.5)
+            candidate_depth: 每一路检索的候选数（默认使用语义记忆的配置）
         """
         if not (self.enable_semantic and self.semantic_memory):
             # 语义搜索未启用，使用关键词搜索
             return self.store.semantic_search(query, top_k)
 
+        depth = max(candidate_depth or self.semantic_memory.candidate_depth, top_k)
+
         # 获取关键词搜索结果
-        keyword_results = self.store.semantic_search(query, top_k * 2)
+        keyword_results = self.store.semantic_search(query, depth)
 
         # 转换为统一格式
         formatted_keyword_results = []
@@ -956,7 +1309,8 @@ class ClaudeMemory:
             query=query,
             keyword_results=formatted_keyword_results,
             top_k=top_k,
-            semantic_weight=semantic_weight
+            semantic_weight=semantic_weight,
+            candidate_depth=depth
         )
 
         return hybrid_results
@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享嵌入服务 - 进程内单例模型 + 磁盘嵌入缓存
+
+memory_agent 的 TextEmbedder、SemanticMemory 和 LocalAIEngine 共用：
+1. 模型: 同一进程中同名模型只加载一次，且在第一次真正需要编码时才加载
+2. 缓存: 以 (模型标识, 文本 SHA-1) 为键，向量以 float16 存在内存映射文件中，
+   键到行号的索引存在 SQLite；重新索引、重复查询直接读缓存
+3. 批量: 一次请求中相同的文本只编码一次，未命中的文本合并成一次 encode
+4. 后端: 'torch'（默认）、'onnx'（ONNX Runtime）或 'onnx-int8'（动态 int8 量化，
+   适合只有 CPU 的机器）；torch 后端可用 workers 开多进程分摊大批量编码；
+   max_seq_length 可调小以换取吞吐（超出部分截断）
+5. 查询: encode_query 以规范化后的查询文本为键，在进程内 LRU 中保存向量，
+   同一查询在一次会话中被多个检索路径使用时只编码（或读缓存）一次
+
+缓存文件（每个模型一个向量文件）:
+    06_Learning_Journal/embedding_cache/index.db
+    06_Learning_Journal/embedding_cache/<模型>-<维度>.f16
+
+用法:
+    service = get_embedding_service('paraphrase-multilingual-MiniLM-L12-v2')
+    vectors = service.encode(["文本一", "文本二"])   # numpy (n, dim) float32
+    vector = service.encode_one("查询")
+    query_vector = service.encode_query("  查询 ")    # 与 "查询" 共用一条 LRU 记录
+
+    # CPU 部署: int8 量化 + 截断到 256 token
+    service = get_embedding_service(name, backend='onnx-int8', max_seq_length=256)
+
+不同后端/序列长度得到的向量不完全相同，各自使用独立的缓存标识。
+
+作者: Claude Code
+日期: 2026-01-16
+"""
+
+import atexit
+import hashlib
+import platform
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "06_Learning_Journal" / "embedding_cache"
+
+# 向量文件每次扩容的最少行数
+GROW_ROWS = 1024
+
+# SQLite IN 查询每批的键数
+LOOKUP_BATCH = 500
+
+# 可选的编码后端
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+# 多进程编码的最小批量（每个进程至少分到的文本数，少于此时单进程更快）
+MIN_TEXTS_PER_WORKER = 64
+
+# 进程内查询向量 LRU 的默认容量
+QUERY_CACHE_SIZE = 512
+
+
+# ============================================================================
+# 模型注册表
+# ============================================================================
+
+_models: Dict[Tuple[str, str, str, Optional[int]], Any] = {}
+_models_lock = threading.Lock()
+
+
+def load_model(model_name: str,
+               device: str = 'cpu',
+               backend: str = 'torch',
+               max_seq_length: Optional[int] = None):
+    """
+    获取共享的 SentenceTransformer 模型（同一进程相同配置只加载一次）
+
+    参数:
+        model_name: 模型名称或本地路径
+        device: 运行设备
+        backend: 'torch'、'onnx' 或 'onnx-int8'（需要 sentence-transformers[onnx]）
+        max_seq_length: 最大输入 token 数（None 使用模型默认值）
+
+    返回:
+        SentenceTransformer 实例
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"未知的嵌入后端: {backend}（可选: {', '.join(BACKENDS)}）")
+
+    key = (model_name, device, backend, max_seq_length)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+
+            print(f"🔄 加载嵌入模型: {model_name} ({device}, {backend})")
+            if backend == 'torch':
+                model = SentenceTransformer(model_name, device=device)
+            elif backend == 'onnx':
+                model = SentenceTransformer(model_name, device=device, backend='onnx')
+            else:
+                model = _load_quantized(model_name, device)
+
+            if max_seq_length:
+                model.max_seq_length = min(max_seq_length, model.max_seq_length)
+            _models[key] = model
+        return model
+
+
+def _quantization_target() -> str:
+    """按 CPU 指令集选择 int8 量化配置"""
+    if platform.machine().lower() in ('arm64', 'aarch64'):
+        return 'arm64'
+    try:
+        flags = Path('/proc/cpuinfo').read_text()
+    except OSError:
+        return 'avx2'
+    if 'avx512_vnni' in flags:
+        return 'avx512_vnni'
+    if 'avx512' in flags:
+        return 'avx512'
+    return 'avx2'
+
+
+def _load_quantized(model_name: str, device: str):
+    """
+    加载动态 int8 量化的 ONNX 模型
+
+    第一次使用时导出 ONNX 并量化，结果保存在缓存目录的 onnx/ 下，之后直接加载。
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    target = _quantization_target()
+    file_name = f"onnx/model_qint8_{target}.onnx"
+    slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name).strip('_')
+    export_dir = DEFAULT_CACHE_DIR / "onnx" / slug
+
+    if not (export_dir / file_name).exists():
+        print(f"⚙️ 导出 int8 量化模型 ({target}): {export_dir}")
+        model = SentenceTransformer(model_name, device=device, backend='onnx')
+        model.save(str(export_dir))
+        export_dynamic_quantized_onnx_model(model, target, str(export_dir))
+
+    return SentenceTransformer(
+        str(export_dir), device=device, backend='onnx',
+        model_kwargs={'file_name': file_name}
+    )
+
+
+# ============================================================================
+# 磁盘缓存
+# ============================================================================
+
+def normalize_query(text: str) -> str:
+    """查询文本规范化（NFKC、去首尾空白、连续空白合并为一个空格）"""
+    return ' '.join(unicodedata.normalize('NFKC', text).split())
+
+
+def text_key(text: str) -> bytes:
+    """文本的缓存键（SHA-1 摘要）"""
+    return hashlib.sha1(text.encode('utf-8')).digest()
+
+
+class EmbeddingCache:
+    """
+    嵌入向量磁盘缓存
+
+    向量按行追加写入 float16 内存映射文件，写入完成后才在 SQLite 中登记键，
+    因此并发读取只会看到完整的向量。多个进程共享同一目录时由 SQLite 写锁
+    串行化行号分配和文件扩容。
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        初始化缓存
+
+        参数:
+            cache_dir: 缓存目录
+        """
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._maps: Dict[str, np.memmap] = {}
+
+        self._conn = sqlite3.connect(
+            str(self.cache_dir / "index.db"), timeout=30,
+            check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS models (
+                model TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                rows INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                key BLOB NOT NULL,
+                row INTEGER NOT NULL,
+                PRIMARY KEY (model, key)
+            ) WITHOUT ROWID
+        ''')
+
+    def dimension(self, model: str) -> Optional[int]:
+        """已缓存模型的向量维度（未缓存过返回 None）"""
+        with self._lock:
+            row = self._conn.execute('SELECT dim FROM models WHERE model = ?', (model,)).fetchone()
+        return row[0] if row else None
+
+    def _vector_path(self, model: str, dim: int) -> Path:
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model).strip('_')
+        return self.cache_dir / f"{slug}-{dim}.f16"
+
+    def _map(self, model: str, dim: int, min_rows: int = 0) -> Optional[np.memmap]:
+        """打开（必要时重新打开）模型的向量文件映射（调用方持锁）"""
+        mapped = self._maps.get(model)
+        if mapped is not None and mapped.shape[0] >= min_rows:
+            return mapped
+
+        path = self._vector_path(model, dim)
+        rows = path.stat().st_size // (dim * 2) if path.exists() else 0
+        if rows == 0:
+            return None
+        mapped = np.memmap(path, dtype=np.float16, mode='r+', shape=(rows, dim))
+        self._maps[model] = mapped
+        return mapped
+
+    def get(self, model: str, keys: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
+        """
+        批量读取向量
+
+        参数:
+            model: 模型标识
+            keys: 文本键列表
+
+        返回:
+            {键: float32 向量}，只含命中的键
+        """
+        if not keys:
+            return {}
+
+        with self._lock:
+            meta = self._conn.execute('SELECT dim FROM models WHERE model = ?', (model,)).fetchone()
+            if meta is None:
+                return {}
+
+            rows = {}
+            for i in range(0, len(keys), LOOKUP_BATCH):
+                batch = list(keys[i:i + LOOKUP_BATCH])
+                placeholders = ','.join('?' * len(batch))
+                rows.update(self._conn.execute(
+                    f'SELECT key, row FROM embeddings WHERE model = ? AND key IN ({placeholders})',
+                    [model, *batch]
+                ).fetchall())
+            if not rows:
+                return {}
+
+            mapped = self._map(model, meta[0], max(rows.values()) + 1)
+            found = list(rows)
+            vectors = np.asarray(mapped[[rows[key] for key in found]], dtype=np.float32)
+
+        return dict(zip(found, vectors))
+
+    def put(self, model: str, keys: Sequence[bytes], vectors: np.ndarray):
+        """
+        批量写入向量
+
+        参数:
+            model: 模型标识
+            keys: 文本键列表
+            vectors: (n, dim) 向量
+        """
+        if not len(keys):
+            return
+
+        vectors = np.asarray(vectors, dtype=np.float16)
+        dim = vectors.shape[1]
+
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute('INSERT OR IGNORE INTO models (model, dim) VALUES (?, ?)', (model, dim))
+                stored_dim, start = self._conn.execute(
+                    'SELECT dim, rows FROM models WHERE model = ?', (model,)
+                ).fetchone()
+                if stored_dim != dim:
+                    raise ValueError(f"向量维度不一致: 缓存 {stored_dim}, 写入 {dim}")
+
+                # 扩容向量文件（按倍数增长，减少重新映射次数）
+                end = start + len(keys)
+                path = self._vector_path(model, dim)
+                capacity = path.stat().st_size // (dim * 2) if path.exists() else 0
+                if end > capacity:
+                    with open(path, 'ab') as f:
+                        f.truncate(max(end, capacity * 2, GROW_ROWS) * dim * 2)
+                    self._maps.pop(model, None)
+
+                mapped = self._map(model, dim, end)
+                mapped[start:end] = vectors
+                mapped.flush()
+
+                self._conn.executemany(
+                    'INSERT OR IGNORE INTO embeddings (model, key, row) VALUES (?, ?, ?)',
+                    [(model, key, start + i) for i, key in enumerate(keys)]
+                )
+                self._conn.execute('UPDATE models SET rows = ? WHERE model = ?', (end, model))
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """各模型的缓存条数"""
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT m.model, m.dim, COUNT(e.key) FROM models m
+                LEFT JOIN embeddings e ON e.model = m.model GROUP BY m.model
+            ''').fetchall()
+        return {model: {'dim': dim, 'entries': count} for model, dim, count in rows}
+
+    def clear(self, model: Optional[str] = None):
+        """
+        清空缓存
+
+        参数:
+            model: 只清空该模型（默认全部）
+        """
+        with self._lock:
+            where, params = ('WHERE model = ?', (model,)) if model else ('', ())
+            targets = self._conn.execute(f'SELECT model, dim FROM models {where}', params).fetchall()
+            self._conn.execute(f'DELETE FROM embeddings {where}', params)
+            self._conn.execute(f'DELETE FROM models {where}', params)
+            for name, dim in targets:
+                self._maps.pop(name, None)
+                self._vector_path(name, dim).unlink(missing_ok=True)
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._maps.clear()
+            self._conn.close()
+
+
+_caches: Dict[str, EmbeddingCache] = {}
+_registry_lock = threading.Lock()
+
+
+def get_embedding_cache(cache_dir: Optional[Path] = None) -> EmbeddingCache:
+    """获取共享的缓存实例（同一目录只打开一次）"""
+    key = str(Path(cache_dir or DEFAULT_CACHE_DIR).resolve())
+    with _registry_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = EmbeddingCache(key)
+            _caches[key] = cache
+        return cache
+
+
+# ============================================================================
+# 嵌入服务
+# ============================================================================
+
+class EmbeddingService:
+    """带缓存的文本嵌入服务"""
+
+    def __init__(self,
+                 model_name: str,
+                 device: str = 'cpu',
+                 batch_size: int = 32,
+                 cache_dir: Optional[Path] = None,
+                 use_cache: bool = True,
+                 model: Any = None,
+                 backend: str = 'torch',
+                 max_seq_length: Optional[int] = None,
+                 workers: int = 1,
+                 query_cache_size: int = QUERY_CACHE_SIZE):
+        """
+        初始化嵌入服务（不加载模型）
+
+        参数:
+            model_name: 模型名称或本地路径
+            device: 运行设备
+            batch_size: 编码批大小
+            cache_dir: 缓存目录（默认 06_Learning_Journal/embedding_cache）
+            use_cache: 是否使用磁盘缓存
+            model: 已创建的编码模型（需提供 encode 与 get_sentence_embedding_dimension），
+                默认按 model_name 从共享注册表加载
+            backend: 编码后端 'torch'、'onnx' 或 'onnx-int8'
+            max_seq_length: 最大输入 token 数（None 使用模型默认值）
+            workers: 编码进程数（仅 torch 后端；ONNX Runtime 本身已多线程）
+            query_cache_size: 查询向量 LRU 容量（0 关闭）
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"未知的嵌入后端: {backend}（可选: {', '.join(BACKENDS)}）")
+
+        self.model_name = model_name
+        self.device = device
+        self.batch_size = batch_size
+        self.backend = backend
+        self.max_seq_length = max_seq_length
+        self.workers = max(1, workers) if backend == 'torch' else 1
+        self.cache = get_embedding_cache(cache_dir) if use_cache else None
+
+        self._model = model
+        self._dimension = None
+        self._pool = None
+
+        self.query_cache_size = query_cache_size
+        self._queries: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._queries_lock = threading.Lock()
+        self.query_hits = 0
+
+        self.stats = {'hits': 0, 'misses': 0, 'duplicates': 0}
+        self.timings: Dict[str, float] = {}
+
+    @property
+    def model(self):
+        """编码模型（首次访问时加载）"""
+        if self._model is None:
+            start = time.perf_counter()
+            self._model = load_model(self.model_name, self.device, self.backend, self.max_seq_length)
+            self.timings['model_load'] = time.perf_counter() - start
+        return self._model
+
+    @property
+    def cache_id(self) -> str:
+        """缓存中的模型标识（非默认后端和序列长度带后缀，如 name@onnx-int8@seq256）"""
+        cache_id = self.model_name
+        if self.backend != 'torch':
+            cache_id += f"@{self.backend}"
+        if self.max_seq_length:
+            cache_id += f"@seq{self.max_seq_length}"
+        return cache_id
+
+    @property
+    def dimension(self) -> int:
+        """向量维度（已有缓存时不需要加载模型）"""
+        if self._dimension is None:
+            if self.cache is not None:
+                self._dimension = self.cache.dimension(self.cache_id)
+            if self._dimension is None:
+                self._dimension = self.model.get_sentence_embedding_dimension()
+        return self._dimension
+
+    def encode(self, texts: Sequence[str], show_progress: bool = False) -> np.ndarray:
+        """
+        批量编码（去重 + 缓存）
+
+        参数:
+            texts: 文本列表
+            show_progress: 是否显示进度条
+
+        返回:
+            (n, dim) float32 数组，顺序与 texts 一致
+        """
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        # 相同文本只处理一次
+        keys = [text_key(text) for text in texts]
+        unique: Dict[bytes, str] = {}
+        for key, text in zip(keys, texts):
+            unique.setdefault(key, text)
+        self.stats['duplicates'] += len(texts) - len(unique)
+
+        vectors = self.cache.get(self.cache_id, list(unique)) if self.cache is not None else {}
+        self.stats['hits'] += len(vectors)
+
+        missing = [key for key in unique if key not in vectors]
+        if missing:
+            self.stats['misses'] += len(missing)
+            encoded = self._encode([unique[key] for key in missing], show_progress)
+            # 与缓存读出的精度一致，结果不因是否命中而不同
+            encoded = np.asarray(encoded, dtype=np.float16)
+            if self.cache is not None:
+                self.cache.put(self.cache_id, missing, encoded)
+            vectors.update(zip(missing, encoded.astype(np.float32)))
+
+        return np.stack([vectors[key] for key in keys])
+
+    def _encode(self, texts: List[str], show_progress: bool) -> np.ndarray:
+        """调用模型编码，批量足够大时分发到多个进程"""
+        if self.workers > 1 and len(texts) >= self.workers * MIN_TEXTS_PER_WORKER:
+            if self._pool is None:
+                self._pool = self.model.start_multi_process_pool([self.device] * self.workers)
+                atexit.register(self.close)
+            return self.model.encode_multi_process(texts, self._pool, batch_size=self.batch_size)
+
+        return self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            show_progress_bar=show_progress,
+            convert_to_numpy=True
+        )
+
+    def close(self):
+        """停止多进程编码池"""
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def encode_one(self, text: str) -> np.ndarray:
+        """
+        编码单个文本
+
+        参数:
+            text: 文本内容
+
+        返回:
+            (dim,) float32 向量
+        """
+        return self.encode([text])[0]
+
+    def encode_queries(self, queries: Sequence[str]) -> np.ndarray:
+        """
+        批量编码查询（先查进程内 LRU，未命中的查询合并成一次 encode）
+
+        查询先经 normalize_query 规范化，编码的也是规范化后的文本，
+        因此只差空白或全半角的查询得到同一个向量。
+
+        参数:
+            queries: 查询文本列表
+
+        返回:
+            (n, dim) float32 数组，顺序与 queries 一致
+        """
+        normalized = [normalize_query(query) for query in queries]
+        if not normalized:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        found: Dict[str, np.ndarray] = {}
+        with self._queries_lock:
+            for query in normalized:
+                vector = self._queries.get(query)
+                if vector is not None:
+                    self._queries.move_to_end(query)
+                    found[query] = vector
+        self.query_hits += sum(1 for query in normalized if query in found)
+
+        missing = list(dict.fromkeys(query for query in normalized if query not in found))
+        if missing:
+            vectors = self.encode(missing)
+            vectors.setflags(write=False)
+            for query, vector in zip(missing, vectors):
+                found[query] = vector
+
+            if self.query_cache_size > 0:
+                with self._queries_lock:
+                    for query in missing:
+                        self._queries[query] = found[query]
+                        self._queries.move_to_end(query)
+                    while len(self._queries) > self.query_cache_size:
+                        self._queries.popitem(last=False)
+
+        return np.stack([found[query] for query in normalized])
+
+    def encode_query(self, query: str) -> np.ndarray:
+        """
+        编码单个查询（进程内 LRU）
+
+        参数:
+            query: 查询文本
+
+        返回:
+            (dim,) float32 向量
+        """
+        return self.encode_queries([query])[0]
+
+
+_services: Dict[Tuple[str, str, str, str, Optional[int]], EmbeddingService] = {}
+
+
+def get_embedding_service(model_name: str,
+                          device: str = 'cpu',
+                          batch_size: int = 32,
+                          cache_dir: Optional[Path] = None,
+                          backend: str = 'torch',
+                          max_seq_length: Optional[int] = None,
+                          workers: int = 1) -> EmbeddingService:
+    """
+    获取共享的嵌入服务（同一模型、设备、后端、序列长度和缓存目录只创建一次）
+
+    参数:
+        model_name: 模型名称或本地路径
+        device: 运行设备
+        batch_size: 编码批大小（首次创建时生效）
+        cache_dir: 缓存目录
+        backend: 编码后端 'torch'、'onnx' 或 'onnx-int8'
+        max_seq_length: 最大输入 token 数
+        workers: 编码进程数（首次创建时生效）
+
+    返回:
+        EmbeddingService 实例
+    """
+    key = (model_name, device, str(Path(cache_dir or DEFAULT_CACHE_DIR).resolve()), backend, max_seq_length)
+    with _registry_lock:
+        service = _services.get(key)
+    if service is None:
+        service = EmbeddingService(model_name, device, batch_size, cache_dir,
+                                   backend=backend, max_seq_length=max_seq_length, workers=workers)
+        with _registry_lock:
+            service = _services.setdefault(key, service)
+    return service
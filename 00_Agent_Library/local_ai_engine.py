@@ -159,19 +159,24 @@ class LocalAIEngine:
             self.logger.error(f"❌ PaddleOCR 初始化失败: {e}")
 
     def _init_embedding_model(self):
-        """初始化嵌入模型"""
+        """初始化嵌入模型（共享嵌入服务，模型在首次编码时加载）"""
         try:
-            from sentence_transformers import SentenceTransformer
+            import sentence_transformers  # noqa: F401  检查依赖
+            from embedding_service import get_embedding_service
 
             config = self.config['embedding']
             model_name = config.get('model_name',
                                    'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2')
             device = config.get('device', 'cpu')
 
-            model = SentenceTransformer(model_name, device=device)
-            self._engines[AIEngine.SENTENCE_TRANSFORMER] = model
+            service = get_embedding_service(
+                model_name,
+                device=device,
+                batch_size=config.get('batch_size', 32)
+            )
+            self._engines[AIEngine.SENTENCE_TRANSFORMER] = service
 
-            self.logger.info(f"✅ 嵌入模型初始化成功 ({device})")
+            self.logger.info(f"✅ 嵌入服务初始化成功 ({device})")
 
         except ImportError:
             self.logger.warning("⚠️ sentence-transformers 未安装")
@@ -305,14 +310,8 @@ class LocalAIEngine:
             self.logger.error("❌ 嵌入模型未初始化")
             return []
 
-        model = self._engines[AIEngine.SENTENCE_TRANSFORMER]
-        embeddings = model.encode(
-            texts,
-            batch_size=self.config['embedding'].get('batch_size', 32),
-            show_progress_bar=False
-        )
-
-        return embeddings.tolist()
+        service = self._engines[AIEngine.SENTENCE_TRANSFORMER]
+        return service.encode(texts).tolist()
 
     def semantic_search(
         self,
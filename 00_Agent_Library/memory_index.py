@@ -0,0 +1,769 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+记忆倒排索引 - 支持中文的 BM25 关键词检索
+
+为 MemoryStore 的上下文记忆维护倒排索引：
+1. 分词: ASCII 单词 + 中文二元组（bigram），单字中文查询按字展开
+2. 增量维护: 查询前只索引新追加的记录
+3. BM25F 评分: 主题 > 摘要 > 标签 > 其他字段
+4. 持久化: MemoryStore.close() 时保存为 contexts.index.json，首次查询时加载
+5. 向量化: 查询涉及的倒排表较长时，用 NumPy 数组做匹配、评分和 Top-K（可选依赖）
+
+另有 LexicalIndex: 以字符串 ID 为键、可删除的单字段 BM25 索引，
+放在 SemanticMemory 的向量集合旁边做词法检索，与向量检索结果用
+reciprocal_rank_fusion 融合。
+
+用法:
+    index = MemoryIndex()
+    index.add(0, context)
+    doc_ids = index.match("工作流引擎", fields=['topic', 'summary'])
+    ranked = index.search("LangGraph 检查点", top_k=5)
+
+作者: Claude Code
+日期: 2026-01-16
+"""
+
+import bisect
+import heapq
+import itertools
+import json
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+# ============================================================================
+# 分词
+# ============================================================================
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+(?:_[a-z0-9]+)*|[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    分词
+
+    ASCII 按单词切分（带下划线的标识符额外拆出各部分），
+    中文连续片段切成二元组，单独一个汉字保留为单字。
+
+    返回:
+        词元列表（可能有重复，用于计算词频）
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        run = match.group()
+        if run[0] < '\u0080':
+            tokens.append(run)
+            if '_' in run:
+                # 标识符同时按下划线拆分，market_supervision 也能被 supervision 命中
+                tokens.extend(run.split('_'))
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def query_tokens(query: str) -> List[str]:
+    """查询分词（去重并保持顺序）"""
+    return list(dict.fromkeys(tokenize(query)))
+
+
+def _is_ascii(token: str) -> bool:
+    return token[0] < '\u0080'
+
+
+# ============================================================================
+# 倒排索引
+# ============================================================================
+
+class MemoryIndex:
+    """
+    上下文记忆倒排索引
+
+    文档 ID 即记录在 contexts 列表中的下标，每个字段一张倒排表:
+        postings[字段序号][token] = {doc_id: 词频}
+    """
+
+    FIELDS = ['topic', 'summary', 'body', 'tags']
+    FIELD_WEIGHTS = [3.0, 2.0, 1.0, 1.5]
+
+    # BM25 参数
+    K1 = 1.2
+    B = 0.75
+
+    # ASCII 前缀扩展 / 单字扩展的最大词数
+    MAX_EXPANSION = 32
+
+    # 查询涉及的倒排表总长度达到该值时改用 NumPy 向量化匹配与评分
+    VECTORIZE_MIN_POSTINGS = 2048
+    # 倒排表数组缓存的最大条数（超过后清空）
+    ARRAY_CACHE_SIZE = 4096
+
+    VERSION = 2
+
+    def __init__(self):
+        self.postings: List[Dict[str, Dict[int, int]]] = [{} for _ in self.FIELDS]
+        self.df: Dict[str, int] = {}            # 文档频率（任一字段出现即计一次）
+        self.lengths: List[List[int]] = []      # 每个文档各字段的长度
+        self.field_totals = [0] * len(self.FIELDS)
+        self.tags: Dict[str, List[int]] = {}    # 标签精确索引（按插入顺序）
+        self.last_timestamp = ''                # 最后一条已索引记录的时间戳
+
+        self._ascii_vocab: List[str] = []       # 已排序的 ASCII 词表（前缀扩展用）
+        self._vocab_dirty = False               # 批量构建后词表待整体排序
+        self._by_char: Dict[str, Set[str]] = {}  # 汉字 -> 含该字的二元组
+
+        # NumPy 查询用的缓存：(字段序号, 词) -> (文档ID, 词频, 字段长度) 数组，以及长度矩阵
+        self._arrays: Dict[Tuple[int, str], Tuple[Any, Any]] = {}
+        self._length_array = None
+
+    @property
+    def doc_count(self) -> int:
+        return len(self.lengths)
+
+    # ------------------------------------------------------------------
+    # 构建
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _field_texts(context: Dict[str, Any]) -> List[str]:
+        return [
+            context.get('topic', '') or '',
+            context.get('summary', '') or '',
+            ' '.join([
+                ' '.join(context.get('key_points', []) or []),
+                ' '.join(context.get('decisions_made', []) or []),
+                context.get('outcomes', '') or '',
+            ]),
+            ' '.join(context.get('tags', []) or []),
+        ]
+
+    def _new_term(self, token: str):
+        if _is_ascii(token):
+            # 词表有序时插入到位，查询前不必整体重排
+            if not self._vocab_dirty:
+                bisect.insort(self._ascii_vocab, token)
+        elif len(token) == 2:
+            for ch in token:
+                self._by_char.setdefault(ch, set()).add(token)
+
+    def add(self, doc_id: int, context: Dict[str, Any]):
+        """索引一条记录（doc_id 必须等于当前文档数）"""
+        if doc_id != self.doc_count:
+            raise ValueError(f"索引不连续: 期望 doc_id={self.doc_count}，实际 {doc_id}")
+
+        lengths = []
+        seen: Set[str] = set()
+        for field_no, text in enumerate(self._field_texts(context)):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            self.field_totals[field_no] += len(tokens)
+            field_postings = self.postings[field_no]
+            for token in tokens:
+                entry = field_postings.get(token)
+                if entry is None:
+                    entry = field_postings[token] = {}
+                entry[doc_id] = entry.get(doc_id, 0) + 1
+            seen.update(tokens)
+            if self._arrays:
+                for token in set(tokens):
+                    self._arrays.pop((field_no, token), None)
+
+        for token in seen:
+            df = self.df.get(token)
+            if df is None:
+                self._new_term(token)
+                df = 0
+            self.df[token] = df + 1
+        self.lengths.append(lengths)
+        if self._length_array is not None:
+            if doc_id >= len(self._length_array):
+                grown = np.empty((max(64, 2 * len(self._length_array)), len(self.FIELDS)))
+                grown[:doc_id] = self._length_array[:doc_id]
+                self._length_array = grown
+            self._length_array[doc_id] = lengths
+
+        for tag in context.get('tags', []) or []:
+            self.tags.setdefault(tag, []).append(doc_id)
+
+        self.last_timestamp = context.get('timestamp', '')
+
+    def rebuild(self, contexts: List[Dict[str, Any]]):
+        """从头重建索引"""
+        self.__init__()
+        self._vocab_dirty = True  # 词表在首次前缀扩展时整体排序一次
+        for doc_id, context in enumerate(contexts):
+            self.add(doc_id, context)
+
+    def sync(self, contexts: List[Dict[str, Any]]) -> bool:
+        """
+        使索引与记录列表一致
+
+        记录只在末尾追加时增量索引尾部；否则（如清理后）整体重建。
+
+        返回:
+            是否发生了整体重建
+        """
+        count = self.doc_count
+        if count == len(contexts) and (
+                count == 0 or contexts[-1].get('timestamp', '') == self.last_timestamp):
+            return False
+
+        if count < len(contexts) and (
+                count == 0 or contexts[count - 1].get('timestamp', '') == self.last_timestamp):
+            if len(contexts) - count > count:
+                self._vocab_dirty = True  # 批量追加，词表留到查询时整体排序
+            for doc_id in range(count, len(contexts)):
+                self.add(doc_id, contexts[doc_id])
+            return False
+
+        self.rebuild(contexts)
+        return True
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def _expand(self, token: str) -> List[str]:
+        """
+        把查询词元展开为索引中的词
+
+        - ASCII 词元按前缀扩展（支持边输入边搜索）
+        - 单个汉字扩展为包含该字的二元组
+        """
+        if _is_ascii(token):
+            if self._vocab_dirty:
+                self._ascii_vocab = sorted(t for t in self.df if _is_ascii(t))
+                self._vocab_dirty = False
+            terms = []
+            start = bisect.bisect_left(self._ascii_vocab, token)
+            for term in self._ascii_vocab[start:start + self.MAX_EXPANSION]:
+                if not term.startswith(token):
+                    break
+                terms.append(term)
+            return terms
+
+        if len(token) == 1:
+            terms = [token] if token in self.df else []
+            terms.extend(sorted(self._by_char.get(token, ()),
+                                key=lambda t: -self.df[t])[:self.MAX_EXPANSION])
+            return terms
+
+        return [token] if token in self.df else []
+
+    def _field_mask(self, fields: Optional[Iterable[str]]) -> List[int]:
+        if fields is None:
+            return list(range(len(self.FIELDS)))
+        return [self.FIELDS.index(f) for f in fields]
+
+    def _docs_for(self, terms: List[str], mask: List[int]) -> Set[int]:
+        docs: Set[int] = set()
+        for term in terms:
+            for i in mask:
+                entry = self.postings[i].get(term)
+                if entry:
+                    docs.update(entry.keys())
+        return docs
+
+    def match(self, query: str, fields: Optional[Iterable[str]] = None,
+              require_all: bool = True) -> Set[int]:
+        """
+        布尔匹配
+
+        参数:
+            query: 查询文本
+            fields: 限定字段（默认全部）
+            require_all: True 为所有词元都出现（交集），False 为任一出现（并集）
+
+        返回:
+            匹配的文档 ID 集合
+        """
+        mask = self._field_mask(fields)
+        groups = [self._expand(t) for t in query_tokens(query)]
+        if not groups or (require_all and any(not terms for terms in groups)):
+            return set()
+        if self._vectorize(groups):
+            return set(np.flatnonzero(self._match_mask(groups, mask, require_all)).tolist())
+
+        if require_all:
+            # 从文档频率最低的词开始求交集
+            groups.sort(key=lambda terms: sum(self.df[t] for t in terms))
+            result = self._docs_for(groups[0], mask)
+            for terms in groups[1:]:
+                if not result:
+                    break
+                if len(terms) == 1 and len(mask) == 1:
+                    result.intersection_update(self.postings[mask[0]].get(terms[0], ()))
+                else:
+                    result &= self._docs_for(terms, mask)
+            return result
+
+        result: Set[int] = set()
+        for terms in groups:
+            result |= self._docs_for(terms, mask)
+        return result
+
+    def _idf(self, term: str) -> float:
+        df = self.df.get(term, 0)
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def score(self, query: str, doc_ids: Iterable[int],
+              fields: Optional[Iterable[str]] = None) -> Dict[int, float]:
+        """对候选文档计算 BM25F 分数"""
+        mask = self._field_mask(fields)
+        n = max(self.doc_count, 1)
+        avg = [max(total / n, 1.0) for total in self.field_totals]
+        candidates = doc_ids if isinstance(doc_ids, (set, frozenset)) else set(doc_ids)
+        if NUMPY_AVAILABLE and len(candidates) >= self.VECTORIZE_MIN_POSTINGS:
+            cand = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+            return dict(zip(cand.tolist(), self._score_array(query, cand, mask).tolist()))
+        lengths = self.lengths
+        k1, b = self.K1, self.B
+
+        scores = dict.fromkeys(candidates, 0.0)
+        for token in query_tokens(query):
+            for term in self._expand(token):
+                # 先按字段累加加权词频，再做一次饱和
+                weighted: Dict[int, float] = {}
+                for i in mask:
+                    entry = self.postings[i].get(term)
+                    if not entry:
+                        continue
+                    weight, field_avg = self.FIELD_WEIGHTS[i], avg[i]
+                    # 候选集较小时遍历候选，否则遍历倒排表
+                    if len(candidates) < len(entry):
+                        hits = [(d, entry[d]) for d in candidates if d in entry]
+                    else:
+                        hits = [(d, tf) for d, tf in entry.items() if d in candidates]
+                    for doc_id, tf in hits:
+                        norm = 1 - b + b * lengths[doc_id][i] / field_avg
+                        weighted[doc_id] = weighted.get(doc_id, 0.0) + weight * tf / norm
+
+                if weighted:
+                    idf = self._idf(term) * (k1 + 1)
+                    for doc_id, tf in weighted.items():
+                        scores[doc_id] += idf * tf / (k1 + tf)
+        return scores
+
+    def max_score(self, query: str) -> float:
+        """查询的理论最高分（用于把 BM25 分数归一化到 0-1）"""
+        total = 0.0
+        for token in query_tokens(query):
+            terms = self._expand(token)
+            if terms:
+                total += max(self._idf(t) for t in terms) * (self.K1 + 1)
+        return total
+
+    def search(self, query: str, top_k: int = 10, fields: Optional[Iterable[str]] = None,
+               require_all: bool = False) -> List[Tuple[int, float]]:
+        """
+        BM25 排序检索
+
+        返回:
+            [(doc_id, score), ...]，按分数降序（同分时较早的记录在前）
+        """
+        mask = self._field_mask(fields)
+        groups = [self._expand(t) for t in query_tokens(query)]
+        if not groups or (require_all and any(not terms for terms in groups)):
+            return []
+        if self._vectorize(groups):
+            cand = np.flatnonzero(self._match_mask(groups, mask, require_all))
+            return self._top_array(self._score_array(query, cand, mask), cand, top_k)
+
+        candidates = self.match(query, fields, require_all)
+        if not candidates:
+            return []
+        scores = self.score(query, candidates, fields)
+        return heapq.nlargest(top_k, scores.items(), key=lambda x: (x[1], -x[0]))
+
+    # ------------------------------------------------------------------
+    # NumPy 向量化查询（常见词的倒排表很长时，逐条遍历字典是主要开销）
+    # ------------------------------------------------------------------
+
+    def _vectorize(self, groups: List[List[str]]) -> bool:
+        if not NUMPY_AVAILABLE:
+            return False
+        return sum(self.df[t] for terms in groups for t in terms) >= self.VECTORIZE_MIN_POSTINGS
+
+    def _posting_arrays(self, field_no: int, term: str):
+        """倒排表的数组形式 (文档ID, 词频, 该字段长度)，按需构建并缓存，add 涉及的词失效"""
+        key = (field_no, term)
+        arrays = self._arrays.get(key)
+        if arrays is None:
+            entry = self.postings[field_no].get(term)
+            if not entry:
+                return None
+            ids = np.fromiter(entry.keys(), dtype=np.int64, count=len(entry))
+            arrays = (ids, np.fromiter(entry.values(), dtype=np.float64, count=len(entry)),
+                      self._length_matrix()[ids, field_no])
+            if len(self._arrays) >= self.ARRAY_CACHE_SIZE:
+                self._arrays.clear()
+            self._arrays[key] = arrays
+        return arrays
+
+    def _length_matrix(self):
+        """文档 × 字段的长度矩阵（首次使用时构建，之后随 add 追加）"""
+        if self._length_array is None:
+            n, width = self.doc_count, len(self.FIELDS)
+            flat = np.fromiter(itertools.chain.from_iterable(self.lengths),
+                               dtype=np.float64, count=n * width)
+            self._length_array = flat.reshape(n, width)
+        return self._length_array
+
+    def _match_mask(self, groups: List[List[str]], mask: List[int], require_all: bool):
+        """布尔匹配的向量化版本，返回长度为文档数的布尔数组"""
+        result = None
+        for terms in groups:
+            hit = np.zeros(self.doc_count, dtype=bool)
+            for term in terms:
+                for i in mask:
+                    arrays = self._posting_arrays(i, term)
+                    if arrays is not None:
+                        hit[arrays[0]] = True
+            if result is None:
+                result = hit
+            elif require_all:
+                result &= hit
+            else:
+                result |= hit
+        return result
+
+    def _score_array(self, query: str, cand, mask: List[int]):
+        """BM25F 的向量化版本，返回与 cand 对齐的分数数组（运算顺序与 score 一致）"""
+        n = max(self.doc_count, 1)
+        avg = [max(total / n, 1.0) for total in self.field_totals]
+        k1, b = self.K1, self.B
+
+        scores = np.zeros(len(cand))
+        for token in query_tokens(query):
+            for term in self._expand(token):
+                weighted = None
+                for i in mask:
+                    arrays = self._posting_arrays(i, term)
+                    if arrays is None:
+                        continue
+                    ids, tfs, lengths = arrays
+                    if weighted is None:
+                        weighted = np.zeros(self.doc_count)
+                    norm = 1 - b + b * lengths / avg[i]
+                    weighted[ids] += self.FIELD_WEIGHTS[i] * tfs / norm
+                if weighted is not None:
+                    tf = weighted[cand]
+                    idf = self._idf(term) * (k1 + 1)
+                    scores += idf * tf / (k1 + tf)
+        return scores
+
+    @staticmethod
+    def _top_array(scores, cand, top_k: int) -> List[Tuple[int, float]]:
+        """分数数组的 Top-K，同分时较早的记录在前"""
+        k = min(top_k, cand.size)
+        if k <= 0:
+            return []
+        if k < scores.size:
+            # 先用 argpartition 取出第 k 大的分数，再把同分的全部纳入以保持稳定排序
+            kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+            keep = np.flatnonzero(scores >= kth)
+        else:
+            keep = np.arange(scores.size)
+        order = np.lexsort((cand[keep], -scores[keep]))[:k]
+        return [(int(cand[keep[j]]), float(scores[keep[j]])) for j in order]
+
+    def docs_with_tag(self, tag: str) -> List[int]:
+        """带某标签的文档 ID（插入顺序）"""
+        return self.tags.get(tag, [])
+
+    # ------------------------------------------------------------------
+    # 持久化
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path):
+        """原子写入索引文件"""
+        path = Path(path)
+        payload = {
+            'version': self.VERSION,
+            'last_timestamp': self.last_timestamp,
+            'lengths': self.lengths,
+            'field_totals': self.field_totals,
+            'tags': self.tags,
+            'df': self.df,
+            # JSON 的键只能是字符串，倒排表存为扁平的 [doc, tf, doc, tf, ...]
+            'postings': [
+                {token: [x for pair in entry.items() for x in pair]
+                 for token, entry in field_postings.items()}
+                for field_postings in self.postings
+            ],
+        }
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['MemoryIndex']:
+        """读取索引文件，文件不存在或版本不符时返回 None"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except Exception as e:
+            print(f"⚠️ 加载记忆索引失败: {e}")
+            return None
+        if payload.get('version') != cls.VERSION:
+            return None
+
+        index = cls()
+        index.last_timestamp = payload.get('last_timestamp', '')
+        index.lengths = payload.get('lengths', [])
+        index.field_totals = payload.get('field_totals', index.field_totals)
+        index.tags = payload.get('tags', {})
+        index.df = payload.get('df', {})
+        index.postings = [
+            {token: dict(zip(flat[::2], flat[1::2])) for token, flat in field_postings.items()}
+            for field_postings in payload.get('postings', [{} for _ in cls.FIELDS])
+        ]
+        index._vocab_dirty = True
+        for token in index.df:
+            index._new_term(token)
+        return index
+
+
+# ============================================================================
+# 词法索引（按字符串 ID，支持删除）
+# ============================================================================
+
+class LexicalIndex:
+    """
+    单字段 BM25 索引
+
+    与 MemoryIndex 使用同一套分词，正排表 docs[id] = {词元: 词频}，
+    倒排表 postings[词元] = {id: 词频} 在加载时由正排表重建。
+    精确的标识符（身份证号、错误信息、函数名）作为完整词元被索引，
+    向量检索漏掉时仍能命中。
+
+    持久化为快照 <name>.json 加增量日志 <name>.log.jsonl：每次增删只向日志
+    追加对应文档的条目（append_log），加载时在快照上重放，save 写出新快照
+    并清空日志。重放是幂等的，快照替换后、日志删除前崩溃也不会出错。
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    VERSION = 1
+
+    def __init__(self):
+        self.docs: Dict[str, Dict[str, int]] = {}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.lengths: Dict[str, int] = {}
+        self.total_length = 0
+        self._by_char: Dict[str, Set[str]] = {}  # 汉字 -> 含该字的二元组
+        self.log_entries = 0                     # 快照之后日志中的条目数
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.docs
+
+    def add(self, doc_id: str, text: str):
+        """索引（或重新索引）一条文本"""
+        if doc_id in self.docs:
+            self.remove(doc_id)
+        self._insert(doc_id, dict(Counter(tokenize(text))))
+
+    @staticmethod
+    def delta(added: Optional[Dict[str, str]] = None,
+              removed: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        把增删转换为日志条目（先删后加，文本只分词一次）
+
+        返回:
+            [{'op': 'remove', 'id': ...} | {'op': 'add', 'id': ..., 'terms': {词元: 词频}}, ...]
+        """
+        ops: List[Dict[str, Any]] = [{'op': 'remove', 'id': doc_id} for doc_id in removed or []]
+        ops.extend({'op': 'add', 'id': doc_id, 'terms': dict(Counter(tokenize(text)))}
+                   for doc_id, text in (added or {}).items())
+        return ops
+
+    def apply(self, ops: Iterable[Dict[str, Any]]):
+        """应用日志条目"""
+        for op in ops:
+            if op.get('op') == 'remove':
+                self.remove(op['id'])
+            elif op.get('op') == 'add':
+                self.remove(op['id'])
+                self._insert(op['id'], op['terms'])
+
+    def _insert(self, doc_id: str, terms: Dict[str, int]):
+        self.docs[doc_id] = terms
+        length = sum(terms.values())
+        self.lengths[doc_id] = length
+        self.total_length += length
+        for term, tf in terms.items():
+            entry = self.postings.get(term)
+            if entry is None:
+                entry = self.postings[term] = {}
+                if len(term) == 2 and not _is_ascii(term):
+                    for ch in term:
+                        self._by_char.setdefault(ch, set()).add(term)
+            entry[doc_id] = tf
+
+    def remove(self, doc_id: str):
+        """删除一条文本（不存在时忽略）"""
+        terms = self.docs.pop(doc_id, None)
+        if terms is None:
+            return
+        self.total_length -= self.lengths.pop(doc_id)
+        for term in terms:
+            entry = self.postings[term]
+            del entry[doc_id]
+            if not entry:
+                del self.postings[term]
+                if len(term) == 2 and not _is_ascii(term):
+                    for ch in term:
+                        bigrams = self._by_char[ch]
+                        bigrams.discard(term)
+                        if not bigrams:
+                            del self._by_char[ch]
+
+    def clear(self):
+        """清空索引"""
+        self.__init__()
+
+    def _expand(self, token: str) -> List[str]:
+        """单个汉字扩展为包含该字的二元组，其余词元精确匹配"""
+        if len(token) == 1 and not _is_ascii(token):
+            terms = [token] if token in self.postings else []
+            terms.extend(sorted(self._by_char.get(token, ()),
+                                key=lambda t: -len(self.postings[t]))[:MemoryIndex.MAX_EXPANSION])
+            return terms
+        return [token] if token in self.postings else []
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        BM25 检索
+
+        参数:
+            query: 查询文本
+            top_k: 返回条数
+
+        返回:
+            [(id, score), ...]，按分数降序
+        """
+        n = len(self.docs)
+        if n == 0:
+            return []
+        avg = max(self.total_length / n, 1.0)
+        k1, b = self.K1, self.B
+
+        scores: Dict[str, float] = {}
+        for token in query_tokens(query):
+            for term in self._expand(token):
+                entry = self.postings[term]
+                idf = math.log(1 + (n - len(entry) + 0.5) / (len(entry) + 0.5)) * (k1 + 1)
+                for doc_id, tf in entry.items():
+                    norm = k1 * (1 - b + b * self.lengths[doc_id] / avg)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf / (tf + norm)
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda x: x[1])
+
+    @staticmethod
+    def log_path(path: Path) -> Path:
+        """索引文件旁的增量日志路径"""
+        path = Path(path)
+        return path.with_name(path.stem + '.log.jsonl')
+
+    @classmethod
+    def append_log(cls, path: Path, ops: List[Dict[str, Any]]):
+        """把日志条目追加到索引旁的增量日志（不需要加载索引）"""
+        if not ops:
+            return
+        payload = ''.join(json.dumps(op, ensure_ascii=False, separators=(',', ':')) + '\n'
+                          for op in ops).encode('utf-8')
+        with open(cls.log_path(path), 'a+b') as f:
+            # 上次写入被截断时先补一个换行，残缺的行在重放时跳过
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    payload = b'\n' + payload
+            f.write(payload)
+
+    def save(self, path: Path):
+        """原子写入索引快照，并清空增量日志"""
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'docs': self.docs}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+        self.log_path(path).unlink(missing_ok=True)
+        self.log_entries = 0
+
+    @classmethod
+    def load(cls, path: Path) -> Optional['LexicalIndex']:
+        """读取索引快照并重放增量日志，快照不存在或版本不符时返回 None"""
+        path = Path(path)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except Exception as e:
+            print(f"⚠️ 加载词法索引失败: {e}")
+            return None
+        if payload.get('version') != cls.VERSION:
+            return None
+
+        index = cls()
+        for doc_id, terms in payload.get('docs', {}).items():
+            index._insert(doc_id, terms)
+
+        log = cls.log_path(path)
+        if log.exists():
+            with open(log, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    try:
+                        op = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    index.apply([op])
+                    index.log_entries += 1
+        return index
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]],
+                           weights: Optional[List[float]] = None,
+                           k: int = 60) -> Dict[str, float]:
+    """
+    倒数排名融合（RRF）
+
+    每个列表中排第 r 位（从 1 开始）的条目得分 weight / (k + r)，各列表得分相加。
+    只依赖名次，不需要把向量相似度和 BM25 分数换算到同一尺度。
+
+    参数:
+        rankings: 多个按相关性排序的 ID 列表
+        weights: 各列表的权重（默认都为 1）
+        k: 平滑常数，越大越看重在多个列表中同时出现
+
+    返回:
+        {id: 融合分数}
+    """
+    weights = weights or [1.0] * len(rankings)
+    fused: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, 1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + weight / (k + rank)
+    return fused
@@ -0,0 +1,508 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+记忆存储后端 - 可插拔的持久化层
+
+为 MemoryStore 提供两种存储后端:
+1. JsonFileBackend  - 原有方式，每次保存整体重写 <type>.json
+2. AppendLogBackend - 追加日志方式，每条新记录 O(1) 追加到 JSONL，
+                      后台线程定期把日志折叠进快照
+
+追加日志的目录布局（以 contexts 为例）:
+    contexts.snapshot.json     快照 {"generation": G, "data": {...}}
+    contexts.log.<N>.jsonl     日志段，N > G 的段在启动时按序重放
+
+用法:
+    backend = create_backend('jsonl', memory_dir, memory_types)
+    data = backend.load('contexts', default)
+    backend.record('contexts', data, [{'op': 'append', 'path': ['contexts'], 'value': ctx}])
+
+作者: Claude Code
+日期: 2026-01-16
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+# ============================================================================
+# 日志操作
+# ============================================================================
+
+def apply_op(data: Dict[str, Any], op: Dict[str, Any]):
+    """
+    把一条日志操作应用到内存数据上
+
+    支持的操作:
+        {'op': 'append', 'path': [...], 'value': x}  列表追加
+        {'op': 'incr',   'path': [...], 'by': n}     计数器累加
+        {'op': 'set',    'path': [...], 'value': x}  直接赋值
+    """
+    path = op.get('path') or []
+    if not path:
+        return
+
+    target = data
+    for key in path[:-1]:
+        if key not in target or not isinstance(target[key], dict):
+            target[key] = {}
+        target = target[key]
+
+    last = path[-1]
+    kind = op.get('op')
+    if kind == 'append':
+        target.setdefault(last, []).append(op.get('value'))
+    elif kind == 'incr':
+        target[last] = target.get(last, 0) + op.get('by', 1)
+    elif kind == 'set':
+        target[last] = op.get('value')
+
+
+# ============================================================================
+# 后端基类
+# ============================================================================
+
+class MemoryBackend:
+    """记忆存储后端基类"""
+
+    name = 'base'
+
+    def __init__(self, memory_dir: Path, memory_types: Iterable[str]):
+        self.memory_dir = Path(memory_dir)
+        self.memory_dir.mkdir(parents=True, exist_ok=True)
+        self.memory_types = list(memory_types)
+
+    def load(self, memory_type: str, default: Any) -> Any:
+        """加载一种记忆，不存在时返回 default"""
+        raise NotImplementedError
+
+    def record(self, memory_type: str, data: Any, ops: List[Dict[str, Any]]):
+        """
+        记录一次增量修改
+
+        参数:
+            memory_type: 记忆类型
+            data: 修改后的完整数据（整体重写型后端使用）
+            ops: 本次修改对应的日志操作（追加型后端使用）
+        """
+        raise NotImplementedError
+
+    def write(self, memory_type: str, data: Any):
+        """整体替换一种记忆（如清理后）"""
+        raise NotImplementedError
+
+    def storage_files(self) -> List[Path]:
+        """后端当前占用的所有文件"""
+        raise NotImplementedError
+
+    def storage_size_bytes(self) -> int:
+        """后端占用的磁盘空间"""
+        return sum(f.stat().st_size for f in self.storage_files() if f.exists())
+
+    def flush(self):
+        """等待后台任务完成"""
+
+    def close(self):
+        """释放文件句柄等资源"""
+        self.flush()
+
+
+# ============================================================================
+# 整体重写后端（原有行为）
+# ============================================================================
+
+class JsonFileBackend(MemoryBackend):
+    """每次保存都整体重写 <type>.json（兼容旧版本）"""
+
+    name = 'json'
+
+    def _path(self, memory_type: str) -> Path:
+        return self.memory_dir / f"{memory_type}.json"
+
+    def load(self, memory_type: str, default: Any) -> Any:
+        path = self._path(memory_type)
+        if not path.exists():
+            return default
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ 加载 {memory_type} 失败: {e}")
+            return default
+
+    def record(self, memory_type: str, data: Any, ops: List[Dict[str, Any]]):
+        self.write(memory_type, data)
+
+    def write(self, memory_type: str, data: Any):
+        try:
+            with open(self._path(memory_type), 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"⚠️ 保存 {memory_type} 失败: {e}")
+
+    def storage_files(self) -> List[Path]:
+        return [self._path(t) for t in self.memory_types]
+
+
+# ============================================================================
+# 追加日志后端
+# ============================================================================
+
+class AppendLogBackend(MemoryBackend):
+    """
+    追加日志存储后端
+
+    - record(): 只把操作追加到当前日志段，写入成本与历史长度无关
+    - 当前日志段超过 compact_threshold 条时封存该段，
+      由后台线程把 快照 + 已封存日志段 折叠成新快照
+    - load(): 读取快照，再按序重放代数大于快照代数的日志段
+    - 首次加载时若没有任何日志文件，会自动从旧版 <type>.json 迁移
+    """
+
+    name = 'jsonl'
+
+    def __init__(self, memory_dir: Path, memory_types: Iterable[str],
+                 compact_threshold: int = 1000, background: bool = True):
+        """
+        参数:
+            memory_dir: 记忆目录
+            memory_types: 记忆类型列表
+            compact_threshold: 单个日志段的最大条数，超过后触发压缩
+            background: 是否在后台线程中压缩（False 时同步压缩，便于测试）
+        """
+        super().__init__(memory_dir, memory_types)
+        self.compact_threshold = compact_threshold
+        self.background = background
+
+        self._lock = threading.RLock()
+        self._generation: Dict[str, int] = {}    # 当前写入的日志段代数
+        self._entries: Dict[str, int] = {}       # 当前日志段的条数
+        self._handles: Dict[str, Any] = {}
+        self._compactors: Dict[str, threading.Thread] = {}
+
+    # ------------------------------------------------------------------
+    # 路径
+    # ------------------------------------------------------------------
+
+    def _snapshot_path(self, memory_type: str) -> Path:
+        return self.memory_dir / f"{memory_type}.snapshot.json"
+
+    def _segment_path(self, memory_type: str, generation: int) -> Path:
+        return self.memory_dir / f"{memory_type}.log.{generation}.jsonl"
+
+    def _legacy_path(self, memory_type: str) -> Path:
+        return self.memory_dir / f"{memory_type}.json"
+
+    def _segments(self, memory_type: str) -> List[int]:
+        """列出磁盘上已有的日志段代数（升序）"""
+        generations = []
+        for path in self.memory_dir.glob(f"{memory_type}.log.*.jsonl"):
+            try:
+                generations.append(int(path.name.split('.')[-2]))
+            except ValueError:
+                continue
+        return sorted(generations)
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+
+    def _read_snapshot(self, memory_type: str, default: Any):
+        path = self._snapshot_path(memory_type)
+        if not path.exists():
+            return 0, default
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        return snapshot.get('generation', 0), snapshot.get('data', default)
+
+    @staticmethod
+    def _replay(data: Any, segment: Path) -> int:
+        """重放一个日志段，返回成功应用的条数（跳过无法解析的行）"""
+        applied = 0
+        with open(segment, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    apply_op(data, json.loads(line))
+                    applied += 1
+                except json.JSONDecodeError:
+                    # 崩溃时写了一半的行：跳过，后面的记录照常重放
+                    continue
+        return applied
+
+    @staticmethod
+    def _trim_torn_tail(segment: Path):
+        """把日志段截断到最后一个换行符，避免新记录接在半行后面"""
+        with open(segment, 'rb+') as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            # 从尾部向前找最后一个换行符
+            end = size
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b'\n')
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+                    return
+                end = start
+            f.truncate(0)
+
+    def load(self, memory_type: str, default: Any) -> Any:
+        with self._lock:
+            if not self._snapshot_path(memory_type).exists() and not self._segments(memory_type):
+                self._migrate_legacy(memory_type)
+
+            try:
+                snapshot_gen, data = self._read_snapshot(memory_type, default)
+            except Exception as e:
+                print(f"⚠️ 加载 {memory_type} 快照失败: {e}")
+                snapshot_gen, data = 0, default
+
+            last_gen, last_entries = snapshot_gen, 0
+            for generation in self._segments(memory_type):
+                if generation <= snapshot_gen:
+                    # 压缩已完成但旧段尚未删除
+                    self._segment_path(memory_type, generation).unlink(missing_ok=True)
+                    continue
+                last_entries = self._replay(data, self._segment_path(memory_type, generation))
+                last_gen = generation
+
+            # 最后一段会继续追加：先去掉崩溃留下的半行
+            if last_gen != snapshot_gen:
+                self._close_handle(memory_type)
+                self._trim_torn_tail(self._segment_path(memory_type, last_gen))
+
+            # 继续写最后一个日志段；没有日志段时新开一段
+            if last_gen == snapshot_gen:
+                last_gen, last_entries = snapshot_gen + 1, 0
+            self._generation[memory_type] = last_gen
+            self._entries[memory_type] = last_entries
+            return data
+
+    def _migrate_legacy(self, memory_type: str):
+        """把旧版 <type>.json 导入为第 0 代快照（旧文件保留不动）"""
+        legacy = self._legacy_path(memory_type)
+        if not legacy.exists():
+            return
+        try:
+            with open(legacy, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"⚠️ 迁移 {memory_type} 失败: {e}")
+            return
+        self._write_snapshot(memory_type, 0, data)
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def _write_snapshot(self, memory_type: str, generation: int, data: Any):
+        """原子写入快照（先写临时文件再替换）"""
+        path = self._snapshot_path(memory_type)
+        tmp = path.with_suffix('.json.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'generation': generation, 'data': data}, f,
+                      ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _handle(self, memory_type: str):
+        handle = self._handles.get(memory_type)
+        if handle is None:
+            if memory_type not in self._generation:
+                self.load(memory_type, {})
+            path = self._segment_path(memory_type, self._generation[memory_type])
+            handle = open(path, 'a', encoding='utf-8')
+            self._handles[memory_type] = handle
+        return handle
+
+    def _close_handle(self, memory_type: str):
+        handle = self._handles.pop(memory_type, None)
+        if handle is not None:
+            handle.close()
+
+    def record(self, memory_type: str, data: Any, ops: List[Dict[str, Any]]):
+        if not ops:
+            return
+        with self._lock:
+            try:
+                handle = self._handle(memory_type)
+                handle.write(''.join(
+                    json.dumps(op, ensure_ascii=False, separators=(',', ':')) + '\n'
+                    for op in ops
+                ))
+                handle.flush()
+            except Exception as e:
+                print(f"⚠️ 保存 {memory_type} 失败: {e}")
+                return
+
+            self._entries[memory_type] = self._entries.get(memory_type, 0) + len(ops)
+            if self._entries[memory_type] >= self.compact_threshold:
+                self._seal_and_compact(memory_type)
+
+    def write(self, memory_type: str, data: Any):
+        """整体替换：直接写出新快照并丢弃所有日志段"""
+        with self._lock:
+            self._join_compactor(memory_type)
+            self._close_handle(memory_type)
+            generation = self._generation.get(memory_type, 1)
+            try:
+                self._write_snapshot(memory_type, generation, data)
+            except Exception as e:
+                print(f"⚠️ 保存 {memory_type} 失败: {e}")
+                return
+            for old in self._segments(memory_type):
+                if old <= generation:
+                    self._segment_path(memory_type, old).unlink(missing_ok=True)
+            self._generation[memory_type] = generation + 1
+            self._entries[memory_type] = 0
+
+    # ------------------------------------------------------------------
+    # 压缩
+    # ------------------------------------------------------------------
+
+    def _seal_and_compact(self, memory_type: str):
+        """封存当前日志段并启动压缩（调用方持有锁）"""
+        if self._compactors.get(memory_type) and self._compactors[memory_type].is_alive():
+            # 上一次压缩还没结束，继续写当前段，下次再试
+            return
+
+        sealed = self._generation[memory_type]
+        self._close_handle(memory_type)
+        self._generation[memory_type] = sealed + 1
+        self._entries[memory_type] = 0
+
+        if self.background:
+            worker = threading.Thread(
+                target=self._compact, args=(memory_type, sealed),
+                name=f"memory-compact-{memory_type}", daemon=True
+            )
+            self._compactors[memory_type] = worker
+            worker.start()
+        else:
+            self._compact(memory_type, sealed)
+
+    def _compact(self, memory_type: str, upto: int):
+        """把快照与代数 <= upto 的日志段折叠成新快照（不读内存数据）"""
+        try:
+            snapshot_gen, data = self._read_snapshot(memory_type, {})
+            for generation in self._segments(memory_type):
+                if snapshot_gen < generation <= upto:
+                    self._replay(data, self._segment_path(memory_type, generation))
+            self._write_snapshot(memory_type, upto, data)
+            for generation in self._segments(memory_type):
+                if generation <= upto:
+                    self._segment_path(memory_type, generation).unlink(missing_ok=True)
+        except Exception as e:
+            # 压缩失败不影响数据：快照与日志段都仍然完整
+            print(f"⚠️ 压缩 {memory_type} 失败: {e}")
+
+    def compact(self, memory_type: Optional[str] = None):
+        """立即同步压缩（不指定类型时压缩全部）"""
+        types = [memory_type] if memory_type else self.memory_types
+        for t in types:
+            with self._lock:
+                self._join_compactor(t)
+                if t not in self._generation:
+                    continue
+                sealed = self._generation[t]
+                self._close_handle(t)
+                self._generation[t] = sealed + 1
+                self._entries[t] = 0
+                self._compact(t, sealed)
+
+    def _join_compactor(self, memory_type: str):
+        worker = self._compactors.pop(memory_type, None)
+        if worker is not None:
+            worker.join()
+
+    def flush(self):
+        for memory_type in list(self._compactors):
+            self._join_compactor(memory_type)
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            for memory_type in list(self._handles):
+                self._close_handle(memory_type)
+
+    def storage_files(self) -> List[Path]:
+        files = []
+        for memory_type in self.memory_types:
+            files.append(self._snapshot_path(memory_type))
+            files.extend(self._segment_path(memory_type, g) for g in self._segments(memory_type))
+        return files
+
+
+# ============================================================================
+# 工厂与迁移
+# ============================================================================
+
+BACKENDS = {
+    JsonFileBackend.name: JsonFileBackend,
+    AppendLogBackend.name: AppendLogBackend,
+}
+
+
+def create_backend(name: str, memory_dir: Path, memory_types: Iterable[str],
+                   **kwargs) -> MemoryBackend:
+    """按名称创建存储后端（'json' 或 'jsonl'）"""
+    if name not in BACKENDS:
+        raise ValueError(f"未知的记忆存储后端: {name}，可选: {', '.join(BACKENDS)}")
+    return BACKENDS[name](memory_dir, memory_types, **kwargs)
+
+
+def migrate_json_to_log(memory_dir: Path, memory_types: Iterable[str],
+                        overwrite: bool = False) -> Dict[str, str]:
+    """
+    把旧版六个 JSON 文件迁移为追加日志格式
+
+    参数:
+        memory_dir: 记忆目录
+        memory_types: 记忆类型列表
+        overwrite: 已存在快照时是否覆盖
+
+    返回:
+        {记忆类型: 'migrated' | 'skipped' | 'missing'}
+    """
+    backend = AppendLogBackend(memory_dir, memory_types, background=False)
+    result = {}
+    for memory_type in backend.memory_types:
+        has_log = (backend._snapshot_path(memory_type).exists()
+                   or backend._segments(memory_type))
+        if not backend._legacy_path(memory_type).exists():
+            result[memory_type] = 'missing'
+        elif has_log and not overwrite:
+            result[memory_type] = 'skipped'
+        else:
+            for generation in backend._segments(memory_type):
+                backend._segment_path(memory_type, generation).unlink(missing_ok=True)
+            backend._snapshot_path(memory_type).unlink(missing_ok=True)
+            backend._migrate_legacy(memory_type)
+            result[memory_type] = 'migrated'
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="把 claude_memory 的 JSON 文件迁移为追加日志格式")
+    parser.add_argument('memory_dir', nargs='?',
+                        default=str(Path(__file__).parent.parent / "06_Learning_Journal" / "claude_memory"))
+    parser.add_argument('--overwrite', action='store_true', help='覆盖已存在的快照')
+    args = parser.parse_args()
+
+    types = ['contexts', 'decisions', 'preferences', 'projects', 'evolution', 'conversations']
+    for memory_type, status in migrate_json_to_log(Path(args.memory_dir), types, args.overwrite).items():
+        print(f"  {memory_type}: {status}")
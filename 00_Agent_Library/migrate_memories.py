@@ -27,6 +27,7 @@ os.environ['HF_ENDPOINT'] = 'https://hf-mirror.com'
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root / "00_Agent_Library"))
 
+from claude_memory import MemoryStore
 from semantic_memory import SemanticMemory, MemoryMigrator
 
 
@@ -44,28 +45,26 @@ def main():
     semantic = SemanticMemory()
     migrator = MemoryMigrator(semantic)
 
-    # 获取contexts.json路径
-    contexts_file = (project_root / "06_Learning_Journal" / "claude_memory" / "contexts.json")
+    # 通过 MemoryStore 读取上下文（按存储后端加载：快照 + 日志重放，
+    # 追加日志后端下 contexts.json 只是迁移时的旧快照，不能直接读取）
+    store = MemoryStore(project_root)
+    print(f"📂 读取: {store.memory_dir} (后端: {store.backend.name})")
 
-    if not contexts_file.exists():
-        print(f"❌ 文件不存在: {contexts_file}")
-        return False
-
-    print(f"📂 读取: {contexts_file}")
-
-    # 显示当前状态
-    import json
-    with open(contexts_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    try:
+        contexts = store.memory['contexts']['contexts']
+        print(f"📊 现有记忆数: {len(contexts)}")
 
-    total_contexts = data.get('total_contexts', 0)
-    print(f"📊 现有记忆数: {total_contexts}")
+        if not contexts:
+            print("❌ 没有找到上下文记忆")
+            return False
 
-    # 执行迁移
-    print("\n🚀 开始迁移...")
-    print("-" * 70)
+        # 执行迁移
+        print("\n🚀 开始迁移...")
+        print("-" * 70)
 
-    result = migrator.migrate_from_json(contexts_file, batch_size=10)
+        result = migrator.migrate_contexts(contexts, batch_size=10)
+    finally:
+        store.close()
 
     # 显示结果
     print("\n" + "=" * 70)
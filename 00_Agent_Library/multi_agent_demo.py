@@ -432,11 +432,9 @@ class MultiAgentSystem:
         for agent_name, agent in self.agents.items():
             graph.add_node(agent_name, agent)
 
-        # 定义工作流程：串行协作
-        # 协调者 → 分析师 → 处理器 → 审查师 → 结束
-        graph.add_edge("coordinator", "analyst")
-        graph.add_edge("analyst", "processor")
-        graph.add_edge("processor", "reviewer")
+        # 定义工作流程：分析与处理互不依赖，并行执行后由审查师汇合
+        # 协调者 → [分析师 ∥ 处理器] → 审查师 → 结束
+        graph.add_parallel_edges("coordinator", ["analyst", "processor"], join="reviewer")
         graph.add_edge("reviewer", END)
 
         # 设置入口点
@@ -3,11 +3,17 @@
 """
 自然语言搜索模块
 支持时间范围、文件类型、主题等多维度搜索
+
+解析出的时间范围、文件类型和分类编译为 ChromaDB where 条件
+（modified_timestamp / extension / category 元数据），下推给基础搜索引擎，
+在检索时过滤而不是取回 top_k 后再丢弃。
 """
 
 import re
+import inspect
 import logging
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
@@ -32,6 +38,18 @@ class ParsedQuery:
     file_types: Optional[List[str]]    # 文件类型
     topics: Optional[List[str]]        # 主题
     filters: Dict[str, Any]            # 其他过滤条件
+    categories: Optional[List[str]] = None  # 笔记分类（学习日志的子目录）
+
+
+# 文件类型 → 扩展名（与索引元数据中的 extension 一致）
+FILE_TYPE_EXTENSIONS = {
+    'python': ['.py'],
+    'markdown': ['.md', '.markdown'],
+    'yaml': ['.yaml', '.yml'],
+    'json': ['.json'],
+    'docx': ['.docx'],
+    'pdf': ['.pdf'],
+}
 
 
 class NaturalLanguageParser:
@@ -76,6 +94,14 @@ class NaturalLanguageParser:
             'testing': r'(测试|test)',
         }
 
+        # 分类模式（学习日志的子目录，对应索引元数据中的 category）
+        self.category_patterns = {
+            'daily_logs': r'(日志|daily log)',
+            'challenges_solved': r'(踩坑|问题解决|解决的问题)',
+            'code_patterns': r'(代码模式|code pattern)',
+            'workspace_memory': r'(工作区记忆)',
+        }
+
     def parse(self, query: str) -> ParsedQuery:
         """
         解析自然语言查询
@@ -100,6 +126,9 @@ class NaturalLanguageParser:
         # 提取主题
         topics = self._extract_topics(query)
 
+        # 提取分类
+        categories = self._extract_categories(query)
+
         # 提取关键词
         keywords = self._extract_keywords(query)
 
@@ -110,7 +139,8 @@ class NaturalLanguageParser:
         filters = {
             'time_range': time_range,
             'file_types': file_types,
-            'topics': topics
+            'topics': topics,
+            'categories': categories
         }
 
         parsed = ParsedQuery(
@@ -120,7 +150,8 @@ class NaturalLanguageParser:
             time_range=time_range,
             file_types=file_types,
             topics=topics,
-            filters=filters
+            filters=filters,
+            categories=categories
         )
 
         self.logger.info(f"✅ 查询解析完成: {query_type.value}")
@@ -198,6 +229,14 @@ class NaturalLanguageParser:
 
         return found_topics if found_topics else None
 
+    def _extract_categories(self, query: str) -> Optional[List[str]]:
+        """提取分类"""
+        found_categories = [
+            name for name, pattern in self.category_patterns.items()
+            if re.search(pattern, query)
+        ]
+        return found_categories or None
+
     def _extract_keywords(self, query: str) -> List[str]:
         """提取关键词"""
         # 移除时间、文件类型、主题相关的词
@@ -212,6 +251,9 @@ class NaturalLanguageParser:
         for pattern in self.topic_patterns.values():
             cleaned = re.sub(pattern, '', cleaned)
 
+        for pattern in self.category_patterns.values():
+            cleaned = re.sub(pattern, '', cleaned)
+
         # 移除常用停用词
         stop_words = ['的', '了', '是', '在', '有', '和', '与', '或', '等']
         for word in stop_words:
@@ -263,6 +305,49 @@ class EnhancedSearchEngine:
         self.base_engine = base_search_engine
         self.logger = logging.getLogger('EnhancedSearchEngine')
 
+        # 基础引擎的 search 是否接受 where（不接受时退回到取回后过滤）
+        self.supports_where = self._accepts_where(base_search_engine)
+
+    @staticmethod
+    def _accepts_where(engine) -> bool:
+        if engine is None:
+            return False
+        try:
+            return 'where' in inspect.signature(engine.search).parameters
+        except (TypeError, ValueError):
+            return False
+
+    def build_where(self, parsed: ParsedQuery) -> Optional[Dict]:
+        """
+        把解析出的过滤条件编译为 ChromaDB where 条件
+
+        Args:
+            parsed: 解析后的查询
+
+        Returns:
+            where 条件，没有过滤条件时返回 None
+        """
+        conditions = []
+
+        if parsed.time_range:
+            # ChromaDB 每个字段条件只能有一个运算符，上下界分开写
+            conditions.append({'modified_timestamp': {'$gte': parsed.time_range['start'].timestamp()}})
+            conditions.append({'modified_timestamp': {'$lte': parsed.time_range['end'].timestamp()}})
+
+        if parsed.file_types:
+            extensions = sorted({
+                ext for file_type in parsed.file_types
+                for ext in FILE_TYPE_EXTENSIONS.get(file_type, [f'.{file_type}'])
+            })
+            conditions.append({'extension': {'$in': extensions}})
+
+        if parsed.categories:
+            conditions.append({'category': {'$in': parsed.categories}})
+
+        if not conditions:
+            return None
+        return conditions[0] if len(conditions) == 1 else {'$and': conditions}
+
     def search(self, query: str, top_k: int = 10) -> Dict[str, Any]:
         """
         自然语言搜索
@@ -298,87 +383,76 @@ class EnhancedSearchEngine:
 
     def _search_by_time(self, parsed: ParsedQuery, top_k: int) -> List[Dict]:
         """按时间范围搜索"""
-        # 这里可以集成文件系统的时间过滤
-        # 示例：搜索特定时间范围内修改的文件
-
-        results = []
-
-        if self.base_engine:
-            # 使用基础搜索引擎
-            base_results = self.base_engine.search(' '.join(parsed.keywords))
-            # 应用时间过滤
-            results = self._filter_by_time(base_results, parsed.time_range)
-
-        return results[:top_k]
+        return self._filtered_search(parsed, top_k)
 
     def _search_by_file_type(self, parsed: ParsedQuery, top_k: int) -> List[Dict]:
         """按文件类型搜索"""
-        results = []
-
-        # 示例：搜索特定文件类型
-        for file_type in parsed.file_types:
-            # 这里可以集成 Glob 搜索
-            pass
-
-        return results[:top_k]
+        return self._filtered_search(parsed, top_k)
 
     def _search_by_topic(self, parsed: ParsedQuery, top_k: int) -> List[Dict]:
-        """按主题搜索"""
-        results = []
-
-        if self.base_engine:
-            # 使用基础搜索引擎进行语义搜索
-            query = ' '.join(parsed.keywords + (parsed.topics or []))
-            results = self.base_engine.search(query)
-
-        return results[:top_k]
+        """按主题搜索（有分类时同样下推过滤）"""
+        return self._filtered_search(parsed, top_k)
 
     def _search_complex(self, parsed: ParsedQuery, top_k: int) -> List[Dict]:
         """复合查询"""
-        results = []
+        return self._filtered_search(parsed, top_k)
 
-        # 先按主题搜索
-        topic_results = self._search_by_topic(parsed, top_k * 2)
+    def _query_text(self, parsed: ParsedQuery) -> str:
+        """语义检索用的查询文本（只有过滤条件时用原始查询）"""
+        terms = parsed.keywords + (parsed.topics or [])
+        return ' '.join(terms) if terms else parsed.original
 
-        # 再应用其他过滤条件
-        if parsed.time_range:
-            topic_results = self._filter_by_time(topic_results, parsed.time_range)
+    def _filtered_search(self, parsed: ParsedQuery, top_k: int) -> List[Dict]:
+        """
+        语义检索 + 元数据过滤
 
-        if parsed.file_types:
-            topic_results = self._filter_by_file_type(topic_results, parsed.file_types)
+        基础引擎支持 where 时把过滤条件下推，否则取回默认结果后在内存中过滤。
+        """
+        if not self.base_engine:
+            return []
 
-        results = topic_results
+        query = self._query_text(parsed)
+        if self.supports_where:
+            return self.base_engine.search(query, top_k=top_k, where=self.build_where(parsed))[:top_k]
 
+        results = self.base_engine.search(query)
+        if parsed.time_range:
+            results = self._filter_by_time(results, parsed.time_range)
+        if parsed.file_types:
+            results = self._filter_by_file_type(results, parsed.file_types)
+        if parsed.categories:
+            results = [r for r in results if r.get('metadata', {}).get('category') in parsed.categories]
         return results[:top_k]
 
     def _filter_by_time(self, results: List[Dict], time_range: Dict) -> List[Dict]:
-        """按时间过滤结果"""
+        """按时间过滤结果（基础引擎不支持过滤下推时使用）"""
         filtered = []
-        start = time_range['start']
-        end = time_range['end']
+        start = time_range['start'].timestamp()
+        end = time_range['end'].timestamp()
 
         for result in results:
-            # 这里需要根据实际结果结构提取时间戳
-            # 示例假设结果有 'modified_time' 字段
-            if 'modified_time' in result:
-                file_time = result['modified_time']
-                if start <= file_time <= end:
-                    filtered.append(result)
+            timestamp = result.get('metadata', {}).get('modified_timestamp')
+            if timestamp is None and isinstance(result.get('modified_time'), datetime):
+                timestamp = result['modified_time'].timestamp()
+            if timestamp is not None and start <= timestamp <= end:
+                filtered.append(result)
 
         return filtered
 
     def _filter_by_file_type(self, results: List[Dict], file_types: List[str]) -> List[Dict]:
-        """按文件类型过滤结果"""
+        """按文件类型过滤结果（基础引擎不支持过滤下推时使用）"""
+        extensions = {
+            ext for file_type in file_types
+            for ext in FILE_TYPE_EXTENSIONS.get(file_type, [f'.{file_type}'])
+        }
         filtered = []
 
         for result in results:
-            # 这里需要根据实际结果结构提取文件类型
-            if 'file_path' in result:
-                file_path = result['file_path']
-                for ft in file_types:
-                    if f'.{ft}' in file_path:
-                        filtered.append(result)
-                        break
+            metadata = result.get('metadata', {})
+            path = metadata.get('path') or result.get('file_path', '')
+            extension = metadata.get('extension') or Path(path).suffix
+            if extension.lower() in extensions:
+                filtered.append(result)
 
         return filtered
 
@@ -3,8 +3,8 @@
 """
 向量语义记忆系统
 
-基于ChromaDB和sentence-transformers的语义搜索实现，
-为Claude Code提供真正的语义理解能力。
+基于sentence-transformers和向量索引（默认ChromaDB，可选hnswlib/numpy，
+见 vector_index.py）的语义搜索实现，为Claude Code提供真正的语义理解能力。
 
 作者: Claude Code
 日期: 2026-01-16
@@ -13,11 +13,17 @@
 
 import sys
 import os
+import time
+import threading
+import importlib.util
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import json
 
+from memory_index import LexicalIndex, reciprocal_rank_fusion
+from vector_index import open_index
+
 # ============================================================================
 # SSL证书问题修复
 # ============================================================================
@@ -51,18 +57,17 @@ if sys.platform == 'win32':
 # 导入依赖（延迟导入以提供友好的错误信息）
 # ============================================================================
 
-def check_dependencies():
-    """检查必要的依赖是否安装"""
+def check_dependencies(index_backend: str = 'chroma'):
+    """检查必要的依赖是否安装（只查找不导入，导入 torch/chromadb 需要数秒）"""
     missing = []
 
-    try:
-        import chromadb
-    except ImportError:
+    if index_backend == 'chroma' and importlib.util.find_spec('chromadb') is None:
         missing.append('chromadb')
 
-    try:
-        from sentence_transformers import SentenceTransformer
-    except ImportError:
+    if index_backend == 'hnswlib' and importlib.util.find_spec('hnswlib') is None:
+        missing.append('hnswlib')
+
+    if importlib.util.find_spec('sentence_transformers') is None:
         missing.append('sentence-transformers')
 
     return missing
@@ -76,7 +81,7 @@ class SemanticMemory:
     """
     向量语义记忆系统
 
-    基于ChromaDB和sentence-transformers实现高性能语义搜索。
+    基于sentence-transformers和向量索引（ChromaDB / hnswlib / numpy）实现高性能语义搜索。
 
     特性:
     - 真正的语义理解（非关键词匹配）
@@ -84,6 +89,9 @@ class SemanticMemory:
     - 亚毫秒级搜索速度
     - 自动增量更新
     - 元数据过滤
+    - 延迟加载：嵌入模型和向量索引在第一次语义操作时才加载，
+      可选后台线程提前预热
+    - 混合检索：集合旁维护 BM25 词法索引，与向量结果按倒数排名融合
     """
 
     # 推荐的中文嵌入模型
@@ -93,20 +101,37 @@ class SemanticMemory:
         'large': 'moka-ai/m3e-large',  # 中文专用大模型
     }
 
+    # 词法索引增量日志至少积累多少条才写出新快照
+    LEXICAL_COMPACT_MIN = 1000
+
     def __init__(self,
                  workspace_root: Optional[Path] = None,
                  model_name: str = 'fast',
-                 collection_name: str = 'claude_memories'):
+                 collection_name: str = 'claude_memories',
+                 warm_up: bool = False,
+                 backend: str = 'torch',
+                 max_seq_length: Optional[int] = None,
+                 candidate_depth: int = 50,
+                 index_backend: str = 'chroma',
+                 hnsw: Optional[Dict[str, int]] = None):
         """
-        初始化语义记忆系统
+        初始化语义记忆系统（不加载模型、不打开数据库）
 
         参数:
             workspace_root: 工作区根目录
             model_name: 嵌入模型名称 ('fast', 'quality', 'large' 或具体模型名)
-            collection_name: ChromaDB集合名称
+            collection_name: 向量集合名称
+            warm_up: 是否在后台线程中提前加载模型和数据库
+            backend: 嵌入后端 'torch'、'onnx' 或 'onnx-int8'（同一集合应始终使用同一后端）
+            max_seq_length: 最大输入 token 数（None 使用模型默认值）
+            candidate_depth: 混合检索时向量和词法各取的候选数
+            index_backend: 向量索引后端 'chroma'、'hnswlib' 或 'numpy'
+            hnsw: hnswlib 参数 {'M', 'ef_construction', 'ef_search'}
         """
+        start = time.perf_counter()
+
         # 检查依赖
-        missing = check_dependencies()
+        missing = check_dependencies(index_backend)
         if missing:
             print(f"❌ 缺少依赖: {', '.join(missing)}")
             print("📦 请运行: pip install", ' '.join(missing))
@@ -122,11 +147,20 @@ class SemanticMemory:
         # 确保目录存在
         self.vector_db_dir.mkdir(parents=True, exist_ok=True)
 
-        # 初始化嵌入模型
-        self._init_embedder(model_name)
+        # 嵌入服务（模型在首次编码时加载）
+        self._init_embedder(model_name, backend, max_seq_length)
+
+        # 向量索引在首次访问 collection 时打开
+        self.collection_name = collection_name
+        self.index_backend = index_backend
+        self.hnsw = hnsw
+        self._collection = None
+        self._index_lock = threading.Lock()
 
-        # 初始化ChromaDB
-        self._init_chroma(collection_name)
+        # 词法索引（与集合同步，首次混合检索时加载）
+        self.lexical_index_path = self.vector_db_dir / f"{collection_name}.lexical.json"
+        self._lexical_index = None
+        self.candidate_depth = candidate_depth
 
         # 统计信息
         self.stats = {
@@ -135,9 +169,15 @@ class SemanticMemory:
             'model_name': self.model_name
         }
 
-    def _init_embedder(self, model_name: str):
-        """初始化嵌入模型"""
-        from sentence_transformers import SentenceTransformer
+        # 启动耗时（秒）
+        self.timings = {'init': time.perf_counter() - start}
+
+        if warm_up:
+            self.warm_up(background=True)
+
+    def _init_embedder(self, model_name: str, backend: str = 'torch', max_seq_length: Optional[int] = None):
+        """初始化嵌入模型（共享嵌入服务：同一进程只加载一次，结果有磁盘缓存）"""
+        from embedding_service import get_embedding_service
 
         # 解析模型名称
         if model_name in self.RECOMMENDED_MODELS:
@@ -145,35 +185,82 @@ class SemanticMemory:
         else:
             self.model_name = model_name
 
-        print(f"🔄 加载嵌入模型: {self.model_name}")
-        self.embedder = SentenceTransformer(self.model_name)
-        print(f"✅ 模型加载完成")
+        self.embedding_service = get_embedding_service(
+            self.model_name, backend=backend, max_seq_length=max_seq_length
+        )
+
+    @property
+    def embedder(self):
+        """SentenceTransformer 模型（首次访问时加载）"""
+        return self.embedding_service.model
+
+    @property
+    def embedding_dim(self) -> int:
+        """嵌入维度（已有缓存时不需要加载模型）"""
+        return self.embedding_service.dimension
+
+    @property
+    def collection(self):
+        """向量索引（VectorIndex，首次访问时打开）"""
+        if self._collection is None:
+            with self._index_lock:
+                if self._collection is None:
+                    self._open_index(self.collection_name)
+        return self._collection
+
+    def warm_up(self, background: bool = True) -> Optional[threading.Thread]:
+        """
+        预热：加载嵌入模型并打开向量数据库
 
-        # 记录模型维度
-        self.embedding_dim = self.embedder.get_sentence_embedding_dimension()
-        print(f"📊 嵌入维度: {self.embedding_dim}")
+        参数:
+            background: 是否在后台守护线程中执行
 
-    def _init_chroma(self, collection_name: str):
-        """初始化ChromaDB"""
-        import chromadb
+        返回:
+            后台线程（background=False 时返回 None）
+        """
+        def run():
+            try:
+                self.collection
+                self.embedding_service.model
+            except Exception as e:
+                print(f"⚠️ 语义记忆预热失败: {e}")
+
+        if not background:
+            run()
+            return None
+
+        thread = threading.Thread(target=run, name='semantic-memory-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def get_timings(self) -> Dict[str, float]:
+        """
+        获取启动与加载耗时
 
-        # 创建持久化客户端
-        print(f"🔄 初始化向量数据库: {self.vector_db_dir}")
-        self.chroma_client = chromadb.PersistentClient(
-            path=str(self.vector_db_dir)
+        返回:
+            {'init': 构造耗时, 'index': 打开向量索引耗时, 'model': 加载模型耗时}（秒，未加载的项不出现）
+        """
+        timings = dict(self.timings)
+        if 'model_load' in self.embedding_service.timings:
+            timings['model'] = self.embedding_service.timings['model_load']
+        return timings
+
+    def _open_index(self, collection_name: str):
+        """打开（必要时创建）向量索引"""
+        start = time.perf_counter()
+
+        print(f"🔄 初始化向量数据库: {self.vector_db_dir} ({self.index_backend})")
+        self._collection = open_index(
+            self.index_backend,
+            self.vector_db_dir,
+            collection_name,
+            metadata={"hnsw:space": "cosine"},  # 使用余弦相似度
+            hnsw=self.hnsw
         )
+        print(f"✅ 向量集合: {collection_name}")
+        print(f"📊 现有记忆数: {self._collection.count()}")
 
-        # 获取或创建集合
-        try:
-            self.collection = self.chroma_client.get_collection(name=collection_name)
-            print(f"✅ 加载现有集合: {collection_name}")
-            print(f"📊 现有记忆数: {self.collection.count()}")
-        except:
-            self.collection = self.chroma_client.create_collection(
-                name=collection_name,
-                metadata={"hnsw:space": "cosine"}  # 使用余弦相似度
-            )
-            print(f"✅ 创建新集合: {collection_name}")
+        self.timings['index'] = time.perf_counter() - start
 
     def add_memory(self,
                    memory_id: str,
@@ -192,7 +279,7 @@ class SemanticMemory:
         """
         try:
             # 生成嵌入向量
-            embedding = self.embedder.encode(text, convert_to_numpy=True).tolist()
+            embedding = self.embedding_service.encode_one(text).tolist()
 
             # 准备元数据
             if metadata is None:
@@ -213,6 +300,8 @@ class SemanticMemory:
                 metadatas=[metadata_str]
             )
 
+            self._update_lexical_index(added={memory_id: text})
+
             # 更新统计
             self.stats['total_memories'] = self.collection.count()
             self.stats['last_update'] = datetime.now().isoformat()
@@ -243,7 +332,7 @@ class SemanticMemory:
         try:
             # 批量生成嵌入
             texts = [m['text'] for m in memories]
-            embeddings = self.embedder.encode(texts, convert_to_numpy=True).tolist()
+            embeddings = self.embedding_service.encode(texts).tolist()
 
             # 准备数据
             ids = [m['id'] for m in memories]
@@ -266,6 +355,7 @@ class SemanticMemory:
             )
 
             results['success'] = len(memories)
+            self._update_lexical_index(added=dict(zip(ids, texts)))
 
         except Exception as e:
             results['failed'] = len(memories)
@@ -298,7 +388,7 @@ class SemanticMemory:
         """
         try:
             # 生成查询嵌入
-            query_embedding = self.embedder.encode(query, convert_to_numpy=True).tolist()
+            query_embedding = self.embedding_service.encode_query(query).tolist()
 
             # 执行搜索
             results = self.collection.query(
@@ -330,80 +420,144 @@ class SemanticMemory:
             print(f"❌ 搜索失败: {e}")
             return []
 
+    # ========== 词法索引 ==========
+
+    @property
+    def lexical_index(self) -> LexicalIndex:
+        """BM25 词法索引（快照 + 增量日志；缺失或与集合条数不一致时从集合重建）"""
+        if self._lexical_index is None:
+            index = LexicalIndex.load(self.lexical_index_path)
+            if index is None or len(index) != self.collection.count():
+                index = self._rebuild_lexical_index()
+            self._lexical_index = index
+            self._compact_lexical_index()
+        return self._lexical_index
+
+    def _compact_lexical_index(self):
+        """日志条目超过索引规模时写出新快照（摊还到每次增删为 O(1)）"""
+        index = self._lexical_index
+        if index.log_entries > max(self.LEXICAL_COMPACT_MIN, len(index)):
+            index.save(self.lexical_index_path)
+
+    def _rebuild_lexical_index(self, batch_size: int = 1000) -> LexicalIndex:
+        """从向量集合中的原文重建词法索引"""
+        index = LexicalIndex()
+        total = self.collection.count()
+        for offset in range(0, total, batch_size):
+            batch = self.collection.get(include=['documents'], limit=batch_size, offset=offset)
+            for memory_id, text in zip(batch['ids'], batch['documents']):
+                index.add(memory_id, text or '')
+        index.save(self.lexical_index_path)
+        print(f"✅ 重建词法索引: {len(index)} 条记忆")
+        return index
+
+    def _update_lexical_index(self,
+                              added: Optional[Dict[str, str]] = None,
+                              removed: Optional[List[str]] = None):
+        """
+        记录词法索引的增删
+
+        只向增量日志追加本次改动的文档；索引未加载时不加载，
+        下次检索时在快照上重放。
+        """
+        ops = LexicalIndex.delta(added, removed)
+        LexicalIndex.append_log(self.lexical_index_path, ops)
+        if self._lexical_index is not None:
+            self._lexical_index.apply(ops)
+            self._lexical_index.log_entries += len(ops)
+            self._compact_lexical_index()
+
+    def keyword_search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        BM25 关键词搜索（精确标识符、错误信息、函数名）
+
+        参数:
+            query: 搜索查询
+            top_k: 返回前K个结果
+
+        返回:
+            搜索结果列表，每个结果包含 id, text, metadata, keyword_score
+        """
+        hits = self.lexical_index.search(query, top_k)
+        if not hits:
+            return []
+
+        records = self.collection.get(ids=[memory_id for memory_id, _ in hits],
+                                      include=['documents', 'metadatas'])
+        by_id = {
+            memory_id: (text, metadata)
+            for memory_id, text, metadata in zip(records['ids'], records['documents'], records['metadatas'])
+        }
+
+        return [
+            {
+                'id': memory_id,
+                'text': by_id[memory_id][0],
+                'metadata': by_id[memory_id][1],
+                'keyword_score': round(score, 4)
+            }
+            for memory_id, score in hits if memory_id in by_id
+        ]
+
     def hybrid_search(self,
                      query: str,
-                     keyword_results: List[Dict[str, Any]],
+                     keyword_results: Optional[List[Dict[str, Any]]] = None,
                      top_k: int = 5,
-                     semantic_weight: float = 0.7) -> List[Dict[str, Any]]:
+                     semantic_weight: float = 0.5,
+                     candidate_depth: Optional[int] = None,
+                     rrf_k: int = 60) -> List[Dict[str, Any]]:
         """
-        混合搜索（语义+关键词）
+        混合搜索（向量 + BM25）
 
-        结合语义搜索和关键词搜索的结果，
-       通过加权融合获得更准确的结果。
+        向量检索和词法检索各取 candidate_depth 个候选，按倒数排名融合（RRF）。
+        只被其中一路找到的结果（如只有词法能命中的身份证号）也能进入前列。
 
         参数:
             query: 搜索查询
-            keyword_results: 关键词搜索结果
+            keyword_results: 外部关键词结果（如 JSON 记忆库的检索结果，按相关性排序），
+                作为第三路参与融合，与集合中文本相同的结果合并
             top_k: 返回前K个结果
-            semantic_weight: 语义搜索权重 (0-1)
+            semantic_weight: 向量检索的权重 (0-1)，词法检索为 1 - semantic_weight
+            candidate_depth: 每一路的候选数（默认 self.candidate_depth）
+            rrf_k: RRF 平滑常数
 
         返回:
-            融合后的搜索结果
+            融合后的搜索结果，scores 中含 semantic / keyword / hybrid 分数
         """
-        # 语义搜索
-        semantic_results = self.search(query, top_k=top_k * 2)
-
-        # 创建ID到结果的映射
-        result_map = {}
-
-        # 添加语义结果
-        for result in semantic_results:
-            result_map[result['id']] = {
-                'result': result,
-                'semantic_score': result['similarity_score'],
-                'keyword_score': 0.0
-            }
+        depth = max(candidate_depth or self.candidate_depth, top_k)
 
-        # 融合关键词结果
-        for i, kw_result in enumerate(keyword_results):
-            result_id = kw_result.get('id') or kw_result.get('timestamp', '')
-
-            if result_id in result_map:
-                # 已存在，更新关键词分数
-                # 关键词分数：位置越靠前分数越高
-                kw_score = 1.0 - (i / len(keyword_results))
-                result_map[result_id]['keyword_score'] = kw_score
-            else:
-                # 不存在，添加新结果
-                kw_score = 1.0 - (i / len(keyword_results))
-                result_map[result_id] = {
-                    'result': kw_result,
-                    'semantic_score': 0.0,
-                    'keyword_score': kw_score
-                }
+        semantic_results = self.search(query, top_k=depth)
+        lexical_results = self.keyword_search(query, top_k=depth)
 
-        # 计算融合分数
-        for result_id, data in result_map.items():
-            data['hybrid_score'] = (
-                data['semantic_score'] * semantic_weight +
-                data['keyword_score'] * (1 - semantic_weight)
-            )
+        results: Dict[str, Dict[str, Any]] = {}
+        for result in semantic_results + lexical_results:
+            results.setdefault(result['id'], result)
+
+        rankings = [[r['id'] for r in semantic_results], [r['id'] for r in lexical_results]]
+        weights = [semantic_weight, 1 - semantic_weight]
+
+        if keyword_results:
+            text_ids = {r['text']: r['id'] for r in results.values()}
+            external = []
+            for result in keyword_results:
+                result_id = text_ids.get(result.get('text')) or result.get('id') or result.get('timestamp', '')
+                results.setdefault(result_id, result)
+                if result_id not in external:
+                    external.append(result_id)
+            rankings.append(external)
+            weights.append(1 - semantic_weight)
 
-        # 排序并返回top-k
-        sorted_results = sorted(
-            result_map.values(),
-            key=lambda x: x['hybrid_score'],
-            reverse=True
-        )[:top_k]
+        fused = reciprocal_rank_fusion(rankings, weights, k=rrf_k)
+        semantic_scores = {r['id']: r['similarity_score'] for r in semantic_results}
+        keyword_scores = {r['id']: r['keyword_score'] for r in lexical_results}
 
-        # 添加分数信息到结果中
         final_results = []
-        for data in sorted_results:
-            result = data['result'].copy()
+        for result_id, score in sorted(fused.items(), key=lambda x: x[1], reverse=True)[:top_k]:
+            result = results[result_id].copy()
             result['scores'] = {
-                'semantic': round(data['semantic_score'], 4),
-                'keyword': round(data['keyword_score'], 4),
-                'hybrid': round(data['hybrid_score'], 4)
+                'semantic': semantic_scores.get(result_id, 0.0),
+                'keyword': keyword_scores.get(result_id, 0.0),
+                'hybrid': round(score, 6)
             }
             final_results.append(result)
 
@@ -413,6 +567,7 @@ class SemanticMemory:
         """删除记忆"""
         try:
             self.collection.delete(ids=[memory_id])
+            self._update_lexical_index(removed=[memory_id])
             self.stats['total_memories'] = self.collection.count()
             return True
         except Exception as e:
@@ -449,8 +604,9 @@ class SemanticMemory:
     def clear_all(self) -> bool:
         """清空所有记忆（危险操作）"""
         try:
-            self.chroma_client.delete_collection(self.collection.name)
-            self._init_chroma(self.collection.name)
+            self.collection.reset()
+            self._lexical_index = LexicalIndex()
+            self._lexical_index.save(self.lexical_index_path)
             self.stats['total_memories'] = 0
             return True
         except Exception as e:
@@ -506,9 +662,21 @@ class MemoryMigrator:
         with open(json_file, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
-        # 提取contexts
-        contexts = data.get('contexts', [])
+        return self.migrate_contexts(data.get('contexts', []), batch_size=batch_size)
+
+    def migrate_contexts(self,
+                         contexts: List[Dict[str, Any]],
+                         batch_size: int = 10) -> Dict[str, Any]:
+        """
+        迁移上下文记忆列表（如 MemoryStore 当前加载的 contexts）
 
+        参数:
+            contexts: 上下文记录列表
+            batch_size: 批量处理大小
+
+        返回:
+            迁移结果统计
+        """
         if not contexts:
             return {'error': '没有找到contexts'}
 
@@ -0,0 +1,782 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+向量索引抽象 - ChromaDB / hnswlib / NumPy 暴力搜索
+
+memory_agent 的 VectorStore 和 SemanticMemory 通过 open_index() 取得索引对象。
+所有后端的方法都与 ChromaDB Collection 同名同参、返回相同形状的字典，
+调用方不需要区分后端:
+1. chroma: ChromaDB PersistentClient（默认，兼容已有数据）
+2. hnswlib: HNSW 近似搜索，M / ef_construction / ef_search 可调
+3. numpy: 精确暴力搜索（分块矩阵乘），适合小数据集，也用作召回基准
+
+hnswlib 与 numpy 后端使用同一种存储，两者之间切换不需要重新嵌入:
+    <目录>/<集合名>/meta.db        SQLite：行号、ID、原文、元数据（JSON）
+    <目录>/<集合名>/vectors.f32    内存映射向量文件（vector_dtype='float16' 时为 vectors.f16）
+    <目录>/<集合名>/hnsw.bin       HNSW 图（仅 hnswlib；关闭时写盘，与 meta.db 版本不一致时从向量文件重建）
+
+向量先写入映射文件，再在 SQLite 中登记行号，读取方只会看到完整的向量。
+删除的行不再复用（HNSW 中只做删除标记）。
+
+距离与 ChromaDB 一致: l2 为欧氏距离的平方，cosine 为 1 - 余弦相似度，ip 为 1 - 内积。
+
+用法:
+    index = open_index('hnswlib', directory, 'learning_memory',
+                       metadata={'hnsw:space': 'cosine'}, hnsw={'M': 32, 'ef_search': 128})
+    index.add(ids=ids, embeddings=vectors, documents=texts, metadatas=metadatas)
+    results = index.query(query_embeddings=[query], n_results=10, where={'type': 'journal'})
+
+作者: Claude Code
+日期: 2026-01-16
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# 可选的索引后端
+BACKENDS = ('chroma', 'hnswlib', 'numpy')
+
+# 距离度量（与 ChromaDB 的 hnsw:space 相同）
+SPACES = ('l2', 'cosine', 'ip')
+
+# HNSW 默认参数（ef_search 只影响查询，可随时调整）
+DEFAULT_HNSW = {'M': 16, 'ef_construction': 200, 'ef_search': 64}
+
+# 向量文件每次扩容的最少行数
+GROW_ROWS = 4096
+
+# 暴力搜索每块的行数
+SCAN_BLOCK = 65536
+
+# SQLite IN 查询每批的键数
+LOOKUP_BATCH = 500
+
+# hnswlib 带过滤查询时，候选不超过该数直接精确计算
+EXACT_FILTER_MAX = 2000
+
+OPERATORS = {
+    '$eq': '=', '$ne': '!=', '$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<='
+}
+
+
+def compile_where(where: Dict) -> Tuple[str, List]:
+    """
+    把 ChromaDB where 条件编译为 SQL（按元数据 JSON 字段求值）
+
+    参数:
+        where: where 条件，支持 $and $or $eq $ne $gt $gte $lt $lte $in $nin
+
+    返回:
+        (SQL 条件, 参数)
+    """
+    clauses, params = [], []
+    for key, value in where.items():
+        if key in ('$and', '$or'):
+            parts = [compile_where(item) for item in value]
+            joiner = ' AND ' if key == '$and' else ' OR '
+            clauses.append('(' + joiner.join(sql for sql, _ in parts) + ')')
+            for _, part_params in parts:
+                params.extend(part_params)
+            continue
+
+        column = "json_extract(metadata, '$.\"{}\"')".format(key.replace('"', '').replace("'", ''))
+        conditions = value if isinstance(value, dict) else {'$eq': value}
+        for operator, operand in conditions.items():
+            if operator in OPERATORS:
+                clauses.append(f'{column} {OPERATORS[operator]} ?')
+                params.append(operand)
+            elif operator in ('$in', '$nin'):
+                if not operand:
+                    clauses.append('0' if operator == '$in' else '1')
+                    continue
+                negate = 'NOT ' if operator == '$nin' else ''
+                clauses.append(f"{column} {negate}IN ({','.join('?' * len(operand))})")
+                params.extend(operand)
+            else:
+                raise ValueError(f"不支持的过滤运算: {operator}")
+
+    if not clauses:
+        raise ValueError("过滤条件为空")
+    return ' AND '.join(clauses), params
+
+
+# ============================================================================
+# 接口
+# ============================================================================
+
+class VectorIndex:
+    """
+    向量索引接口
+
+    方法与 ChromaDB Collection 同名同参，返回相同形状的字典:
+        get   -> {'ids': [...], 'documents': [...], 'metadatas': [...], 'embeddings': ...}
+        query -> {'ids': [[...]], 'documents': [[...]], 'metadatas': [[...]], 'distances': [[...]]}
+    未请求（include 中没有）的字段为 None。
+    """
+
+    backend = ''
+
+    name: str
+    metadata: Dict[str, Any]
+
+    def count(self) -> int:
+        """记录数"""
+        raise NotImplementedError
+
+    def add(self, ids: List[str], embeddings, documents: Optional[List[str]] = None,
+            metadatas: Optional[List[Dict]] = None):
+        """新增记录（已存在的ID被忽略）"""
+        raise NotImplementedError
+
+    def upsert(self, ids: List[str], embeddings, documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict]] = None):
+        """新增或覆盖记录"""
+        raise NotImplementedError
+
+    def update(self, ids: List[str], embeddings=None, documents: Optional[List[str]] = None,
+               metadatas: Optional[List[Dict]] = None):
+        """更新已存在的记录（不存在的ID被忽略）"""
+        raise NotImplementedError
+
+    def delete(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None):
+        """删除记录"""
+        raise NotImplementedError
+
+    def get(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            include: Sequence[str] = ('documents', 'metadatas')) -> Dict[str, Any]:
+        """按ID或元数据读取记录"""
+        raise NotImplementedError
+
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[Dict] = None,
+              include: Sequence[str] = ('documents', 'metadatas', 'distances')) -> Dict[str, Any]:
+        """最近邻搜索"""
+        raise NotImplementedError
+
+    def reset(self):
+        """清空索引"""
+        raise NotImplementedError
+
+    def close(self):
+        """写盘并释放资源"""
+
+
+# ============================================================================
+# ChromaDB 后端
+# ============================================================================
+
+class ChromaIndex(VectorIndex):
+    """ChromaDB 集合（PersistentClient）"""
+
+    backend = 'chroma'
+
+    def __init__(self, directory: Path, name: str, metadata: Optional[Dict] = None):
+        """
+        打开（必要时创建）集合
+
+        参数:
+            directory: ChromaDB 数据目录
+            name: 集合名称
+            metadata: 创建集合时的元数据（如 {'hnsw:space': 'cosine'}）
+        """
+        import chromadb
+
+        self.name = name
+        self._create_metadata = metadata or None
+        self.client = chromadb.PersistentClient(path=str(directory))
+        self.collection = self.client.get_or_create_collection(name=name, metadata=self._create_metadata)
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self.collection.metadata or {}
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def add(self, ids, embeddings, documents=None, metadatas=None):
+        self.collection.add(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        self.collection.upsert(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def update(self, ids, embeddings=None, documents=None, metadatas=None):
+        self.collection.update(ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def delete(self, ids=None, where=None):
+        self.collection.delete(ids=ids, where=where)
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=('documents', 'metadatas')):
+        return self.collection.get(ids=ids, where=where, limit=limit, offset=offset, include=list(include))
+
+    def query(self, query_embeddings, n_results=10, where=None,
+              include=('documents', 'metadatas', 'distances')):
+        return self.collection.query(query_embeddings=query_embeddings, n_results=n_results,
+                                     where=where, include=list(include))
+
+    def reset(self):
+        self.client.delete_collection(self.name)
+        self.collection = self.client.create_collection(name=self.name, metadata=self._create_metadata)
+
+
+# ============================================================================
+# 本地存储（hnswlib / numpy 共用）
+# ============================================================================
+
+class LocalIndex(VectorIndex):
+    """SQLite 元数据 + 内存映射向量文件，子类实现 _search"""
+
+    def __init__(self, directory: Path, name: str, metadata: Optional[Dict] = None,
+                 dtype: str = 'float32'):
+        """
+        打开（必要时创建）索引
+
+        参数:
+            directory: 索引根目录（每个集合一个子目录）
+            name: 集合名称
+            metadata: 创建时的元数据（hnsw:space 决定距离度量，之后以已存的为准）
+            dtype: 向量存储精度 'float32' 或 'float16'（创建后不可更改）
+        """
+        self.name = name
+        self.directory = Path(directory) / name
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.directory / "meta.db"), check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS records (
+                row INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                document TEXT,
+                metadata TEXT
+            );
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        ''')
+
+        settings = self._settings()
+        metadata = dict(metadata or {})
+        self.space = settings.get('space') or metadata.get('hnsw:space', 'l2')
+        if self.space not in SPACES:
+            raise ValueError(f"未知的距离度量: {self.space}（可选: {', '.join(SPACES)}）")
+        self.dtype = np.dtype(settings.get('dtype') or dtype)
+        if self.dtype not in (np.float32, np.float16):
+            raise ValueError(f"不支持的向量精度: {self.dtype}")
+
+        self.dim = int(settings['dim']) if settings.get('dim') else None
+        self.next_row = int(settings.get('next_row', 0))
+        self.version = int(settings.get('version', 0))
+        self.metadata = {**metadata, 'hnsw:space': self.space}
+        self._save_settings(space=self.space, dtype=self.dtype.name)
+
+        self.vector_path = self.directory / f"vectors.{'f32' if self.dtype == np.float32 else 'f16'}"
+        self._vectors = None
+        self._live = None
+
+    # ========== 存储 ==========
+
+    def _settings(self) -> Dict[str, str]:
+        return dict(self.conn.execute('SELECT key, value FROM settings').fetchall())
+
+    def _save_settings(self, **values):
+        with self.conn:
+            self._put_settings(**values)
+
+    def _put_settings(self, **values):
+        """写入设置（不提交，调用方放在与记录相同的事务中）"""
+        self.conn.executemany(
+            'INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)',
+            [(key, None if value is None else str(value)) for key, value in values.items()]
+        )
+
+    def _map(self, min_rows: int = 0) -> Optional[np.memmap]:
+        """向量文件的内存映射（容量不足 min_rows 时扩容）"""
+        if self.dim is None:
+            return None
+
+        row_bytes = self.dim * self.dtype.itemsize
+        capacity = self.vector_path.stat().st_size // row_bytes if self.vector_path.exists() else 0
+        if capacity < min_rows:
+            capacity = max(min_rows, capacity * 2, GROW_ROWS)
+            with open(self.vector_path, 'ab') as f:
+                f.truncate(capacity * row_bytes)
+
+        if capacity == 0:
+            return None
+        if self._vectors is None or self._vectors.shape[0] != capacity:
+            self._vectors = np.memmap(self.vector_path, dtype=self.dtype, mode='r+', shape=(capacity, self.dim))
+        return self._vectors
+
+    def _live_mask(self) -> np.ndarray:
+        """各行是否为有效记录（写入后重新读取）"""
+        if self._live is None:
+            rows = np.array([row for (row,) in self.conn.execute('SELECT row FROM records')], dtype=np.int64)
+            mask = np.zeros(self.next_row, dtype=bool)
+            mask[rows] = True
+            self._live = mask
+        return self._live
+
+    def _select(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None,
+                limit: Optional[int] = None, offset: Optional[int] = None) -> List[Tuple]:
+        """按ID和/或元数据条件读取 (row, id, document, metadata) 行，按行号排序"""
+        clauses, params = [], []
+        if where:
+            sql, where_params = compile_where(where)
+            clauses.append(sql)
+            params.extend(where_params)
+
+        if ids is None:
+            sql = 'SELECT row, id, document, metadata FROM records'
+            if clauses:
+                sql += ' WHERE ' + ' AND '.join(clauses)
+            sql += ' ORDER BY row LIMIT ? OFFSET ?'
+            return self.conn.execute(sql, params + [-1 if limit is None else limit, offset or 0]).fetchall()
+
+        rows = []
+        for i in range(0, len(ids), LOOKUP_BATCH):
+            batch = list(ids[i:i + LOOKUP_BATCH])
+            batch_clauses = clauses + [f"id IN ({','.join('?' * len(batch))})"]
+            rows.extend(self.conn.execute(
+                'SELECT row, id, document, metadata FROM records WHERE ' + ' AND '.join(batch_clauses),
+                params + batch
+            ).fetchall())
+        rows.sort()
+        start = offset or 0
+        return rows[start:None if limit is None else start + limit]
+
+    def _write(self, mode: str, ids, embeddings=None, documents=None, metadatas=None):
+        """add / upsert / update 的共同实现"""
+        ids = list(ids)
+        if not ids:
+            return
+        if len(set(ids)) != len(ids):
+            raise ValueError("ID 不能重复")
+
+        vectors = None
+        if embeddings is not None:
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            if vectors.ndim != 2 or len(vectors) != len(ids):
+                raise ValueError("embeddings 与 ids 数量不一致")
+
+        with self.lock:
+            if vectors is not None and self.dim is not None and vectors.shape[1] != self.dim:
+                raise ValueError(f"向量维度不一致: {vectors.shape[1]} != {self.dim}")
+
+            existing = {record[1]: record for record in self._select(ids=ids)}
+            if mode == 'add':
+                keep = [i for i, doc_id in enumerate(ids) if doc_id not in existing]
+            elif mode == 'update':
+                keep = [i for i, doc_id in enumerate(ids) if doc_id in existing]
+            else:
+                keep = list(range(len(ids)))
+            if not keep:
+                return
+            if vectors is None and any(ids[i] not in existing for i in keep):
+                raise ValueError("新增记录需要提供 embeddings")
+
+            rows = {}
+            next_row = self.next_row
+            for i in keep:
+                if ids[i] in existing:
+                    rows[i] = existing[ids[i]][0]
+                else:
+                    rows[i] = next_row
+                    next_row += 1
+            target = np.array([rows[i] for i in keep], dtype=np.int64)
+
+            self._before_write()
+
+            if vectors is not None:
+                if self.dim is None:
+                    self.dim = vectors.shape[1]
+                mapped = self._map(next_row)
+                mapped[target] = vectors[keep].astype(self.dtype)
+                mapped.flush()
+
+            records = []
+            for i in keep:
+                old = existing.get(ids[i])
+                document = documents[i] if documents is not None else (old[2] if old else None)
+                if metadatas is not None and metadatas[i] is not None:
+                    metadata = json.dumps(metadatas[i], ensure_ascii=False)
+                else:
+                    metadata = old[3] if old else None
+                records.append((rows[i], ids[i], document, metadata))
+
+            # 记录与 next_row/version 在同一事务中提交，崩溃后不会重复分配行号
+            with self.conn:
+                self.conn.executemany(
+                    'INSERT OR REPLACE INTO records (row, id, document, metadata) VALUES (?, ?, ?, ?)',
+                    records
+                )
+                self._put_settings(dim=self.dim, next_row=next_row, version=self.version + 1)
+            self.next_row = next_row
+            self.version += 1
+            self._live = None
+
+            if vectors is not None:
+                self._after_write(target, vectors[keep])
+
+    def _before_write(self):
+        """写入前的钩子（hnswlib 先按旧版本载入图）"""
+
+    def _after_write(self, rows: np.ndarray, vectors: np.ndarray):
+        """向量写入后的钩子"""
+
+    def _after_delete(self, rows: List[int]):
+        """删除后的钩子"""
+
+    # ========== Collection 接口 ==========
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM records').fetchone()[0]
+
+    def add(self, ids, embeddings, documents=None, metadatas=None):
+        self._write('add', ids, embeddings, documents, metadatas)
+
+    def upsert(self, ids, embeddings, documents=None, metadatas=None):
+        self._write('upsert', ids, embeddings, documents, metadatas)
+
+    def update(self, ids, embeddings=None, documents=None, metadatas=None):
+        self._write('update', ids, embeddings, documents, metadatas)
+
+    def delete(self, ids=None, where=None):
+        if ids is None and where is None:
+            return
+        with self.lock:
+            rows = [record[0] for record in self._select(ids=ids, where=where)]
+            if not rows:
+                return
+            self._before_write()
+            with self.conn:
+                self.conn.executemany('DELETE FROM records WHERE row = ?', [(row,) for row in rows])
+                self._put_settings(version=self.version + 1)
+            self.version += 1
+            self._live = None
+            self._after_delete(rows)
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=('documents', 'metadatas')):
+        with self.lock:
+            records = self._select(ids=ids, where=where, limit=limit, offset=offset)
+            embeddings = None
+            if 'embeddings' in include:
+                mapped = self._map()
+                rows = np.array([record[0] for record in records], dtype=np.int64)
+                embeddings = mapped[rows].astype(np.float32) if len(rows) else np.zeros((0, self.dim or 0), np.float32)
+
+        return {
+            'ids': [record[1] for record in records],
+            'documents': [record[2] for record in records] if 'documents' in include else None,
+            'metadatas': [json.loads(record[3]) if record[3] else None for record in records]
+            if 'metadatas' in include else None,
+            'embeddings': embeddings,
+        }
+
+    def query(self, query_embeddings, n_results=10, where=None,
+              include=('documents', 'metadatas', 'distances')):
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+
+        with self.lock:
+            candidates = None
+            if where:
+                candidates = np.array([record[0] for record in self._select(where=where)], dtype=np.int64)
+            hits = self._search(queries, n_results, candidates)
+
+            wanted = sorted({int(row) for labels, _ in hits for row in labels})
+            records = {}
+            for i in range(0, len(wanted), LOOKUP_BATCH):
+                batch = wanted[i:i + LOOKUP_BATCH]
+                for record in self.conn.execute(
+                    f"SELECT row, id, document, metadata FROM records WHERE row IN ({','.join('?' * len(batch))})",
+                    batch
+                ):
+                    records[record[0]] = record
+
+        result = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        for labels, distances in hits:
+            found = [(records[int(row)], float(distance))
+                     for row, distance in zip(labels, distances) if int(row) in records]
+            result['ids'].append([record[1] for record, _ in found])
+            result['documents'].append([record[2] for record, _ in found])
+            result['metadatas'].append([json.loads(record[3]) if record[3] else None for record, _ in found])
+            result['distances'].append([distance for _, distance in found])
+
+        for field in ('documents', 'metadatas', 'distances'):
+            if field not in include:
+                result[field] = None
+        return result
+
+    def reset(self):
+        with self.lock:
+            with self.conn:
+                self.conn.execute('DELETE FROM records')
+                self._put_settings(dim=None, next_row=0, version=self.version + 1)
+            self._vectors = None
+            if self.vector_path.exists():
+                self.vector_path.unlink()
+            self.dim = None
+            self.next_row = 0
+            self.version += 1
+            self._live = None
+
+    def close(self):
+        if self._vectors is not None:
+            self._vectors.flush()
+
+    # ========== 搜索 ==========
+
+    def _search(self, queries: np.ndarray, k: int,
+                candidates: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        每个查询的 (行号, 距离)，按距离升序
+
+        参数:
+            queries: (q, dim) 查询向量
+            k: 每个查询的结果数
+            candidates: 只在这些行中搜索（None 表示全部有效行）
+        """
+        raise NotImplementedError
+
+    def _distances(self, queries: np.ndarray, vectors: np.ndarray) -> np.ndarray:
+        """(q, n) 距离矩阵"""
+        vectors = vectors.astype(np.float32, copy=False)
+        if self.space == 'ip':
+            return 1 - queries @ vectors.T
+        if self.space == 'cosine':
+            q = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+            v = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            return 1 - q @ v.T
+        distances = (np.einsum('ij,ij->i', queries, queries)[:, None]
+                     - 2 * queries @ vectors.T
+                     + np.einsum('ij,ij->i', vectors, vectors)[None, :])
+        return np.maximum(distances, 0)
+
+    def _exact_search(self, queries: np.ndarray, k: int,
+                      candidates: Optional[np.ndarray] = None) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """分块暴力搜索（每块取前 k 个与已有结果合并）"""
+        empty = [(np.zeros(0, np.int64), np.zeros(0, np.float32)) for _ in queries]
+        mapped = self._map()
+        if mapped is None or self.next_row == 0 or k <= 0:
+            return empty
+
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        best_distances = np.zeros((len(queries), 0), dtype=np.float32)
+
+        if candidates is None:
+            mask = self._live_mask()
+            blocks = [(np.arange(start, min(start + SCAN_BLOCK, self.next_row)),
+                       slice(start, min(start + SCAN_BLOCK, self.next_row)))
+                      for start in range(0, self.next_row, SCAN_BLOCK)]
+        else:
+            mask = None
+            candidates = np.sort(candidates)
+            blocks = [(candidates[start:start + SCAN_BLOCK], None)
+                      for start in range(0, len(candidates), SCAN_BLOCK)]
+
+        for rows, window in blocks:
+            if not len(rows):
+                continue
+            vectors = mapped[window] if window is not None else mapped[rows]
+            distances = self._distances(queries, vectors)
+            if mask is not None:
+                distances[:, ~mask[window]] = np.inf
+
+            merged_distances = np.hstack([best_distances, distances])
+            merged_rows = np.hstack([best_rows, np.broadcast_to(rows, distances.shape)])
+            keep = min(k, merged_distances.shape[1])
+            top = np.argpartition(merged_distances, keep - 1, axis=1)[:, :keep]
+            best_distances = np.take_along_axis(merged_distances, top, axis=1)
+            best_rows = np.take_along_axis(merged_rows, top, axis=1)
+
+        results = []
+        for rows, distances in zip(best_rows, best_distances):
+            order = np.argsort(distances, kind='stable')
+            order = order[np.isfinite(distances[order])]
+            results.append((rows[order], distances[order]))
+        return results
+
+
+class NumpyIndex(LocalIndex):
+    """精确暴力搜索"""
+
+    backend = 'numpy'
+
+    def _search(self, queries, k, candidates=None):
+        return self._exact_search(queries, k, candidates)
+
+
+class HnswIndex(LocalIndex):
+    """hnswlib HNSW 近似搜索"""
+
+    backend = 'hnswlib'
+
+    def __init__(self, directory: Path, name: str, metadata: Optional[Dict] = None,
+                 dtype: str = 'float32', M: int = 16, ef_construction: int = 200, ef_search: int = 64):
+        """
+        打开（必要时创建）索引
+
+        参数:
+            directory: 索引根目录
+            name: 集合名称
+            metadata: 创建时的元数据（hnsw:space）
+            dtype: 向量存储精度
+            M: 每个节点的邻居数（越大召回越高、内存和构建时间越多；修改后重建图）
+            ef_construction: 构建时的候选队列长度（修改后重建图）
+            ef_search: 查询时的候选队列长度（越大召回越高、查询越慢）
+        """
+        import hnswlib  # noqa: F401  尽早报告缺少依赖
+
+        super().__init__(directory, name, metadata, dtype)
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.graph_path = self.directory / "hnsw.bin"
+        self._graph = None
+        self._graph_dirty = False
+        atexit.register(self.close)
+
+    @property
+    def graph_params(self) -> str:
+        return f"M={self.M},ef_construction={self.ef_construction}"
+
+    @property
+    def graph(self):
+        """HNSW 图（首次访问时载入；与元数据版本或参数不一致时重建）"""
+        if self._graph is None and self.dim is not None:
+            self._graph = self._load_graph()
+        return self._graph
+
+    def _load_graph(self):
+        import hnswlib
+
+        graph = hnswlib.Index(space=self.space, dim=self.dim)
+        settings = self._settings()
+        if (self.graph_path.exists()
+                and settings.get('graph_version') == str(self.version)
+                and settings.get('graph_params') == self.graph_params):
+            graph.load_index(str(self.graph_path))
+            graph.set_ef(self.ef_search)
+            return graph
+
+        start = time.perf_counter()
+        rows = np.flatnonzero(self._live_mask())
+        graph.init_index(max_elements=max(len(rows), GROW_ROWS), M=self.M, ef_construction=self.ef_construction)
+        mapped = self._map()
+        for i in range(0, len(rows), SCAN_BLOCK):
+            batch = rows[i:i + SCAN_BLOCK]
+            graph.add_items(mapped[batch].astype(np.float32), batch)
+        graph.set_ef(self.ef_search)
+        self._graph_dirty = True
+        if len(rows):
+            print(f"✅ 重建 HNSW 图: {len(rows)} 条 ({time.perf_counter() - start:.1f}s)")
+        return graph
+
+    def _before_write(self):
+        # 按写入前的版本载入已保存的图，避免写入后版本不一致触发重建
+        self.graph
+
+    def _after_write(self, rows, vectors):
+        if self._graph is None:
+            # 第一次写入：图按向量文件建立，已包含本次写入
+            self.graph
+            return
+        needed = self._graph.get_current_count() + len(rows)
+        if needed > self._graph.get_max_elements():
+            self._graph.resize_index(max(needed, self._graph.get_max_elements() * 2))
+        self._graph.add_items(vectors, rows)
+        self._graph_dirty = True
+
+    def _after_delete(self, rows):
+        if self._graph is None:
+            return
+        for row in rows:
+            try:
+                self._graph.mark_deleted(int(row))
+            except RuntimeError:
+                pass
+        self._graph_dirty = True
+
+    def _search(self, queries, k, candidates=None):
+        if candidates is not None and len(candidates) <= EXACT_FILTER_MAX:
+            return self._exact_search(queries, k, candidates)
+
+        live = self.count()
+        k = min(k, live if candidates is None else len(candidates))
+        if k <= 0 or self.graph is None:
+            return [(np.zeros(0, np.int64), np.zeros(0, np.float32)) for _ in queries]
+
+        self.graph.set_ef(max(self.ef_search, k))
+        try:
+            if candidates is None:
+                labels, distances = self.graph.knn_query(queries, k=k)
+            else:
+                allowed = set(candidates.tolist())
+                labels, distances = self.graph.knn_query(queries, k=k, num_threads=1,
+                                                         filter=lambda label: label in allowed)
+        except RuntimeError:
+            # 可达的候选不足 k 个（过滤太严或 ef 太小），退回精确计算
+            return self._exact_search(queries, k, candidates)
+
+        return [(labels[i].astype(np.int64), distances[i]) for i in range(len(queries))]
+
+    def reset(self):
+        with self.lock:
+            super().reset()
+            self._graph = None
+            self._graph_dirty = False
+            if self.graph_path.exists():
+                self.graph_path.unlink()
+
+    def close(self):
+        """把有变化的图写盘（进程退出时自动调用）"""
+        with self.lock:
+            super().close()
+            if self._graph is not None and self._graph_dirty:
+                tmp = self.graph_path.with_suffix('.tmp')
+                self._graph.save_index(str(tmp))
+                os.replace(tmp, self.graph_path)
+                self._save_settings(graph_version=self.version, graph_params=self.graph_params)
+                self._graph_dirty = False
+
+
+def open_index(backend: str,
+               directory: Path,
+               name: str,
+               metadata: Optional[Dict] = None,
+               dtype: str = 'float32',
+               hnsw: Optional[Dict] = None) -> VectorIndex:
+    """
+    打开向量索引
+
+    参数:
+        backend: 'chroma'、'hnswlib' 或 'numpy'
+        directory: 数据目录（chroma 为 PersistentClient 目录，其余为索引根目录）
+        name: 集合名称
+        metadata: 创建时的元数据（如 {'hnsw:space': 'cosine'}）
+        dtype: 本地后端的向量存储精度 'float32' 或 'float16'
+        hnsw: hnswlib 参数 {'M', 'ef_construction', 'ef_search'}（缺省项用 DEFAULT_HNSW）
+
+    返回:
+        VectorIndex 实例
+    """
+    if backend == 'chroma':
+        return ChromaIndex(directory, name, metadata)
+    if backend == 'numpy':
+        return NumpyIndex(directory, name, metadata, dtype)
+    if backend == 'hnswlib':
+        return HnswIndex(directory, name, metadata, dtype, **{**DEFAULT_HNSW, **(hnsw or {})})
+    raise ValueError(f"未知的向量索引后端: {backend}（可选: {', '.join(BACKENDS)}）")
@@ -10,13 +10,30 @@
 
 import sys
 import json
+import time
+import asyncio
 import uuid
+import copy
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Callable, TypedDict
+from typing import Dict, List, Any, Optional, Callable, Tuple, TypedDict, AsyncIterator
 from enum import Enum
+from types import MappingProxyType
 from datetime import datetime
-from copy import deepcopy
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
 
 # Windows 终端编码修复
 if sys.platform == 'win32':
@@ -49,6 +66,62 @@ class State(TypedDict):
 # 检查点管理器 - LangGraph 风格的状态快照
 # ============================================================================
 
+def _state_diff(old: Any, new: Any) -> Optional[Dict[str, Any]]:
+    """
+    计算两个 JSON 值之间的结构化差异
+
+    返回 None 表示相同，否则返回补丁:
+        {'r': value}                        整体替换
+        {'a': [...]}                        列表尾部追加
+        {'s': {...}, 'd': [...], 'c': {...}} 字典: 新增/修改、删除、递归修改
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        patch: Dict[str, Any] = {}
+        changed = {k: v for k, v in new.items() if k not in old}
+        deleted = [k for k in old if k not in new]
+        children = {}
+        for key in new:
+            if key in old:
+                child = _state_diff(old[key], new[key])
+                if child is not None:
+                    if 'r' in child:
+                        changed[key] = child['r']
+                    else:
+                        children[key] = child
+        if changed:
+            patch['s'] = changed
+        if deleted:
+            patch['d'] = deleted
+        if children:
+            patch['c'] = children
+        return patch or None
+
+    if isinstance(old, list) and isinstance(new, list):
+        # 状态里的列表（nodes_executed、execution_log、errors）基本只追加
+        if len(new) >= len(old) and new[:len(old)] == old:
+            return {'a': new[len(old):]} if len(new) > len(old) else None
+        return {'r': new}
+
+    if type(old) is type(new) and old == new:
+        return None
+    return {'r': new}
+
+
+def _apply_state_diff(value: Any, patch: Dict[str, Any]) -> Any:
+    """把 _state_diff 生成的补丁应用到 value 上（原地修改并返回）"""
+    if 'r' in patch:
+        return patch['r']
+    if 'a' in patch:
+        value.extend(patch['a'])
+        return value
+    for key in patch.get('d', []):
+        value.pop(key, None)
+    for key, child in patch.get('c', {}).items():
+        value[key] = _apply_state_diff(value[key], child)
+    value.update(patch.get('s', {}))
+    return value
+
+
 class CheckpointManager:
     """
     检查点管理器 - 保存和恢复工作流状态
@@ -59,6 +132,13 @@ class CheckpointManager:
     3. 维护执行历史和时间线
     4. 持久化到文件系统
 
+    存储结构:
+        index.jsonl         轻量索引（不含状态），删除以墓碑行追加
+        blobs/<sha256>.json 内容寻址的状态块: 完整状态或相对上一个检查点的差异
+
+    连续检查点只保存结构化差异，每 KEYFRAME_INTERVAL 个检查点保存一次完整状态，
+    load/get_state_at 时才沿差异链重建状态。索引在首次访问时才读取。
+
     用法:
         manager = CheckpointManager("my_workflow")
         checkpoint_id = manager.save(state, current_node="process")
@@ -66,6 +146,12 @@ class CheckpointManager:
         history = manager.list_history()
     """
 
+    # 差异链的最大长度（之后写一次完整状态）
+    KEYFRAME_INTERVAL = 10
+
+    # 墓碑行超过有效条目数时重写索引
+    INDEX_COMPACT_RATIO = 1.0
+
     def __init__(self, workflow_id: str, storage_path: Path = None):
         """
         初始化检查点管理器
@@ -80,30 +166,132 @@ class CheckpointManager:
             # 默认存储到工作区记忆目录
             storage_path = Path(__file__).parent.parent / "06_Learning_Journal" / "workspace_memory" / "checkpoints"
 
-        self.storage_path = storage_path / workflow_id
+        self.storage_path = Path(storage_path) / workflow_id
         self.storage_path.mkdir(parents=True, exist_ok=True)
+        self.blob_path = self.storage_path / "blobs"
 
-        # 检查点索引
+        # 检查点索引（惰性加载，只含元数据）
         self.index_file = self.storage_path / "index.jsonl"
-        self.checkpoints: Dict[str, Dict] = {}
-        self._load_index()
+        self._checkpoints: Optional[Dict[str, Dict]] = None
+        self._blob_refs: Dict[str, int] = {}
+        self._tombstones = 0
+
+        # 上一次保存的状态（用于计算差异）
+        self._last_state: Optional[Dict] = None
+        self._last_blob: Optional[str] = None
+        self._chain_length = 0
+
+    # ------------------------------------------------------------------
+    # 索引
+    # ------------------------------------------------------------------
+
+    @property
+    def checkpoints(self) -> Dict[str, Dict]:
+        """检查点索引 {id: 元数据}，首次访问时加载"""
+        if self._checkpoints is None:
+            self._load_index()
+        return self._checkpoints
 
     def _load_index(self):
-        """加载检查点索引"""
-        if self.index_file.exists():
-            try:
-                with open(self.index_file, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        if line.strip():
-                            cp = json.loads(line)
-                            self.checkpoints[cp['id']] = cp
-            except Exception as e:
-                print(f"⚠️  加载检查点索引失败: {e}")
+        """加载检查点索引（旧格式中内联的状态会被丢弃，按需从 <id>.json 读取）"""
+        self._checkpoints = {}
+        self._blob_refs = {}
+        self._tombstones = 0
+        if not self.index_file.exists():
+            return
+        bases: Dict[str, Optional[str]] = {}
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if 'deleted' in entry:
+                        removed = self._checkpoints.pop(entry['deleted'], None)
+                        if removed and removed.get('blob'):
+                            self._drop_ref(removed['blob'], bases)
+                        self._tombstones += 1
+                        continue
+                    entry.pop('state', None)
+                    self._checkpoints[entry['id']] = entry
+                    if entry.get('blob'):
+                        bases[entry['blob']] = entry.get('base')
+                        self._add_ref(entry['blob'], entry.get('base'))
+        except Exception as e:
+            print(f"⚠️  加载检查点索引失败: {e}")
+
+    def _add_ref(self, blob: str, base: Optional[str]):
+        """登记块引用；新块会同时引用其差异基准块"""
+        if self._blob_refs.get(blob, 0) == 0 and base:
+            self._add_ref_count(base)
+        self._add_ref_count(blob)
+
+    def _add_ref_count(self, blob: str):
+        self._blob_refs[blob] = self._blob_refs.get(blob, 0) + 1
+
+    def _drop_ref(self, blob: str, bases: Dict[str, Optional[str]]):
+        """重放墓碑行时释放块引用（块文件删除时已处理），归零时同样释放其差异基准"""
+        while blob:
+            count = self._blob_refs.get(blob, 0) - 1
+            if count > 0:
+                self._blob_refs[blob] = count
+                return
+            self._blob_refs.pop(blob, None)
+            blob = bases.get(blob)
+
+    def _append_index(self, entries: List[Dict]):
+        with open(self.index_file, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False, default=str) + '\n')
 
     def _save_index(self):
-        """保存检查点索引（追加模式）"""
-        # 索引是追加写入的，不需要每次重写
-        pass
+        """重写索引（清除墓碑行）"""
+        tmp = self.index_file.with_suffix('.jsonl.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for checkpoint in self.checkpoints.values():
+                f.write(json.dumps(checkpoint, ensure_ascii=False, default=str) + '\n')
+        tmp.replace(self.index_file)
+        self._tombstones = 0
+
+    # ------------------------------------------------------------------
+    # 内容寻址块
+    # ------------------------------------------------------------------
+
+    def _blob_file(self, blob: str) -> Path:
+        return self.blob_path / f"{blob}.json"
+
+    def _write_blob(self, payload: Dict) -> Tuple[str, int]:
+        """写入块（内容相同的块只写一次），返回 (哈希, 字节数)"""
+        data = json.dumps(payload, ensure_ascii=False, sort_keys=True,
+                          separators=(',', ':'), default=str).encode('utf-8')
+        blob = hashlib.sha256(data).hexdigest()
+        path = self._blob_file(blob)
+        if not path.exists():
+            self.blob_path.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix('.tmp')
+            tmp.write_bytes(data)
+            tmp.replace(path)
+        return blob, len(data)
+
+    def _read_blob(self, blob: str) -> Dict:
+        with open(self._blob_file(blob), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _materialize(self, blob: str) -> Dict:
+        """沿差异链回溯到完整状态，再依次应用补丁"""
+        chain = []
+        payload = self._read_blob(blob)
+        while 'patch' in payload:
+            chain.append(payload['patch'])
+            payload = self._read_blob(payload['base'])
+        state = payload['state']
+        for patch in reversed(chain):
+            state = _apply_state_diff(state, patch)
+        return state
+
+    # ------------------------------------------------------------------
+    # 公共接口
+    # ------------------------------------------------------------------
 
     def save(self, state: State, current_node: str, metadata: Dict = None) -> str:
         """
@@ -119,27 +307,40 @@ class CheckpointManager:
         """
         checkpoint_id = str(uuid.uuid4())
 
-        # 深拷贝状态，避免后续修改影响检查点
-        state_copy = deepcopy(state)
+        # JSON 往返得到与状态无共享引用的快照，同时规范化不可序列化的值
+        snapshot = json.loads(json.dumps(state, ensure_ascii=False, default=str))
+
+        base = None
+        patch = None
+        if self._last_state is not None and self._chain_length < self.KEYFRAME_INTERVAL:
+            patch = _state_diff(self._last_state, snapshot) or {}
+
+        if patch is not None:
+            base = self._last_blob
+            blob, size = self._write_blob({'base': base, 'patch': patch})
+            self._chain_length += 1
+        else:
+            blob, size = self._write_blob({'state': snapshot})
+            self._chain_length = 0
 
         checkpoint = {
             "id": checkpoint_id,
             "workflow_id": self.workflow_id,
             "timestamp": datetime.now().isoformat(),
             "current_node": current_node,
-            "state": state_copy,
+            "blob": blob,
+            "base": base,
+            "size": size,
             "metadata": metadata or {}
         }
 
-        # 保存到文件
-        checkpoint_file = self.storage_path / f"{checkpoint_id}.json"
-        with open(checkpoint_file, 'w', encoding='utf-8') as f:
-            json.dump(checkpoint, f, ensure_ascii=False, indent=2, default=str)
-
-        # 更新索引
+        # 更新索引（只追加一行元数据）
         self.checkpoints[checkpoint_id] = checkpoint
-        with open(self.index_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(checkpoint, ensure_ascii=False, default=str) + '\n')
+        self._add_ref(blob, base)
+        self._append_index([checkpoint])
+
+        self._last_state = snapshot
+        self._last_blob = blob
 
         return checkpoint_id
 
@@ -151,12 +352,15 @@ class CheckpointManager:
             checkpoint_id: 检查点ID
 
         返回:
-            检查点数据，如果不存在返回None
+            检查点数据（含 state），如果不存在返回None
         """
-        if checkpoint_id not in self.checkpoints:
+        entry = self.checkpoints.get(checkpoint_id)
+        if entry is None:
             return None
 
-        return self.checkpoints[checkpoint_id]
+        checkpoint = dict(entry)
+        checkpoint['state'] = self.get_state_at(checkpoint_id)
+        return checkpoint
 
     def list_history(self, limit: int = None) -> List[Dict]:
         """
@@ -166,7 +370,7 @@ class CheckpointManager:
             limit: 限制返回数量
 
         返回:
-            检查点列表（按时间倒序）
+            检查点元数据列表（按时间倒序，不含状态，需要时用 load 获取）
         """
         checkpoints = list(self.checkpoints.values())
         checkpoints.sort(key=lambda x: x['timestamp'], reverse=True)
@@ -182,14 +386,49 @@ class CheckpointManager:
         return history[0] if history else None
 
     def get_state_at(self, checkpoint_id: str) -> Optional[State]:
-        """获取指定检查点的状态"""
-        checkpoint = self.load(checkpoint_id)
-        return checkpoint['state'] if checkpoint else None
+        """获取指定检查点的状态（按需从磁盘重建）"""
+        entry = self.checkpoints.get(checkpoint_id)
+        if entry is None:
+            return None
+
+        try:
+            if entry.get('blob'):
+                return self._materialize(entry['blob'])
+
+            # 旧格式: 完整检查点保存在 <id>.json
+            with open(self.storage_path / f"{checkpoint_id}.json", 'r', encoding='utf-8') as f:
+                return json.load(f).get('state')
+        except Exception as e:
+            print(f"⚠️  加载检查点状态失败: {e}")
+            return None
+
+    def _release(self, blob: str):
+        """释放一次块引用，引用归零时删除块并释放其差异基准"""
+        while blob:
+            self._blob_refs[blob] = self._blob_refs.get(blob, 1) - 1
+            if self._blob_refs[blob] > 0:
+                return
+            del self._blob_refs[blob]
+            path = self._blob_file(blob)
+            base = None
+            if path.exists():
+                try:
+                    base = self._read_blob(blob).get('base')
+                except Exception:
+                    base = None
+                path.unlink()
+            if blob == self._last_blob:
+                # 下一个检查点不能再以已删除的块为基准
+                self._last_state, self._last_blob = None, None
+            blob = base
 
     def clear_old_checkpoints(self, keep_last: int = 10):
         """
         清理旧检查点，只保留最近的N个
 
+        只删除被清理检查点独占的块，并向索引追加墓碑行；
+        仍被保留的检查点作为差异基准引用的块会保留下来。
+
         参数:
             keep_last: 保留最近多少个检查点
         """
@@ -202,17 +441,21 @@ class CheckpointManager:
         to_delete = history[keep_last:]
         for checkpoint in to_delete:
             checkpoint_id = checkpoint['id']
-            checkpoint_file = self.storage_path / f"{checkpoint_id}.json"
-
-            if checkpoint_file.exists():
-                checkpoint_file.unlink()
+            if checkpoint.get('blob'):
+                self._release(checkpoint['blob'])
+            else:
+                legacy_file = self.storage_path / f"{checkpoint_id}.json"
+                if legacy_file.exists():
+                    legacy_file.unlink()
 
             del self.checkpoints[checkpoint_id]
 
-        # 重建索引
-        with open(self.index_file, 'w', encoding='utf-8') as f:
-            for checkpoint in self.checkpoints.values():
-                f.write(json.dumps(checkpoint, ensure_ascii=False, default=str) + '\n')
+        self._append_index([{'deleted': cp['id']} for cp in to_delete])
+        self._tombstones += len(to_delete)
+
+        # 墓碑行过多时才重写索引
+        if self._tombstones > len(self.checkpoints) * self.INDEX_COMPACT_RATIO:
+            self._save_index()
 
     def get_stats(self) -> Dict:
         """获取检查点统计信息"""
@@ -220,8 +463,10 @@ class CheckpointManager:
 
         total_size = 0
         for checkpoint_file in self.storage_path.glob("*.json"):
-            if checkpoint_file.name != "index.jsonl":
-                total_size += checkpoint_file.stat().st_size
+            total_size += checkpoint_file.stat().st_size
+        if self.blob_path.exists():
+            for blob_file in self.blob_path.glob("*.json"):
+                total_size += blob_file.stat().st_size
 
         return {
             "workflow_id": self.workflow_id,
@@ -234,6 +479,214 @@ class CheckpointManager:
         }
 
 
+# ============================================================================
+# 执行剖析器 - 节点耗时、检查点开销与路由开销
+# ============================================================================
+
+def _peak_rss_bytes() -> Optional[int]:
+    """进程峰值常驻内存（字节），无法获取时返回 None"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS 以字节为单位，Linux 以 KB 为单位
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if PSUTIL_AVAILABLE:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    return None
+
+
+class WorkflowProfiler:
+    """
+    工作流剖析器 - 记录每次节点执行、检查点写入和路由决策的开销
+
+    记录内容:
+    1. 节点: 墙钟时间、CPU 时间（同步节点）、峰值 RSS 增量
+    2. 检查点: 序列化写入时间与字节数
+    3. 路由: _get_next_node 耗时
+
+    用法:
+        graph = WorkflowGraph("demo", enable_profiling=True)
+        workflow = graph.compile()
+        workflow.invoke(data)
+        graph.profiler.print_summary()
+        graph.profiler.save_chrome_trace("trace.json")   # chrome://tracing 或 Perfetto 打开
+        graph.save_visualization("demo.html")             # 流程图上叠加节点耗时
+    """
+
+    CATEGORY_NODE = 'node'
+    CATEGORY_CHECKPOINT = 'checkpoint'
+    CATEGORY_ROUTING = 'routing'
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """清空已记录的事件"""
+        with self._lock:
+            self.events = []
+            self._origin = time.perf_counter()
+
+    def record(self, category: str, name: str, start: float, end: float, **args):
+        """
+        记录一个事件
+
+        参数:
+            category: 事件类别 (node/checkpoint/routing)
+            name: 事件名称（节点名）
+            start: 开始时间 (time.perf_counter)
+            end: 结束时间 (time.perf_counter)
+            **args: 附加数据（cpu_ms、rss_delta_bytes、bytes 等）
+        """
+        event = {
+            'cat': category,
+            'name': name,
+            'start': start,
+            'duration': end - start,
+            'tid': threading.get_ident(),
+            'args': args
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def call_node(self, name: str, node: Callable[[State], State], state: State) -> State:
+        """执行同步节点并记录墙钟时间、CPU 时间和峰值 RSS 增量"""
+        rss_before = _peak_rss_bytes()
+        cpu_before = time.thread_time()
+        start = time.perf_counter()
+        try:
+            return node(state)
+        finally:
+            end = time.perf_counter()
+            rss_after = _peak_rss_bytes()
+            self.record(self.CATEGORY_NODE, name, start, end,
+                        cpu_ms=(time.thread_time() - cpu_before) * 1000,
+                        rss_delta_bytes=None if rss_before is None else rss_after - rss_before)
+
+    async def acall_node(self, name: str, pending) -> Any:
+        """等待异步节点并记录墙钟时间（协程与其他任务交错执行，不记录 CPU 时间）"""
+        rss_before = _peak_rss_bytes()
+        start = time.perf_counter()
+        try:
+            return await pending
+        finally:
+            end = time.perf_counter()
+            rss_after = _peak_rss_bytes()
+            self.record(self.CATEGORY_NODE, name, start, end, cpu_ms=None,
+                        rss_delta_bytes=None if rss_before is None else rss_after - rss_before)
+
+    # ------------------------------------------------------------------
+    # 汇总与导出
+    # ------------------------------------------------------------------
+
+    def node_latencies(self) -> Dict[str, float]:
+        """各节点的平均墙钟耗时（毫秒）"""
+        return {row['name']: row['mean_ms'] for row in self.summary()
+                if row['category'] == self.CATEGORY_NODE}
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """
+        按 (类别, 名称) 汇总
+
+        返回:
+            汇总行列表，按总耗时倒序
+        """
+        with self._lock:
+            events = list(self.events)
+
+        groups: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for event in events:
+            key = (event['cat'], event['name'])
+            row = groups.setdefault(key, {
+                'category': event['cat'],
+                'name': event['name'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'cpu_ms': None,
+                'rss_delta_bytes': None,
+                'bytes': None
+            })
+            duration_ms = event['duration'] * 1000
+            row['count'] += 1
+            row['total_ms'] += duration_ms
+            row['max_ms'] = max(row['max_ms'], duration_ms)
+            for field in ('cpu_ms', 'rss_delta_bytes', 'bytes'):
+                value = event['args'].get(field)
+                if value is not None:
+                    row[field] = (row[field] or 0) + value
+
+        rows = list(groups.values())
+        for row in rows:
+            row['mean_ms'] = row['total_ms'] / row['count']
+        rows.sort(key=lambda r: r['total_ms'], reverse=True)
+        return rows
+
+    def format_summary(self) -> str:
+        """生成文本汇总表"""
+        header = f"{'类别':<10} {'名称':<20} {'次数':>5} {'总耗时ms':>10} {'平均ms':>9} {'最大ms':>9} {'CPU ms':>9} {'RSS增量KB':>10} {'字节':>9}"
+        lines = [header, "-" * len(header)]
+
+        def fmt(value, spec):
+            return format(value, spec) if value is not None else '-'
+
+        for row in self.summary():
+            rss_kb = row['rss_delta_bytes'] / 1024 if row['rss_delta_bytes'] is not None else None
+            lines.append(
+                f"{row['category']:<10} {row['name'][:20]:<20} {row['count']:>5} "
+                f"{row['total_ms']:>10.2f} {row['mean_ms']:>9.2f} {row['max_ms']:>9.2f} "
+                f"{fmt(row['cpu_ms'], '>9.2f'):>9} {fmt(rss_kb, '>10.0f'):>10} {fmt(row['bytes'], '>9d'):>9}"
+            )
+        return "\n".join(lines)
+
+    def print_summary(self):
+        """打印汇总表"""
+        print(f"\n{'='*60}")
+        print("执行剖析")
+        print(f"{'='*60}")
+        print(self.format_summary())
+        print(f"{'='*60}\n")
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """
+        导出 Chrome trace-event 格式（chrome://tracing、Perfetto 可直接打开）
+
+        返回:
+            {"traceEvents": [...], "displayTimeUnit": "ms"}
+        """
+        with self._lock:
+            events = list(self.events)
+
+        trace_events = []
+        for event in events:
+            trace_events.append({
+                'name': event['name'],
+                'cat': event['cat'],
+                'ph': 'X',
+                'ts': (event['start'] - self._origin) * 1_000_000,
+                'dur': event['duration'] * 1_000_000,
+                'pid': 1,
+                'tid': event['tid'],
+                'args': {k: v for k, v in event['args'].items() if v is not None}
+            })
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def save_chrome_trace(self, filename: str) -> str:
+        """
+        保存 Chrome trace JSON
+
+        参数:
+            filename: 输出文件名
+
+        返回:
+            文件路径
+        """
+        output_path = Path(filename)
+        output_path.write_text(json.dumps(self.to_chrome_trace(), ensure_ascii=False), encoding='utf-8')
+        return str(output_path)
+
+
 # ============================================================================
 # 工作流可视化器 - 生成流程图
 # ============================================================================
@@ -264,12 +717,13 @@ class WorkflowVisualizer:
         """
         self.graph = graph
 
-    def to_mermaid(self, direction: str = "TD") -> str:
+    def to_mermaid(self, direction: str = "TD", latencies: Dict[str, float] = None) -> str:
         """
         生成 Mermaid 图表
 
         参数:
             direction: 图表方向 (TD=自上而下, LR=自左向右)
+            latencies: 节点平均耗时 {节点名: 毫秒}，提供时在节点上标注并按快慢着色
 
         返回:
             Mermaid 代码字符串
@@ -281,6 +735,8 @@ class WorkflowVisualizer:
         # 添加节点
         for node_name, node in self.graph.nodes.items():
             label = node.name
+            if latencies and node_name in latencies:
+                label = f"\"{label}<br/>{latencies[node_name]:.1f} ms\""
             # 使用圆角矩形表示节点
             lines.append(f"    {node_name}[{label}]")
 
@@ -304,6 +760,26 @@ class WorkflowVisualizer:
                 else:
                     lines.append(f"    {edge.source} -->|{condition_result}| {target}")
 
+        # 添加并行边（分叉用粗线，汇合用虚线）
+        for edge in self.graph.parallel_edges.values():
+            for target in edge.targets:
+                lines.append(f"    {edge.source} ==> {target}")
+                lines.append(f"    {target} -.-> {edge.join}")
+
+        # 按耗时着色: 最慢节点一半以上为慢，四分之一以上为中
+        if latencies:
+            slowest = max(latencies.values()) or 1.0
+            lines.append("")
+            lines.append("    classDef slow fill:#ffcdd2,stroke:#c62828,stroke-width:2px")
+            lines.append("    classDef medium fill:#fff9c4,stroke:#f9a825")
+            lines.append("    classDef fast fill:#c8e6c9,stroke:#2e7d32")
+            for node_name, latency in latencies.items():
+                if node_name not in self.graph.nodes:
+                    continue
+                ratio = latency / slowest
+                css = "slow" if ratio >= 0.5 else "medium" if ratio >= 0.25 else "fast"
+                lines.append(f"    class {node_name} {css}")
+
         return "\n".join(lines)
 
     def to_graphviz(self, direction: str = "TD") -> str:
@@ -353,6 +829,12 @@ class WorkflowVisualizer:
                 else:
                     lines.append(f'    {edge.source} -> {target} [label="{condition_result}"];')
 
+        # 添加并行边
+        for edge in self.graph.parallel_edges.values():
+            for target in edge.targets:
+                lines.append(f'    {edge.source} -> {target} [style=bold];')
+                lines.append(f'    {target} -> {edge.join} [style=dashed];')
+
         lines.append("}")
 
         return "\n".join(lines)
@@ -392,7 +874,12 @@ class WorkflowVisualizer:
 
                 # 查找下一个节点
                 next_node = None
-                for edge in self.graph.edges:
+                parallel = self.graph.parallel_edges.get(current)
+                if parallel:
+                    lines.append(f"  ⇉ (并行: {', '.join(node_map.get(t, t) for t in parallel.targets)})")
+                    next_node = parallel.join
+
+                for edge in self.graph.edges if not next_node else []:
                     if edge.source == current:
                         next_node = edge.target
                         break
@@ -412,15 +899,32 @@ class WorkflowVisualizer:
 
         return "\n".join(lines)
 
-    def save_html(self, filename: str, direction: str = "TD"):
+    def save_html(self, filename: str, direction: str = "TD", latencies: Dict[str, float] = None):
         """
         保存为交互式HTML文件
 
         参数:
             filename: 输出文件名
             direction: 图表方向
+            latencies: 节点平均耗时 {节点名: 毫秒}；默认取图上剖析器的记录
         """
-        mermaid_code = self.to_mermaid(direction)
+        profile_html = ""
+        profiler = self.graph.profiler
+        if latencies is None and profiler and profiler.events:
+            latencies = profiler.node_latencies()
+            rows = "".join(
+                f"<tr><td>{row['category']}</td><td>{row['name']}</td><td>{row['count']}</td>"
+                f"<td>{row['total_ms']:.2f}</td><td>{row['mean_ms']:.2f}</td><td>{row['max_ms']:.2f}</td></tr>"
+                for row in profiler.summary()
+            )
+            profile_html = f"""
+        <h2>执行剖析</h2>
+        <table>
+            <tr><th>类别</th><th>名称</th><th>次数</th><th>总耗时 ms</th><th>平均 ms</th><th>最大 ms</th></tr>
+            {rows}
+        </table>"""
+
+        mermaid_code = self.to_mermaid(direction, latencies)
 
         html_template = f"""<!DOCTYPE html>
 <html>
@@ -459,6 +963,18 @@ class WorkflowVisualizer:
             border-radius: 4px;
             margin: 20px 0;
         }}
+        table {{
+            border-collapse: collapse;
+            width: 100%;
+        }}
+        th, td {{
+            border: 1px solid #ddd;
+            padding: 6px 10px;
+            text-align: right;
+        }}
+        th:nth-child(-n+2), td:nth-child(-n+2) {{
+            text-align: left;
+        }}
     </style>
 </head>
 <body>
@@ -466,13 +982,13 @@ class WorkflowVisualizer:
         <h1>📊 工作流: {self.graph.name}</h1>
         <div class="info">
             <strong>节点数量:</strong> {len(self.graph.nodes)} |
-            <strong>边数量:</strong> {len(self.graph.edges) + len(self.graph.conditional_edges)} |
+            <strong>边数量:</strong> {len(self.graph.edges) + len(self.graph.conditional_edges) + len(self.graph.parallel_edges)} |
             <strong>入口:</strong> {self.graph.entry_point or "未设置"}
         </div>
         <h2>流程图</h2>
         <div class="mermaid">
 {mermaid_code}
-        </div>
+        </div>{profile_html}
     </div>
     <script>
         mermaid.initialize({{startOnLoad: true}});
@@ -492,6 +1008,7 @@ class WorkflowVisualizer:
         print(f"节点数量: {len(self.graph.nodes)}")
         print(f"边数量: {len(self.graph.edges)}")
         print(f"条件边数量: {len(self.graph.conditional_edges)}")
+        print(f"并行边数量: {len(self.graph.parallel_edges)}")
         print(f"入口节点: {self.graph.entry_point or '未设置'}")
         print(f"\n节点列表:")
         for name, node in self.graph.nodes.items():
@@ -530,6 +1047,55 @@ class Node(ABC):
             return state
 
 
+class AsyncNode(Node):
+    """
+    异步节点 - execute 是协程，适合 Playwright 等异步 I/O
+
+    在 CompiledWorkflow.ainvoke/astream 中直接 await；
+    在同步的 invoke 中会为该节点单独运行一个事件循环。
+
+    用法:
+        class FetchNode(AsyncNode):
+            async def execute(self, state):
+                async with async_playwright() as p:
+                    ...
+                return state
+    """
+
+    @abstractmethod
+    async def execute(self, state: State) -> State:
+        """
+        执行节点逻辑（协程）
+        返回更新后的状态
+        """
+        pass
+
+    async def acall(self, state: State) -> State:
+        """异步调用节点"""
+        start_time = datetime.now()
+        self.execution_count += 1
+
+        try:
+            result = await self.execute(state)
+            self.execution_time += (datetime.now() - start_time).total_seconds()
+            return result
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            state['errors'].append(f"{self.name} 执行失败: {str(e)}")
+            return state
+
+    def __call__(self, state: State) -> State:
+        """同步调用: 当前线程没有运行中的事件循环时直接 asyncio.run，否则换线程运行"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.acall(state))
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, self.acall(state)).result()
+
+
 class ConditionalEdge:
     """条件边 - 参考 LangGraph 的条件边"""
 
@@ -565,6 +1131,50 @@ class Edge:
         return self.target
 
 
+def merge_branch_states(base: State, branches: List[State]) -> State:
+    """
+    默认的汇合归并函数
+
+    把每个分支相对分叉前状态的改动依次合并回去: 字典按键合并，
+    只追加的列表（nodes_executed、errors 等）按分支顺序拼接，
+    同一个键被多个分支改写时以靠后的分支为准。
+
+    参数:
+        base: 分叉前的状态（不会被修改）
+        branches: 各分支执行后的状态，顺序与 targets 一致
+
+    返回:
+        合并后的状态
+    """
+    merged = copy.deepcopy(base)
+    for branch in branches:
+        patch = _state_diff(base, branch)
+        if patch:
+            merged = _apply_state_diff(merged, patch)
+    return merged
+
+
+class ParallelEdge:
+    """并行边 - 分叉到多个节点并发执行，再在汇合节点合并状态"""
+
+    def __init__(self,
+                 source: str,
+                 targets: List[str],
+                 join: str,
+                 reducer: Callable[[State, List[State]], State] = None):
+        """
+        参数:
+            source: 源节点名称
+            targets: 并行执行的分支起点
+            join: 汇合节点，所有分支到达此处（或结束）后才执行
+            reducer: 状态归并函数 (分叉前状态, 分支状态列表) -> 合并状态
+        """
+        self.source = source
+        self.targets = list(targets)
+        self.join = join
+        self.reducer = reducer or merge_branch_states
+
+
 class END:
     """结束标记"""
     pass
@@ -601,7 +1211,9 @@ class WorkflowGraph:
         result = workflow.invoke(initial_state)
     """
 
-    def __init__(self, name: str, enable_checkpoints: bool = False, enable_visualization: bool = False):
+    def __init__(self, name: str, enable_checkpoints: bool = False, enable_visualization: bool = False,
+                 max_concurrency: int = 4, node_timeout: float = None, max_iterations: int = 3,
+                 enable_profiling: bool = False):
         """
         初始化工作流图
 
@@ -609,13 +1221,25 @@ class WorkflowGraph:
             name: 工作流名称
             enable_checkpoints: 是否启用检查点功能
             enable_visualization: 是否启用可视化功能
+            max_concurrency: 并行分支的最大并发数
+            node_timeout: 节点默认超时（秒），None 表示不限制
+            max_iterations: 单个节点在一次执行中的最大执行次数（限制循环）
+            enable_profiling: 是否记录节点耗时、检查点开销和路由开销
         """
         self.name = name
         self.nodes: Dict[str, Node] = {}
         self.edges: List[Edge] = []
         self.conditional_edges: List[ConditionalEdge] = []
+        self.parallel_edges: Dict[str, ParallelEdge] = {}
         self.entry_point: Optional[str] = None
 
+        # 执行限制
+        self.max_concurrency = max_concurrency
+        self.node_timeout = node_timeout
+        self.max_iterations = max_iterations
+        self.node_timeouts: Dict[str, float] = {}
+        self.node_max_iterations: Dict[str, int] = {}
+
         # 新增功能
         self.enable_checkpoints = enable_checkpoints
         self.enable_visualization = enable_visualization
@@ -630,9 +1254,26 @@ class WorkflowGraph:
         if enable_visualization:
             self.visualizer = WorkflowVisualizer(self)
 
-    def add_node(self, name: str, node: Node):
-        """添加节点"""
+        # 剖析器
+        self.profiler: Optional[WorkflowProfiler] = None
+        if enable_profiling:
+            self.profiler = WorkflowProfiler()
+
+    def add_node(self, name: str, node: Node, timeout: float = None, max_iterations: int = None):
+        """
+        添加节点
+
+        参数:
+            name: 节点名称
+            node: 节点实例
+            timeout: 该节点的超时（秒），覆盖图的默认值
+            max_iterations: 该节点的最大执行次数，覆盖图的默认值
+        """
         self.nodes[name] = node
+        if timeout is not None:
+            self.node_timeouts[name] = timeout
+        if max_iterations is not None:
+            self.node_max_iterations[name] = max_iterations
 
     def add_edge(self, source: str, target: str):
         """添加边"""
@@ -650,6 +1291,30 @@ class WorkflowGraph:
             ConditionalEdge(source, condition, branches)
         )
 
+    def add_parallel_edges(self,
+                           source: str,
+                           targets: List[str],
+                           join: str,
+                           reducer: Callable[[State, List[State]], State] = None):
+        """
+        添加并行边: source 执行完后并发执行 targets，全部完成后合并状态并进入 join
+
+        每个分支从目标节点出发沿普通边/条件边执行，到达 join 或结束时停止；
+        分支之间互不可见对方的改动。
+
+        参数:
+            source: 源节点
+            targets: 并行分支的起点节点
+            join: 汇合节点
+            reducer: 状态归并函数，默认 merge_branch_states
+        """
+        for target in list(targets) + [join]:
+            if target not in self.nodes:
+                raise ValueError(f"目标节点不存在: {target}")
+        if not targets:
+            raise ValueError("并行边至少需要一个目标节点")
+        self.parallel_edges[source] = ParallelEdge(source, targets, join, reducer)
+
     def set_entry_point(self, node_name: str):
         """设置入口点"""
         if node_name not in self.nodes:
@@ -657,7 +1322,12 @@ class WorkflowGraph:
         self.entry_point = node_name
 
     def compile(self):
-        """编译工作流"""
+        """
+        编译工作流
+
+        预计算路由表并校验图结构，边引用不存在的节点或存在无法结束的
+        循环时直接抛出 ValueError，而不是在执行中途才失败。
+        """
         if not self.entry_point:
             raise ValueError("未设置入口点")
 
@@ -737,11 +1407,154 @@ class WorkflowGraph:
         self.checkpoint_manager.clear_old_checkpoints(keep_last)
 
 
+class ExecutionPlan:
+    """
+    执行计划 - compile() 时从 WorkflowGraph 预计算的不可变路由表
+
+    内容:
+    1. 邻接表: 每个节点的条件边/普通边/并行边，O(1) 路由
+    2. 可达性校验: 引用不存在的节点、从入口不可达的节点、无法结束的节点
+    3. 预绑定的节点可调用对象与执行限制（超时、最大执行次数）
+
+    编译后再修改 WorkflowGraph 不会影响已编译的工作流，需要重新 compile。
+    """
+
+    __slots__ = ('entry_point', 'nodes', 'callables', 'async_nodes', 'conditional', 'static_next',
+                 'parallel', 'successors', 'reachable', 'unreachable', 'dead_ends',
+                 'timeouts', 'max_iterations')
+
+    def __init__(self, graph: 'WorkflowGraph'):
+        """
+        从工作流图构建执行计划
+
+        参数:
+            graph: WorkflowGraph 实例
+
+        异常:
+            ValueError: 入口缺失、边引用不存在的节点、存在无法结束的节点
+        """
+        problems = []
+
+        if not graph.entry_point:
+            raise ValueError("未设置入口点")
+
+        def check_target(source: str, target: Any, kind: str):
+            if target is not END and target not in graph.nodes:
+                problems.append(f"{kind} {source} → {target}: 目标节点不存在")
+
+        # 邻接表（与原先的线性扫描保持相同优先级: 条件边优先，同类边取第一条）
+        conditional: Dict[str, ConditionalEdge] = {}
+        for edge in graph.conditional_edges:
+            if edge.source not in graph.nodes:
+                problems.append(f"条件边源节点不存在: {edge.source}")
+            for target in edge.branches.values():
+                check_target(edge.source, target, "条件边")
+            conditional.setdefault(edge.source, edge)
+
+        static_next: Dict[str, Any] = {}
+        for edge in graph.edges:
+            if edge.source not in graph.nodes:
+                problems.append(f"边源节点不存在: {edge.source}")
+            check_target(edge.source, edge.target, "边")
+            if edge.source in static_next and edge.source not in conditional:
+                print(f"⚠️  节点 {edge.source} 有多条普通边，只使用第一条（并发执行请用 add_parallel_edges）")
+            static_next.setdefault(edge.source, edge.target)
+
+        for edge in graph.parallel_edges.values():
+            if edge.source not in graph.nodes:
+                problems.append(f"并行边源节点不存在: {edge.source}")
+
+        # 实际生效的后继（END/无出边视为可结束）
+        successors: Dict[str, frozenset] = {}
+        terminal = set()
+        for name in graph.nodes:
+            if name in graph.parallel_edges:
+                parallel = graph.parallel_edges[name]
+                targets = set(parallel.targets) | {parallel.join}
+            elif name in conditional:
+                targets = set(conditional[name].branches.values())
+            elif name in static_next:
+                targets = {static_next[name]}
+            else:
+                targets = set()
+
+            if not targets or END in targets:
+                terminal.add(name)
+            successors[name] = frozenset(t for t in targets if t is not END and t in graph.nodes)
+
+        # 从入口出发的可达节点
+        reachable = {graph.entry_point}
+        stack = [graph.entry_point]
+        while stack:
+            for target in successors[stack.pop()]:
+                if target not in reachable:
+                    reachable.add(target)
+                    stack.append(target)
+
+        # 能到达结束的节点（反向图上从可结束节点出发）
+        predecessors: Dict[str, List[str]] = {name: [] for name in graph.nodes}
+        for name, targets in successors.items():
+            for target in targets:
+                predecessors[target].append(name)
+        can_finish = set(terminal)
+        stack = list(terminal)
+        while stack:
+            for source in predecessors[stack.pop()]:
+                if source not in can_finish:
+                    can_finish.add(source)
+                    stack.append(source)
+
+        dead_ends = frozenset(name for name in reachable if name not in can_finish)
+        if dead_ends:
+            problems.append(f"以下节点无法到达结束（死循环）: {', '.join(sorted(dead_ends))}")
+
+        if problems:
+            raise ValueError(f"工作流 {graph.name} 编译失败:\n  " + "\n  ".join(problems))
+
+        unreachable = frozenset(name for name in graph.nodes if name not in reachable)
+        if unreachable:
+            print(f"⚠️  工作流 {graph.name} 中有从入口不可达的节点: {', '.join(sorted(unreachable))}")
+
+        set_ = object.__setattr__
+        set_(self, 'entry_point', graph.entry_point)
+        set_(self, 'nodes', MappingProxyType(dict(graph.nodes)))
+        set_(self, 'callables', MappingProxyType({
+            name: node.__call__ for name, node in graph.nodes.items()
+        }))
+        set_(self, 'async_nodes', frozenset(
+            name for name, node in graph.nodes.items() if isinstance(node, AsyncNode)
+        ))
+        set_(self, 'conditional', MappingProxyType(conditional))
+        set_(self, 'static_next', MappingProxyType(static_next))
+        set_(self, 'parallel', MappingProxyType(dict(graph.parallel_edges)))
+        set_(self, 'successors', MappingProxyType(successors))
+        set_(self, 'reachable', frozenset(reachable))
+        set_(self, 'unreachable', unreachable)
+        set_(self, 'dead_ends', dead_ends)
+        set_(self, 'timeouts', MappingProxyType({
+            name: graph.node_timeouts.get(name, graph.node_timeout) for name in graph.nodes
+        }))
+        set_(self, 'max_iterations', MappingProxyType({
+            name: graph.node_max_iterations.get(name, graph.max_iterations) for name in graph.nodes
+        }))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ExecutionPlan 不可修改，请修改 WorkflowGraph 后重新 compile")
+
+    def next_node(self, current: str, state: State) -> Optional[str]:
+        """O(1) 查找下一个节点"""
+        edge = self.conditional.get(current)
+        if edge is not None:
+            return edge.get_next(state)
+        return self.static_next.get(current)
+
+
 class CompiledWorkflow:
     """编译后的工作流"""
 
     def __init__(self, graph: WorkflowGraph):
         self.graph = graph
+        self.plan = ExecutionPlan(graph)
 
     def invoke(self, initial_data: Dict = None, save_checkpoints: bool = True) -> Dict[str, Any]:
         """
@@ -754,8 +1567,84 @@ class CompiledWorkflow:
         返回:
             执行结果
         """
-        # 初始化状态
-        state: State = {
+        state = self._initial_state(initial_data)
+        state = self._run_path(self.plan.entry_point, state, {}, save_checkpoints=save_checkpoints)
+        return self._finish(state, save_checkpoints)
+
+    async def ainvoke(self, initial_data: Dict = None, save_checkpoints: bool = True) -> Dict[str, Any]:
+        """
+        异步执行工作流
+
+        AsyncNode 直接在事件循环中 await，同步节点放到线程池执行，
+        并行分支作为 asyncio 任务并发运行，浏览器等 I/O 等待可以相互重叠。
+
+        参数:
+            initial_data: 初始数据
+            save_checkpoints: 是否自动保存检查点（需在WorkflowGraph中启用）
+
+        返回:
+            执行结果（与 invoke 相同）
+        """
+        result = None
+        async for event in self.astream(initial_data, save_checkpoints):
+            if event['type'] == 'end':
+                result = event['result']
+        return result
+
+    async def astream(self, initial_data: Dict = None,
+                      save_checkpoints: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        异步执行工作流并逐个产出执行事件
+
+        事件类型: node_start、node_end、parallel_start、parallel_end、checkpoint、end，
+        每个事件包含 type、node、time，end 事件的 result 与 invoke 返回值相同。
+
+        用法:
+            async for event in workflow.astream({'url': url}):
+                print(event['type'], event.get('node'))
+
+        参数:
+            initial_data: 初始数据
+            save_checkpoints: 是否自动保存检查点
+
+        返回:
+            事件异步迭代器
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        executor = ThreadPoolExecutor(max_workers=max(1, self.graph.max_concurrency),
+                                      thread_name_prefix=f"{self.graph.name}-sync")
+
+        async def run():
+            try:
+                state = self._initial_state(initial_data)
+                state = await self._arun_path(self.plan.entry_point, state, {},
+                                              queue, executor, save_checkpoints=save_checkpoints)
+                result = self._finish(state, save_checkpoints)
+                await queue.put(self._event('end', 'END', result=result))
+            finally:
+                await queue.put(None)
+
+        runner = asyncio.ensure_future(run())
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+            await runner
+        finally:
+            if not runner.done():
+                runner.cancel()
+            executor.shutdown(wait=False)
+
+    # ------------------------------------------------------------------
+    # 执行辅助（同步/异步共用）
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _initial_state(initial_data: Dict = None) -> State:
+        """创建初始状态"""
+        return {
             'data': initial_data or {},
             'errors': [],
             'warnings': [],
@@ -767,65 +1656,24 @@ class CompiledWorkflow:
             }
         }
 
-        current_node = self.graph.entry_point
-        visited = set()
-
-        while current_node and current_node != END:
-            # 防止无限循环
-            if current_node in visited:
-                state['errors'].append(f"检测到循环: {current_node}")
-                break
-            visited.add(current_node)
-
-            # 执行节点
-            if current_node not in self.graph.nodes:
-                state['errors'].append(f"节点不存在: {current_node}")
-                break
-
-            node = self.graph.nodes[current_node]
-
-            print(f"\n[执行] {node.name}: {node.description}")
-            state['metadata']['nodes_executed'].append(current_node)
-            state['metadata']['execution_log'].append({
-                'node': current_node,
-                'time': datetime.now().isoformat()
-            })
-
-            # 执行
-            state = node(state)
-
-            # ========== 新增：保存检查点 ==========
-            if save_checkpoints and self.graph.checkpoint_manager:
-                checkpoint_id = self.graph.checkpoint_manager.save(
-                    state=state,
-                    current_node=current_node,
-                    metadata={
-                        'node_name': node.name,
-                        'execution_count': node.execution_count
-                    }
-                )
-                state['metadata']['checkpoints'].append(checkpoint_id)
-                print(f"  [检查点] 已保存: {checkpoint_id[:8]}...")
-
-            # 检查是否有错误
-            if state['errors']:
-                print(f"[错误] {state['errors'][-1]}")
-                break
-
-            # 查找下一个节点
-            current_node = self._get_next_node(current_node, state)
-
-        # 完成
+    def _finish(self, state: State, save_checkpoints: bool) -> Dict[str, Any]:
+        """标记完成、保存最终检查点并生成执行结果"""
         state['metadata']['end_time'] = datetime.now().isoformat()
         state['metadata']['success'] = len(state['errors']) == 0
 
         # 最终检查点
         if save_checkpoints and self.graph.checkpoint_manager:
+            start = time.perf_counter()
             final_checkpoint_id = self.graph.checkpoint_manager.save(
                 state=state,
                 current_node="END",
                 metadata={'completed': True}
             )
+            if self.graph.profiler:
+                self.graph.profiler.record(
+                    WorkflowProfiler.CATEGORY_CHECKPOINT, "END", start, time.perf_counter(),
+                    bytes=self.graph.checkpoint_manager.checkpoints[final_checkpoint_id].get('size')
+                )
             state['metadata']['checkpoints'].append(final_checkpoint_id)
 
         return {
@@ -837,19 +1685,309 @@ class CompiledWorkflow:
             'checkpoints_created': len(state['metadata']['checkpoints'])
         }
 
-    def _get_next_node(self, current: str, state: State) -> Optional[str]:
-        """获取下一个节点"""
-        # 先检查条件边
-        for edge in self.graph.conditional_edges:
-            if edge.source == current:
-                return edge.get_next(state)
+    def _enter_node(self, name: str, state: State, iterations: Dict[str, int]) -> bool:
+        """检查节点是否存在以及是否超过最大执行次数，可以执行时记录日志并返回 True"""
+        if name not in self.plan.nodes:
+            state['errors'].append(f"节点不存在: {name}")
+            return False
+
+        # 有界循环: 每个节点最多执行 max_iterations 次
+        limit = self.plan.max_iterations[name]
+        iterations[name] = iterations.get(name, 0) + 1
+        if iterations[name] > limit:
+            state['errors'].append(f"检测到循环: {name} 超过最大执行次数 {limit}")
+            return False
+
+        node = self.plan.nodes[name]
+        print(f"\n[执行] {node.name}: {node.description}")
+        state['metadata']['nodes_executed'].append(name)
+        state['metadata']['execution_log'].append({
+            'node': name,
+            'time': datetime.now().isoformat()
+        })
+        return True
+
+    def _save_checkpoint(self, state: State, current_node: str, metadata: Dict) -> Optional[str]:
+        """保存检查点并记录到状态中"""
+        if not self.graph.checkpoint_manager:
+            return None
+        start = time.perf_counter()
+        checkpoint_id = self.graph.checkpoint_manager.save(
+            state=state,
+            current_node=current_node,
+            metadata=metadata
+        )
+        if self.graph.profiler:
+            self.graph.profiler.record(
+                WorkflowProfiler.CATEGORY_CHECKPOINT, current_node, start, time.perf_counter(),
+                bytes=self.graph.checkpoint_manager.checkpoints[checkpoint_id].get('size')
+            )
+        state['metadata']['checkpoints'].append(checkpoint_id)
+        print(f"  [检查点] 已保存: {checkpoint_id[:8]}...")
+        return checkpoint_id
 
-        # 再检查普通边
-        for edge in self.graph.edges:
-            if edge.source == current:
-                return edge.target
+    def _node_checkpoint_metadata(self, name: str) -> Dict:
+        node = self.plan.nodes[name]
+        return {
+            'node_name': node.name,
+            'execution_count': node.execution_count
+        }
 
-        return None
+    @staticmethod
+    def _parallel_checkpoint_metadata(parallel: ParallelEdge) -> Dict:
+        return {'parallel': parallel.targets, 'join': parallel.join}
+
+    @staticmethod
+    def _merge_iterations(iterations: Dict[str, int], branch_iterations: List[Dict[str, int]]):
+        """累加各分支内的执行次数，供后续循环限制使用"""
+        before = dict(iterations)
+        for counts in branch_iterations:
+            for name, count in counts.items():
+                iterations[name] = iterations.get(name, 0) + count - before.get(name, 0)
+
+    @staticmethod
+    def _event(event_type: str, node: str, **fields) -> Dict[str, Any]:
+        event = {'type': event_type, 'node': node, 'time': datetime.now().isoformat()}
+        event.update(fields)
+        return event
+
+    # ------------------------------------------------------------------
+    # 同步执行
+    # ------------------------------------------------------------------
+
+    def _run_path(self,
+                  start: str,
+                  state: State,
+                  iterations: Dict[str, int],
+                  stop: str = None,
+                  save_checkpoints: bool = False) -> State:
+        """
+        从 start 开始顺序执行，直到结束、出错或到达 stop 节点
+
+        参数:
+            start: 起始节点
+            state: 当前状态
+            iterations: 各节点已执行次数（原地更新）
+            stop: 停止节点（并行分支的汇合点）
+            save_checkpoints: 是否在每个节点后保存检查点
+
+        返回:
+            执行后的状态
+        """
+        current_node = start
+
+        while current_node and current_node != END and current_node != stop:
+            if not self._enter_node(current_node, state, iterations):
+                break
+
+            state = self._execute_node(current_node, state)
+            if save_checkpoints:
+                self._save_checkpoint(state, current_node, self._node_checkpoint_metadata(current_node))
+
+            # 检查是否有错误
+            if state['errors']:
+                print(f"[错误] {state['errors'][-1]}")
+                break
+
+            parallel = self.plan.parallel.get(current_node)
+            if parallel:
+                state = self._fan_out(parallel, state, iterations, save_checkpoints)
+                if state['errors']:
+                    print(f"[错误] {state['errors'][-1]}")
+                    break
+                current_node = parallel.join
+                continue
+
+            # 查找下一个节点
+            current_node = self._route(current_node, state)
+
+        return state
+
+    def _execute_node(self, name: str, state: State) -> State:
+        """执行单个节点（按配置施加超时）"""
+        node = self.plan.nodes[name]
+        timeout = self.plan.timeouts[name]
+        if timeout:
+            return self._call_with_timeout(name, node, state, timeout)
+        return self._call_node(name, node, state)
+
+    def _call_node(self, name: str, node: Node, state: State) -> State:
+        """调用节点，启用剖析时记录开销"""
+        call = self.plan.callables[name]
+        if self.graph.profiler:
+            return self.graph.profiler.call_node(name, call, state)
+        return call(state)
+
+    def _call_with_timeout(self, name: str, node: Node, state: State, timeout: float) -> State:
+        """
+        在独立线程中执行节点，超时则放弃其结果
+
+        节点拿到的是状态副本，超时后仍在运行的节点不会改动后续状态。
+        """
+        result: Dict[str, State] = {}
+
+        def run():
+            result['state'] = self._call_node(name, node, copy.deepcopy(state))
+
+        worker = threading.Thread(target=run, name=f"node-{node.name}", daemon=True)
+        worker.start()
+        worker.join(timeout)
+
+        if worker.is_alive() or 'state' not in result:
+            state['errors'].append(f"{node.name} 执行超时 ({timeout}s)")
+            return state
+        return result['state']
+
+    def _fan_out(self,
+                 parallel: ParallelEdge,
+                 state: State,
+                 iterations: Dict[str, int],
+                 save_checkpoints: bool) -> State:
+        """并发执行并行分支，等待全部完成后用 reducer 合并状态"""
+        print(f"\n[并行] {parallel.source} → {', '.join(parallel.targets)} → {parallel.join}")
+
+        branch_states = [copy.deepcopy(state) for _ in parallel.targets]
+        branch_iterations = [dict(iterations) for _ in parallel.targets]
+        workers = max(1, min(self.graph.max_concurrency, len(parallel.targets)))
+
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix=f"{self.graph.name}-{parallel.source}") as pool:
+            futures = [
+                pool.submit(self._run_path, target, branch_state, counts, parallel.join)
+                for target, branch_state, counts in zip(parallel.targets, branch_states, branch_iterations)
+            ]
+            results = [future.result() for future in futures]
+
+        self._merge_iterations(iterations, branch_iterations)
+        state = parallel.reducer(state, results)
+
+        if save_checkpoints:
+            self._save_checkpoint(state, parallel.join, self._parallel_checkpoint_metadata(parallel))
+
+        return state
+
+    # ------------------------------------------------------------------
+    # 异步执行
+    # ------------------------------------------------------------------
+
+    async def _arun_path(self,
+                         start: str,
+                         state: State,
+                         iterations: Dict[str, int],
+                         queue: asyncio.Queue,
+                         executor: ThreadPoolExecutor,
+                         stop: str = None,
+                         save_checkpoints: bool = False) -> State:
+        """_run_path 的异步版本，执行事件写入 queue"""
+        current_node = start
+
+        while current_node and current_node != END and current_node != stop:
+            if not self._enter_node(current_node, state, iterations):
+                break
+
+            await queue.put(self._event('node_start', current_node))
+            began = time.perf_counter()
+            state = await self._aexecute_node(current_node, state, executor)
+            await queue.put(self._event('node_end', current_node,
+                                        duration=time.perf_counter() - began,
+                                        errors=list(state['errors'])))
+
+            if save_checkpoints:
+                checkpoint_id = self._save_checkpoint(state, current_node,
+                                                      self._node_checkpoint_metadata(current_node))
+                if checkpoint_id:
+                    await queue.put(self._event('checkpoint', current_node, checkpoint_id=checkpoint_id))
+
+            # 检查是否有错误
+            if state['errors']:
+                print(f"[错误] {state['errors'][-1]}")
+                break
+
+            parallel = self.plan.parallel.get(current_node)
+            if parallel:
+                state = await self._afan_out(parallel, state, iterations, queue, executor, save_checkpoints)
+                if state['errors']:
+                    print(f"[错误] {state['errors'][-1]}")
+                    break
+                current_node = parallel.join
+                continue
+
+            # 查找下一个节点
+            current_node = self._route(current_node, state)
+
+        return state
+
+    async def _aexecute_node(self, name: str, state: State, executor: ThreadPoolExecutor) -> State:
+        """异步节点直接 await，同步节点在线程池中执行；超时时放弃结果"""
+        node = self.plan.nodes[name]
+        timeout = self.plan.timeouts[name]
+        node_state = copy.deepcopy(state) if timeout else state
+
+        if name in self.plan.async_nodes:
+            pending = node.acall(node_state)
+            if self.graph.profiler:
+                pending = self.graph.profiler.acall_node(name, pending)
+        else:
+            pending = asyncio.get_running_loop().run_in_executor(
+                executor, self._call_node, name, node, node_state)
+
+        if not timeout:
+            return await pending
+        try:
+            return await asyncio.wait_for(pending, timeout)
+        except asyncio.TimeoutError:
+            state['errors'].append(f"{node.name} 执行超时 ({timeout}s)")
+            return state
+
+    async def _afan_out(self,
+                        parallel: ParallelEdge,
+                        state: State,
+                        iterations: Dict[str, int],
+                        queue: asyncio.Queue,
+                        executor: ThreadPoolExecutor,
+                        save_checkpoints: bool) -> State:
+        """以 asyncio 任务并发执行并行分支，信号量限制最大并发数"""
+        print(f"\n[并行] {parallel.source} → {', '.join(parallel.targets)} → {parallel.join}")
+        await queue.put(self._event('parallel_start', parallel.source,
+                                    targets=parallel.targets, join=parallel.join))
+
+        semaphore = asyncio.Semaphore(max(1, self.graph.max_concurrency))
+        branch_iterations = [dict(iterations) for _ in parallel.targets]
+
+        async def branch(target: str, counts: Dict[str, int]) -> State:
+            async with semaphore:
+                return await self._arun_path(target, copy.deepcopy(state), counts,
+                                             queue, executor, stop=parallel.join)
+
+        results = await asyncio.gather(*[
+            branch(target, counts) for target, counts in zip(parallel.targets, branch_iterations)
+        ])
+
+        self._merge_iterations(iterations, branch_iterations)
+        state = parallel.reducer(state, list(results))
+        await queue.put(self._event('parallel_end', parallel.join, targets=parallel.targets))
+
+        if save_checkpoints:
+            checkpoint_id = self._save_checkpoint(state, parallel.join,
+                                                  self._parallel_checkpoint_metadata(parallel))
+            if checkpoint_id:
+                await queue.put(self._event('checkpoint', parallel.join, checkpoint_id=checkpoint_id))
+
+        return state
+
+    def _route(self, current: str, state: State) -> Optional[str]:
+        """查找下一个节点，启用剖析时记录路由耗时"""
+        if not self.graph.profiler:
+            return self._get_next_node(current, state)
+        start = time.perf_counter()
+        try:
+            return self._get_next_node(current, state)
+        finally:
+            self.graph.profiler.record(WorkflowProfiler.CATEGORY_ROUTING, current, start, time.perf_counter())
+
+    def _get_next_node(self, current: str, state: State) -> Optional[str]:
+        """获取下一个节点（查编译期路由表）"""
+        return self.plan.next_node(current, state)
 
 
 # ============ 申请书生成工作流的具体节点 ============
@@ -1012,10 +2150,15 @@ class ReviewDocumentNode(Node):
 
 # ============ 预定义工作流 ============
 
-def create_application_workflow() -> CompiledWorkflow:
-    """创建申请书生成工作流"""
+def create_application_workflow(enable_profiling: bool = False) -> CompiledWorkflow:
+    """
+    创建申请书生成工作流
+
+    参数:
+        enable_profiling: 是否记录各节点耗时（graph.profiler）
+    """
 
-    graph = WorkflowGraph("application_generation")
+    graph = WorkflowGraph("application_generation", enable_profiling=enable_profiling)
 
     # 添加节点
     graph.add_node("validate", ValidateNode())
@@ -1087,7 +2230,7 @@ def main():
     # 演示1: 申请书生成工作流
     print("\n[演示1] 申请书生成工作流\n")
 
-    workflow = create_application_workflow()
+    workflow = create_application_workflow(enable_profiling=True)
 
     test_data = {
         'business_name': '测试便利店',
@@ -1111,6 +2254,8 @@ def main():
         if output_file:
             print(f"  输出文件: {output_file}")
 
+    workflow.graph.profiler.print_summary()
+
     # 演示2: 文件整理工作流
     print("\n[演示2] 文件整理工作流\n")
 
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+百度 OCR 客户端基准测试（离线，使用本地替身服务）
+
+替身服务按配额限流并模拟每次识别的网络延迟，对比：
+- 逐张串行调用（原 BaiduOCREngine 的方式）
+- 线程池并发 + 不限流（靠 18 号错误重试兜底）
+- 线程池并发 + 令牌桶限流（略低于配额）
+
+用法:
+    python scripts/benchmarks/bench_baidu_client.py --images 40 --quota 10 --latency 0.3
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "scripts" / "tools"))
+
+from loguru import logger
+
+from baidu_ocr_standin import BaiduOCRStandIn
+from src.baidu_ocr_client import BaiduOCRClient
+
+
+def _run(label: str, args, images: list, qps: float, workers: int):
+    with BaiduOCRStandIn(qps=args.quota, latency=args.latency) as server:
+        client = BaiduOCRClient(
+            "key", "secret", qps=qps, max_workers=workers, max_retries=50,
+            base_url=server.url, token_cache=None
+        )
+        client.access_token()
+        start = time.perf_counter()
+        results = client.recognize_many(lambda p: client.basicGeneral(Path(p).read_bytes()), images)
+        elapsed = time.perf_counter() - start
+        client.close()
+
+    failed = sum(1 for r in results.values() if 'error_code' in r)
+    print(f"{label}: {elapsed:.2f}s ({len(images) / elapsed:.1f} 张/秒), "
+          f"请求 {server.stats['requests']}, 配额拒绝 {server.stats['qps_rejected']}, "
+          f"失败 {failed}, TCP 连接 {server.stats['connections']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="百度 OCR 客户端基准测试")
+    parser.add_argument("--images", type=int, default=40)
+    parser.add_argument("--quota", type=float, default=10, help="替身服务的 QPS 配额")
+    parser.add_argument("--latency", type=float, default=0.3, help="单次识别耗时（秒）")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    logger.remove()
+    with tempfile.TemporaryDirectory() as workdir:
+        images = []
+        for i in range(args.images):
+            path = Path(workdir) / f"scan_{i}.jpg"
+            path.write_bytes(b'\xff\xd8' + i.to_bytes(4, 'big') * 50000)
+            images.append(str(path))
+
+        _run("逐张串行", args, images, qps=0, workers=1)
+        _run(f"并发 {args.workers} 不限流", args, images, qps=0, workers=args.workers)
+        _run(f"并发 {args.workers} 限流 {args.quota * 0.9:g} QPS", args, images,
+             qps=args.quota * 0.9, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+经营户批量导入基准测试
+
+对比逐条 insert_operator（每条一个事务 + 一条日志）与 bulk_upsert_operators
+（单事务 executemany + 批量日志）导入 JSON 导出数据的耗时。
+逐条导入很慢，默认只跑较少行数并按比例折算。
+
+用法:
+    python scripts/benchmarks/bench_bulk_import.py --rows 50000 --legacy-rows 2000
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from loguru import logger
+
+from src.database_manager import DatabaseManager
+
+
+def _records(count: int) -> list:
+    return [
+        {
+            'operator_name': f'经营者{i}',
+            'id_card': f'450921{i:012d}',
+            'phone': f'138{i:08d}',
+            'business_name': f'测试便利店{i}',
+            'business_address': '广西玉林市兴业县蒲塘镇测试路123号',
+            'business_scope': '食品销售；日用百货',
+            'metadata': {'source': 'legacy_export'},
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="经营户批量导入基准测试")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--legacy-rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    logger.remove()
+    workdir = Path(tempfile.mkdtemp(prefix="bench_import_"))
+    try:
+        # 逐条插入
+        db = DatabaseManager(str(workdir / "legacy.db"))
+        records = _records(args.legacy_rows)
+        start = time.perf_counter()
+        for record in records:
+            db.insert_operator(record)
+        legacy = time.perf_counter() - start
+        db.close()
+        print(f"逐条插入: {args.legacy_rows} 行 {legacy:.2f}s "
+              f"(折算 {args.rows} 行约 {legacy / args.legacy_rows * args.rows:.1f}s)")
+
+        # JSON 导出 → 批量导入
+        export = workdir / "export.json"
+        export.write_text(json.dumps(_records(args.rows), ensure_ascii=False), encoding='utf-8')
+
+        db = DatabaseManager(str(workdir / "bulk.db"))
+        start = time.perf_counter()
+        count = db.import_from_json(str(export))
+        bulk = time.perf_counter() - start
+        print(f"批量导入: {count} 行 {bulk:.2f}s")
+
+        # 再导入一次（全部走更新分支）
+        start = time.perf_counter()
+        outcomes = db.bulk_upsert_operators(_records(args.rows))
+        again = time.perf_counter() - start
+        updated = sum(1 for o in outcomes if o['status'] == 'updated')
+        print(f"重复导入: {updated} 行更新 {again:.2f}s")
+        db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
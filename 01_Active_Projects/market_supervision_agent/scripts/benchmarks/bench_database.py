@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库并发吞吐基准测试
+
+模拟 Flask 多线程 worker：每个请求新建一个 DatabaseManager（与 ui/flask_app.py 相同），
+分别测插入、搜索、更新的吞吐，对比连接池 + WAL 与原先每次 sqlite3.connect 的实现。
+
+用法:
+    python scripts/benchmarks/bench_database.py --workers 1 4 16 --requests 400
+"""
+
+import argparse
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from loguru import logger
+
+from src.database_manager import DatabaseManager
+
+
+class LegacyDatabaseManager(DatabaseManager):
+    """原实现：每次构造都建表，每次操作新开连接、默认回滚日志"""
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._init_database()
+
+    @contextmanager
+    def _get_connection(self):
+        conn = sqlite3.connect(str(self.db_path))
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+def _record(worker: int, i: int) -> dict:
+    return {
+        'operator_name': f'经营者{worker}_{i}',
+        'id_card': f'45092{worker:04d}{i:09d}',
+        'phone': f'138{worker:02d}{i:06d}',
+        'business_name': f'测试便利店{worker}_{i}',
+        'business_address': '广西玉林市兴业县蒲塘镇测试路123号',
+    }
+
+
+def _run(manager_cls, db_path: str, workers: int, per_worker: int, op: str) -> float:
+    """workers 个线程各发 per_worker 个请求，返回每秒请求数"""
+    barrier = threading.Barrier(workers + 1)
+    errors = []
+
+    def worker(w: int):
+        barrier.wait()
+        try:
+            for i in range(per_worker):
+                db = manager_cls(db_path)   # Flask 路由里每个请求都新建
+                if op == 'insert':
+                    db.insert_operator(_record(w, i))
+                elif op == 'search':
+                    db.search_operators(f'{w}_{i % 50}')
+                else:
+                    db.update_operator(_record(w, i)['id_card'], {'phone': f'139{i:08d}'})
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(w,)) for w in range(workers)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    if errors:
+        print(f"  ⚠️  {len(errors)} 个 worker 出错: {errors[0]}")
+    return workers * per_worker / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库并发吞吐基准测试")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=400, help="每种操作的总请求数")
+    args = parser.parse_args()
+
+    logger.remove()
+    workdir = Path(tempfile.mkdtemp(prefix="bench_db_"))
+
+    print(f"{'实现':<8} {'workers':>8} {'插入/s':>10} {'搜索/s':>10} {'更新/s':>10}")
+    try:
+        for name, cls in (("原实现", LegacyDatabaseManager), ("连接池", DatabaseManager)):
+            for workers in args.workers:
+                db_path = str(workdir / f"{cls.__name__}_{workers}.db")
+                per_worker = max(1, args.requests // workers)
+                rates = [_run(cls, db_path, workers, per_worker, op) for op in ('insert', 'search', 'update')]
+                print(f"{name:<8} {workers:>8} {rates[0]:>10.0f} {rates[1]:>10.0f} {rates[2]:>10.0f}")
+                if cls is DatabaseManager:
+                    cls(db_path).close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量 OCR 基准测试
+
+对比单进程逐张 OCREngine.recognize_image 与 OCRService 在不同工作进程数下
+识别一批扫描件的吞吐（张/秒），观察随核数的扩展情况。
+需要安装 paddleocr 和 opencv-python；不使用 OCR 缓存。
+
+用法:
+    python scripts/benchmarks/bench_ocr_service.py --images path/to/scans --repeat 40 --workers 1 2 4 8
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from loguru import logger
+
+from src.ocr_engine import OCREngine
+from src.ocr_service import IMAGE_EXTENSIONS, OCRService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量 OCR 基准测试")
+    parser.add_argument("--images", required=True, help="扫描件目录")
+    parser.add_argument("--repeat", type=int, default=40, help="循环取图凑满的张数")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    logger.remove()
+    scans = sorted(p for p in Path(args.images).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+    if not scans:
+        print(f"目录中没有图片: {args.images}")
+        return
+    files = [str(scans[i % len(scans)]) for i in range(args.repeat)]
+
+    # 单进程逐张识别（模型加载不计时）
+    engine = OCREngine(use_cache=False)
+    engine._initialize()
+    start = time.perf_counter()
+    for path in files:
+        engine.recognize_image(path)
+    sequential = time.perf_counter() - start
+    print(f"逐张识别: {len(files)} 张 {sequential:.1f}s ({len(files) / sequential:.2f} 张/秒)")
+
+    for workers in args.workers:
+        with OCRService(workers=workers, use_cache=False) as service:
+            start = time.perf_counter()
+            # recognize_batch 会对相同内容去重，这里直接按分块提交以让每张都实际识别
+            futures = [
+                service.submit([(path, "general") for path in files[i:i + service.chunk_size]])
+                for i in range(0, len(files), service.chunk_size)
+            ]
+            for future in futures:
+                future.result()
+            elapsed = time.perf_counter() - start
+        print(f"OCRService workers={workers}: {elapsed:.1f}s ({len(files) / elapsed:.2f} 张/秒, "
+              f"加速 {sequential / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
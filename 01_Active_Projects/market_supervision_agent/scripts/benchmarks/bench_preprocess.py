@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR 图片预处理基准测试
+
+对每种文档类型统计预处理前后的像素数、上传字节数和预处理耗时；
+安装了 PaddleOCR 时同时对比原图与预处理后图片的识别耗时。
+
+仓库中没有真实证件样本（涉及个人信息），未指定 --images 时生成模拟的
+手机拍摄照片（4000x3000、EXIF 竖拍、证件斜放在桌面上）。
+--images 目录下的文件按文件名前缀归类：id_card_*、business_license_*、
+contract_*，其余为 general。
+
+用法:
+    python scripts/benchmarks/bench_preprocess.py
+    python scripts/benchmarks/bench_preprocess.py --images ~/scans --ocr
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import cv2
+import numpy as np
+from loguru import logger
+from PIL import Image
+
+from src.image_preprocessor import ImagePreprocessor
+from src.ocr_cache import OCRCache
+
+DOC_TYPES = ("id_card", "business_license", "contract", "general")
+
+# 模拟样本：文档尺寸（像素）与在照片中的四个角点
+SAMPLES = {
+    "id_card": ((856, 540), [[900, 700], [2900, 850], [2800, 2150], [800, 1950]]),
+    "business_license": ((1188, 840), [[300, 250], [3700, 400], [3600, 2800], [250, 2650]]),
+    "contract": ((840, 1188), [[600, 80], [3200, 150], [3300, 2950], [500, 2900]]),
+    "general": ((1188, 840), [[200, 200], [3800, 200], [3800, 2800], [200, 2800]]),
+}
+
+
+def _synthetic_photo(path: Path, doc_type: str, seed: int):
+    """生成模拟的手机拍摄照片"""
+    (doc_w, doc_h), quad = SAMPLES[doc_type]
+    rng = np.random.default_rng(seed)
+    photo = cv2.GaussianBlur(rng.integers(30, 90, (3000, 4000, 3), dtype=np.uint8), (7, 7), 0)
+
+    document = np.full((doc_h, doc_w, 3), 240, dtype=np.uint8)
+    for row, y in enumerate(range(60, doc_h - 40, 48)):
+        cv2.putText(document, f"LINE {row:02d} 4501031990{seed:04d} ZHANG SAN", (40, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (25, 25, 25), 2)
+
+    source = np.float32([[0, 0], [doc_w - 1, 0], [doc_w - 1, doc_h - 1], [0, doc_h - 1]])
+    matrix = cv2.getPerspectiveTransform(source, np.float32(quad))
+    warped = cv2.warpPerspective(document, matrix, (4000, 3000))
+    mask = cv2.warpPerspective(np.ones((doc_h, doc_w), np.uint8), matrix, (4000, 3000)).astype(bool)
+    photo[mask] = warped[mask]
+
+    image = Image.fromarray(cv2.cvtColor(photo, cv2.COLOR_BGR2RGB)).rotate(90, expand=True)
+    exif = image.getexif()
+    exif[0x0112] = 8  # 逆时针旋转 90 度拍摄
+    image.save(path, "JPEG", quality=92, exif=exif.tobytes())
+
+
+def _doc_type(path: Path) -> str:
+    for doc_type in DOC_TYPES:
+        if path.name.startswith(doc_type):
+            return doc_type
+    return "general"
+
+
+def _ocr_seconds(ocr, image) -> float:
+    start = time.perf_counter()
+    ocr.ocr(image, cls=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR 图片预处理基准测试")
+    parser.add_argument("--images", type=Path, help="样本图片目录（默认生成模拟样本）")
+    parser.add_argument("--samples", type=int, default=5, help="每种文档类型的模拟样本数")
+    parser.add_argument("--ocr", action="store_true", help="同时测量 PaddleOCR 识别耗时")
+    args = parser.parse_args()
+
+    logger.remove()
+    ocr = None
+    if args.ocr:
+        from paddleocr import PaddleOCR
+        ocr = PaddleOCR(use_angle_cls=True, lang="ch", show_log=False)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        if args.images:
+            files = sorted(p for p in args.images.iterdir() if p.is_file())
+        else:
+            files = []
+            for doc_type in DOC_TYPES:
+                for i in range(args.samples):
+                    path = workdir / f"{doc_type}_{i}.jpg"
+                    _synthetic_photo(path, doc_type, i)
+                    files.append(path)
+
+        cache = OCRCache(str(workdir / "cache.db"))
+        preprocessor = ImagePreprocessor(cache=cache)
+
+        print(f"{'文档类型':<18}{'样本':>4}{'原图像素':>12}{'处理后像素':>12}{'原图字节':>12}"
+              f"{'上传字节':>12}{'预处理ms':>10}{'缓存后ms':>10}{'检测率':>8}")
+        for doc_type in DOC_TYPES:
+            group = [p for p in files if _doc_type(p) == doc_type]
+            if not group:
+                continue
+            rows = []
+            for path in group:
+                start = time.perf_counter()
+                data = preprocessor.prepare_for_upload(str(path), doc_type)
+                cold = time.perf_counter() - start
+                start = time.perf_counter()
+                prepared = preprocessor.prepare(str(path), doc_type)
+                warm = time.perf_counter() - start
+
+                width, height = prepared.original_size
+                rows.append({
+                    "pixels": width * height,
+                    "prepared_pixels": prepared.image.shape[0] * prepared.image.shape[1],
+                    "bytes": path.stat().st_size,
+                    "upload": len(data),
+                    "cold": cold,
+                    "warm": warm,
+                    "detected": prepared.quad is not None,
+                    "prepared": prepared.image,
+                    "path": path,
+                })
+
+            mean = lambda key: statistics.mean(r[key] for r in rows)
+            detected = sum(r["detected"] for r in rows) / len(rows)
+            print(f"{doc_type:<18}{len(rows):>4}{mean('pixels') / 1e6:>11.1f}M"
+                  f"{mean('prepared_pixels') / 1e6:>11.2f}M{mean('bytes') / 1024:>10.0f}KB"
+                  f"{mean('upload') / 1024:>10.0f}KB{mean('cold') * 1000:>10.0f}{mean('warm') * 1000:>10.0f}"
+                  f"{detected:>8.0%}")
+
+            if ocr is not None:
+                original = statistics.median(_ocr_seconds(ocr, str(r["path"])) for r in rows)
+                prepared = statistics.median(_ocr_seconds(ocr, r["prepared"]) for r in rows)
+                print(f"{'':<18}PaddleOCR 中位耗时: 原图 {original:.2f}s → 预处理后 {prepared:.2f}s")
+
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+经营户搜索基准测试
+
+模拟边输入边搜索：对每个查询词逐字符取前缀发起一次 search_operators(limit=20)，
+对比 FTS5 trigram 全文索引与原先的 LIKE '%keyword%' 全表扫描的单次延迟。
+
+用法:
+    python scripts/benchmarks/bench_search.py --rows 200000
+"""
+
+import argparse
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from loguru import logger
+
+from src.database_manager import DatabaseManager
+
+SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗'
+GIVEN = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华'
+SHOPS = ['便利店', '水果店', '五金店', '粮油店', '早餐店', '服装店', '烧烤店', '理发店', '药店', '茶叶店']
+AREAS = ['青秀区', '兴宁区', '江南区', '西乡塘区', '良庆区', '邕宁区', '武鸣区']
+
+
+def _records(count: int, rng: random.Random) -> list:
+    records = []
+    for i in range(count):
+        name = rng.choice(SURNAMES) + ''.join(rng.choice(GIVEN) for _ in range(rng.randint(1, 2)))
+        records.append({
+            'operator_name': name,
+            'id_card': f'4501{rng.randint(0, 99):02d}{rng.randint(1960, 2000)}{i:08d}',
+            'phone': f'1{rng.choice("3589")}{i:09d}',
+            'business_name': f'{rng.choice(AREAS)}{name}{rng.choice(SHOPS)}',
+        })
+    return records
+
+
+def _like_search(db: DatabaseManager, keyword: str, limit: int) -> list:
+    """原实现：四列 LIKE 全表扫描"""
+    pattern = f'%{keyword}%'
+    with db._get_connection() as conn:
+        return conn.execute('''
+            SELECT * FROM operators
+            WHERE status = 'active'
+            AND (operator_name LIKE ? OR business_name LIKE ? OR id_card LIKE ? OR phone LIKE ?)
+            ORDER BY updated_at DESC LIMIT ?
+        ''', (pattern, pattern, pattern, pattern, limit)).fetchall()
+
+
+def _typing(queries: list) -> list:
+    return [q[:n] for q in queries for n in range(1, len(q) + 1)]
+
+
+def _measure(search, prefixes: list) -> list:
+    timings = []
+    for prefix in prefixes:
+        start = time.perf_counter()
+        search(prefix)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def _report(label: str, timings: list):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label}: {len(timings)} 次, 中位 {statistics.median(timings):.2f}ms, "
+          f"p95 {p95:.2f}ms, 最大 {timings[-1]:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="经营户搜索基准测试")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    logger.remove()
+    rng = random.Random(42)
+    workdir = Path(tempfile.mkdtemp(prefix="bench_search_"))
+    try:
+        db = DatabaseManager(str(workdir / "operators.db"))
+        records = _records(args.rows, rng)
+        start = time.perf_counter()
+        db.bulk_upsert_operators(records)
+        print(f"导入 {args.rows} 行 {time.perf_counter() - start:.1f}s")
+
+        sample = rng.sample(records, 10)
+        queries = (
+            [r['operator_name'] for r in sample[:3]]
+            + [r['business_name'] for r in sample[3:5]]
+            + [r['id_card'][:12] for r in sample[5:7]]
+            + [r['phone'] for r in sample[7:9]]
+            + ['便利店', '青秀区 水果']
+        )
+        prefixes = _typing(queries)
+
+        _report("FTS5", _measure(lambda q: db.search_operators(q, limit=args.limit), prefixes))
+        _report("LIKE", _measure(lambda q: _like_search(db, q, args.limit), prefixes))
+        db.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+百度 OCR 本地替身服务 - 离线测试与基准测试用
+
+模拟百度 OCR 的 Access Token 接口和识别接口：
+- /oauth/2.0/token 发放 Access Token，可设置较短有效期以测试刷新
+- 按 qps 配额限流，超出时返回 error_code 18（与线上一致）
+- 每次识别模拟固定网络/推理延迟
+- 统计请求数、限流拒绝数、Token 请求数和 TCP 连接数（验证 keep-alive）
+
+用法:
+    python scripts/tools/baidu_ocr_standin.py --port 8808 --qps 2 --latency 0.2
+
+    # 代码中
+    with BaiduOCRStandIn(qps=10) as server:
+        client = BaiduOCRClient("key", "secret", base_url=server.url)
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# 各接口的固定返回
+RESPONSES = {
+    "idcard": {
+        "words_result": {
+            "姓名": {"words": "张三"},
+            "民族": {"words": "汉"},
+            "住址": {"words": "广西南宁市青秀区民族大道1号"},
+            "公民身份号码": {"words": "450103199001011234"},
+            "性别": {"words": "男"},
+        },
+        "words_result_num": 5,
+    },
+    "business_license": {
+        "words_result": {
+            "单位名称": {"words": "南宁市青秀区张三便利店"},
+            "法定代表人": {"words": "张三"},
+            "统一社会信用代码": {"words": "92450103MA5XXXXXXX"},
+            "地址": {"words": "广西南宁市青秀区民族大道1号"},
+            "经营范围": {"words": "食品销售；日用百货销售"},
+        },
+    },
+    "general": {
+        "words_result": [{"words": "房屋租赁合同"}, {"words": "出租方：李四"}],
+        "words_result_num": 2,
+    },
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode("utf-8")) if length else {}
+
+        if url.path == "/oauth/2.0/token":
+            self._reply(self.server.issue_token(query))
+            return
+
+        endpoint = url.path.rsplit("/", 1)[-1]
+        self._reply(self.server.recognize(endpoint, query.get("access_token", [""])[0], form))
+
+    def _reply(self, payload: dict):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json;charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class BaiduOCRStandIn(ThreadingHTTPServer):
+    """百度 OCR 替身服务"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        qps: float = 2.0,
+        latency: float = 0.0,
+        token_expires_in: int = 2592000
+    ):
+        """初始化替身服务
+
+        Args:
+            port: 监听端口，0 表示随机端口
+            qps: 每秒允许的识别请求数（0 表示不限）
+            latency: 每次识别的模拟耗时（秒）
+            token_expires_in: Access Token 有效期（秒）
+        """
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.qps = qps
+        self.latency = latency
+        self.token_expires_in = token_expires_in
+
+        self.stats = {"requests": 0, "accepted": 0, "qps_rejected": 0, "token_requests": 0, "connections": 0}
+        self._tokens = {}
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def issue_token(self, query: dict) -> dict:
+        if not query.get("client_id") or not query.get("client_secret"):
+            return {"error": "invalid_client", "error_description": "unknown client id"}
+        with self._lock:
+            self.stats["token_requests"] += 1
+            token = f"standin-token-{self.stats['token_requests']}"
+            self._tokens[token] = time.time() + self.token_expires_in
+        return {"access_token": token, "expires_in": self.token_expires_in}
+
+    def expire_tokens(self):
+        """使所有已发放的 Token 立即过期"""
+        with self._lock:
+            self._tokens = {token: 0 for token in self._tokens}
+
+    def recognize(self, endpoint: str, token: str, form: dict) -> dict:
+        with self._lock:
+            self.stats["requests"] += 1
+            expires = self._tokens.get(token)
+            if expires is None:
+                return {"error_code": 110, "error_msg": "Access token invalid or no longer valid"}
+            if time.time() >= expires:
+                return {"error_code": 111, "error_msg": "Access token expired"}
+
+            # 1 秒滑动窗口限流
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            if self.qps and len(self._recent) >= self.qps:
+                self.stats["qps_rejected"] += 1
+                return {"error_code": 18, "error_msg": "Open api qps request limit reached"}
+            self._recent.append(now)
+
+        if not form.get("image"):
+            return {"error_code": 216100, "error_msg": "invalid param"}
+        time.sleep(self.latency)
+        self.count("accepted")
+        return dict(RESPONSES.get(endpoint, RESPONSES["general"]), log_id=int(now * 1000))
+
+    def start(self) -> "BaiduOCRStandIn":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "BaiduOCRStandIn":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="百度 OCR 本地替身服务")
+    parser.add_argument("--port", type=int, default=8808)
+    parser.add_argument("--qps", type=float, default=2.0)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = BaiduOCRStandIn(args.port, qps=args.qps, latency=args.latency)
+    print(f"百度 OCR 替身服务: {server.url} (qps={args.qps}, latency={args.latency}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
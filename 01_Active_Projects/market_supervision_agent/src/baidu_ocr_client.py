@@ -0,0 +1,317 @@
+"""
+百度 OCR REST 客户端 - 连接复用、QPS 限流、自动重试、Access Token 缓存
+
+与 baidu-aip SDK 的 AipOcr 接口同名（basicGeneral / basicAccurate / general /
+idcard / businessLicense），可直接替换 BaiduOCREngine.client：
+- requests.Session 保持 HTTP keep-alive，连接池大小与并发数一致
+- 令牌桶限流，qps 按账号配额设置（免费版 2 QPS，网络抖动偶发的超限由重试兜底）
+- 命中 QPS 超限等可重试错误码时按带抖动的指数退避重试
+- Access Token（有效期 30 天）缓存在内存和本地文件，过期前自动刷新
+- recognize_many 用线程池并发提交，整体速率仍受限流约束
+
+配置示例（config/baidu_ocr.yaml）：
+    qps: 2
+    max_workers: 8
+"""
+
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlencode
+
+from loguru import logger
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    HAS_REQUESTS = True
+except ImportError:
+    requests = None
+    HAS_REQUESTS = False
+
+DEFAULT_BASE_URL = "https://aip.baidubce.com"
+
+# 接口路径
+ENDPOINTS = {
+    "general_basic": "/rest/2.0/ocr/v1/general_basic",
+    "accurate_basic": "/rest/2.0/ocr/v1/accurate_basic",
+    "general": "/rest/2.0/ocr/v1/general",
+    "idcard": "/rest/2.0/ocr/v1/idcard",
+    "business_license": "/rest/2.0/ocr/v1/business_license",
+}
+
+# 可重试的错误码：2 服务暂不可用，18 QPS 超限，282000 服务内部错误
+RETRY_ERROR_CODES = {2, 18, 282000}
+
+# Access Token 失效：110 无效，111 过期
+TOKEN_ERROR_CODES = {110, 111}
+
+# Token 提前刷新的余量（秒）
+TOKEN_REFRESH_MARGIN = 24 * 3600
+
+
+class BaiduOCRError(Exception):
+    """百度 OCR 接口错误（重试耗尽或不可重试）"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.message = message
+
+
+class RateLimiter:
+    """线程安全的令牌桶限流器"""
+
+    def __init__(self, qps: float, burst: Optional[int] = None):
+        """初始化限流器
+
+        Args:
+            qps: 每秒请求数
+            burst: 桶容量（允许的瞬时突发），默认 1，即请求均匀间隔
+        """
+        self.qps = qps
+        self.capacity = burst or 1
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取得一个令牌，没有时阻塞等待"""
+        if not self.qps:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.qps)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.qps
+            time.sleep(wait)
+
+
+class BaiduOCRClient:
+    """带限流与重试的百度 OCR REST 客户端"""
+
+    def __init__(
+        self,
+        api_key: str,
+        secret_key: str,
+        qps: float = 2.0,
+        max_workers: int = 8,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 8.0,
+        timeout: float = 30.0,
+        base_url: str = DEFAULT_BASE_URL,
+        token_cache: Optional[str] = "data/baidu_ocr_token.json"
+    ):
+        """初始化客户端
+
+        Args:
+            api_key: 百度 OCR API Key
+            secret_key: 百度 OCR Secret Key
+            qps: 限流速率（建议略低于账号配额以吸收网络抖动，0 表示不限流）
+            max_workers: recognize_many 的并发数及连接池大小
+            max_retries: 可重试错误的最大重试次数
+            backoff: 退避基数（秒）
+            max_backoff: 单次退避上限（秒）
+            timeout: HTTP 超时（秒）
+            base_url: 接口地址（测试时指向本地替身服务）
+            token_cache: Access Token 缓存文件，None 表示只缓存在内存
+        """
+        if not HAS_REQUESTS:
+            raise RuntimeError("requests 未安装，请运行: pip install requests")
+
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.base_url = base_url.rstrip("/")
+        self.token_cache = Path(token_cache) if token_cache else None
+
+        self.limiter = RateLimiter(qps)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._token_lock = threading.Lock()
+
+        self.stats = {"requests": 0, "retries": 0, "token_refreshes": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    # ========== Access Token ==========
+
+    def access_token(self, refresh: bool = False) -> str:
+        """获取 Access Token（内存 → 文件缓存 → 接口），过期前自动刷新
+
+        Args:
+            refresh: 强制重新获取
+
+        Returns:
+            Access Token
+        """
+        with self._token_lock:
+            if not refresh and self._token and time.time() < self._token_expires:
+                return self._token
+            if not refresh and self._load_cached_token():
+                return self._token
+
+            response = self.session.post(
+                f"{self.base_url}/oauth/2.0/token",
+                params={
+                    "grant_type": "client_credentials",
+                    "client_id": self.api_key,
+                    "client_secret": self.secret_key,
+                },
+                timeout=self.timeout
+            )
+            data = response.json()
+            if "access_token" not in data:
+                raise BaiduOCRError(-1, data.get("error_description", "获取 Access Token 失败"))
+
+            expires_in = int(data.get("expires_in", 0))
+            self._token = data["access_token"]
+            self._token_expires = time.time() + expires_in - min(TOKEN_REFRESH_MARGIN, expires_in // 10)
+            self._count("token_refreshes")
+            self._save_cached_token()
+            logger.info("百度 OCR Access Token 已更新")
+            return self._token
+
+    def _token_cache_key(self) -> str:
+        return hashlib.sha256(f"{self.base_url}|{self.api_key}".encode("utf-8")).hexdigest()[:16]
+
+    def _load_cached_token(self) -> bool:
+        if not self.token_cache or not self.token_cache.exists():
+            return False
+        try:
+            entry = json.loads(self.token_cache.read_text(encoding="utf-8")).get(self._token_cache_key())
+        except (OSError, ValueError):
+            return False
+        if not entry or time.time() >= entry["expires_at"]:
+            return False
+        self._token = entry["access_token"]
+        self._token_expires = entry["expires_at"]
+        return True
+
+    def _save_cached_token(self):
+        if not self.token_cache:
+            return
+        try:
+            cache = {}
+            if self.token_cache.exists():
+                cache = json.loads(self.token_cache.read_text(encoding="utf-8"))
+            cache[self._token_cache_key()] = {
+                "access_token": self._token,
+                "expires_at": self._token_expires,
+            }
+            self.token_cache.parent.mkdir(parents=True, exist_ok=True)
+            self.token_cache.write_text(json.dumps(cache), encoding="utf-8")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Access Token 缓存写入失败: {e}")
+
+    # ========== 请求 ==========
+
+    def request(self, endpoint: str, image: bytes, **params) -> Dict:
+        """调用 OCR 接口（限流 + 重试）
+
+        Args:
+            endpoint: 接口名（见 ENDPOINTS）
+            image: 图片二进制内容
+            **params: 接口参数（如 id_card_side）
+
+        Returns:
+            接口返回的 JSON；重试耗尽时返回最后一次的错误结果（含 error_code）
+        """
+        # 请求体只编码一次，重试时复用
+        body = urlencode({"image": base64.b64encode(image), **params})
+        url = f"{self.base_url}{ENDPOINTS[endpoint]}"
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+
+        token_retried = False
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            self._count("requests")
+            try:
+                response = self.session.post(
+                    url, params={"access_token": self.access_token()},
+                    data=body, headers=headers, timeout=self.timeout
+                )
+                result = response.json() if response.status_code < 500 else {
+                    "error_code": 2, "error_msg": f"HTTP {response.status_code}"
+                }
+            except (requests.ConnectionError, requests.Timeout) as e:
+                result = {"error_code": 2, "error_msg": str(e)}
+
+            code = result.get("error_code")
+            if code in TOKEN_ERROR_CODES and not token_retried:
+                token_retried = True
+                self.access_token(refresh=True)
+                continue
+            if code not in RETRY_ERROR_CODES or attempt >= self.max_retries:
+                return result
+
+            # 全抖动指数退避，避免多个线程同时重试再次撞上限额
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+            attempt += 1
+            self._count("retries")
+            logger.debug(f"百度 OCR 错误 {code}，{delay:.2f}s 后第 {attempt} 次重试")
+            time.sleep(delay)
+
+    def recognize_many(self, func: Callable[[str], Dict], image_paths: Iterable[str]) -> Dict[str, Dict]:
+        """并发识别多张图片
+
+        Args:
+            func: 单张识别函数（如 BaiduOCREngine.recognize_id_card）
+            image_paths: 图片路径列表
+
+        Returns:
+            {图片路径: 识别结果}
+        """
+        paths: List[str] = list(dict.fromkeys(str(p) for p in image_paths))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return dict(zip(paths, pool.map(func, paths)))
+
+    def close(self):
+        """关闭 HTTP 连接池"""
+        self.session.close()
+
+    # ========== 与 AipOcr 同名的接口 ==========
+
+    def basicGeneral(self, image: bytes, options: Optional[Dict] = None) -> Dict:
+        """通用文字识别（标准版）"""
+        return self.request("general_basic", image, **(options or {}))
+
+    def basicAccurate(self, image: bytes, options: Optional[Dict] = None) -> Dict:
+        """通用文字识别（高精度版）"""
+        return self.request("accurate_basic", image, **(options or {}))
+
+    def general(self, image: bytes, options: Optional[Dict] = None) -> Dict:
+        """通用文字识别（含位置信息版）"""
+        return self.request("general", image, **(options or {}))
+
+    def idcard(self, image: bytes, id_card_side: str, options: Optional[Dict] = None) -> Dict:
+        """身份证识别"""
+        return self.request("idcard", image, id_card_side=id_card_side, **(options or {}))
+
+    def businessLicense(self, image: bytes, options: Optional[Dict] = None) -> Dict:
+        """营业执照识别"""
+        return self.request("business_license", image, **(options or {}))
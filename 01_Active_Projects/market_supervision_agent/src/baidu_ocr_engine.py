@@ -9,7 +9,8 @@
 配置：
 1. 注册百度智能云账号：https://cloud.baidu.com/
 2. 创建 OCR 应用，获取 API Key 和 Secret Key
-3. 安装依赖：pip install baidu-aip
+3. 安装依赖：pip install requests（REST 客户端，推荐）或 pip install baidu-aip
+4. 按账号配额在配置文件中设置 qps（免费版为 2）
 
 免费额度：
 - 通用文字识别：500次/天
@@ -19,16 +20,24 @@
 
 import base64
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 from loguru import logger
 
+from .baidu_ocr_client import BaiduOCRClient, HAS_REQUESTS
+from .image_preprocessor import ImagePreprocessor, get_preprocessor
+from .ocr_cache import OCRCache, cached_ocr, get_ocr_cache, package_version
+
 try:
     from aip import AipOcr
-    HAS_BAIDU_OCR = True
+    HAS_AIP_SDK = True
 except (ImportError, SyntaxError):
-    HAS_BAIDU_OCR = False
+    HAS_AIP_SDK = False
     AipOcr = None
-    logger.warning("百度 OCR SDK 未安装，请运行: pip install baidu-aip")
+
+# REST 客户端（requests）与官方 SDK 任一可用即可
+HAS_BAIDU_OCR = HAS_REQUESTS or HAS_AIP_SDK
+if not HAS_BAIDU_OCR:
+    logger.warning("百度 OCR 不可用，请运行: pip install requests（或 pip install baidu-aip）")
 
 
 class BaiduOCREngine:
@@ -39,7 +48,14 @@ class BaiduOCREngine:
         app_id: str = "",
         api_key: str = "",
         secret_key: str = "",
-        config_file: str = "config/baidu_ocr.yaml"
+        config_file: str = "config/baidu_ocr.yaml",
+        cache: Optional[OCRCache] = None,
+        use_cache: bool = True,
+        qps: Optional[float] = None,
+        max_workers: Optional[int] = None,
+        base_url: Optional[str] = None,
+        preprocessor: Optional[ImagePreprocessor] = None,
+        preprocess: bool = True
     ):
         """初始化百度 OCR 引擎
 
@@ -48,11 +64,21 @@ class BaiduOCREngine:
             api_key: 百度 OCR API Key
             secret_key: 百度 OCR Secret Key
             config_file: 配置文件路径（YAML格式）
+            cache: OCR 结果缓存，None 时使用共享缓存
+            use_cache: 是否缓存识别结果（相同图片不重复调用付费 API）
+            qps: 请求速率上限（与账号配额一致），默认读配置文件，否则为 2
+            max_workers: 批量识别的并发数，默认读配置文件，否则为 8
+            base_url: 接口地址（测试时指向本地替身服务）
+            preprocessor: 图片预处理器，None 时使用共享实例
+            preprocess: 上传前是否旋转、裁剪、缩放并转为 JPEG（减少上传字节）
         """
         self.app_id = app_id
         self.api_key = api_key
         self.secret_key = secret_key
         self.config_file = config_file
+        self.qps = qps
+        self.max_workers = max_workers
+        self.base_url = base_url
 
         # 尝试从配置文件加载
         if not all([app_id, api_key, secret_key]) and Path(config_file).exists():
@@ -61,6 +87,27 @@ class BaiduOCREngine:
         self.client = None
         self._initialized = False
 
+        self.ocr_cache = (cache or get_ocr_cache()) if use_cache else None
+        self.preprocessor = (preprocessor or get_preprocessor()) if preprocess else None
+
+    @property
+    def cache_engine_id(self) -> str:
+        """缓存键中的引擎/版本标识"""
+        engine_id = f"baidu-aip/{package_version('baidu-aip')}"
+        if self.preprocessor is not None:
+            engine_id += f":{self.preprocessor.version}"
+        return engine_id
+
+    def _read_image(self, image_path: str, doc_type: str) -> bytes:
+        """读取待上传的图片：启用预处理时为处理后的 JPEG，失败时退回原始字节"""
+        if self.preprocessor is not None:
+            try:
+                return self.preprocessor.prepare_for_upload(image_path, doc_type)
+            except Exception as e:
+                logger.warning(f"图片预处理失败，上传原图: {image_path}, 错误: {e}")
+        with open(image_path, 'rb') as f:
+            return f.read()
+
     def _load_config(self):
         """从 YAML 配置文件加载"""
         try:
@@ -91,6 +138,10 @@ class BaiduOCREngine:
                 self.app_id = app_id
                 self.api_key = api_key
                 self.secret_key = secret_key
+                if self.qps is None:
+                    self.qps = config.get('qps')
+                if self.max_workers is None:
+                    self.max_workers = config.get('max_workers')
 
                 logger.info(f"从配置文件加载: {self.config_file}")
         except Exception as e:
@@ -102,7 +153,7 @@ class BaiduOCREngine:
             return
 
         if not HAS_BAIDU_OCR:
-            raise RuntimeError("百度 OCR SDK 未安装，请运行: pip install baidu-aip")
+            raise RuntimeError("百度 OCR 不可用，请运行: pip install requests（或 pip install baidu-aip）")
 
         if not all([self.app_id, self.api_key, self.secret_key]):
             raise ValueError(
@@ -112,10 +163,21 @@ class BaiduOCREngine:
                 "3. 在 config/baidu_ocr.yaml 中配置凭证"
             )
 
-        self.client = AipOcr(self.app_id, self.api_key, self.secret_key)
+        if HAS_REQUESTS:
+            options = {'base_url': self.base_url} if self.base_url else {}
+            self.client = BaiduOCRClient(
+                self.api_key,
+                self.secret_key,
+                qps=2.0 if self.qps is None else float(self.qps),
+                max_workers=int(self.max_workers or 8),
+                **options
+            )
+        else:
+            self.client = AipOcr(self.app_id, self.api_key, self.secret_key)
         self._initialized = True
         logger.info("百度 OCR 客户端初始化成功")
 
+    @cached_ocr("general")
     def recognize_image(self, image_path: str) -> Dict:
         """通用文字识别
 
@@ -131,9 +193,8 @@ class BaiduOCREngine:
             raise FileNotFoundError(f"文件不存在: {image_path}")
 
         try:
-            # 读取图片并转换为 base64
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
+            # 读取（预处理后的）图片
+            image_data = self._read_image(image_path, "general")
 
             # 调用百度 OCR API
             result = self.client.basicGeneral(image_data)
@@ -145,6 +206,7 @@ class BaiduOCREngine:
             logger.error(f"OCR识别失败: {image_path}, 错误: {e}")
             return {"text": "", "words_result": [], "error": str(e)}
 
+    @cached_ocr("id_card")
     def recognize_id_card(self, image_path: str) -> Dict:
         """身份证识别
 
@@ -163,8 +225,7 @@ class BaiduOCREngine:
         self._initialize()
 
         try:
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
+            image_data = self._read_image(image_path, "id_card")
 
             # 调用身份证识别 API
             # 百度 API 参数: idCardSide (front=正面, back=背面)
@@ -177,6 +238,7 @@ class BaiduOCREngine:
             logger.error(f"身份证识别失败: {image_path}, 错误: {e}")
             return {}
 
+    @cached_ocr("business_license")
     def recognize_business_license(self, image_path: str) -> Dict:
         """营业执照识别
 
@@ -195,8 +257,7 @@ class BaiduOCREngine:
         self._initialize()
 
         try:
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
+            image_data = self._read_image(image_path, "business_license")
 
             # 优先使用专门的营业执照识别 API
             try:
@@ -214,6 +275,7 @@ class BaiduOCREngine:
             logger.error(f"营业执照识别失败: {image_path}, 错误: {e}")
             return {}
 
+    @cached_ocr("contract")
     def recognize_contract(self, image_path: str) -> Dict:
         """识别租赁合同等文档
 
@@ -231,8 +293,7 @@ class BaiduOCREngine:
         self._initialize()
 
         try:
-            with open(image_path, 'rb') as f:
-                image_data = f.read()
+            image_data = self._read_image(image_path, "contract")
 
             # 使用通用文字识别
             result = self.client.general(image_data)
@@ -246,6 +307,28 @@ class BaiduOCREngine:
             logger.error(f"合同识别失败: {image_path}, 错误: {e}")
             return {}
 
+    def recognize_batch(self, image_paths: Iterable[str], doc_type: str = "general") -> Dict[str, Dict]:
+        """并发识别多张图片（速率受 qps 限制，QPS 超限自动重试）
+
+        Args:
+            image_paths: 图片路径列表
+            doc_type: 文档类型（general、id_card、business_license、contract）
+
+        Returns:
+            {图片路径: 识别结果}
+        """
+        recognize = {
+            "general": self.recognize_image,
+            "id_card": self.recognize_id_card,
+            "business_license": self.recognize_business_license,
+            "contract": self.recognize_contract,
+        }[doc_type]
+
+        self._initialize()
+        if isinstance(self.client, BaiduOCRClient):
+            return self.client.recognize_many(recognize, image_paths)
+        return {str(path): recognize(str(path)) for path in image_paths}
+
     def _parse_general_result(self, result: Dict) -> Dict:
         """解析通用文字识别结果
 
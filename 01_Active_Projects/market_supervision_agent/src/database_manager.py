@@ -10,6 +10,8 @@
 
 import sqlite3
 import json
+import queue
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
@@ -17,21 +19,185 @@ from contextlib import contextmanager
 from loguru import logger
 
 
+class ConnectionPool:
+    """SQLite 连接池 - 线程安全，连接复用
+
+    - WAL 日志模式：读写互不阻塞，Flask 多线程并发读时不再排队
+    - synchronous=NORMAL、mmap、cache_size 等 PRAGMA 在建连时设置一次
+    - 同一线程内嵌套获取连接时复用同一个连接（同一事务），只有最外层提交/回滚
+    """
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA mmap_size=268435456",   # 256MB
+        "PRAGMA cache_size=-65536",     # 64MB
+        "PRAGMA temp_store=MEMORY",
+    )
+
+    def __init__(self, db_path: Path, max_size: int = 16, timeout: float = 30.0):
+        """初始化连接池
+
+        Args:
+            db_path: 数据库文件路径
+            max_size: 最大连接数
+            timeout: 连接耗尽时等待空闲连接的秒数
+        """
+        self.db_path = Path(db_path)
+        self.max_size = max_size
+        self.timeout = timeout
+
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._closed = False
+
+        # 数据库是否支持 FTS5 全文检索（由 DatabaseManager 初始化时探测）
+        self.fts_enabled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """新建连接并设置 PRAGMA"""
+        conn = sqlite3.connect(
+            str(self.db_path),
+            timeout=self.timeout,
+            check_same_thread=False  # 连接由连接池在线程间交接，同一时刻只有一个线程使用
+        )
+        conn.row_factory = sqlite3.Row  # 返回字典格式
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        """取一个空闲连接，没有则新建，达到上限时等待"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("连接池已关闭")
+            if len(self._all) < self.max_size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"等待数据库连接超时 ({self.timeout}s)")
+
+    @contextmanager
+    def connection(self):
+        """获取连接（上下文管理器），退出时提交，异常时回滚
+
+        Yields:
+            sqlite3.Connection: 数据库连接
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            # 嵌套调用：复用当前线程的连接，由最外层负责提交
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            if self._closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def close(self):
+        """关闭所有连接"""
+        with self._lock:
+            self._closed = True
+            connections, self._all = self._all, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
+
+    @property
+    def size(self) -> int:
+        """当前已创建的连接数"""
+        return len(self._all)
+
+
+# 经营户表中可由调用方写入的字段（与 insert_operator 的列顺序一致）
+OPERATOR_FIELDS = (
+    'operator_name', 'id_card', 'phone', 'email', 'gender', 'nation', 'address',
+    'business_name', 'business_address', 'business_scope', 'credit_code',
+    'property_owner', 'lease_start', 'lease_end', 'rent_amount',
+    'id_card_front_path', 'id_card_back_path',
+    'business_license_path', 'lease_contract_path', 'property_cert_path',
+    'archive_path', 'metadata',
+)
+
+# SQLite 单条语句的参数上限较低，IN 查询分批进行
+_IN_BATCH = 500
+
+# 全文检索覆盖的列及 bm25 权重
+FTS_COLUMNS = ('operator_name', 'business_name', 'id_card', 'phone')
+FTS_WEIGHTS = (4.0, 2.0, 1.0, 1.0)
+
+# trigram 分词器只能匹配至少 3 个字符的片段
+FTS_MIN_TERM = 3
+
+# 数据库结构版本（PRAGMA user_version）
+SCHEMA_VERSION = 1
+
+# 全文检索命中超过此数时不再按 bm25 排序
+FTS_RANK_LIMIT = 1000
+
+# 同一进程内按数据库路径共享连接池，表结构只初始化一次
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
 class DatabaseManager:
     """数据库管理器 - 管理经营户档案数据库"""
 
-    def __init__(self, db_path: str = "data/operators_database.db"):
+    def __init__(self, db_path: str = "data/operators_database.db", pool_size: int = 16):
         """初始化数据库
 
+        Flask 每个请求都会新建 DatabaseManager，同一路径的实例共享连接池，
+        只有第一个实例执行建表。
+
         Args:
             db_path: 数据库文件路径
+            pool_size: 连接池最大连接数
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # 初始化数据库
-        self._init_database()
-        logger.info(f"数据库初始化完成: {self.db_path}")
+        self._pool_key = str(self.db_path.resolve())
+        with _pools_lock:
+            self._pool = _pools.get(self._pool_key)
+            if self._pool is None:
+                self._pool = ConnectionPool(self.db_path, max_size=pool_size)
+
+                # 初始化数据库（持锁执行，避免其他线程在建表完成前使用）
+                self._init_database()
+                self._pool.fts_enabled = self._fts
+                _pools[self._pool_key] = self._pool
+                logger.info(f"数据库初始化完成: {self.db_path}")
+            self._fts = self._pool.fts_enabled
 
     @contextmanager
     def _get_connection(self):
@@ -40,17 +206,19 @@ class DatabaseManager:
         Yields:
             sqlite3.Connection: 数据库连接
         """
-        conn = sqlite3.connect(str(self.db_path))
-        conn.row_factory = sqlite3.Row  # 返回字典格式
         try:
-            yield conn
-            conn.commit()
+            with self._pool.connection() as conn:
+                yield conn
         except Exception as e:
-            conn.rollback()
             logger.error(f"数据库操作失败: {e}")
             raise e
-        finally:
-            conn.close()
+
+    def close(self):
+        """关闭该数据库的连接池（同路径的其他实例也会失效）"""
+        with _pools_lock:
+            if _pools.get(self._pool_key) is self._pool:
+                del _pools[self._pool_key]
+        self._pool.close()
 
     def _init_database(self):
         """初始化数据库表结构"""
@@ -105,6 +273,10 @@ class DatabaseManager:
             conn.execute('CREATE INDEX IF NOT EXISTS idx_id_card ON operators(id_card)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_business_name ON operators(business_name)')
             conn.execute('CREATE INDEX IF NOT EXISTS idx_operator_name ON operators(operator_name)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_phone ON operators(phone)')
+
+            # 全文检索
+            self._fts = self._init_fts(conn)
 
             # 创建操作日志表
             conn.execute('''
@@ -120,6 +292,54 @@ class DatabaseManager:
 
             logger.info("数据库表结构初始化完成")
 
+    def _init_fts(self, conn: sqlite3.Connection) -> bool:
+        """创建 FTS5 trigram 全文索引及同步触发器
+
+        trigram 分词不依赖空格，中文姓名、店名和身份证/手机号片段都能按子串检索。
+        旧数据库首次升级时重建索引。
+
+        Returns:
+            是否可用（SQLite 未编译 FTS5 或版本低于 3.34 时返回 False，搜索退回 LIKE）
+        """
+        columns = ', '.join(FTS_COLUMNS)
+        old_values = ', '.join(f'old.{c}' for c in FTS_COLUMNS)
+        new_values = ', '.join(f'new.{c}' for c in FTS_COLUMNS)
+        try:
+            conn.execute(f'''
+                CREATE VIRTUAL TABLE IF NOT EXISTS operators_fts USING fts5(
+                    {columns},
+                    content='operators', content_rowid='id', tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 trigram 不可用，搜索使用 LIKE: {e}")
+            return False
+
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS operators_fts_ai AFTER INSERT ON operators BEGIN
+                INSERT INTO operators_fts(rowid, {columns}) VALUES (new.id, {new_values});
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS operators_fts_ad AFTER DELETE ON operators BEGIN
+                INSERT INTO operators_fts(operators_fts, rowid, {columns})
+                VALUES ('delete', old.id, {old_values});
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS operators_fts_au AFTER UPDATE OF {columns} ON operators BEGIN
+                INSERT INTO operators_fts(operators_fts, rowid, {columns})
+                VALUES ('delete', old.id, {old_values});
+                INSERT INTO operators_fts(rowid, {columns}) VALUES (new.id, {new_values});
+            END
+        ''')
+
+        if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+            conn.execute("INSERT INTO operators_fts(operators_fts) VALUES ('rebuild')")
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            logger.info("全文索引已重建")
+        return True
+
     def insert_operator(self, data: Dict) -> int:
         """插入经营户数据
 
@@ -185,6 +405,143 @@ class DatabaseManager:
                         return self.update_operator(data['id_card'], data)
                 raise e
 
+    def bulk_upsert_operators(self, records: List[Dict]) -> List[Dict]:
+        """批量插入或更新经营户（按身份证号去重）
+
+        全部记录在一个事务内用 executemany 执行
+        INSERT ... ON CONFLICT(id_card) DO UPDATE，操作日志也批量写入。
+        某一行写入失败（如字段类型无法绑定）时回滚本批次，改为每行一个 SAVEPOINT
+        逐行写入：失败行在结果中标记为 error，其余行照常提交。
+
+        更新时只覆盖记录中非空的字段：值为 None 或缺省的字段保留原值
+        （OCR、门户抓取的数据常常缺字段，不能因此清空已有信息；需要清空字段时用 update_operator）。
+        同一批次内身份证号重复时后面的记录生效。
+
+        Args:
+            records: 经营户数据字典列表
+
+        Returns:
+            与 records 一一对应的结果列表，每项包含
+            index、id_card、operator_id、status（inserted/updated/error）、error
+        """
+        outcomes: List[Dict] = [
+            {'index': i, 'id_card': (record or {}).get('id_card'), 'operator_id': None,
+             'status': None, 'error': None}
+            for i, record in enumerate(records)
+        ]
+
+        with self._get_connection() as conn:
+            # 1. 查出已存在的身份证号
+            id_cards = list({o['id_card'] for o in outcomes if o['id_card']})
+            names = self._names_by_id_card(conn, id_cards)
+            existing = set(names)
+
+            # 2. 校验并生成参数
+            rows = []
+            for outcome, record in zip(outcomes, records):
+                id_card = outcome['id_card']
+                if not id_card:
+                    outcome.update(status='error', error='缺少身份证号')
+                    continue
+                if id_card not in names and not record.get('operator_name'):
+                    outcome.update(status='error', error='新记录缺少经营者姓名')
+                    continue
+
+                outcome['status'] = 'updated' if id_card in names else 'inserted'
+
+                values = [record.get(field) for field in OPERATOR_FIELDS]
+                # NOT NULL 约束先于冲突处理检查，更新时缺省的姓名用已有值补上
+                values[0] = values[0] or names.get(id_card)
+                names[id_card] = values[0]
+                metadata = record.get('metadata')
+                values[-1] = json.dumps(metadata, ensure_ascii=False) if metadata is not None else None
+                rows.append((outcome, bool(record.get('operator_name')), values))
+
+            # 3. 一次 executemany 完成插入/更新，失败时逐行重试
+            columns = ', '.join(OPERATOR_FIELDS)
+            placeholders = ', '.join('?' for _ in OPERATOR_FIELDS)
+            updates = ', '.join(
+                f'{field} = COALESCE(excluded.{field}, {field})'
+                for field in OPERATOR_FIELDS if field != 'id_card'
+            )
+            sql = f'''
+                INSERT INTO operators ({columns}) VALUES ({placeholders})
+                ON CONFLICT(id_card) DO UPDATE SET {updates}, updated_at = CURRENT_TIMESTAMP
+            '''
+            conn.execute('SAVEPOINT bulk_upsert')
+            try:
+                conn.executemany(sql, [values for _, _, values in rows])
+            except sqlite3.Error as e:
+                conn.execute('ROLLBACK TO bulk_upsert')
+                logger.warning(f"批量写入失败，改为逐行写入: {e}")
+                self._upsert_rows(conn, sql, rows, existing)
+            conn.execute('RELEASE bulk_upsert')
+
+            # 4. 回填记录ID并批量写操作日志
+            ids = self._ids_by_id_card(conn, id_cards)
+            logs = []
+            for outcome in outcomes:
+                if outcome['status'] in ('inserted', 'updated'):
+                    outcome['operator_id'] = ids.get(outcome['id_card'])
+                    if outcome['status'] == 'inserted':
+                        logs.append((outcome['operator_id'], 'insert', '新建经营户记录（批量）'))
+                    else:
+                        logs.append((outcome['operator_id'], 'update', '更新经营户记录（批量）'))
+            conn.executemany(
+                'INSERT INTO operation_logs (operator_id, operation, details) VALUES (?, ?, ?)',
+                logs
+            )
+
+        counts = {status: sum(1 for o in outcomes if o['status'] == status)
+                  for status in ('inserted', 'updated', 'error')}
+        logger.info(f"批量写入经营户: 新增 {counts['inserted']}, 更新 {counts['updated']}, 失败 {counts['error']}")
+        return outcomes
+
+    def _upsert_rows(self, conn: sqlite3.Connection, sql: str, rows: List[tuple], existing: set):
+        """逐行写入（每行一个 SAVEPOINT），失败行记入结果，不影响其他行
+
+        Args:
+            conn: 数据库连接
+            sql: 单行 upsert 语句
+            rows: (结果项, 是否提供了姓名, 参数) 列表
+            existing: 批次开始前已存在的身份证号（写入成功的新记录会加入）
+        """
+        for outcome, named, values in rows:
+            id_card = outcome['id_card']
+            if id_card not in existing and not named:
+                # 批次内前面提供姓名的同号记录写入失败，本行成了缺少姓名的新记录
+                outcome.update(status='error', error='新记录缺少经营者姓名')
+                continue
+
+            conn.execute('SAVEPOINT bulk_upsert_row')
+            try:
+                conn.execute(sql, values)
+            except sqlite3.Error as e:
+                conn.execute('ROLLBACK TO bulk_upsert_row')
+                outcome.update(status='error', error=str(e))
+            else:
+                outcome['status'] = 'updated' if id_card in existing else 'inserted'
+                existing.add(id_card)
+            conn.execute('RELEASE bulk_upsert_row')
+
+    def _ids_by_id_card(self, conn: sqlite3.Connection, id_cards: List[str]) -> Dict[str, int]:
+        """批量查询身份证号对应的记录ID"""
+        return {row['id_card']: row['id'] for row in self._select_by_id_cards(conn, 'id', id_cards)}
+
+    def _names_by_id_card(self, conn: sqlite3.Connection, id_cards: List[str]) -> Dict[str, str]:
+        """批量查询身份证号对应的经营者姓名"""
+        return {row['id_card']: row['operator_name']
+                for row in self._select_by_id_cards(conn, 'operator_name', id_cards)}
+
+    def _select_by_id_cards(self, conn: sqlite3.Connection, column: str, id_cards: List[str]):
+        """分批执行 id_card IN (...) 查询"""
+        for start in range(0, len(id_cards), _IN_BATCH):
+            batch = id_cards[start:start + _IN_BATCH]
+            yield from conn.execute(
+                f'SELECT id_card, {column} FROM operators WHERE id_card IN ({", ".join("?" for _ in batch)})',
+                batch
+            )
+
     def get_operator_by_id(self, operator_id: int) -> Optional[Dict]:
         """根据ID查询经营户
 
@@ -355,29 +712,152 @@ class DatabaseManager:
 
             return [self._row_to_dict(row) for row in cursor.fetchall()]
 
-    def search_operators(self, keyword: str) -> List[Dict]:
+    def search_operators(
+        self,
+        keyword: str,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict]:
         """搜索经营户
 
+        关键词按空白拆分，各词需同时命中（姓名、店名、身份证号、手机号任一列）。
+        结果分两段排列：
+        - 第一个词是某列前缀的记录在前（走 B 树索引，按姓名、店名、身份证号、手机号的顺序）；
+          前缀命中已够 offset + limit 条时直接返回，边输入边搜索时大多数查询在此结束
+        - 其余子串命中在后：不少于 3 个字符的词走 FTS5 trigram，按 bm25 排序；
+          全是短词或不支持 FTS5 时退回 LIKE 扫描
+
         Args:
-            keyword: 搜索关键词（匹配姓名、店名、身份证号、手机号）
+            keyword: 搜索关键词
+            limit: 每页数量，None 表示返回全部
+            offset: 偏移量（分页）
 
         Returns:
-            匹配的经营户列表
+            匹配的经营户列表（前缀命中在前，其余按相关度排序）
         """
+        terms = keyword.split()
+        if not terms:
+            return []
+
+        long_terms = [t for t in terms if len(t) >= FTS_MIN_TERM]
+        short_terms = [t for t in terms if len(t) < FTS_MIN_TERM]
+        wanted = None if limit is None else offset + limit
+
         with self._get_connection() as conn:
-            cursor = conn.execute('''
+            prefix = self._search_prefix(conn, terms, wanted)
+            if wanted is not None and len(prefix) >= wanted:
+                return [self._row_to_dict(row) for row in prefix[offset:wanted]]
+
+            # 子串结果会包含前缀命中，多取 len(prefix) 条以便去重后仍够数
+            depth = None if wanted is None else wanted + len(prefix)
+            if self._fts and long_terms:
+                substring = self._search_fts(conn, long_terms, short_terms, depth)
+            else:
+                substring = self._search_like(conn, terms, depth)
+
+        seen = {row['id'] for row in prefix}
+        merged = prefix + [row for row in substring if row['id'] not in seen]
+        return [self._row_to_dict(row) for row in merged[offset:wanted]]
+
+    def _search_prefix(
+        self,
+        conn: sqlite3.Connection,
+        terms: List[str],
+        wanted: Optional[int]
+    ) -> List[sqlite3.Row]:
+        """第一个词按前缀依次匹配姓名、店名、身份证号、手机号，其余词在结果上过滤
+
+        每列单独按索引顺序扫描并在取够 wanted 条后停止，不对全部命中排序。
+        """
+        first, rest = terms[0], terms[1:]
+        rest_filter = ''.join(
+            ' AND (operator_name LIKE ? OR business_name LIKE ? OR id_card LIKE ? OR phone LIKE ?)'
+            for _ in rest
+        )
+        rest_params = [p for t in rest for p in [f'%{t}%'] * 4]
+
+        results = {}
+        for column in FTS_COLUMNS:
+            params = [first, first + '\U0010ffff', *rest_params]
+            if wanted is not None:
+                params.append(wanted)
+            cursor = conn.execute(f'''
                 SELECT * FROM operators
-                WHERE status = 'active'
-                AND (
-                    operator_name LIKE ?
-                    OR business_name LIKE ?
-                    OR id_card LIKE ?
-                    OR phone LIKE ?
-                )
-                ORDER BY updated_at DESC
-            ''', (f'%{keyword}%', f'%{keyword}%', f'%{keyword}%', f'%{keyword}%'))
+                WHERE {column} >= ? AND {column} < ? AND status = 'active'{rest_filter}
+                ORDER BY {column}{' LIMIT ?' if wanted is not None else ''}
+            ''', params)
+            for row in cursor:
+                results.setdefault(row['id'], row)
+            if wanted is not None and len(results) >= wanted:
+                break
 
-            return [self._row_to_dict(row) for row in cursor.fetchall()]
+        return list(results.values())[:wanted]
+
+    def _search_fts(
+        self,
+        conn: sqlite3.Connection,
+        long_terms: List[str],
+        short_terms: List[str],
+        limit: Optional[int]
+    ) -> List[sqlite3.Row]:
+        """FTS5 trigram 子串匹配
+
+        命中数不超过 FTS_RANK_LIMIT 时按 bm25 排序；过于宽泛的查询（如“便利店”）
+        对几万行算 bm25 意义不大且耗时，改为按 rowid 倒序（最新录入在前）提前截断。
+        """
+        match = ' AND '.join('"' + t.replace('"', '""') + '"' for t in long_terms)
+        hits = conn.execute(
+            'SELECT count(*) FROM (SELECT 1 FROM operators_fts WHERE operators_fts MATCH ? LIMIT ?)',
+            (match, FTS_RANK_LIMIT + 1)
+        ).fetchone()[0]
+        if hits <= FTS_RANK_LIMIT:
+            order = f'bm25(operators_fts, {", ".join(map(str, FTS_WEIGHTS))})'
+        else:
+            order = 'f.rowid DESC'
+
+        # 短词在 FTS 命中的结果集上再过滤
+        short_filter = ''.join(
+            ' AND (o.operator_name LIKE ? OR o.business_name LIKE ? OR o.id_card LIKE ? OR o.phone LIKE ?)'
+            for _ in short_terms
+        )
+        params = [match] + [p for t in short_terms for p in [f'%{t}%'] * 4]
+        page = ''
+        if limit is not None:
+            page = ' LIMIT ?'
+            params.append(limit)
+
+        return conn.execute(f'''
+            SELECT o.* FROM operators_fts f
+            JOIN operators o ON o.id = f.rowid
+            WHERE operators_fts MATCH ? AND o.status = 'active'{short_filter}
+            ORDER BY {order}{page}
+        ''', params).fetchall()
+
+    def _search_like(
+        self,
+        conn: sqlite3.Connection,
+        terms: List[str],
+        limit: Optional[int]
+    ) -> List[sqlite3.Row]:
+        """LIKE 子串扫描（不支持 FTS5 或查询词过短时使用）
+
+        按 id 倒序（最新录入在前），命中够数即可停止扫描。
+        """
+        conditions = ' AND '.join(
+            '(operator_name LIKE ? OR business_name LIKE ? OR id_card LIKE ? OR phone LIKE ?)'
+            for _ in terms
+        )
+        params = [p for t in terms for p in [f'%{t}%'] * 4]
+        page = ''
+        if limit is not None:
+            page = ' LIMIT ?'
+            params.append(limit)
+
+        return conn.execute(f'''
+            SELECT * FROM operators
+            WHERE status = 'active' AND {conditions}
+            ORDER BY id DESC{page}
+        ''', params).fetchall()
 
     def get_record_count(self) -> int:
         """获取数据库记录总数
@@ -447,7 +927,7 @@ class DatabaseManager:
             return False
 
     def import_from_json(self, input_path: str) -> int:
-        """从JSON文件导入数据
+        """从JSON文件导入数据（已存在的身份证号会被更新）
 
         Args:
             input_path: 输入文件路径
@@ -459,14 +939,8 @@ class DatabaseManager:
             with open(input_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
 
-            count = 0
-            for operator in data:
-                try:
-                    self.insert_operator(operator)
-                    count += 1
-                except sqlite3.IntegrityError:
-                    # 跳过重复记录
-                    continue
+            outcomes = self.bulk_upsert_operators(data)
+            count = sum(1 for o in outcomes if o['status'] != 'error')
 
             logger.info(f"从 {input_path} 导入 {count} 条记录")
             return count
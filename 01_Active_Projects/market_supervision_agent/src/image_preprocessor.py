@@ -0,0 +1,291 @@
+"""
+OCR 图片预处理 - 识别前统一处理手机拍摄的证件照片
+
+处理步骤：
+1. 按 EXIF 方向旋转（手机竖拍照片的像素通常是横的）
+2. 证件/执照边界检测 + 透视裁剪（去掉桌面背景，矫正倾斜）
+3. 自适应缩放到检测模型实际需要的分辨率（长边上限按文档类型）
+4. 云端上传时重新编码为 JPEG
+
+边界检测在缩小的副本上进行，结果（四个角点）按图片内容缓存在 OCR 缓存库中，
+同一张照片重复处理时跳过检测。
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .ocr_cache import OCRCache, file_digest, get_ocr_cache
+
+try:
+    import cv2
+    import numpy as np
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+    logger.warning("opencv-python 未安装，OCR 图片预处理不可用")
+
+try:
+    from PIL import Image, ImageOps
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+# 预处理版本（参数或算法变化时递增，OCR 结果缓存随之失效）
+PREPROCESS_VERSION = 1
+
+# 各文档类型缩放后的长边上限（像素）：PaddleOCR 检测默认按 960 缩放，
+# 营业执照/合同字小，保留更高分辨率
+TARGET_LONG_SIDE = {
+    "id_card": 1280,
+    "business_license": 2048,
+    "contract": 2048,
+    "general": 1600,
+}
+
+# 需要做边界检测裁剪的文档类型及其宽高比（横向）
+DOCUMENT_ASPECT = {
+    "id_card": 85.6 / 54.0,
+    "business_license": 297.0 / 210.0,
+}
+
+# 边界检测时使用的缩略图长边
+DETECT_LONG_SIDE = 640
+
+# 百度 OCR 图片限制：base64 后不超过 4MB，长边不超过 4096
+UPLOAD_MAX_BYTES = 3 * 1024 * 1024
+UPLOAD_MAX_SIDE = 4096
+
+
+@dataclass
+class PreparedImage:
+    """预处理结果"""
+    image: "np.ndarray"                          # BGR 图像
+    original_size: Tuple[int, int]               # 旋转后的原始宽高
+    quad: Optional[List[List[float]]] = None     # 检测到的文档角点（原图坐标）
+    scale: float = 1.0                           # 缩放比例
+
+
+class ImagePreprocessor:
+    """OCR 图片预处理器"""
+
+    def __init__(
+        self,
+        cache: Optional[OCRCache] = None,
+        use_cache: bool = True,
+        jpeg_quality: int = 85,
+        target_long_side: Optional[Dict[str, int]] = None
+    ):
+        """初始化预处理器
+
+        Args:
+            cache: 边界检测结果缓存，None 时使用共享的 OCR 缓存库
+            use_cache: 是否缓存检测结果
+            jpeg_quality: 上传时 JPEG 质量
+            target_long_side: 覆盖各文档类型的长边上限
+        """
+        if not HAS_CV2:
+            raise RuntimeError("opencv-python 未安装，请运行: pip install opencv-python")
+
+        self.jpeg_quality = jpeg_quality
+        self.target_long_side = dict(TARGET_LONG_SIDE, **(target_long_side or {}))
+        self.cache = (cache or get_ocr_cache()) if use_cache else None
+
+    @property
+    def version(self) -> str:
+        """预处理标识（参与 OCR 结果缓存键）"""
+        sizes = ",".join(f"{k}={v}" for k, v in sorted(self.target_long_side.items()))
+        return f"prep{PREPROCESS_VERSION}[{sizes}]"
+
+    # ========== 读取 ==========
+
+    def load(self, image_path: str) -> "np.ndarray":
+        """读取图片并按 EXIF 方向旋转（支持中文路径）
+
+        Args:
+            image_path: 图片路径
+
+        Returns:
+            BGR 图像
+        """
+        if HAS_PIL:
+            with Image.open(image_path) as pil_image:
+                pil_image = ImageOps.exif_transpose(pil_image).convert("RGB")
+                return cv2.cvtColor(np.asarray(pil_image), cv2.COLOR_RGB2BGR)
+
+        data = np.fromfile(str(image_path), dtype=np.uint8)
+        image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        if image is None:
+            raise ValueError(f"无法读取图片: {image_path}")
+        return image
+
+    # ========== 处理 ==========
+
+    def prepare(self, image_path: str, doc_type: str = "general") -> PreparedImage:
+        """旋转、裁剪并缩放图片
+
+        Args:
+            image_path: 图片路径
+            doc_type: 文档类型（id_card、business_license、contract、general）
+
+        Returns:
+            PreparedImage
+        """
+        image = self.load(image_path)
+        height, width = image.shape[:2]
+
+        quad = None
+        if doc_type in DOCUMENT_ASPECT:
+            quad = self._cached_quad(image_path, image, doc_type)
+            if quad is not None:
+                image = self.crop(image, quad, DOCUMENT_ASPECT[doc_type])
+
+        image, scale = self.downscale(image, self.target_long_side.get(doc_type, TARGET_LONG_SIDE["general"]))
+        return PreparedImage(image=image, original_size=(width, height), quad=quad, scale=scale)
+
+    def downscale(self, image: "np.ndarray", long_side: int) -> Tuple["np.ndarray", float]:
+        """长边超过上限时等比缩小（不放大）
+
+        Args:
+            image: BGR 图像
+            long_side: 长边上限
+
+        Returns:
+            (图像, 缩放比例)
+        """
+        height, width = image.shape[:2]
+        scale = long_side / max(height, width)
+        if scale >= 1:
+            return image, 1.0
+        size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA), scale
+
+    def detect_document(self, image: "np.ndarray") -> Optional[List[List[float]]]:
+        """检测画面中最大的四边形文档区域
+
+        Args:
+            image: BGR 图像
+
+        Returns:
+            四个角点（原图坐标，左上/右上/右下/左下），未检测到返回 None
+        """
+        small, scale = self.downscale(image, DETECT_LONG_SIDE)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        edges = cv2.Canny(gray, 50, 150)
+        edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        min_area = 0.2 * small.shape[0] * small.shape[1]
+        for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+            if cv2.contourArea(contour) < min_area:
+                break
+            approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+            if len(approx) == 4 and cv2.isContourConvex(approx):
+                corners = _order_corners(approx.reshape(4, 2).astype("float32") / scale)
+                return corners.tolist()
+        return None
+
+    def crop(self, image: "np.ndarray", quad: List[List[float]], aspect: Optional[float] = None) -> "np.ndarray":
+        """按角点透视裁剪为正视矩形
+
+        Args:
+            image: BGR 图像
+            quad: 四个角点（左上/右上/右下/左下）
+            aspect: 期望宽高比（横向），用于矫正透视后的尺寸；竖放的文档自动取倒数
+
+        Returns:
+            裁剪后的图像
+        """
+        corners = np.array(quad, dtype="float32")
+        (tl, tr, br, bl) = corners
+        width = max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))
+        height = max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))
+        if aspect:
+            target = aspect if width >= height else 1 / aspect
+            height = width / target
+
+        width, height = int(round(width)), int(round(height))
+        destination = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype="float32")
+        matrix = cv2.getPerspectiveTransform(corners, destination)
+        return cv2.warpPerspective(image, matrix, (width, height))
+
+    def encode_jpeg(self, image: "np.ndarray", max_bytes: int = UPLOAD_MAX_BYTES) -> bytes:
+        """编码为 JPEG，超过大小限制时逐步降低质量
+
+        Args:
+            image: BGR 图像
+            max_bytes: 大小上限
+
+        Returns:
+            JPEG 字节
+        """
+        image, _ = self.downscale(image, UPLOAD_MAX_SIDE)
+        quality = self.jpeg_quality
+        while True:
+            ok, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if not ok:
+                raise ValueError("JPEG 编码失败")
+            if len(buffer) <= max_bytes or quality <= 40:
+                return buffer.tobytes()
+            quality -= 15
+
+    def prepare_for_upload(self, image_path: str, doc_type: str = "general") -> bytes:
+        """预处理并编码为适合云端上传的 JPEG
+
+        Args:
+            image_path: 图片路径
+            doc_type: 文档类型
+
+        Returns:
+            JPEG 字节
+        """
+        return self.encode_jpeg(self.prepare(image_path, doc_type).image)
+
+    # ========== 检测缓存 ==========
+
+    def _cached_quad(self, image_path: str, image: "np.ndarray", doc_type: str) -> Optional[List[List[float]]]:
+        engine = f"ImagePreprocessor/detect{PREPROCESS_VERSION}"
+        digest = None
+        if self.cache is not None:
+            digest = file_digest(image_path)
+            cached = self.cache.get(digest, doc_type, engine)
+            if cached is not None:
+                return cached["quad"]
+
+        quad = self.detect_document(image)
+        if quad is None:
+            logger.debug(f"未检测到文档边界，使用整张图片: {Path(image_path).name}")
+        if digest is not None:
+            self.cache.put(digest, doc_type, engine, {"quad": quad})
+        return quad
+
+
+def _order_corners(points: "np.ndarray") -> "np.ndarray":
+    """角点排序为 左上、右上、右下、左下"""
+    ordered = np.zeros((4, 2), dtype="float32")
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    ordered[0] = points[np.argmin(sums)]
+    ordered[2] = points[np.argmax(sums)]
+    ordered[1] = points[np.argmin(diffs)]
+    ordered[3] = points[np.argmax(diffs)]
+    return ordered
+
+
+# 共享实例（延迟创建）
+_default_preprocessor: Optional[ImagePreprocessor] = None
+
+
+def get_preprocessor() -> Optional[ImagePreprocessor]:
+    """获取共享的预处理器，opencv 未安装时返回 None
+
+    Returns:
+        ImagePreprocessor 或 None
+    """
+    global _default_preprocessor
+    if _default_preprocessor is None and HAS_CV2:
+        _default_preprocessor = ImagePreprocessor()
+    return _default_preprocessor
@@ -10,6 +10,9 @@ from pathlib import Path
 from typing import Dict, Optional
 from loguru import logger
 
+from .image_preprocessor import get_preprocessor
+from .ocr_cache import OCRCache, cached_ocr, get_ocr_cache, package_version
+
 # 检查可用的 OCR 引擎
 try:
     from paddleocr import PaddleOCR
@@ -34,7 +37,10 @@ class OCREngineAdapter:
         engine: str = "auto",
         baidu_config: str = "config/baidu_ocr.yaml",
         use_angle_cls: bool = True,
-        lang: str = "ch"
+        lang: str = "ch",
+        cache: Optional[OCRCache] = None,
+        use_cache: bool = True,
+        preprocess: bool = True
     ):
         """初始化 OCR 适配器
 
@@ -43,12 +49,18 @@ class OCREngineAdapter:
             baidu_config: 百度 OCR 配置文件路径
             use_angle_cls: PaddleOCR 是否使用方向分类器
             lang: PaddleOCR 语言设置
+            cache: OCR 结果缓存，None 时使用共享缓存
+            use_cache: 是否按图片内容缓存识别结果
+            preprocess: 识别前是否做 EXIF 旋转、证件裁剪、缩放（百度上传前另转 JPEG）
         """
         self.engine_type = engine
         self.baidu_config = baidu_config
         self.use_angle_cls = use_angle_cls
         self.lang = lang
 
+        self.ocr_cache = (cache or get_ocr_cache()) if use_cache else None
+        self.preprocessor = get_preprocessor() if preprocess else None
+
         self._paddle_engine = None
         self._baidu_engine = None
         self._active_engine = None
@@ -69,12 +81,12 @@ class OCREngineAdapter:
             else:
                 raise RuntimeError(
                     "没有可用的 OCR 引擎！请安装以下任一：\n"
-                    "1. 百度 OCR: pip install baidu-aip\n"
+                    "1. 百度 OCR: pip install requests（或 baidu-aip）\n"
                     "2. PaddleOCR: pip install paddleocr paddlepaddle"
                 )
         elif self.engine_type == "baidu":
             if not self._try_baidu():
-                raise RuntimeError("百度 OCR 不可用，请安装: pip install baidu-aip")
+                raise RuntimeError("百度 OCR 不可用，请安装: pip install requests（或 baidu-aip）")
             self._active_engine = "baidu"
         elif self.engine_type == "paddle":
             if not self._try_paddle():
@@ -89,7 +101,12 @@ class OCREngineAdapter:
             return False
 
         try:
-            self._baidu_engine = BaiduOCREngine(config_file=self.baidu_config)
+            self._baidu_engine = BaiduOCREngine(
+                config_file=self.baidu_config,
+                cache=self.ocr_cache,
+                use_cache=self.ocr_cache is not None,
+                preprocess=self.preprocessor is not None
+            )
             # 测试一下是否配置了凭证
             self._baidu_engine._initialize()
             return True
@@ -168,11 +185,29 @@ class OCREngineAdapter:
         else:
             return self._paddle_recognize_image(image_path)
 
+    @property
+    def cache_engine_id(self) -> str:
+        """缓存键中的引擎/版本标识（百度结果由 BaiduOCREngine 自行缓存）"""
+        engine_id = (
+            f"OCREngineAdapter:paddleocr/{package_version('paddleocr')}"
+            f":cls={self.use_angle_cls}:lang={self.lang}"
+        )
+        if self.preprocessor is not None:
+            engine_id += f":{self.preprocessor.version}"
+        return engine_id
+
+    def _paddle_input(self, image_path: str, doc_type: str):
+        """PaddleOCR 输入：启用预处理时为处理后的图像，否则为原路径"""
+        if self.preprocessor is None:
+            return image_path
+        return self.preprocessor.prepare(image_path, doc_type).image
+
     # ========== PaddleOCR 后备方法 ==========
 
+    @cached_ocr("id_card")
     def _paddle_recognize_id_card(self, image_path: str) -> Dict:
         """PaddleOCR 识别身份证"""
-        result = self._paddle_engine.ocr(image_path, cls=True)
+        result = self._paddle_engine.ocr(self._paddle_input(image_path, "id_card"), cls=True)
 
         if not result or not result[0]:
             return {}
@@ -185,9 +220,10 @@ class OCREngineAdapter:
         info = self._parse_id_card_text(text)
         return info
 
+    @cached_ocr("business_license")
     def _paddle_recognize_business_license(self, image_path: str) -> Dict:
         """PaddleOCR 识别营业执照"""
-        result = self._paddle_engine.ocr(image_path, cls=True)
+        result = self._paddle_engine.ocr(self._paddle_input(image_path, "business_license"), cls=True)
 
         if not result or not result[0]:
             return {}
@@ -198,10 +234,11 @@ class OCREngineAdapter:
         # 解析营业执照信息
         return self._parse_business_license_text(text)
 
+    @cached_ocr("general")
     def _paddle_recognize_image(self, image_path: str) -> Dict:
         """PaddleOCR 通用识别"""
         # 移除cls参数以兼容新版PaddleOCR
-        result = self._paddle_engine.ocr(image_path)
+        result = self._paddle_engine.ocr(self._paddle_input(image_path, "general"))
 
         if not result or not result[0]:
             return {"text": "", "words_result": []}
@@ -314,14 +351,19 @@ class OCREngineAdapter:
 
 # ============ 便捷函数 ============
 
-def create_ocr_engine(engine: str = "auto", baidu_config: str = "config/baidu_ocr.yaml"):
+def create_ocr_engine(
+    engine: str = "auto",
+    baidu_config: str = "config/baidu_ocr.yaml",
+    use_cache: bool = True
+):
     """创建 OCR 引擎的便捷函数
 
     Args:
         engine: OCR 引擎类型 ("auto", "paddle", "baidu")
         baidu_config: 百度 OCR 配置文件路径
+        use_cache: 是否按图片内容缓存识别结果
 
     Returns:
         OCREngineAdapter 实例
     """
-    return OCREngineAdapter(engine=engine, baidu_config=baidu_config)
+    return OCREngineAdapter(engine=engine, baidu_config=baidu_config, use_cache=use_cache)
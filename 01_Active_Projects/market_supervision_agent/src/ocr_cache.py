@@ -0,0 +1,316 @@
+"""
+OCR 结果缓存 - 按图片内容去重
+
+缓存键为 (图片 SHA-256, 文档类型, 引擎/版本)，识别结果以 JSON 存入 SQLite，
+按最近访问时间做 LRU 淘汰（条数与总字节数双上限）。
+同一张照片重复上传、改名或工作流重试时，不会再次调用付费的百度 API
+或重新运行 PaddleOCR。
+
+用法：
+    class MyEngine:
+        ocr_cache = get_ocr_cache()
+        cache_engine_id = "my-engine/1.0"
+
+        @cached_ocr("id_card")
+        def recognize_id_card(self, image_path): ...
+"""
+
+import functools
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from loguru import logger
+
+# 缓存格式版本（解析逻辑变化导致旧结果失效时递增）
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_PATH = "data/ocr_cache.db"
+
+# 共享缓存实例（按数据库路径）
+_caches: Dict[str, "OCRCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def file_digest(image_path: str, chunk_size: int = 1 << 20) -> str:
+    """计算文件内容的 SHA-256
+
+    Args:
+        image_path: 文件路径
+        chunk_size: 分块读取大小
+
+    Returns:
+        十六进制摘要
+    """
+    digest = hashlib.sha256()
+    with open(image_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _json_default(value):
+    """序列化 numpy 标量/数组（PaddleOCR 的坐标与置信度）"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"无法序列化类型: {type(value).__name__}")
+
+
+def is_cacheable(result) -> bool:
+    """只缓存成功的识别结果：非空字典、不含 error、至少一个字段有值"""
+    return (
+        isinstance(result, dict)
+        and 'error' not in result
+        and any(bool(v) for v in result.values())
+    )
+
+
+class OCRCache:
+    """基于 SQLite 的 OCR 结果缓存（线程安全，多进程共享同一文件）"""
+
+    def __init__(
+        self,
+        db_path: str = DEFAULT_CACHE_PATH,
+        max_entries: int = 5000,
+        max_bytes: int = 64 * 1024 * 1024
+    ):
+        """初始化缓存
+
+        Args:
+            db_path: 缓存数据库路径
+            max_entries: 最多保留条数
+            max_bytes: 结果 JSON 总字节数上限
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                digest TEXT NOT NULL,
+                doc_type TEXT NOT NULL,
+                engine TEXT NOT NULL,
+                result TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (digest, doc_type, engine)
+            ) WITHOUT ROWID
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_ocr_cache_accessed ON ocr_cache(accessed_at)')
+        self._conn.commit()
+
+    def get(self, digest: str, doc_type: str, engine: str) -> Optional[Dict]:
+        """读取缓存并刷新访问时间
+
+        Args:
+            digest: 图片 SHA-256
+            doc_type: 文档类型
+            engine: 引擎标识（含版本）
+
+        Returns:
+            识别结果，未命中返回 None
+        """
+        key = (digest, doc_type, self._engine_key(engine))
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT result FROM ocr_cache WHERE digest = ? AND doc_type = ? AND engine = ?', key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                'UPDATE ocr_cache SET accessed_at = ? WHERE digest = ? AND doc_type = ? AND engine = ?',
+                (time.time(), *key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, digest: str, doc_type: str, engine: str, result: Dict) -> bool:
+        """写入缓存，超出上限时淘汰最久未访问的条目
+
+        Args:
+            digest: 图片 SHA-256
+            doc_type: 文档类型
+            engine: 引擎标识（含版本）
+            result: 识别结果
+
+        Returns:
+            是否写入（结果无法序列化时返回 False）
+        """
+        try:
+            payload = json.dumps(result, ensure_ascii=False, default=_json_default)
+        except (TypeError, ValueError) as e:
+            logger.debug(f"OCR 结果无法缓存: {e}")
+            return False
+
+        size = len(payload.encode('utf-8'))
+        if size > self.max_bytes:
+            return False
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute('''
+                INSERT OR REPLACE INTO ocr_cache
+                (digest, doc_type, engine, result, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (digest, doc_type, self._engine_key(engine), payload, size, now, now))
+            self._evict()
+            self._conn.commit()
+        return True
+
+    def recognize(
+        self,
+        image_path: str,
+        doc_type: str,
+        engine: str,
+        compute: Callable[[], Dict]
+    ) -> Dict:
+        """命中缓存直接返回，否则执行识别并缓存成功结果
+
+        Args:
+            image_path: 图片路径
+            doc_type: 文档类型
+            engine: 引擎标识（含版本）
+            compute: 实际识别函数
+
+        Returns:
+            识别结果
+        """
+        if not Path(image_path).is_file():
+            return compute()
+
+        digest = file_digest(image_path)
+        cached = self.get(digest, doc_type, engine)
+        if cached is not None:
+            logger.debug(f"OCR 缓存命中: {Path(image_path).name} ({doc_type}, {engine})")
+            return cached
+
+        result = compute()
+        if is_cacheable(result):
+            self.put(digest, doc_type, engine, result)
+        return result
+
+    def _evict(self):
+        """按 LRU 淘汰超出条数或字节上限的条目（调用方持锁）"""
+        count, total = self._conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache'
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        cursor = self._conn.execute(
+            'SELECT digest, doc_type, engine, size FROM ocr_cache ORDER BY accessed_at'
+        )
+        stale = []
+        for digest, doc_type, engine, size in cursor:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            stale.append((digest, doc_type, engine))
+            count -= 1
+            total -= size
+
+        self._conn.executemany(
+            'DELETE FROM ocr_cache WHERE digest = ? AND doc_type = ? AND engine = ?', stale
+        )
+        logger.debug(f"OCR 缓存淘汰 {len(stale)} 条")
+
+    @staticmethod
+    def _engine_key(engine: str) -> str:
+        return f"{engine}#v{CACHE_VERSION}"
+
+    def stats(self) -> Dict:
+        """获取缓存统计
+
+        Returns:
+            条数、字节数、本进程命中/未命中次数
+        """
+        with self._lock:
+            count, total = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_cache'
+            ).fetchone()
+        return {'entries': count, 'bytes': total, 'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute('DELETE FROM ocr_cache')
+            self._conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+def get_ocr_cache(db_path: str = DEFAULT_CACHE_PATH) -> OCRCache:
+    """获取共享的 OCR 缓存实例（同一路径只打开一次）
+
+    Args:
+        db_path: 缓存数据库路径
+
+    Returns:
+        OCRCache 实例
+    """
+    key = str(Path(db_path).resolve())
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = OCRCache(db_path)
+            _caches[key] = cache
+        return cache
+
+
+def cached_ocr(doc_type: str):
+    """OCR 识别方法的缓存装饰器
+
+    被装饰方法的签名须为 method(self, image_path)。实例通过 ocr_cache 属性
+    提供缓存（None 表示不缓存），通过 cache_engine_id 属性提供引擎/版本标识。
+
+    Args:
+        doc_type: 文档类型（id_card、business_license、contract、general 等）
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, image_path, *args, **kwargs):
+            cache = getattr(self, 'ocr_cache', None)
+            if cache is None or args or kwargs:
+                return method(self, image_path, *args, **kwargs)
+            return cache.recognize(
+                str(image_path), doc_type, self.cache_engine_id,
+                lambda: method(self, image_path)
+            )
+        return wrapper
+    return decorator
+
+
+def package_version(name: str) -> str:
+    """获取已安装包的版本（用于缓存键）
+
+    Args:
+        name: 发行包名
+
+    Returns:
+        版本号，未安装返回 "unknown"
+    """
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+    except ImportError:
+        return "unknown"
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
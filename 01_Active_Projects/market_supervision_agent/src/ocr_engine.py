@@ -15,20 +15,51 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from loguru import logger
 
+from .image_preprocessor import ImagePreprocessor, get_preprocessor
+from .ocr_cache import OCRCache, cached_ocr, get_ocr_cache, package_version
+
 
 class OCREngine:
     """OCR识别引擎"""
 
-    def __init__(self, use_gpu: bool = False):
+    # 支持的文档类型
+    DOC_TYPES = ("id_card", "business_license", "contract", "general")
+
+    def __init__(
+        self,
+        use_gpu: bool = False,
+        cache: Optional[OCRCache] = None,
+        use_cache: bool = True,
+        cpu_threads: Optional[int] = None,
+        preprocessor: Optional[ImagePreprocessor] = None,
+        preprocess: bool = True
+    ):
         """初始化OCR引擎
 
         Args:
             use_gpu: 是否使用GPU加速
+            cache: OCR 结果缓存，None 时使用共享缓存
+            use_cache: 是否缓存识别结果（相同图片不重复运行 PaddleOCR）
+            cpu_threads: PaddleOCR 推理线程数（多进程并行时设为 1，避免线程争用）
+            preprocessor: 图片预处理器，None 时使用共享实例
+            preprocess: 是否做 EXIF 旋转、证件裁剪和缩放
         """
         self.use_gpu = use_gpu
+        self.cpu_threads = cpu_threads
         self.ocr = None
         self._initialized = False
 
+        self.ocr_cache = (cache or get_ocr_cache()) if use_cache else None
+        self.preprocessor = (preprocessor or get_preprocessor()) if preprocess else None
+
+    @property
+    def cache_engine_id(self) -> str:
+        """缓存键中的引擎/版本标识（预处理与解析规则属于本引擎）"""
+        engine_id = f"OCREngine:paddleocr/{package_version('paddleocr')}"
+        if self.preprocessor is not None:
+            engine_id += f":{self.preprocessor.version}"
+        return engine_id
+
     def _initialize(self):
         """延迟初始化PaddleOCR（避免导入时立即加载）"""
         if self._initialized:
@@ -36,11 +67,15 @@ class OCREngine:
 
         try:
             from paddleocr import PaddleOCR
+            options = {}
+            if self.cpu_threads:
+                options['cpu_threads'] = self.cpu_threads
             self.ocr = PaddleOCR(
                 use_angle_cls=True,  # 启用文字方向分类
                 lang='ch',           # 中文识别
                 use_gpu=self.use_gpu,
-                show_log=False
+                show_log=False,
+                **options
             )
             self._initialized = True
             logger.info("PaddleOCR初始化成功")
@@ -51,6 +86,7 @@ class OCREngine:
             logger.error(f"PaddleOCR初始化失败: {e}")
             raise
 
+    @cached_ocr("general")
     def recognize_image(self, image_path: str) -> Dict:
         """识别图片中的文字
 
@@ -72,12 +108,12 @@ class OCREngine:
             raise FileNotFoundError(f"文件不存在: {image_path}")
 
         try:
-            result = self.ocr.ocr(image_path, cls=True)
-            return self._parse_result(result)
+            return self.recognize_array(self.load_image(image_path, "general"), "general")
         except Exception as e:
             logger.error(f"OCR识别失败: {image_path}, 错误: {e}")
             return {"text": "", "regions": []}
 
+    @cached_ocr("id_card")
     def recognize_id_card(self, image_path: str) -> Dict:
         """专门识别身份证
 
@@ -96,18 +132,9 @@ class OCREngine:
         self._initialize()
 
         try:
-            # 预处理身份证图片
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError(f"无法读取图片: {image_path}")
-
-            img_processed = self._preprocess_id_card(img)
-
-            # 识别
-            result = self.ocr.ocr(img_processed, cls=True)
-
-            # 解析身份证特定格式
-            info = self._parse_id_card(result)
+            # 预处理身份证图片并识别
+            img = self.load_image(image_path, "id_card")
+            info = self.recognize_array(img, "id_card")
 
             logger.info(f"身份证识别成功: {image_path}")
             return info
@@ -116,6 +143,7 @@ class OCREngine:
             logger.error(f"身份证识别失败: {image_path}, 错误: {e}")
             return {}
 
+    @cached_ocr("business_license")
     def recognize_business_license(self, image_path: str) -> Dict:
         """识别营业执照
 
@@ -134,8 +162,7 @@ class OCREngine:
         self._initialize()
 
         try:
-            result = self.ocr.ocr(image_path, cls=True)
-            info = self._parse_business_license(result)
+            info = self.recognize_array(self.load_image(image_path, "business_license"), "business_license")
 
             logger.info(f"营业执照识别成功: {image_path}")
             return info
@@ -144,6 +171,7 @@ class OCREngine:
             logger.error(f"营业执照识别失败: {image_path}, 错误: {e}")
             return {}
 
+    @cached_ocr("contract")
     def recognize_contract(self, image_path: str) -> Dict:
         """识别租赁合同等文档
 
@@ -161,11 +189,8 @@ class OCREngine:
         self._initialize()
 
         try:
-            result = self.ocr.ocr(image_path, cls=True)
-            parsed = self._parse_result(result)
-
-            # 提取合同特有信息
-            contract_info = self._parse_contract_info(parsed.get("text", ""))
+            # 识别并提取合同特有信息
+            contract_info = self.recognize_array(self.load_image(image_path, "contract"), "contract")
 
             logger.info(f"合同识别成功: {image_path}")
             return contract_info
@@ -174,6 +199,48 @@ class OCREngine:
             logger.error(f"合同识别失败: {image_path}, 错误: {e}")
             return {}
 
+    def load_image(self, image_path: str, doc_type: str = "general"):
+        """读取并预处理图片（解码与预处理不占用 OCR 模型，可与推理流水线并行）
+
+        Args:
+            image_path: 图片路径
+            doc_type: 文档类型；启用预处理时做 EXIF 旋转、证件裁剪和缩放，
+                身份证另做灰度/去噪/二值化
+
+        Returns:
+            OpenCV图片对象
+        """
+        if self.preprocessor is not None:
+            img = self.preprocessor.prepare(image_path, doc_type).image
+        else:
+            img = cv2.imread(str(image_path))
+        if img is None:
+            raise ValueError(f"无法读取图片: {image_path}")
+        if doc_type == "id_card":
+            return self._preprocess_id_card(img)
+        return img
+
+    def recognize_array(self, img, doc_type: str = "general") -> Dict:
+        """识别已解码的图片并按文档类型解析
+
+        Args:
+            img: load_image 返回的图片对象
+            doc_type: 文档类型（见 DOC_TYPES）
+
+        Returns:
+            与对应 recognize_* 方法相同格式的结果
+        """
+        self._initialize()
+        result = self.ocr.ocr(img, cls=True)
+
+        if doc_type == "id_card":
+            return self._parse_id_card(result)
+        if doc_type == "business_license":
+            return self._parse_business_license(result)
+        if doc_type == "contract":
+            return self._parse_contract_info(self._parse_result(result).get("text", ""))
+        return self._parse_result(result)
+
     def _preprocess_id_card(self, img):
         """身份证图片预处理
 
@@ -0,0 +1,253 @@
+"""
+OCR 服务 - 多进程批量识别
+
+- 进程池：每个工作进程启动时加载一次 PaddleOCR（预热），之后一直复用
+- 批量提交：整个材料文件夹一次提交，按 chunk_size 分块派发给工作进程
+- 有界队列：在途分块数达到 max_pending 时提交阻塞（背压），
+  避免一次拖入几十张扫描件时全部排队占用内存
+- 流水线：工作进程内由一个线程提前解码/预处理下一张图片，与当前图片的推理重叠
+- 命中 OCR 缓存（按图片内容）的文件不进入进程池，同一批次内的重复图片只识别一次
+
+用法：
+    with OCRService(workers=4) as service:
+        results = service.recognize_batch([
+            ("scans/身份证正面.jpg", "id_card"),
+            ("scans/营业执照.jpg", "business_license"),
+        ])
+"""
+
+import functools
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from loguru import logger
+
+from .ocr_cache import OCRCache, file_digest, get_ocr_cache, is_cacheable
+
+# 可识别的图片扩展名（PDF/Word 材料不走 OCR）
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tif', '.tiff', '.webp'}
+
+# MaterialFile.category → OCR 文档类型
+CATEGORY_DOC_TYPES = {
+    'id_card': 'id_card',
+    'license': 'business_license',
+    'contract': 'contract',
+}
+
+# 工作进程内的识别引擎（由 _init_worker 创建）
+_worker_engine = None
+
+
+def _paddle_engine(use_gpu: bool = False):
+    """在工作进程中创建并预热 PaddleOCR 引擎（单线程推理，由进程数提供并行度）"""
+    from .ocr_engine import OCREngine
+
+    engine = OCREngine(use_gpu=use_gpu, use_cache=False, cpu_threads=1)
+    engine._initialize()
+    return engine
+
+
+def _init_worker(factory: Callable):
+    global _worker_engine
+    _worker_engine = factory()
+
+
+def _worker_ready() -> Tuple[int, Optional[str]]:
+    return os.getpid(), getattr(_worker_engine, "cache_engine_id", None)
+
+
+def _recognize_chunk(items: Sequence[Tuple[str, str]]) -> List[Dict]:
+    """工作进程：识别一个分块，解码/预处理与推理流水线进行
+
+    Args:
+        items: [(图片路径, 文档类型), ...]
+
+    Returns:
+        与 items 顺序一致的结果列表，失败项为 {"error": ...}
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=1) as loader:
+        images = [loader.submit(_worker_engine.load_image, path, doc_type) for path, doc_type in items]
+        for (path, doc_type), image in zip(items, images):
+            try:
+                results.append(_worker_engine.recognize_array(image.result(), doc_type))
+            except Exception as e:
+                logger.error(f"OCR识别失败: {path}, 错误: {e}")
+                results.append({"error": str(e)})
+    return results
+
+
+class OCRService:
+    """预热的多进程 OCR 服务"""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        chunk_size: int = 4,
+        max_pending: Optional[int] = None,
+        use_gpu: bool = False,
+        cache: Optional[OCRCache] = None,
+        use_cache: bool = True,
+        engine_factory: Optional[Callable] = None,
+        engine_id: Optional[str] = None
+    ):
+        """初始化 OCR 服务
+
+        Args:
+            workers: 工作进程数，默认 CPU 核数
+            chunk_size: 每次派发给工作进程的图片数
+            max_pending: 在途分块上限（背压），默认 workers * 2
+            use_gpu: PaddleOCR 是否使用 GPU
+            cache: OCR 结果缓存，None 时使用共享缓存
+            use_cache: 是否使用缓存
+            engine_factory: 工作进程中创建引擎的可序列化函数，引擎需提供
+                load_image(path, doc_type) 与 recognize_array(img, doc_type)；
+                默认创建 OCREngine
+            engine_id: 缓存键中的引擎标识，默认取工作进程中引擎的 cache_engine_id
+                （与单独使用 OCREngine 共享缓存结果）
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending = max_pending or self.workers * 2
+        self.engine_factory = engine_factory or functools.partial(_paddle_engine, use_gpu)
+        self.engine_id = engine_id
+        self.ocr_cache = (cache or get_ocr_cache()) if use_cache else None
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+
+    def start(self) -> "OCRService":
+        """启动进程池并等待所有工作进程加载完模型
+
+        Returns:
+            self
+        """
+        with self._lock:
+            if self._executor is not None:
+                return self
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.engine_factory,)
+            )
+            # 同时提交 workers 个任务，促使进程池一次拉起全部进程并完成预热
+            ready = [f.result() for f in [self._executor.submit(_worker_ready) for _ in range(self.workers)]]
+            if self.engine_id is None:
+                self.engine_id = ready[0][1]
+            if self.engine_id is None:
+                self.ocr_cache = None
+        logger.info(f"OCR 服务已启动: {len({pid for pid, _ in ready})}/{self.workers} 个工作进程就绪")
+        return self
+
+    def submit(self, items: Sequence[Tuple[str, str]]) -> Future:
+        """提交一个分块（在途分块已满时阻塞，直到有分块完成）
+
+        Args:
+            items: [(图片路径, 文档类型), ...]
+
+        Returns:
+            结果列表的 Future
+        """
+        self.start()
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(_recognize_chunk, list(items))
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def recognize_batch(
+        self,
+        files: Iterable[Union[str, Path, Tuple[Union[str, Path], str]]],
+        doc_type: str = "general"
+    ) -> Dict[str, Dict]:
+        """批量识别
+
+        Args:
+            files: 图片路径，或 (图片路径, 文档类型) 元组
+            doc_type: 未指定类型的文件使用的文档类型
+
+        Returns:
+            {图片路径: 识别结果}，失败的文件结果含 "error"
+        """
+        self.start()
+        results: Dict[str, Dict] = {}
+        # (摘要, 文档类型) → 共用同一次识别的路径
+        pending: Dict[Tuple[str, str], List[str]] = {}
+        hits = 0
+
+        for entry in files:
+            path, kind = (entry if isinstance(entry, tuple) else (entry, doc_type))
+            path = str(path)
+            if path in results:
+                continue
+            try:
+                digest = file_digest(path)
+            except OSError as e:
+                results[path] = {"error": str(e)}
+                continue
+
+            cached = self.ocr_cache.get(digest, kind, self.engine_id) if self.ocr_cache else None
+            if cached is not None:
+                results[path] = cached
+                hits += 1
+                continue
+            results[path] = {}
+            pending.setdefault((digest, kind), []).append(path)
+
+        keys = list(pending)
+        chunks = [keys[i:i + self.chunk_size] for i in range(0, len(keys), self.chunk_size)]
+        logger.info(
+            f"批量 OCR: {len(results)} 个文件, 缓存命中 {hits}, "
+            f"待识别 {len(keys)} 张（{len(chunks)} 个分块）"
+        )
+
+        futures = [
+            (chunk, self.submit([(pending[key][0], key[1]) for key in chunk]))
+            for chunk in chunks
+        ]
+        for chunk, future in futures:
+            for (digest, kind), result in zip(chunk, future.result()):
+                if self.ocr_cache and is_cacheable(result):
+                    self.ocr_cache.put(digest, kind, self.engine_id, result)
+                for path in pending[(digest, kind)]:
+                    results[path] = result
+
+        return results
+
+    def recognize_materials(self, materials: Iterable) -> Dict[str, Dict]:
+        """识别材料文件夹中的图片材料（MaterialFolderManager.materials 的值）
+
+        Args:
+            materials: MaterialFile 列表
+
+        Returns:
+            {材料键值: 识别结果}（非图片材料不识别）
+        """
+        selected = [
+            m for m in materials
+            if m.file_path and Path(m.file_path).suffix.lower() in IMAGE_EXTENSIONS
+        ]
+        results = self.recognize_batch(
+            (m.file_path, CATEGORY_DOC_TYPES.get(m.category, "general")) for m in selected
+        )
+        return {m.key: results[str(m.file_path)] for m in selected}
+
+    def close(self):
+        """关闭进程池"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def __enter__(self) -> "OCRService":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -329,14 +329,7 @@ class UnifiedWorkflowEngine:
 
             # 3. 保存到数据库
             if extracted_data.get('id_card'):
-                existing = self.db_manager.get_operator_by_id_card(extracted_data['id_card'])
-                if existing:
-                    operator_id = existing['id']
-                    self.db_manager.update_operator(existing['id'], extracted_data)
-                else:
-                    operator_id = self.db_manager.insert_operator(extracted_data)
-
-                progress.operator_id = operator_id
+                progress.operator_id = self._save_operator(extracted_data)
 
             # 4. 更新进度
             progress.metadata['ocr_data'] = extracted_data
@@ -379,14 +372,7 @@ class UnifiedWorkflowEngine:
 
             # 2. 保存/更新到数据库
             if cleaned_data.get('id_card'):
-                existing = self.db_manager.get_operator_by_id_card(cleaned_data['id_card'])
-                if existing:
-                    operator_id = existing['id']
-                    self.db_manager.update_operator(operator_id, cleaned_data)
-                else:
-                    operator_id = self.db_manager.insert_operator(cleaned_data)
-
-                progress.operator_id = operator_id
+                progress.operator_id = self._save_operator(cleaned_data)
 
             # 3. 更新进度
             progress.metadata['portal_data'] = cleaned_data
@@ -429,14 +415,7 @@ class UnifiedWorkflowEngine:
 
             # 2. 保存/更新到数据库
             if validated_data.get('id_card'):
-                existing = self.db_manager.get_operator_by_id_card(validated_data['id_card'])
-                if existing:
-                    operator_id = existing['id']
-                    self.db_manager.update_operator(operator_id, validated_data)
-                else:
-                    operator_id = self.db_manager.insert_operator(validated_data)
-
-                progress.operator_id = operator_id
+                progress.operator_id = self._save_operator(validated_data)
 
             # 2. 更新进度
             progress.metadata['form_data'] = validated_data
@@ -712,6 +691,17 @@ class UnifiedWorkflowEngine:
 
         return validated
 
+    def _save_operator(self, data: Dict) -> int:
+        """按身份证号插入或更新经营户，返回记录ID
+
+        Raises:
+            ValueError: 数据不完整（如新记录缺少姓名）
+        """
+        outcome = self.db_manager.bulk_upsert_operators([data])[0]
+        if outcome['status'] == 'error':
+            raise ValueError(outcome['error'])
+        return outcome['operator_id']
+
     def _check_completeness(self, data: Dict) -> Dict[str, bool]:
         """检查数据完整性"""
         required = self.REQUIRED_FIELDS.get(self.config.scenario, [])
@@ -0,0 +1,84 @@
+"""
+百度 OCR 客户端测试 - 基于本地替身服务（限流、重试、Token 缓存、连接复用）
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "scripts" / "tools"))
+
+from baidu_ocr_standin import BaiduOCRStandIn
+from src.baidu_ocr_client import BaiduOCRClient
+from src.baidu_ocr_engine import BaiduOCREngine
+
+
+@pytest.fixture
+def images(tmp_path):
+    paths = []
+    for i in range(12):
+        path = tmp_path / f"scan_{i}.jpg"
+        path.write_bytes(b'\xff\xd8' + bytes([i]) * 64)
+        paths.append(str(path))
+    return paths
+
+
+def _client(server, tmp_path, **kwargs):
+    options = dict(backoff=0.05, max_backoff=0.5, token_cache=str(tmp_path / "token.json"))
+    options.update(kwargs)
+    return BaiduOCRClient("key", "secret", base_url=server.url, **options)
+
+
+def test_qps_errors_retried_with_backoff(tmp_path, images):
+    """测试不限流并发时撞上配额，18 号错误自动退避重试直至成功"""
+    with BaiduOCRStandIn(qps=5) as server:
+        client = _client(server, tmp_path, qps=0, max_workers=8, max_retries=20)
+        results = client.recognize_many(lambda p: client.basicGeneral(Path(p).read_bytes()), images)
+
+    assert all('error_code' not in r for r in results.values())
+    assert server.stats['qps_rejected'] > 0
+    assert client.stats['retries'] == server.stats['qps_rejected']
+
+
+def test_rate_limit_stays_within_quota(tmp_path, images):
+    """测试限流略低于配额时不触发 QPS 错误，且复用连接"""
+    with BaiduOCRStandIn(qps=10) as server:
+        client = _client(server, tmp_path, qps=8, max_workers=4)
+        results = client.recognize_many(lambda p: client.idcard(Path(p).read_bytes(), "front"), images)
+
+    assert len(results) == 12
+    assert server.stats['qps_rejected'] == 0
+    assert server.stats['connections'] <= 4
+
+
+def test_token_cached_and_refreshed(tmp_path, images):
+    """测试 Token 跨实例复用，过期后自动刷新并重试"""
+    with BaiduOCRStandIn(qps=0) as server:
+        first = _client(server, tmp_path)
+        first.basicGeneral(b'image')
+        second = _client(server, tmp_path)
+        second.basicGeneral(b'image')
+        assert server.stats['token_requests'] == 1
+
+        server.expire_tokens()
+        result = second.basicGeneral(b'image')
+
+    assert 'error_code' not in result
+    assert server.stats['token_requests'] == 2
+
+
+def test_engine_recognize_batch(tmp_path, images):
+    """测试 BaiduOCREngine 使用 REST 客户端批量识别身份证"""
+    with BaiduOCRStandIn(qps=20) as server:
+        engine = BaiduOCREngine(
+            "app", "key", "secret", use_cache=False, preprocess=False, qps=20, base_url=server.url
+        )
+        engine._initialize()
+        engine.client.token_cache = None
+        results = engine.recognize_batch(images[:4], doc_type="id_card")
+
+    assert [r['name'] for r in results.values()] == ['张三'] * 4
+    assert results[images[0]]['id_card'] == '450103199001011234'
@@ -0,0 +1,247 @@
+"""
+数据库管理器测试 - 连接池、WAL、并发访问、批量导入、全文检索
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# 添加 src 目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from database_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "operators.db"))
+    yield manager
+    manager.close()
+
+
+def _operator(i: int) -> dict:
+    return {'operator_name': f'经营者{i}', 'id_card': f'450921{i:012d}', 'phone': f'138{i:08d}'}
+
+
+def test_wal_and_pragmas(db):
+    """测试连接启用 WAL 和 synchronous=NORMAL"""
+    with db._get_connection() as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1
+
+
+def test_instances_share_pool(db):
+    """测试同一路径的实例共享连接池且不重复建表"""
+    other = DatabaseManager(str(db.db_path))
+
+    assert other._pool is db._pool
+    db.insert_operator(_operator(1))
+    assert other.get_record_count() == 1
+
+
+def test_connections_reused(db):
+    """测试顺序操作复用同一个连接"""
+    for i in range(20):
+        db.insert_operator(_operator(i))
+        db.search_operators(f'经营者{i}')
+
+    assert db._pool.size == 1
+
+
+def test_nested_calls_share_transaction(db):
+    """测试身份证重复时在同一连接内转为更新"""
+    first = db.insert_operator(_operator(1))
+    second = db.insert_operator(dict(_operator(1), phone='13900000000'))
+
+    assert first == second
+    assert db.get_operator_by_id(first)['phone'] == '13900000000'
+
+
+def test_rollback_on_error(db):
+    """测试异常时回滚整个事务"""
+    with pytest.raises(RuntimeError):
+        with db._get_connection() as conn:
+            conn.execute("INSERT INTO operators (operator_name, id_card) VALUES ('a', 'x1')")
+            raise RuntimeError("boom")
+
+    assert db.get_operator_by_id_card('x1') is None
+
+
+def test_concurrent_workers(db):
+    """测试多线程并发写入读取"""
+    def worker(w):
+        manager = DatabaseManager(str(db.db_path))
+        for i in range(25):
+            manager.insert_operator(_operator(w * 1000 + i))
+            manager.search_operators('经营者')
+
+    threads = [threading.Thread(target=worker, args=(w,)) for w in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert db.get_record_count() == 200
+    assert db._pool.size <= 8
+
+
+def test_bulk_upsert_outcomes(db):
+    """测试批量写入返回逐行结果"""
+    db.insert_operator(dict(_operator(1), business_name='旧店名'))
+
+    outcomes = db.bulk_upsert_operators([
+        _operator(2),
+        {'id_card': _operator(1)['id_card'], 'phone': '13900000000'},
+        {'operator_name': '无身份证'},
+        {'id_card': 'new-without-name'},
+        dict(_operator(2), phone='13700000000'),
+    ])
+
+    assert [o['status'] for o in outcomes] == ['inserted', 'updated', 'error', 'error', 'updated']
+    assert outcomes[0]['operator_id'] == outcomes[4]['operator_id']
+
+    updated = db.get_operator_by_id_card(_operator(1)['id_card'])
+    assert updated['phone'] == '13900000000'
+    assert updated['business_name'] == '旧店名'
+    assert db.get_operator_by_id(outcomes[0]['operator_id'])['phone'] == '13700000000'
+
+    operations = [log['operation'] for log in db.get_recent_logs(limit=10)]
+    assert operations.count('update') == 2 and operations.count('insert') == 2
+
+
+def test_bulk_upsert_isolates_bad_rows(db):
+    """测试单行写入失败时只标记该行，其余行照常提交"""
+    db.insert_operator(dict(_operator(1), phone='13800000001'))
+
+    outcomes = db.bulk_upsert_operators([
+        _operator(2),
+        dict(_operator(3), phone=['无法绑定的类型']),
+        {'id_card': _operator(1)['id_card'], 'business_name': '新店名', 'phone': None},
+        {'id_card': _operator(3)['id_card']},
+    ])
+
+    assert [o['status'] for o in outcomes] == ['inserted', 'error', 'updated', 'error']
+    assert outcomes[1]['error']
+    assert db.get_operator_by_id_card(_operator(2)['id_card']) is not None
+    assert db.get_operator_by_id_card(_operator(3)['id_card']) is None
+
+    # None 视为未提供，不清空已有值
+    updated = db.get_operator_by_id_card(_operator(1)['id_card'])
+    assert updated['business_name'] == '新店名'
+    assert updated['phone'] == '13800000001'
+
+    operations = [log['operation'] for log in db.get_recent_logs(limit=10)]
+    assert operations.count('insert') == 2 and operations.count('update') == 1
+
+
+def test_import_from_json_bulk(db, tmp_path):
+    """测试 JSON 导入走批量写入"""
+    export = tmp_path / "export.json"
+    export.write_text(json.dumps([_operator(i) for i in range(1200)], ensure_ascii=False), encoding='utf-8')
+
+    assert db.import_from_json(str(export)) == 1200
+    assert db.import_from_json(str(export)) == 1200
+    assert db.get_record_count() == 1200
+
+
+def _shop(name: str, business: str, id_card: str, phone: str) -> dict:
+    return {'operator_name': name, 'business_name': business, 'id_card': id_card, 'phone': phone}
+
+
+@pytest.fixture
+def shops(db):
+    db.bulk_upsert_operators([
+        _shop('张三', '南宁市张三水果店', '450921199001011234', '13800001111'),
+        _shop('李小明', '青秀区小明便利店', '450103198505052345', '13900002222'),
+        _shop('王五', '兴宁区五金建材行', '450102197712123456', '15800003333'),
+    ])
+    return db
+
+
+def test_search_substring_cjk(shops):
+    """测试中文子串检索及多词同时命中"""
+    assert [r['operator_name'] for r in shops.search_operators('便利店')] == ['李小明']
+    assert [r['operator_name'] for r in shops.search_operators('水果 张三')] == ['张三']
+    assert shops.search_operators('便利店 张三') == []
+
+
+def test_search_prefix_and_short_terms(shops):
+    """测试身份证/手机号前缀、短词前缀及子串回退"""
+    assert sorted(r['operator_name'] for r in shops.search_operators('4501')) == ['李小明', '王五']
+    assert [r['operator_name'] for r in shops.search_operators('1580')] == ['王五']
+    assert [r['operator_name'] for r in shops.search_operators('张三')] == ['张三']
+    # 无前缀命中时按子串匹配
+    assert [r['operator_name'] for r in shops.search_operators('小明')] == ['李小明']
+    assert [r['operator_name'] for r in shops.search_operators('0505')] == ['李小明']
+
+
+def test_search_merges_prefix_and_substring(db):
+    """测试前缀命中排在前面，且不遗漏关键词在中间的记录"""
+    db.bulk_upsert_operators([
+        _shop('周一', '超市便民店', '450101199001010001', '13700000001'),
+        _shop('周二', '华联超市', '450101199001010002', '13700000002'),
+        _shop('周三', '大润发超市', '450101199001010003', '13700000003'),
+        _shop('周四', '红星文具店', '450101199001010004', '13700000004'),
+    ])
+
+    # 短词走 LIKE，长词走 FTS5，两条路径都要合并前缀与子串命中
+    for keyword in ('超市', '超市便民'):
+        assert db.search_operators(keyword)[0]['business_name'] == '超市便民店'
+    assert sorted(r['business_name'] for r in db.search_operators('超市')) == ['华联超市', '大润发超市', '超市便民店']
+    assert sorted(r['business_name'] for r in db.search_operators('联超市')) == ['华联超市']
+
+    # 分页跨越前缀与子串两段时不重叠、不遗漏
+    pages = [db.search_operators('超市', limit=2, offset=offset) for offset in (0, 2)]
+    assert pages[0][0]['business_name'] == '超市便民店'
+    assert sorted(r['business_name'] for page in pages for r in page) == ['华联超市', '大润发超市', '超市便民店']
+
+
+def test_search_pagination(db):
+    """测试分页结果不重叠且覆盖全部命中"""
+    db.bulk_upsert_operators([_operator(i) for i in range(25)])
+
+    pages = [db.search_operators('经营者', limit=10, offset=offset) for offset in (0, 10, 20)]
+    ids = [r['id'] for page in pages for r in page]
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert len(set(ids)) == 25
+
+
+def test_search_index_follows_updates(shops):
+    """测试触发器同步更新和删除"""
+    shops.update_operator('450921199001011234', {'business_name': '张三烧烤'})
+    assert shops.search_operators('水果店') == []
+    assert [r['operator_name'] for r in shops.search_operators('烧烤')] == ['张三']
+
+    with shops._get_connection() as conn:
+        conn.execute("DELETE FROM operators WHERE id_card = '450921199001011234'")
+    assert shops.search_operators('张三') == []
+    with shops._get_connection() as conn:
+        assert conn.execute("SELECT count(*) FROM operators_fts WHERE operators_fts MATCH '张三烧烤'").fetchone()[0] == 0
+
+
+def test_search_index_rebuilt_for_existing_database(tmp_path):
+    """测试旧数据库（无全文索引）首次打开时重建索引"""
+    import sqlite3
+
+    path = tmp_path / "legacy.db"
+    manager = DatabaseManager(str(path))
+    manager.insert_operator(_shop('赵六', '赵六粮油店', '450100', None))
+    manager.close()
+
+    conn = sqlite3.connect(path)
+    for trigger in ('operators_fts_ai', 'operators_fts_ad', 'operators_fts_au'):
+        conn.execute(f'DROP TRIGGER {trigger}')
+    conn.execute('DROP TABLE operators_fts')
+    conn.execute('PRAGMA user_version = 0')
+    conn.commit()
+    conn.close()
+
+    manager = DatabaseManager(str(path))
+    try:
+        assert [r['operator_name'] for r in manager.search_operators('粮油店')] == ['赵六']
+    finally:
+        manager.close()
@@ -0,0 +1,107 @@
+"""
+OCR 图片预处理测试 - EXIF 旋转、证件裁剪、缩放、JPEG 编码、检测缓存
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.image_preprocessor import ImagePreprocessor
+from src.ocr_cache import OCRCache
+
+
+def _card_photo(path: Path, orientation: int = 1, size=(4000, 3000)):
+    """生成桌面上斜放一张证件的照片（白色卡片 + 文字行，深色背景）"""
+    width, height = size
+    rng = np.random.default_rng(0)
+    photo = rng.integers(40, 70, (height, width, 3), dtype=np.uint8)
+
+    card = np.full((540, 856, 3), 245, dtype=np.uint8)
+    for row in range(6):
+        cv2.putText(card, f"ZHANG SAN 4501031990{row:04d}", (40, 80 + row * 75),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.2, (20, 20, 20), 2)
+    source = np.float32([[0, 0], [855, 0], [855, 539], [0, 539]])
+    target = np.float32([[900, 700], [2900, 850], [2800, 2150], [800, 1950]])
+    matrix = cv2.getPerspectiveTransform(source, target)
+    warped = cv2.warpPerspective(card, matrix, (width, height))
+    mask = cv2.warpPerspective(np.ones((540, 856), np.uint8), matrix, (width, height)).astype(bool)
+    photo[mask] = warped[mask]
+
+    image = Image.fromarray(cv2.cvtColor(photo, cv2.COLOR_BGR2RGB))
+    exif = image.getexif()
+    exif[0x0112] = orientation
+    image.save(path, "JPEG", quality=95, exif=exif.tobytes())
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = OCRCache(str(tmp_path / "cache.db"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def preprocessor(cache):
+    return ImagePreprocessor(cache=cache)
+
+
+def test_exif_rotation(tmp_path, preprocessor):
+    """测试按 EXIF 方向旋转（6 = 顺时针 90 度）"""
+    path = _card_photo(tmp_path / "rotated.jpg", orientation=6, size=(800, 600))
+
+    assert preprocessor.load(str(path)).shape[:2] == (800, 600)
+
+
+def test_downscale_only_shrinks(preprocessor):
+    """测试只缩小不放大"""
+    image = np.zeros((3000, 4000, 3), np.uint8)
+
+    small, scale = preprocessor.downscale(image, 1600)
+    assert small.shape[:2] == (1200, 1600)
+    assert scale == pytest.approx(0.4)
+    assert preprocessor.downscale(small, 4000)[1] == 1.0
+
+
+def test_card_detected_and_cropped(tmp_path, preprocessor):
+    """测试检测证件边界并按证件比例透视裁剪"""
+    path = _card_photo(tmp_path / "id_card.jpg")
+
+    prepared = preprocessor.prepare(str(path), "id_card")
+
+    assert prepared.quad is not None
+    top_left = prepared.quad[0]
+    assert abs(top_left[0] - 900) < 40 and abs(top_left[1] - 700) < 40
+    height, width = prepared.image.shape[:2]
+    assert max(height, width) <= 1280
+    assert width / height == pytest.approx(85.6 / 54.0, rel=0.02)
+
+
+def test_detection_cached(tmp_path, preprocessor, cache):
+    """测试同一图片的边界检测结果命中缓存"""
+    path = _card_photo(tmp_path / "id_card.jpg")
+
+    first = preprocessor.prepare(str(path), "id_card")
+    hits = cache.hits
+    second = preprocessor.prepare(str(path), "id_card")
+
+    assert cache.hits == hits + 1
+    assert second.quad == first.quad
+
+
+def test_upload_bytes_reduced(tmp_path, preprocessor):
+    """测试上传用 JPEG 明显小于原图且可解码"""
+    path = _card_photo(tmp_path / "license.jpg")
+
+    data = preprocessor.prepare_for_upload(str(path), "business_license")
+
+    assert len(data) < path.stat().st_size / 2
+    assert cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR) is not None
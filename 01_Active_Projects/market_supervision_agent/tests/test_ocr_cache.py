@@ -0,0 +1,135 @@
+"""
+OCR 结果缓存测试 - 内容寻址、LRU 淘汰、引擎接入
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.ocr_cache import OCRCache, cached_ocr, file_digest
+from src.baidu_ocr_engine import BaiduOCREngine
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = OCRCache(str(tmp_path / "ocr_cache.db"))
+    yield cache
+    cache.close()
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "id_card.jpg"
+    path.write_bytes(b'\xff\xd8fake-jpeg-bytes')
+    return path
+
+
+class CountingEngine:
+    """记录实际识别次数的引擎"""
+
+    cache_engine_id = "counting/1"
+
+    def __init__(self, cache, result=None):
+        self.ocr_cache = cache
+        self.calls = 0
+        self.result = result if result is not None else {'name': '张三'}
+
+    @cached_ocr("id_card")
+    def recognize_id_card(self, image_path):
+        self.calls += 1
+        return dict(self.result)
+
+
+class FakeBaiduClient:
+    """百度 AipOcr 客户端替身，只统计调用次数"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def idcard(self, image_data, side):
+        self.calls += 1
+        return {'words_result': {'姓名': {'words': '张三'}, '公民身份号码': {'words': '450921199001011234'}}}
+
+
+def test_same_bytes_hit_cache(cache, image, tmp_path):
+    """测试相同内容（含改名副本）只识别一次"""
+    engine = CountingEngine(cache)
+    copy = tmp_path / "renamed.jpg"
+    copy.write_bytes(image.read_bytes())
+
+    assert engine.recognize_id_card(str(image)) == {'name': '张三'}
+    assert engine.recognize_id_card(str(copy)) == {'name': '张三'}
+    assert engine.calls == 1
+
+    image.write_bytes(b'other-bytes')
+    engine.recognize_id_card(str(image))
+    assert engine.calls == 2
+
+
+def test_key_includes_doc_type_and_engine(cache, image):
+    """测试文档类型与引擎版本不同则不共享结果"""
+    digest = file_digest(str(image))
+    cache.put(digest, 'id_card', 'paddle/2.7', {'name': '张三'})
+
+    assert cache.get(digest, 'id_card', 'paddle/2.7') == {'name': '张三'}
+    assert cache.get(digest, 'general', 'paddle/2.7') is None
+    assert cache.get(digest, 'id_card', 'paddle/2.8') is None
+
+
+def test_failed_results_not_cached(cache, image):
+    """测试空结果和错误结果不写入缓存"""
+    for result in ({}, {'text': '', 'words_result': []}, {'text': 'x', 'error': 'QPS limit'}):
+        engine = CountingEngine(cache, result)
+        engine.recognize_id_card(str(image))
+        engine.recognize_id_card(str(image))
+        assert engine.calls == 2
+
+    assert cache.stats()['entries'] == 0
+
+
+def test_lru_eviction(tmp_path):
+    """测试超出条数上限时淘汰最久未访问的条目"""
+    cache = OCRCache(str(tmp_path / "lru.db"), max_entries=3)
+    try:
+        for i in range(3):
+            cache.put(f'd{i}', 'general', 'e', {'text': str(i)})
+        cache.get('d0', 'general', 'e')
+        cache.put('d3', 'general', 'e', {'text': '3'})
+
+        assert cache.get('d1', 'general', 'e') is None
+        assert cache.get('d0', 'general', 'e') == {'text': '0'}
+        assert cache.stats()['entries'] == 3
+    finally:
+        cache.close()
+
+
+def test_cache_persists_across_instances(tmp_path, image):
+    """测试缓存写入磁盘，新进程/新实例可直接命中"""
+    path = str(tmp_path / "persist.db")
+    first = OCRCache(path)
+    CountingEngine(first).recognize_id_card(str(image))
+    first.close()
+
+    second = OCRCache(path)
+    engine = CountingEngine(second)
+    engine.recognize_id_card(str(image))
+    second.close()
+    assert engine.calls == 0
+
+
+def test_baidu_engine_does_not_repeat_paid_calls(cache, image):
+    """测试百度引擎对相同图片只调用一次 API"""
+    engine = BaiduOCREngine('app', 'key', 'secret', cache=cache, preprocess=False)
+    engine.client = FakeBaiduClient()
+    engine._initialized = True
+
+    first = engine.recognize_id_card(str(image))
+    second = engine.recognize_id_card(str(image))
+
+    assert first == second
+    assert first['id_card'] == '450921199001011234'
+    assert engine.client.calls == 1
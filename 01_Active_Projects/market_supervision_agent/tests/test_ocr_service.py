@@ -0,0 +1,113 @@
+"""
+OCR 服务测试 - 进程池批量识别、缓存跳过、背压
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加项目根目录到路径
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.material_manager import MaterialFile
+from src.ocr_cache import OCRCache
+from src.ocr_service import OCRService
+
+
+class TextEngine:
+    """把文件内容当作识别文本的引擎（可在工作进程中创建）"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def load_image(self, path, doc_type):
+        return Path(path).read_text(encoding='utf-8')
+
+    def recognize_array(self, img, doc_type):
+        time.sleep(self.delay)
+        if img == 'bad':
+            raise ValueError('无法读取图片')
+        return {'text': img, 'doc_type': doc_type}
+
+
+def text_engine():
+    return TextEngine()
+
+
+def slow_engine():
+    return TextEngine(delay=0.3)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = OCRCache(str(tmp_path / "ocr_cache.db"))
+    yield cache
+    cache.close()
+
+
+def _scan(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_batch_results_by_path(tmp_path, cache):
+    """测试批量结果按路径返回，文档类型和失败项正确"""
+    files = [(_scan(tmp_path, f'{i}.jpg', f'page{i}'), 'general') for i in range(7)]
+    files.append((_scan(tmp_path, 'front.jpg', '张三'), 'id_card'))
+    files.append((_scan(tmp_path, 'broken.jpg', 'bad'), 'general'))
+
+    with OCRService(workers=2, chunk_size=3, cache=cache, engine_factory=text_engine, engine_id='text') as service:
+        results = service.recognize_batch(files)
+
+    assert results[files[3][0]] == {'text': 'page3', 'doc_type': 'general'}
+    assert results[files[7][0]]['doc_type'] == 'id_card'
+    assert 'error' in results[files[8][0]]
+    assert len(results) == 9
+
+
+def test_cached_and_duplicate_images_skip_pool(tmp_path, cache):
+    """测试缓存命中与批次内重复图片不重复识别"""
+    first = _scan(tmp_path, 'a.jpg', '营业执照')
+    copy = _scan(tmp_path, 'a_copy.jpg', '营业执照')
+
+    with OCRService(workers=1, cache=cache, engine_factory=text_engine, engine_id='text') as service:
+        results = service.recognize_batch([first, copy])
+        assert results[first] == results[copy]
+        assert cache.stats()['entries'] == 1
+
+        again = service.recognize_batch([copy])
+
+    assert again[copy]['text'] == '营业执照'
+    assert cache.hits == 1
+
+
+def test_backpressure_limits_in_flight_chunks(tmp_path):
+    """测试在途分块达到上限时提交阻塞"""
+    files = [_scan(tmp_path, f'{i}.jpg', f'p{i}') for i in range(4)]
+
+    with OCRService(workers=1, chunk_size=1, max_pending=1, use_cache=False,
+                    engine_factory=slow_engine, engine_id='slow') as service:
+        service.submit([(files[0], 'general')])
+        began = time.perf_counter()
+        service.submit([(files[1], 'general')]).result()
+        assert time.perf_counter() - began >= 0.5
+
+
+def test_recognize_materials_maps_categories(tmp_path, cache):
+    """测试材料文件夹按分类选择文档类型并跳过非图片材料"""
+    materials = [
+        MaterialFile('身份证正面', 'id_card_front', _scan(tmp_path, 'front.jpg', '张三'), 'id_card'),
+        MaterialFile('营业执照', 'business_license', _scan(tmp_path, 'license.png', '执照'), 'license'),
+        MaterialFile('租赁合同', 'lease_contract', _scan(tmp_path, 'lease.pdf', '合同'), 'contract'),
+    ]
+
+    with OCRService(workers=1, cache=cache, engine_factory=text_engine, engine_id='text') as service:
+        results = service.recognize_materials(materials)
+
+    assert results == {
+        'id_card_front': {'text': '张三', 'doc_type': 'id_card'},
+        'business_license': {'text': '执照', 'doc_type': 'business_license'},
+    }
@@ -143,7 +143,7 @@ def database_page():
     limit = int(request.args.get('limit', 20))
 
     if keyword:
-        operators = db.search_operators(keyword)
+        operators = db.search_operators(keyword, limit=limit)
         search_term = keyword
     else:
         operators = db.list_operators(limit=limit)
@@ -326,17 +326,26 @@ def api_status():
 
 @app.route('/api/search')
 def api_search():
-    """API: 搜索经营户"""
+    """API: 搜索经营户（分页，前缀命中在前，其余按相关度排序）"""
     keyword = request.args.get('keyword', '')
-    limit = int(request.args.get('limit', 20))
+    limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    offset = max(int(request.args.get('offset', 0)), 0)
 
     if not keyword:
         return jsonify({"error": "请提供搜索关键词"}), 400
 
     try:
         db = DatabaseManager()
-        operators = db.search_operators(keyword)
-        return jsonify({"count": len(operators), "results": operators})
+        # 多取一条判断是否还有下一页
+        operators = db.search_operators(keyword, limit=limit + 1, offset=offset)
+        has_more = len(operators) > limit
+        operators = operators[:limit]
+        return jsonify({
+            "count": len(operators),
+            "offset": offset,
+            "has_more": has_more,
+            "results": operators
+        })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
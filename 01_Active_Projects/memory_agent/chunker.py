@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文档分块模块
+把长文档切成不超过嵌入模型序列长度的片段，每个片段单独生成向量
+
+- Markdown：按标题切分
+- Python：用 ast 按顶层函数/类切分，过大的类再按方法切分
+- 其他文本或切分后仍过长的片段：按行组成滑动窗口，相邻窗口有重叠
+"""
+
+import re
+import ast
+from typing import Callable, Dict, List, Optional, Tuple
+
+# (起始偏移, 结束偏移, 所属章节/函数名)
+Section = Tuple[int, int, str]
+
+# Markdown 标题行与代码块围栏
+MARKDOWN_HEADING = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+MARKDOWN_FENCE = re.compile(r'^\s*(```|~~~)')
+
+# 近似分词：一个汉字、一个英文单词/数字串或一个标点各算一个 token
+APPROX_TOKEN = re.compile(r'[一-鿿㐀-䶿]|[A-Za-z0-9_]+|[^\sA-Za-z0-9_]')
+
+
+def approx_token_count(text: str) -> int:
+    """近似计算 token 数（没有模型分词器时使用）"""
+    return len(APPROX_TOKEN.findall(text))
+
+
+class DocumentChunker:
+    """文档分块器"""
+
+    def __init__(
+        self,
+        max_tokens: int = 128,
+        overlap_tokens: int = 24,
+        min_tokens: int = 24,
+        count_tokens: Optional[Callable[[str], int]] = None
+    ):
+        """
+        初始化分块器
+
+        Args:
+            max_tokens: 每个片段的最大 token 数（不超过模型的最大序列长度）
+            overlap_tokens: 滑动窗口相邻片段的重叠 token 数
+            min_tokens: 小于该长度的章节与下一章节合并
+            count_tokens: token 计数函数（默认近似计数）
+        """
+        self.max_tokens = max_tokens
+        self.overlap_tokens = min(overlap_tokens, max_tokens // 2)
+        self.min_tokens = min_tokens
+        self.count_tokens = count_tokens or approx_token_count
+
+    def chunk(self, content: str, extension: str = '') -> List[Dict]:
+        """
+        切分文档
+
+        Args:
+            content: 文档内容
+            extension: 文件扩展名（决定切分方式）
+
+        Returns:
+            片段列表，每个包含:
+            - text: 片段文本
+            - start / end: 在原文中的字符偏移
+            - section: 所属标题或函数/类名
+        """
+        if not content.strip():
+            return []
+
+        sections = None
+        extension = extension.lower()
+        if extension in ('.md', '.markdown'):
+            sections = self._markdown_sections(content)
+        elif extension == '.py':
+            sections = self._python_sections(content)
+
+        if not sections:
+            sections = [(0, len(content), '')]
+
+        chunks = []
+        for start, end, section in self._merge_small(content, sections):
+            text = content[start:end]
+            if not text.strip():
+                continue
+            if self.count_tokens(text) <= self.max_tokens:
+                chunks.append({'text': text, 'start': start, 'end': end, 'section': section})
+            else:
+                chunks.extend(self._windows(content, start, end, section))
+
+        return chunks
+
+    # ========== 结构切分 ==========
+
+    def _markdown_sections(self, content: str) -> List[Section]:
+        """按标题切分 Markdown（忽略代码块中的 #）"""
+        sections = []
+        start, title = 0, ''
+        in_fence = False
+        offset = 0
+
+        for line in content.splitlines(keepends=True):
+            if MARKDOWN_FENCE.match(line):
+                in_fence = not in_fence
+            elif not in_fence:
+                match = MARKDOWN_HEADING.match(line)
+                if match and offset > start:
+                    sections.append((start, offset, title))
+                    start = offset
+                if match:
+                    title = match.group(2)
+            offset += len(line)
+
+        sections.append((start, len(content), title))
+        return sections
+
+    def _python_sections(self, content: str) -> Optional[List[Section]]:
+        """按顶层函数/类切分 Python 代码，语法错误时返回 None"""
+        try:
+            tree = ast.parse(content)
+        except (SyntaxError, ValueError):
+            return None
+
+        line_offsets = [0] + [match.end() for match in re.finditer('\n', content)]
+
+        def line_start(lineno: int) -> int:
+            return line_offsets[lineno - 1] if lineno - 1 < len(line_offsets) else len(content)
+
+        def walk(body, start: int, end: int, prefix: str) -> List[Section]:
+            sections = []
+            cursor = start
+            for node in body:
+                if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    continue
+
+                # 装饰器属于函数本身
+                first_line = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                node_start, node_end = line_start(first_line), line_start(node.end_lineno + 1)
+                if node_start > cursor:
+                    if content[cursor:node_start].strip():
+                        sections.append((cursor, node_start, prefix or 'module'))
+                    else:
+                        # 只有空行的间隙并入后面的函数/类，不单独成为以类名命名的章节
+                        node_start = cursor
+
+                name = f"{prefix}.{node.name}" if prefix else node.name
+                if isinstance(node, ast.ClassDef) and self.count_tokens(content[node_start:node_end]) > self.max_tokens:
+                    sections.extend(walk(node.body, node_start, node_end, name))
+                else:
+                    sections.append((node_start, node_end, name))
+                cursor = node_end
+
+            if cursor < end:
+                sections.append((cursor, end, prefix or 'module'))
+            return sections
+
+        return walk(tree.body, 0, len(content), '')
+
+    def _merge_small(self, content: str, sections: List[Section]) -> List[Section]:
+        """把过短的章节（如只有标题行、import 块）并入下一个章节"""
+        merged = []
+        pending = None
+
+        for start, end, section in sections:
+            if pending is None:
+                pending = (start, end, section)
+            else:
+                pending = (pending[0], end, pending[2] if pending[2] not in ('', 'module') else section)
+
+            if self.count_tokens(content[pending[0]:pending[1]]) >= self.min_tokens:
+                merged.append(pending)
+                pending = None
+
+        if pending is not None:
+            # 末尾的短章节并入前一个
+            if merged and self.count_tokens(content[merged[-1][0]:pending[1]]) <= self.max_tokens:
+                merged[-1] = (merged[-1][0], pending[1], merged[-1][2])
+            else:
+                merged.append(pending)
+
+        return merged
+
+    # ========== 滑动窗口 ==========
+
+    def _windows(self, content: str, start: int, end: int, section: str) -> List[Dict]:
+        """按行组成滑动窗口，超长的单行按字符切开"""
+        units = []  # (起始偏移, 结束偏移, token 数)
+        offset = start
+        for line in content[start:end].splitlines(keepends=True):
+            tokens = self.count_tokens(line)
+            if tokens <= self.max_tokens:
+                units.append((offset, offset + len(line), tokens))
+            else:
+                step = max(1, len(line) * self.max_tokens // (tokens * 2))
+                for i in range(0, len(line), step):
+                    piece = line[i:i + step]
+                    units.append((offset + i, offset + i + len(piece), self.count_tokens(piece)))
+            offset += len(line)
+
+        chunks = []
+        first = 0
+        while first < len(units):
+            # 尽量多装入整行
+            last, total = first, 0
+            while last < len(units) and (last == first or total + units[last][2] <= self.max_tokens):
+                total += units[last][2]
+                last += 1
+
+            chunk_start, chunk_end = units[first][0], units[last - 1][1]
+            text = content[chunk_start:chunk_end]
+            if text.strip():
+                chunks.append({'text': text, 'start': chunk_start, 'end': chunk_end, 'section': section})
+            if last >= len(units):
+                break
+
+            # 下一个窗口从末尾回退 overlap_tokens 开始（至少前进一行）
+            next_first, overlap = last, 0
+            while next_first - 1 > first and overlap + units[next_first - 1][2] <= self.overlap_tokens:
+                next_first -= 1
+                overlap += units[next_first][2]
+            first = next_first
+
+        return chunks
@@ -3,19 +3,28 @@
 """
 文本嵌入模块
 使用sentence-transformers生成本地向量嵌入
+
+模型和嵌入缓存由 00_Agent_Library/embedding_service 统一管理：
+同一进程只加载一次模型，已嵌入过的文本直接从磁盘缓存读取，
+查询向量另有进程内 LRU（embed_query）。
 """
 
+import sys
 import yaml
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
 from typing import List, Union
 
+# 共享嵌入服务位于 00_Agent_Library
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "00_Agent_Library"))
+
+from embedding_service import EmbeddingService, get_embedding_service
+
 
 class TextEmbedder:
     """文本嵌入器 - 生成本地向量"""
 
     def __init__(self, config_path="config.yaml"):
-        """初始化嵌入器"""
+        """初始化嵌入器（模型在第一次需要编码时加载）"""
         # 加载配置
         config_path = Path(__file__).parent / config_path
         with open(config_path, 'r', encoding='utf-8') as f:
@@ -23,20 +32,35 @@ class TextEmbedder:
 
         embedding_config = config['embedding']
 
-        print(f"[INFO] Loading embedding model: {embedding_config['model_name']}")
-        print(f"       Device: {embedding_config['device']}")
+        backend = embedding_config.get('backend', 'torch')
 
-        # 加载模型（首次会下载，约500MB）
-        self.model = SentenceTransformer(
-            embedding_config['model_name'],
-            device=embedding_config['device']
-        )
+        print(f"[INFO] Embedding model: {embedding_config['model_name']}")
+        print(f"       Device: {embedding_config['device']} ({backend})")
 
         self.batch_size = embedding_config.get('batch_size', 32)
+        options = {
+            'device': embedding_config['device'],
+            'batch_size': self.batch_size,
+            'backend': backend,
+            'max_seq_length': embedding_config.get('max_seq_length'),
+            'workers': embedding_config.get('workers', 1),
+        }
+
+        # 共享嵌入服务（首次下载模型约500MB）
+        if embedding_config.get('use_cache', True):
+            self.service = get_embedding_service(embedding_config['model_name'], **options)
+        else:
+            self.service = EmbeddingService(embedding_config['model_name'], use_cache=False, **options)
 
-        # 获取向量维度
-        self.embedding_dim = self.model.get_sentence_embedding_dimension()
-        print(f"[OK] Model loaded! Embedding dimension: {self.embedding_dim}")
+    @property
+    def model(self):
+        """SentenceTransformer 模型（首次访问时加载）"""
+        return self.service.model
+
+    @property
+    def embedding_dim(self) -> int:
+        """向量维度"""
+        return self.service.dimension
 
     def embed_texts(self, texts: List[str], show_progress=False) -> List[List[float]]:
         """
@@ -52,14 +76,7 @@ class TextEmbedder:
         if not texts:
             return []
 
-        embeddings = self.model.encode(
-            texts,
-            batch_size=self.batch_size,
-            show_progress_bar=show_progress,
-            convert_to_numpy=True
-        )
-
-        return embeddings.tolist()
+        return self.service.encode(texts, show_progress=show_progress).tolist()
 
     def embed_text(self, text: str) -> List[float]:
         """
@@ -71,11 +88,48 @@ class TextEmbedder:
         Returns:
             向量
         """
-        embedding = self.model.encode(
-            text,
-            convert_to_numpy=True
-        )
-        return embedding.tolist()
+        return self.service.encode_one(text).tolist()
+
+    def embed_query(self, query: str) -> List[float]:
+        """
+        嵌入查询（规范化后在进程内 LRU 中复用，重复查询不再编码）
+
+        Args:
+            query: 查询文本
+
+        Returns:
+            向量
+        """
+        return self.service.encode_query(query).tolist()
+
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """
+        批量嵌入查询（LRU 未命中的合并为一次编码）
+
+        Args:
+            queries: 查询文本列表
+
+        Returns:
+            向量列表
+        """
+        return self.service.encode_queries(queries).tolist()
+
+    def count_tokens(self, text: str) -> int:
+        """
+        按模型分词器计算 token 数（不含特殊符号）
+
+        Args:
+            text: 文本内容
+
+        Returns:
+            token 数
+        """
+        return len(self.model.tokenizer.tokenize(text))
+
+    @property
+    def max_seq_length(self) -> int:
+        """模型的最大输入长度（超出部分会被截断）"""
+        return self.model.max_seq_length
 
     @property
     def dimension(self) -> int:
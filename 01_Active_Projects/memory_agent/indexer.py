@@ -3,18 +3,36 @@
 """
 笔记索引器
 扫描学习笔记和项目代码，生成向量嵌入并存入数据库
+
+增量索引：索引清单（manifest）记录每个文件的路径、修改时间、大小和内容哈希，
+重新构建时只嵌入新增或内容变化的文件，并清除已删除文件的向量。
+清单同时记录嵌入模型标识（含后端和序列长度），更换后自动全量重建。
+
+分块索引：每个文件切成多个片段分别嵌入（见 chunker.py），片段记录的ID为
+"<文档ID>#<序号>"，元数据中带有所属文档ID和在原文中的偏移。
+
+元数据侧索引：每个文档的类型、扩展名、分类、修改时间和片段数同步写入 SQLite
+（见 metadata_index.py），供有选择性的过滤搜索使用。
 """
 
+import os
+import sys
+import json
 import yaml
 import hashlib
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Tuple
+from typing import List, Dict, Set
 from tqdm import tqdm
 
+from chunker import DocumentChunker
 from embedder import TextEmbedder
+from metadata_index import MetadataIndex, metadata_index_path
 from vector_store import VectorStore
 
+# 索引清单格式版本（元数据结构或文档ID规则变化时递增，触发全量重建）
+MANIFEST_VERSION = 2
+
 
 class DocumentIndexer:
     """文档索引器 - 扫描和索引学习资料"""
@@ -27,24 +45,98 @@ class DocumentIndexer:
             self.config = yaml.safe_load(f)
 
         self.workspace_root = Path(__file__).parent.parent.parent
+        self.config_path = config_path
 
-        # 初始化嵌入器和向量数据库
-        self.embedder = TextEmbedder(config_path)
+        # 初始化向量数据库；嵌入模型和分块器在首次需要生成向量时再加载
+        self._embedder = None
+        self._chunker = None
         self.vector_store = VectorStore(config_path)
 
+        # 索引清单：{文件路径: {mtime, size, hash, id, chunks}}
+        db_config = self.config['vector_db']
+        manifest_path = db_config.get(
+            'manifest_path',
+            str(Path(db_config['persist_directory']).parent / "index_manifest.json")
+        )
+        self.manifest_path = self.workspace_root / manifest_path
+        self.manifest_embedding = None
+        self.manifest = self._load_manifest()
+
+        # 元数据侧索引
+        self.metadata_index = MetadataIndex(metadata_index_path(self.config, self.workspace_root))
+
+        # 本次扫描看到的文件、扫描过的源目录
+        self._seen: Set[str] = set()
+        self._scanned_roots: List[Path] = []
+
         # 统计信息
         self.stats = {
             'indexed': 0,
             'skipped': 0,
-            'failed': 0
+            'deleted': 0,
+            'failed': 0,
+            'chunks': 0
         }
 
+    @property
+    def embedder(self) -> TextEmbedder:
+        """嵌入器（延迟加载，文件都未变化时不加载模型）"""
+        if self._embedder is None:
+            self._embedder = TextEmbedder(self.config_path)
+        return self._embedder
+
+    @property
+    def chunker(self) -> DocumentChunker:
+        """分块器（按嵌入模型的分词器计数，片段不超过模型最大序列长度）"""
+        if self._chunker is None:
+            chunk_config = self.config.get('chunking', {})
+            max_tokens = min(
+                chunk_config.get('max_tokens', 128),
+                self.embedder.max_seq_length - 2  # 留出 [CLS]/[SEP]
+            )
+            self._chunker = DocumentChunker(
+                max_tokens=max_tokens,
+                overlap_tokens=chunk_config.get('overlap_tokens', 24),
+                min_tokens=chunk_config.get('min_tokens', 24),
+                count_tokens=self.embedder.count_tokens
+            )
+        return self._chunker
+
+    def _load_manifest(self) -> Dict[str, Dict]:
+        """加载索引清单"""
+        if self.manifest_path.exists():
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self.manifest_embedding = data.get('embedding')
+                    return data['files']
+            except Exception as e:
+                print(f"⚠️  加载索引清单失败，将全量索引: {e}")
+
+        return {}
+
+    def _save_manifest(self):
+        """保存索引清单（先写临时文件再替换，避免中断时损坏）"""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'embedding': self.embedder.service.cache_id,
+                'updated_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'files': self.manifest
+            }, f, ensure_ascii=False)
+
+        tmp_path.replace(self.manifest_path)
+
     def scan_sources(self) -> List[Dict]:
         """
         扫描所有配置的源目录
 
         Returns:
-            文档信息列表
+            需要索引的（新增或修改过的）文档信息列表
         """
         all_docs = []
 
@@ -67,33 +159,9 @@ class DocumentIndexer:
 
         print(f"\n📚 扫描学习日志: {base_path}")
 
-        docs = []
-        patterns = source_config['patterns']
-        exclude_patterns = source_config.get('exclude_patterns', [])
-
-        for pattern in patterns:
-            matched_files = list(base_path.glob(pattern))
-
-            for file_path in tqdm(matched_files, desc=f"  扫描 {pattern}"):
-                # 检查排除规则
-                if self._should_exclude(file_path, exclude_patterns):
-                    continue
+        docs = self._scan_files(base_path, source_config, 'journal')
 
-                # 读取文件
-                content = self._read_file(file_path)
-                if content is None:
-                    continue
-
-                # 解析元数据
-                metadata = self._parse_metadata(file_path, content, 'journal')
-
-                docs.append({
-                    'content': content,
-                    'metadata': metadata,
-                    'file_path': file_path
-                })
-
-        print(f"   找到 {len(docs)} 个学习笔记文件")
+        print(f"   找到 {len(docs)} 个新增或修改的学习笔记文件")
         return docs
 
     def _scan_projects(self) -> List[Dict]:
@@ -107,6 +175,28 @@ class DocumentIndexer:
 
         print(f"\n💻 扫描项目代码: {base_path}")
 
+        docs = self._scan_files(base_path, source_config, 'project')
+
+        print(f"   找到 {len(docs)} 个新增或修改的项目文件")
+        return docs
+
+    def _scan_files(self, base_path: Path, source_config: Dict, doc_type: str) -> List[Dict]:
+        """
+        扫描一个源目录，只读取新增或修改过的文件
+
+        修改时间和大小与清单一致的文件不读取直接跳过；
+        修改时间变了但内容哈希不变的文件只更新清单。
+
+        Args:
+            base_path: 源目录
+            source_config: 源配置（patterns、exclude_patterns）
+            doc_type: 文档类型（journal / project）
+
+        Returns:
+            需要索引的文档列表
+        """
+        self._scanned_roots.append(base_path)
+
         docs = []
         patterns = source_config['patterns']
         exclude_patterns = source_config.get('exclude_patterns', [])
@@ -119,23 +209,53 @@ class DocumentIndexer:
                 if self._should_exclude(file_path, exclude_patterns):
                     continue
 
+                # 多个模式可能匹配同一文件
+                key = str(file_path)
+                if key in self._seen:
+                    continue
+                self._seen.add(key)
+
+                # 修改时间和大小都没变，跳过
+                stat = file_path.stat()
+                entry = self.manifest.get(key)
+                if entry and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+                    self.stats['skipped'] += 1
+                    continue
+
                 # 读取文件
                 content = self._read_file(file_path)
                 if content is None:
                     continue
 
+                # 内容没变（如仅被 touch 或 checkout），只更新清单
+                content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+                if entry and entry['hash'] == content_hash:
+                    entry.update(mtime=stat.st_mtime, size=stat.st_size)
+                    self.stats['skipped'] += 1
+                    continue
+
                 # 解析元数据
-                metadata = self._parse_metadata(file_path, content, 'project')
+                metadata = self._parse_metadata(file_path, content, doc_type)
 
                 docs.append({
                     'content': content,
                     'metadata': metadata,
-                    'file_path': file_path
+                    'file_path': file_path,
+                    'manifest': {
+                        'mtime': stat.st_mtime,
+                        'size': stat.st_size,
+                        'hash': content_hash,
+                        'id': self._doc_id(file_path)
+                    }
                 })
 
-        print(f"   找到 {len(docs)} 个项目文件")
         return docs
 
+    @staticmethod
+    def _doc_id(file_path: Path) -> str:
+        """生成文档ID（基于文件路径的哈希）"""
+        return hashlib.md5(str(file_path).encode()).hexdigest()
+
     def _should_exclude(self, file_path: Path, exclude_patterns: List[str]) -> bool:
         """检查文件是否应该被排除"""
         file_str = str(file_path)
@@ -187,100 +307,198 @@ class DocumentIndexer:
 
         return metadata
 
-    def index_documents(self, docs: List[Dict], batch_size: int = 32):
+    def index_documents(self, docs: List[Dict], batch_size: int = 32) -> Set[str]:
         """
-        批量索引文档
+        分块并批量索引文档
+
+        多个文档的片段合并后再嵌入，保证每个嵌入批次是满的；每组文档只查询一次
+        向量库获取已有片段，已有的批量更新，新的批量添加，多余的旧片段删除。
 
         Args:
             docs: 文档列表
-            batch_size: 批处理大小
+            batch_size: 嵌入批处理大小
+
+        Returns:
+            成功写入的文档ID集合
         """
         if not docs:
             print("⚠️  没有文档需要索引")
-            return
+            return set()
 
         print(f"\n🔄 开始索引 {len(docs)} 个文档...")
 
-        # 分批处理
-        for i in tqdm(range(0, len(docs), batch_size), desc="生成嵌入向量"):
-            batch = docs[i:i + batch_size]
-
-            # 提取内容
-            contents = [doc['content'] for doc in batch]
-            metadatas = [doc['metadata'] for doc in batch]
-
-            # 生成ID（基于文件路径的哈希）
-            ids = [hashlib.md5(str(doc['file_path']).encode()).hexdigest() for doc in batch]
-
-            # 生成嵌入
-            embeddings = self.embedder.embed_texts(contents)
-
-            # 检查是否已存在
-            existing_docs = []
-            new_contents = []
-            new_embeddings = []
-            new_metadatas = []
-            new_ids = []
-
-            for j, (content, emb, meta, doc_id) in enumerate(zip(contents, embeddings, metadatas, ids)):
-                existing = self.vector_store.get_document(doc_id)
-
-                # 如果已存在，更新
-                if existing:
-                    self.vector_store.update_document(
-                        doc_id=doc_id,
-                        document=content,
-                        embedding=emb,
-                        metadata=meta
-                    )
-                    self.stats['indexed'] += 1
-                else:
-                    # 新文档
-                    new_contents.append(content)
-                    new_embeddings.append(emb)
-                    new_metadatas.append(meta)
-                    new_ids.append(doc_id)
-
-            # 添加新文档
-            if new_contents:
-                self.vector_store.add_documents(
-                    documents=new_contents,
-                    embeddings=new_embeddings,
-                    metadatas=new_metadatas,
-                    ids=new_ids
-                )
-                self.stats['indexed'] += len(new_contents)
-
-    def build_index(self):
-        """构建完整索引"""
+        written = set()
+        group, group_chunks = [], 0
+
+        for doc in tqdm(docs, desc="生成嵌入向量"):
+            extension = doc['metadata'].get('extension') or Path(doc['file_path']).suffix
+            doc['chunks'] = self.chunker.chunk(doc['content'], extension)
+            group.append(doc)
+            group_chunks += len(doc['chunks'])
+
+            # 攒够若干个满批次再嵌入
+            if group_chunks >= batch_size * 4:
+                written.update(self._index_group(group))
+                group, group_chunks = [], 0
+
+        if group:
+            written.update(self._index_group(group))
+
+        self.stats['indexed'] += len(written)
+        self.stats['failed'] += len(docs) - len(written)
+        return written
+
+    def _index_group(self, docs: List[Dict]) -> Set[str]:
+        """
+        嵌入并写入一组文档的全部片段
+
+        Args:
+            docs: 已分块的文档列表（doc['chunks']）
+
+        Returns:
+            成功写入的文档ID集合
+        """
+        doc_ids = [self._doc_id(doc['file_path']) for doc in docs]
+
+        ids, contents, metadatas = [], [], []
+        for doc, doc_id in zip(docs, doc_ids):
+            for i, chunk in enumerate(doc['chunks']):
+                ids.append(f"{doc_id}#{i}")
+                contents.append(chunk['text'])
+                metadatas.append({
+                    **doc['metadata'],
+                    'doc_id': doc_id,
+                    'chunk_index': i,
+                    'chunk_count': len(doc['chunks']),
+                    'start': chunk['start'],
+                    'end': chunk['end'],
+                    'section': chunk['section']
+                })
+            if 'manifest' in doc:
+                doc['manifest']['chunks'] = len(doc['chunks'])
+
+        # 生成嵌入
+        embeddings = self.embedder.embed_texts(contents)
+
+        # 已有的片段，以及分块前整篇存储的旧记录（ID 即文档ID）
+        existing_ids = self.vector_store.get_existing_ids(where={'doc_id': {'$in': doc_ids}})
+        existing_ids |= self.vector_store.get_existing_ids(ids=doc_ids)
+
+        updates = {'ids': [], 'documents': [], 'embeddings': [], 'metadatas': []}
+        inserts = {'ids': [], 'documents': [], 'embeddings': [], 'metadatas': []}
+
+        for chunk_id, content, emb, meta in zip(ids, contents, embeddings, metadatas):
+            target = updates if chunk_id in existing_ids else inserts
+            target['ids'].append(chunk_id)
+            target['documents'].append(content)
+            target['embeddings'].append(emb)
+            target['metadatas'].append(meta)
+
+        ok = True
+        if updates['ids']:
+            ok = self.vector_store.update_documents(**updates) and ok
+        if inserts['ids']:
+            ok = self.vector_store.add_documents(**inserts) and ok
+
+        # 文档变短后多出来的旧片段
+        stale_ids = list(existing_ids - set(ids))
+        if stale_ids:
+            ok = self.vector_store.delete_documents(stale_ids) and ok
+
+        if not ok:
+            return set()
+
+        self.metadata_index.upsert(
+            (doc_id, doc['metadata'], len(doc['chunks'])) for doc, doc_id in zip(docs, doc_ids)
+        )
+        self.stats['chunks'] += len(ids)
+        return set(doc_ids)
+
+    def _purge_deleted(self) -> int:
+        """
+        清除已删除文件的向量和清单记录（只处理本次扫描过的源目录）
+
+        Returns:
+            删除的文档数
+        """
+        roots = [os.path.join(str(root), '') for root in self._scanned_roots]
+        deleted = [
+            key for key in self.manifest
+            if key not in self._seen and any(key.startswith(root) for root in roots)
+        ]
+        if not deleted:
+            return 0
+
+        ids = []
+        for key in deleted:
+            entry = self.manifest[key]
+            ids.extend(f"{entry['id']}#{i}" for i in range(entry.get('chunks', 0)))
+
+        if not self.vector_store.delete_documents(ids):
+            return 0
+
+        self.metadata_index.delete([self.manifest[key]['id'] for key in deleted])
+        for key in deleted:
+            del self.manifest[key]
+        return len(deleted)
+
+    def build_index(self, full: bool = False):
+        """
+        构建索引（默认增量）
+
+        Args:
+            full: 忽略索引清单，重新嵌入所有文件
+        """
         print("\n" + "=" * 70)
         print("🚀 开始构建学习记忆索引")
         print("=" * 70)
 
-        # 扫描文档
+        # 强制全量，向量库被清空过（清单已失效），或侧索引还没有建立
+        if full or (self.manifest and (self.vector_store.count() == 0 or self.metadata_index.count() == 0)):
+            self.manifest = {}
+
+        # 嵌入模型/后端变化后旧向量与新查询向量不可比，全部重新嵌入
+        embedding_id = self.embedder.service.cache_id
+        if self.manifest and self.manifest_embedding not in (None, embedding_id):
+            print(f"⚠️  嵌入模型已变更 ({self.manifest_embedding} → {embedding_id})，全量重建索引")
+            self.manifest = {}
+
+        if not self.manifest:
+            self.metadata_index.clear()
+
+        self._seen = set()
+        self._scanned_roots = []
+
+        # 扫描文档（只返回新增或修改过的）
         docs = self.scan_sources()
 
-        if not docs:
-            print("\n⚠️  未找到任何文档")
-            return
+        # 索引文档，写入成功的才记入清单（失败的下次重试）
+        if docs:
+            written = self.index_documents(docs)
+            for doc in docs:
+                if doc['manifest']['id'] in written:
+                    self.manifest[str(doc['file_path'])] = doc['manifest']
+
+        # 清除已删除的文件
+        self.stats['deleted'] += self._purge_deleted()
 
-        # 索引文档
-        self.index_documents(docs)
+        self._save_manifest()
 
         # 显示统计
         print("\n" + "=" * 70)
         print("📊 索引完成")
         print("=" * 70)
-        print(f"✅ 成功索引: {self.stats['indexed']} 个")
-        print(f"⏭️  跳过: {self.stats['skipped']} 个")
+        print(f"✅ 成功索引: {self.stats['indexed']} 个（{self.stats['chunks']} 个片段）")
+        print(f"⏭️  未变化跳过: {self.stats['skipped']} 个")
+        print(f"🗑️  已删除: {self.stats['deleted']} 个")
         print(f"❌ 失败: {self.stats['failed']} 个")
         print(f"\n📚 总文档数: {self.vector_store.count()}")
 
 
 def main():
-    """主函数"""
+    """主函数（--full 忽略索引清单全量重建）"""
     indexer = DocumentIndexer()
-    indexer.build_index()
+    indexer.build_index(full='--full' in sys.argv)
 
 
 if __name__ == "__main__":
@@ -3,29 +3,106 @@
 """
 学习记忆助手 - 主程序
 统一入口点，整合所有功能
+
+各功能组件在第一次使用时才导入和创建，嵌入模型和向量数据库
+也在第一次需要时才加载，不涉及语义搜索的命令可以立即启动。
 """
 
 import sys
+import time
+import threading
 from pathlib import Path
 
 # 添加当前目录到Python路径
 sys.path.insert(0, str(Path(__file__).parent))
 
-from indexer import DocumentIndexer
-from search import SemanticSearch
-from recommender import SmartRecommender
-from review_scheduler import ReviewScheduler
-
 
 class MemoryAgent:
     """学习记忆助手 - 你的第二大脑"""
 
-    def __init__(self):
-        """初始化助手"""
-        self.indexer = DocumentIndexer()
-        self.search_engine = SemanticSearch()
-        self.recommender = SmartRecommender()
-        self.scheduler = ReviewScheduler()
+    def __init__(self, warm_up: bool = False):
+        """
+        初始化助手（不加载任何组件）
+
+        Args:
+            warm_up: 是否在后台线程中提前加载嵌入模型和向量数据库
+        """
+        self._components = {}
+        self._lock = threading.RLock()
+
+        # 各阶段耗时（秒）
+        self.timings = {}
+
+        if warm_up:
+            self.warm_up(background=True)
+
+    def _component(self, name: str, factory):
+        """获取组件，首次访问时创建并记录耗时"""
+        if name not in self._components:
+            with self._lock:
+                if name not in self._components:
+                    start = time.perf_counter()
+                    self._components[name] = factory()
+                    self.timings[name] = time.perf_counter() - start
+        return self._components[name]
+
+    @property
+    def indexer(self):
+        """文档索引器"""
+        from indexer import DocumentIndexer
+        return self._component('indexer', DocumentIndexer)
+
+    @property
+    def search_engine(self):
+        """语义搜索引擎"""
+        from search import SemanticSearch
+        return self._component('search_engine', SemanticSearch)
+
+    @property
+    def recommender(self):
+        """智能推荐"""
+        from recommender import SmartRecommender
+        return self._component('recommender', SmartRecommender)
+
+    @property
+    def scheduler(self):
+        """复习调度器"""
+        from review_scheduler import ReviewScheduler
+        return self._component('scheduler', ReviewScheduler)
+
+    def warm_up(self, background: bool = True):
+        """
+        预热：加载嵌入模型并打开向量数据库
+
+        Args:
+            background: 是否在后台守护线程中执行
+
+        Returns:
+            后台线程（background=False 时返回 None）
+        """
+        def run():
+            try:
+                start = time.perf_counter()
+                self.search_engine.vector_store.collection
+                self.search_engine.embedder.model
+                self.timings['warm_up'] = time.perf_counter() - start
+            except Exception as e:
+                print(f"⚠️ 预热失败: {e}")
+
+        if not background:
+            run()
+            return None
+
+        thread = threading.Thread(target=run, name='memory-agent-warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def format_timings(self) -> str:
+        """格式化各阶段耗时"""
+        lines = ["⏱️  耗时统计:"]
+        for name, seconds in self.timings.items():
+            lines.append(f"   {name}: {seconds * 1000:.0f} ms")
+        return '\n'.join(lines)
 
     def build_index(self):
         """构建/更新索引"""
@@ -157,7 +234,7 @@ class MemoryAgent:
                 elif choice == '9':
                     stats = self.scheduler.format_statistics()
                     print(f"\n{stats}")
-                    print(f"\n📚 数据库文档数: {self.indexer.vector_store.count()}")
+                    print(f"\n📚 数据库文档数: {self.search_engine.vector_store.count()}")
 
                 else:
                     print("\n❌ 无效选项")
@@ -188,39 +265,57 @@ def print_banner():
 
 def main():
     """主函数"""
+    start = time.perf_counter()
+
     # 切换到脚本目录
     import os
     os.chdir(Path(__file__).parent)
 
+    # --timing: 结束时打印启动和各组件加载耗时
+    args = [arg for arg in sys.argv[1:] if arg != '--timing']
+    show_timing = len(args) != len(sys.argv) - 1
+
     print_banner()
 
-    agent = MemoryAgent()
+    # 交互模式下用户阅读菜单时在后台加载模型
+    agent = MemoryAgent(warm_up=not args)
+    agent.timings['startup'] = time.perf_counter() - start
+
+    try:
+        run_command(agent, args)
+    finally:
+        if show_timing:
+            agent.timings['total'] = time.perf_counter() - start
+            print(agent.format_timings())
+
 
+def run_command(agent: MemoryAgent, args):
+    """执行命令行参数对应的命令，没有参数时进入交互模式"""
     # 命令行模式
-    if len(sys.argv) > 1:
-        command = sys.argv[1]
+    if args:
+        command = args[0]
 
         if command == "index":
             agent.build_index()
 
-        elif command == "search" and len(sys.argv) > 2:
-            query = ' '.join(sys.argv[2:])
+        elif command == "search" and len(args) > 1:
+            query = ' '.join(args[1:])
             agent.search(query)
 
-        elif command == "code" and len(sys.argv) > 2:
-            query = ' '.join(sys.argv[2:])
+        elif command == "code" and len(args) > 1:
+            query = ' '.join(args[1:])
             agent.search_code(query)
 
-        elif command == "note" and len(sys.argv) > 2:
-            query = ' '.join(sys.argv[2:])
+        elif command == "note" and len(args) > 1:
+            query = ' '.join(args[1:])
             agent.search_notes(query)
 
-        elif command == "similar" and len(sys.argv) > 2:
-            problem = ' '.join(sys.argv[2:])
+        elif command == "similar" and len(args) > 1:
+            problem = ' '.join(args[1:])
             agent.find_similar(problem)
 
-        elif command == "path" and len(sys.argv) > 2:
-            topic = ' '.join(sys.argv[2:])
+        elif command == "path" and len(args) > 1:
+            topic = ' '.join(args[1:])
             agent.get_learning_path(topic)
 
         elif command == "review":
@@ -240,6 +335,7 @@ def main():
             print("  学习路径: python memory_agent.py path <主题>")
             print("  今日复习: python memory_agent.py review")
             print("  交互复习: python memory_agent.py interactive")
+            print("  显示耗时: 在任意命令后加 --timing")
 
     else:
         # 交互模式
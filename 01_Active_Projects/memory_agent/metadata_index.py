@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+元数据侧索引
+每个文档一行（类型、扩展名、分类、修改时间、片段数），存在 SQLite 中并建有索引，
+由 DocumentIndexer 与向量库同步维护。
+
+过滤条件很有选择性时（如"上周的 Python 文件"），先在这里用 SQL 找出符合条件的
+文档，再只对这些文档的片段精确计算相似度，避免向量库在带过滤的近似搜索中
+大量扫描或返回不足 top_k 条结果。
+
+过滤条件使用与 ChromaDB where 相同的写法，支持:
+    {'extension': '.py'}
+    {'modified_timestamp': {'$gte': 1700000000.0, '$lte': 1700600000.0}}
+    {'$and': [...]} / {'$or': [...]}
+    以及 $eq $ne $gt $gte $lt $lte $in $nin
+"""
+
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 可以在侧索引中求值的元数据字段
+COLUMNS = ('type', 'extension', 'category', 'modified_timestamp')
+
+OPERATORS = {
+    '$eq': '=', '$ne': '!=', '$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<='
+}
+
+
+def metadata_index_path(config: Dict, workspace_root: Path) -> Path:
+    """
+    侧索引文件位置（vector_db.metadata_index_path，默认与索引清单同目录）
+
+    Args:
+        config: config.yaml 内容
+        workspace_root: 工作区根目录
+
+    Returns:
+        SQLite 文件路径
+    """
+    db_config = config['vector_db']
+    path = db_config.get(
+        'metadata_index_path',
+        str(Path(db_config['persist_directory']).parent / "metadata_index.db")
+    )
+    return workspace_root / path
+
+
+class MetadataIndex:
+    """文档元数据 SQLite 索引"""
+
+    def __init__(self, db_path: Path):
+        """
+        打开（必要时创建）侧索引
+
+        Args:
+            db_path: SQLite 文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS documents (
+                doc_id TEXT PRIMARY KEY,
+                path TEXT,
+                type TEXT,
+                extension TEXT,
+                category TEXT,
+                modified_timestamp REAL,
+                chunks INTEGER NOT NULL DEFAULT 1
+            );
+            CREATE INDEX IF NOT EXISTS idx_documents_modified ON documents (modified_timestamp);
+            CREATE INDEX IF NOT EXISTS idx_documents_extension ON documents (extension, modified_timestamp);
+            CREATE INDEX IF NOT EXISTS idx_documents_type ON documents (type, modified_timestamp);
+            CREATE INDEX IF NOT EXISTS idx_documents_category ON documents (category, modified_timestamp);
+        ''')
+
+    # ========== 维护 ==========
+
+    def upsert(self, records: Iterable[Tuple[str, Dict, int]]):
+        """
+        写入或更新文档
+
+        Args:
+            records: [(文档ID, 元数据, 片段数), ...]
+        """
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (doc_id, metadata.get('path'), metadata.get('type'), metadata.get('extension'),
+                     metadata.get('category'), metadata.get('modified_timestamp'), chunks)
+                    for doc_id, metadata, chunks in records
+                ]
+            )
+
+    def delete(self, doc_ids: List[str]):
+        """删除文档"""
+        with self.conn:
+            self.conn.executemany('DELETE FROM documents WHERE doc_id = ?', [(doc_id,) for doc_id in doc_ids])
+
+    def clear(self):
+        """清空索引（全量重建前）"""
+        with self.conn:
+            self.conn.execute('DELETE FROM documents')
+
+    def count(self) -> int:
+        """文档数"""
+        return self.conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+    # ========== 查询 ==========
+
+    def compile(self, where: Dict) -> Optional[Tuple[str, List]]:
+        """
+        把 ChromaDB where 条件编译为 SQL
+
+        Args:
+            where: where 条件
+
+        Returns:
+            (SQL 条件, 参数)；包含侧索引没有的字段或不支持的运算时返回 None
+        """
+        clauses, params = [], []
+        for key, value in where.items():
+            if key in ('$and', '$or'):
+                parts = [self.compile(item) for item in value]
+                if not parts or any(part is None for part in parts):
+                    return None
+                joiner = ' AND ' if key == '$and' else ' OR '
+                clauses.append('(' + joiner.join(sql for sql, _ in parts) + ')')
+                for _, part_params in parts:
+                    params.extend(part_params)
+            elif key in COLUMNS:
+                compiled = self._compile_field(key, value)
+                if compiled is None:
+                    return None
+                clauses.append(compiled[0])
+                params.extend(compiled[1])
+            else:
+                return None
+
+        if not clauses:
+            return None
+        return ' AND '.join(clauses), params
+
+    def _compile_field(self, column: str, condition) -> Optional[Tuple[str, List]]:
+        if not isinstance(condition, dict):
+            return f'{column} = ?', [condition]
+
+        clauses, params = [], []
+        for operator, value in condition.items():
+            if operator in OPERATORS:
+                clauses.append(f'{column} {OPERATORS[operator]} ?')
+                params.append(value)
+            elif operator in ('$in', '$nin') and isinstance(value, list) and value:
+                negate = 'NOT ' if operator == '$nin' else ''
+                clauses.append(f"{column} {negate}IN ({','.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                return None
+        return ' AND '.join(clauses), params
+
+    def estimate(self, where: Dict) -> Optional[Tuple[int, int]]:
+        """
+        估算过滤条件命中的规模
+
+        Args:
+            where: where 条件
+
+        Returns:
+            (文档数, 片段数)；条件无法在侧索引中求值时返回 None
+        """
+        compiled = self.compile(where)
+        if compiled is None:
+            return None
+        docs, chunks = self.conn.execute(
+            f'SELECT COUNT(*), COALESCE(SUM(chunks), 0) FROM documents WHERE {compiled[0]}', compiled[1]
+        ).fetchone()
+        return docs, chunks
+
+    def select_chunk_ids(self, where: Dict, max_chunks: int) -> Optional[List[str]]:
+        """
+        找出符合条件的文档的全部片段ID（条件足够有选择性时）
+
+        Args:
+            where: where 条件
+            max_chunks: 片段数上限，超过时返回 None（应交给向量库过滤）
+
+        Returns:
+            片段ID列表（"<文档ID>#<序号>"）；不适合走侧索引时返回 None
+        """
+        estimate = self.estimate(where)
+        if estimate is None or estimate[1] > max_chunks:
+            return None
+
+        sql, params = self.compile(where)
+        rows = self.conn.execute(f'SELECT doc_id, chunks FROM documents WHERE {sql}', params).fetchall()
+
+        return [f"{doc_id}#{i}" for doc_id, chunks in rows for i in range(chunks)]
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
@@ -3,6 +3,9 @@
 """
 智能推荐模块
 提供相似问题关联和智能推荐
+
+文档之间的关联直接用向量库中已存的向量批量查询（VectorStore.query_by_ids），
+查询文本的向量经嵌入服务的进程内 LRU 复用。
 """
 
 import yaml
@@ -43,10 +46,10 @@ class SmartRecommender:
             - similarity: 相似度
         """
         # 生成查询向量
-        query_embedding = self.embedder.embed_text(problem_desc)
+        query_embedding = self.embedder.embed_query(problem_desc)
 
         # 搜索（优先查找challenges_solved）
-        results = self.vector_store.search(
+        results = self.vector_store.search_documents(
             query_embedding=query_embedding,
             top_k=top_k * 2
         )
@@ -79,33 +82,33 @@ class SmartRecommender:
         Returns:
             相关文档列表
         """
-        # 获取文档
-        doc = self.vector_store.get_document(doc_id)
-        if not doc:
-            return []
+        return self.relate_many([doc_id], top_k=top_k).get(doc_id, [])
 
-        # 使用文档内容进行搜索
-        query_embedding = self.embedder.embed_text(doc['document'])
+    def relate_many(self, doc_ids: List[str], top_k: int = 5) -> Dict[str, List[Dict]]:
+        """
+        批量查找相关文档（使用库中已存的向量，不重新编码，一次查询）
 
-        # 搜索相似文档（排除自己）
-        results = self.vector_store.search(
-            query_embedding=query_embedding,
-            top_k=top_k + 1
-        )
+        Args:
+            doc_ids: 文档ID列表
+            top_k: 每个文档返回的结果数
 
-        # 移除自己并格式化
-        related_docs = []
-        for result in results:
-            if result['id'] != doc_id:
-                similarity = 1 - result['distance']
-                related_docs.append({
+        Returns:
+            {文档ID: 相关文档列表}，不存在的文档不出现
+        """
+        related = self.vector_store.query_by_ids(doc_ids, top_k=top_k)
+
+        return {
+            doc_id: [
+                {
                     'content': result['document'],
                     'metadata': result['metadata'],
-                    'similarity': similarity,
+                    'similarity': 1 - result['distance'],
                     'id': result['id']
-                })
-
-        return related_docs[:top_k]
+                }
+                for result in results
+            ]
+            for doc_id, results in related.items()
+        }
 
     def get_learning_path(self, topic: str, depth: int = 2) -> Dict:
         """
@@ -119,8 +122,8 @@ class SmartRecommender:
             学习路径字典
         """
         # 搜索相关文档
-        query_embedding = self.embedder.embed_text(topic)
-        results = self.vector_store.search(
+        query_embedding = self.embedder.embed_query(topic)
+        results = self.vector_store.search_documents(
             query_embedding=query_embedding,
             top_k=10
         )
@@ -132,29 +135,34 @@ class SmartRecommender:
                 'path': []
             }
 
+        # 只包含高相关性文档
+        steps = [
+            (i, result) for i, result in enumerate(results[:5])
+            if 1 - result['distance'] > 0.5
+        ]
+
+        # 一次批量查询所有步骤的相关文档
+        related_by_id = self.relate_many([result['id'] for _, result in steps], top_k=2)
+
         # 构建学习路径
         path = []
-        for i, result in enumerate(results[:5]):
+        for i, result in steps:
             similarity = 1 - result['distance']
-
-            # 只包含高相关性文档
-            if similarity > 0.5:
-                # 查找相关文档
-                related = self.relate_documents(result['id'], top_k=2)
-
-                path.append({
-                    'order': i + 1,
-                    'title': result['metadata'].get('title', 'N/A'),
-                    'path': result['metadata'].get('path', 'N/A'),
-                    'similarity': similarity,
-                    'related': [
-                        {
-                            'title': r['metadata'].get('title', 'N/A'),
-                            'path': r['metadata'].get('path', 'N/A')
-                        }
-                        for r in related
-                    ]
-                })
+            related = related_by_id.get(result['id'], [])
+
+            path.append({
+                'order': i + 1,
+                'title': result['metadata'].get('title', 'N/A'),
+                'path': result['metadata'].get('path', 'N/A'),
+                'similarity': similarity,
+                'related': [
+                    {
+                        'title': r['metadata'].get('title', 'N/A'),
+                        'path': r['metadata'].get('path', 'N/A')
+                    }
+                    for r in related
+                ]
+            })
 
         return {
             'topic': topic,
@@ -3,16 +3,61 @@
 """
 复习调度器
 使用间隔重复算法（Spaced Repetition）智能提醒复习
+
+复习记录存在 SQLite（review_store.ReviewStore）中并按下次复习时间建索引，
+到期条目用一次范围查询取出，文档内容用一次批量查询读取。
+评分按 SM-2 算法更新易度因子和间隔。
 """
 
 import yaml
-import json
+import time
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict
 
+from review_store import ReviewStore, format_time
 from vector_store import VectorStore
 
+DAY_SECONDS = 86400
+
+MIN_EASE_FACTOR = 1.3
+
+
+def sm2(record: Dict, quality: int, intervals: List[int]) -> Dict:
+    """
+    SM-2 算法：根据评分计算新的重复次数、间隔和易度因子
+
+    前两次答对的间隔取 intervals[0]、intervals[1]，之后每次乘以易度因子，
+    不超过 intervals[-1]；评分低于 3 时重新从第一个间隔开始。
+
+    Args:
+        record: 复习记录（需要 repetitions, interval_days, ease_factor）
+        quality: 复习质量评分（0-5）
+        intervals: 配置的间隔表（天）
+
+    Returns:
+        {'repetitions', 'interval_days', 'ease_factor'}
+    """
+    ease_factor = record['ease_factor'] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    ease_factor = max(MIN_EASE_FACTOR, ease_factor)
+
+    if quality < 3:
+        repetitions = 0
+        interval_days = intervals[0]
+    else:
+        repetitions = record['repetitions'] + 1
+        if repetitions == 1:
+            interval_days = intervals[0]
+        elif repetitions == 2:
+            interval_days = intervals[min(1, len(intervals) - 1)]
+        else:
+            interval_days = round(min(record['interval_days'] * ease_factor, intervals[-1]), 2)
+
+    return {
+        'repetitions': repetitions,
+        'interval_days': interval_days,
+        'ease_factor': round(ease_factor, 4)
+    }
+
 
 class ReviewScheduler:
     """复习调度系统 - 基于间隔重复算法"""
@@ -31,32 +76,16 @@ class ReviewScheduler:
         self.intervals = self.config['review']['intervals']
         self.daily_limit = self.config['review']['daily_limit']
 
-        # 复习记录文件
-        self.review_db_path = self.workspace_root / "06_Learning_Journal" / "workspace_memory" / "review_schedule.json"
-
-        # 加载复习记录
-        self.review_records = self._load_review_records()
-
-    def _load_review_records(self) -> Dict:
-        """加载复习记录"""
-        if self.review_db_path.exists():
-            try:
-                with open(self.review_db_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"⚠️  加载复习记录失败: {e}")
-
-        return {
-            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'records': {}
-        }
-
-    def _save_review_records(self):
-        """保存复习记录"""
-        self.review_db_path.parent.mkdir(parents=True, exist_ok=True)
-
-        with open(self.review_db_path, 'w', encoding='utf-8') as f:
-            json.dump(self.review_records, f, ensure_ascii=False, indent=2)
+        # 复习记录库（旧版 JSON 记录在首次创建时导入）
+        memory_dir = self.workspace_root / "06_Learning_Journal" / "workspace_memory"
+        self.review_db_path = self.workspace_root / self.config['review'].get(
+            'db_path', "06_Learning_Journal/workspace_memory/review_schedule.db"
+        )
+        self.store = ReviewStore(
+            self.review_db_path,
+            legacy_json=memory_dir / "review_schedule.json",
+            intervals=self.intervals
+        )
 
     def add_to_review(self, doc_id: str, initial_interval: int = 0):
         """
@@ -66,23 +95,21 @@ class ReviewScheduler:
             doc_id: 文档ID
             initial_interval: 初始间隔（天数）
         """
-        if doc_id in self.review_records['records']:
-            print(f"⚠️  文档已在复习队列中")
-            return
-
-        now = datetime.now()
-        next_review = now + timedelta(days=initial_interval)
-
-        self.review_records['records'][doc_id] = {
-            'interval_index': 0,
-            'review_count': 0,
-            'last_review': now.strftime("%Y-%m-%d %H:%M:%S"),
-            'next_review': next_review.strftime("%Y-%m-%d %H:%M:%S"),
+        now = time.time()
+        added = self.store.add({
+            'doc_id': doc_id,
+            'repetitions': 0,
+            'interval_days': initial_interval,
             'ease_factor': 2.5,  # SM-2算法的易度因子
-            'created_at': now.strftime("%Y-%m-%d %H:%M:%S")
-        }
+            'review_count': 0,
+            'last_review': now,
+            'next_review': now + initial_interval * DAY_SECONDS,
+            'created_at': now
+        })
 
-        self._save_review_records()
+        if not added:
+            print(f"⚠️  文档已在复习队列中")
+            return
         print(f"✅ 已添加到复习队列")
 
     def mark_reviewed(self, doc_id: str, quality: int = 4):
@@ -99,103 +126,85 @@ class ReviewScheduler:
                     1: 错误且无印象
                     0: 完全忘记
         """
-        if doc_id not in self.review_records['records']:
+        record = self.store.get(doc_id)
+        if record is None:
             print(f"❌ 文档不在复习队列中")
             return
 
-        record = self.review_records['records'][doc_id]
-
         # 使用SM-2算法计算下次复习时间
-        # 简化版：根据质量评分调整间隔
-        if quality >= 3:
-            # 答对了，推进到下一个间隔
-            record['interval_index'] = min(
-                record['interval_index'] + 1,
-                len(self.intervals) - 1
-            )
-            record['ease_factor'] = max(1.3, record['ease_factor'] + 0.1)
-        else:
-            # 答错了，重置间隔
-            record['interval_index'] = 0
-            record['ease_factor'] = max(1.3, record['ease_factor'] - 0.2)
-
-        # 计算下次复习时间
-        interval_days = self.intervals[record['interval_index']]
-        next_review = datetime.now() + timedelta(days=interval_days)
-
-        record['review_count'] += 1
-        record['last_review'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        record['next_review'] = next_review.strftime("%Y-%m-%d %H:%M:%S")
+        schedule = sm2(record, quality, self.intervals)
+
+        now = time.time()
+        self.store.update(
+            doc_id,
+            review_count=record['review_count'] + 1,
+            last_review=now,
+            next_review=now + schedule['interval_days'] * DAY_SECONDS,
+            **schedule
+        )
+        print(f"✅ 复习完成，{schedule['interval_days']:g}天后再次复习")
 
-        self._save_review_records()
-        print(f"✅ 复习完成，{interval_days}天后再次复习")
+    def _review_info(self, record: Dict) -> Dict:
+        """复习记录转为显示用字典（时间为字符串）"""
+        info = dict(record)
+        for field in ('last_review', 'next_review', 'created_at'):
+            info[field] = format_time(record[field])
+        return info
 
     def get_due_reviews(self) -> List[Dict]:
         """
-        获取到期需要复习的文档
+        获取到期需要复习的文档（逾期最久的优先）
 
         Returns:
             待复习文档列表
         """
-        now = datetime.now()
+        now = time.time()
         due_docs = []
+        after = None
 
-        for doc_id, record in self.review_records['records'].items():
-            next_review = datetime.strptime(record['next_review'], "%Y-%m-%d %H:%M:%S")
+        # 已从向量库删除的文档跳过，继续取下一页直到凑够每日上限
+        while len(due_docs) < self.daily_limit:
+            records = self.store.due(now, self.daily_limit - len(due_docs), after)
+            if not records:
+                break
+            after = (records[-1]['next_review'], records[-1]['doc_id'])
 
-            if next_review <= now:
-                # 获取文档详情
-                doc = self.vector_store.get_document(doc_id)
+            # 获取文档详情
+            documents = self.vector_store.get_documents([record['doc_id'] for record in records])
+            for record in records:
+                doc = documents.get(record['doc_id'])
                 if doc:
                     due_docs.append({
-                        'id': doc_id,
+                        'id': record['doc_id'],
                         'metadata': doc['metadata'],
                         'content': doc['document'],
-                        'review_info': record
+                        'review_info': self._review_info(record)
                     })
 
-        # 按优先级排序（ overdue 最长优先）
-        due_docs.sort(
-            key=lambda x: datetime.strptime(x['review_info']['last_review'], "%Y-%m-%d %H:%M:%S")
-        )
-
-        return due_docs[:self.daily_limit]
+        return due_docs
 
     def get_all_reviews(self) -> List[Dict]:
         """获取所有复习记录"""
-        all_reviews = []
-
-        for doc_id, record in self.review_records['records'].items():
-            doc = self.vector_store.get_document(doc_id)
-            if doc:
-                all_reviews.append({
-                    'id': doc_id,
-                    'metadata': doc['metadata'],
-                    'review_info': record
-                })
-
-        return all_reviews
+        records = self.store.all()
+        documents = self.vector_store.get_documents([record['doc_id'] for record in records])
+
+        return [
+            {
+                'id': record['doc_id'],
+                'metadata': documents[record['doc_id']]['metadata'],
+                'review_info': self._review_info(record)
+            }
+            for record in records if record['doc_id'] in documents
+        ]
 
     def get_statistics(self) -> Dict:
         """获取复习统计信息"""
-        now = datetime.now()
-        total = len(self.review_records['records'])
-        due_count = 0
-        overdue_count = 0
-
-        for record in self.review_records['records'].values():
-            next_review = datetime.strptime(record['next_review'], "%Y-%m-%d %H:%M:%S")
-
-            if next_review <= now:
-                due_count += 1
-
-            if next_review < now:
-                overdue_count += 1
+        now = time.time()
 
         return {
-            'total_items': total,
-            'due_today': due_count,
-            'overdue': overdue_count,
+            'total_items': self.store.count(),
+            'due_today': self.store.count(due_before=now),
+            'overdue': self.store.count(due_before=now, strict=True),
             'intervals': self.intervals
         }
 
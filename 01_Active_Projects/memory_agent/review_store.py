@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+复习记录存储
+每个复习条目一行，存在 SQLite 中并按下次复习时间建索引。
+
+时间以 Unix 时间戳（秒）存储，取到期条目只需要一次索引范围查询，
+不解析日期字符串、不扫描全部记录；评分后只更新一行。
+
+旧版的 review_schedule.json 在数据库第一次创建时自动导入（原文件保留）。
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+FIELDS = ('doc_id', 'repetitions', 'interval_days', 'ease_factor', 'review_count',
+          'last_review', 'next_review', 'created_at')
+
+
+def format_time(timestamp: Optional[float]) -> str:
+    """时间戳转为显示用字符串"""
+    if timestamp is None:
+        return 'N/A'
+    return datetime.fromtimestamp(timestamp).strftime(TIME_FORMAT)
+
+
+class ReviewStore:
+    """复习记录 SQLite 存储"""
+
+    def __init__(self, db_path: Path, legacy_json: Optional[Path] = None, intervals: Optional[List[int]] = None):
+        """
+        打开（必要时创建）复习记录库
+
+        Args:
+            db_path: SQLite 文件路径
+            legacy_json: 旧版 JSON 记录文件（数据库新建时导入）
+            intervals: 旧版记录的间隔表（把 interval_index 换算为天数）
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        created = not self.db_path.exists()
+
+        # Web 界面在多个线程中共用同一个调度器
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS reviews (
+                doc_id TEXT PRIMARY KEY,
+                repetitions INTEGER NOT NULL DEFAULT 0,
+                interval_days REAL NOT NULL DEFAULT 0,
+                ease_factor REAL NOT NULL DEFAULT 2.5,
+                review_count INTEGER NOT NULL DEFAULT 0,
+                last_review REAL,
+                next_review REAL NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_reviews_next ON reviews (next_review, doc_id);
+        ''')
+
+        if created and legacy_json is not None and Path(legacy_json).exists():
+            self._import_json(Path(legacy_json), intervals or [1])
+
+    def _import_json(self, path: Path, intervals: List[int]):
+        """导入旧版 JSON 复习记录"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                records = json.load(f).get('records', {})
+        except Exception as e:
+            print(f"⚠️  导入旧复习记录失败: {e}")
+            return
+
+        def parse(value):
+            return datetime.strptime(value, TIME_FORMAT).timestamp() if value else None
+
+        rows = []
+        for doc_id, record in records.items():
+            index = min(record.get('interval_index', 0), len(intervals) - 1)
+            rows.append({
+                'doc_id': doc_id,
+                'repetitions': record.get('interval_index', 0),
+                'interval_days': intervals[index],
+                'ease_factor': record.get('ease_factor', 2.5),
+                'review_count': record.get('review_count', 0),
+                'last_review': parse(record.get('last_review')),
+                'next_review': parse(record['next_review']),
+                'created_at': parse(record.get('created_at')) or parse(record['next_review']),
+            })
+        self.upsert(rows)
+        print(f"✅ 已导入 {len(rows)} 条旧复习记录: {path.name}")
+
+    # ========== 维护 ==========
+
+    def add(self, record: Dict) -> bool:
+        """
+        新增条目
+
+        Args:
+            record: 包含 FIELDS 中字段的记录
+
+        Returns:
+            是否新增（已存在时返回 False）
+        """
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                f"INSERT OR IGNORE INTO reviews ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+                [record[field] for field in FIELDS]
+            )
+        return cursor.rowcount > 0
+
+    def upsert(self, records: Iterable[Dict]):
+        """批量写入或覆盖条目"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO reviews ({', '.join(FIELDS)}) VALUES ({', '.join('?' * len(FIELDS))})",
+                [[record[field] for field in FIELDS] for record in records]
+            )
+
+    def update(self, doc_id: str, **values):
+        """更新一个条目的部分字段"""
+        columns = ', '.join(f'{key} = ?' for key in values)
+        with self.lock, self.conn:
+            self.conn.execute(f'UPDATE reviews SET {columns} WHERE doc_id = ?', [*values.values(), doc_id])
+
+    def delete(self, doc_ids: List[str]):
+        """删除条目"""
+        with self.lock, self.conn:
+            self.conn.executemany('DELETE FROM reviews WHERE doc_id = ?', [(doc_id,) for doc_id in doc_ids])
+
+    # ========== 查询 ==========
+
+    def get(self, doc_id: str) -> Optional[Dict]:
+        """读取一个条目"""
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(FIELDS)} FROM reviews WHERE doc_id = ?", (doc_id,)
+            ).fetchone()
+        return dict(zip(FIELDS, row)) if row else None
+
+    def due(self, now: float, limit: int, after: Optional[tuple] = None) -> List[Dict]:
+        """
+        按下次复习时间升序取到期条目（索引范围扫描，最多读 limit 行）
+
+        Args:
+            now: 当前时间戳
+            limit: 条数上限
+            after: 上一页最后一条的 (next_review, doc_id)，用于继续翻页
+
+        Returns:
+            条目列表
+        """
+        sql = f"SELECT {', '.join(FIELDS)} FROM reviews WHERE next_review <= ?"
+        params = [now]
+        if after is not None:
+            sql += ' AND (next_review, doc_id) > (?, ?)'
+            params.extend(after)
+        sql += ' ORDER BY next_review, doc_id LIMIT ?'
+        params.append(limit)
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [dict(zip(FIELDS, row)) for row in rows]
+
+    def all(self) -> List[Dict]:
+        """全部条目（按下次复习时间排序）"""
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {', '.join(FIELDS)} FROM reviews ORDER BY next_review, doc_id"
+            ).fetchall()
+        return [dict(zip(FIELDS, row)) for row in rows]
+
+    def count(self, due_before: Optional[float] = None, strict: bool = False) -> int:
+        """
+        条目数
+
+        Args:
+            due_before: 只统计下次复习时间不晚于该时间戳的条目
+            strict: 为 True 时统计早于（不含等于）该时间戳的条目
+        """
+        with self.lock:
+            if due_before is None:
+                return self.conn.execute('SELECT COUNT(*) FROM reviews').fetchone()[0]
+            operator = '<' if strict else '<='
+            return self.conn.execute(
+                f'SELECT COUNT(*) FROM reviews WHERE next_review {operator} ?', (due_before,)
+            ).fetchone()[0]
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
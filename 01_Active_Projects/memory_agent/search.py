@@ -3,6 +3,13 @@
 """
 语义搜索模块
 提供智能的语义搜索功能
+
+带元数据过滤（where）的搜索有两种执行方式：
+- 过滤条件很有选择性时，先在元数据侧索引中用 SQL 找出候选片段，再精确计算相似度
+- 否则把条件下推给向量库，在近似搜索中过滤
+
+多个查询可用 search_many 一起提交：查询一次编码（进程内 LRU 命中的不再编码），
+向量库只收到一次 query 请求。
 """
 
 import yaml
@@ -10,6 +17,7 @@ from pathlib import Path
 from typing import List, Dict, Optional
 
 from embedder import TextEmbedder
+from metadata_index import MetadataIndex, metadata_index_path
 from vector_store import VectorStore
 
 
@@ -31,12 +39,28 @@ class SemanticSearch:
         self.top_k = self.config['search']['top_k']
         self.similarity_threshold = self.config['search']['similarity_threshold']
 
+        # 候选片段不超过该数量时走侧索引精确搜索
+        self.exact_search_max_chunks = self.config['search'].get('exact_search_max_chunks', 2000)
+        self._metadata_index_path = metadata_index_path(self.config, Path(__file__).parent.parent.parent)
+        self._metadata_index = None
+
+        # 最近一次搜索的执行方式: 'vector' / 'vector_where' / 'metadata_index'
+        self.last_plan = None
+
+    @property
+    def metadata_index(self) -> Optional[MetadataIndex]:
+        """元数据侧索引（尚未由索引器建立时为 None）"""
+        if self._metadata_index is None and self._metadata_index_path.exists():
+            self._metadata_index = MetadataIndex(self._metadata_index_path)
+        return self._metadata_index
+
     def search(
         self,
         query: str,
         top_k: Optional[int] = None,
         filter_type: Optional[str] = None,
-        min_similarity: Optional[float] = None
+        min_similarity: Optional[float] = None,
+        where: Optional[Dict] = None
     ) -> List[Dict]:
         """
         语义搜索
@@ -46,32 +70,64 @@ class SemanticSearch:
             top_k: 返回结果数（默认使用配置文件中的值）
             filter_type: 过滤文档类型 ('journal', 'project', None)
             min_similarity: 最小相似度阈值
+            where: ChromaDB 元数据过滤条件（如 {'extension': {'$in': ['.py']}}）
+
+        Returns:
+            搜索结果列表（同一文档的多个片段命中合并为一条，
+            content 为最相关的片段，chunk 为其在原文中的位置）
+        """
+        return self.search_many([query], top_k, filter_type, min_similarity, where)[0]
+
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: Optional[int] = None,
+        filter_type: Optional[str] = None,
+        min_similarity: Optional[float] = None,
+        where: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        """
+        批量语义搜索（同一组过滤条件）
+
+        Args:
+            queries: 搜索查询列表
+            top_k: 每个查询返回的结果数（默认使用配置文件中的值）
+            filter_type: 过滤文档类型 ('journal', 'project', None)
+            min_similarity: 最小相似度阈值
+            where: ChromaDB 元数据过滤条件
 
         Returns:
-            搜索结果列表
+            与 queries 顺序一致的结果列表，每项格式同 search
         """
-        if not query.strip():
-            return []
+        outputs = [[] for _ in queries]
+        active = [i for i, query in enumerate(queries) if query.strip()]
+        if not active:
+            return outputs
 
         # 生成查询向量
-        query_embedding = self.embedder.embed_text(query)
+        query_embeddings = self.embedder.embed_queries([queries[i] for i in active])
 
         # 设置参数
         k = top_k or self.top_k
         threshold = min_similarity or self.similarity_threshold
 
         # 构建过滤条件
+        conditions = ([{'type': filter_type}] if filter_type else []) + ([where] if where else [])
         filter_dict = None
-        if filter_type:
-            filter_dict = {'type': filter_type}
-
-        # 搜索
-        results = self.vector_store.search(
-            query_embedding=query_embedding,
-            top_k=k * 2,  # 获取更多结果，后续过滤
-            filter=filter_dict
-        )
+        if len(conditions) == 1:
+            filter_dict = conditions[0]
+        elif conditions:
+            filter_dict = {'$and': conditions}
+
+        # 搜索（片段命中按文档合并），获取更多结果，后续过滤
+        batch = self._execute(query_embeddings, k * 2, filter_dict)
+
+        for i, results in zip(active, batch):
+            outputs[i] = self._format(results, k, threshold)
+        return outputs
 
+    def _format(self, results: List[Dict], k: int, threshold: float) -> List[Dict]:
+        """距离转换为相似度，过滤低于阈值的结果并取前 k 个"""
         # 计算相似度并过滤
         formatted_results = []
         for result in results:
@@ -83,13 +139,38 @@ class SemanticSearch:
                     'content': result['document'],
                     'metadata': result['metadata'],
                     'similarity': similarity,
-                    'id': result['id']
+                    'id': result['id'],
+                    'chunk': result['chunk']
                 })
 
         # 按相似度排序并返回top_k
         formatted_results.sort(key=lambda x: x['similarity'], reverse=True)
         return formatted_results[:k]
 
+    def _execute(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int,
+        filter_dict: Optional[Dict]
+    ) -> List[List[Dict]]:
+        """选择执行方式并搜索（每个查询一个结果列表）"""
+        if filter_dict is None:
+            self.last_plan = 'vector'
+            return self.vector_store.search_many(query_embeddings, top_k=top_k)
+
+        index = self.metadata_index
+        if index is not None and index.count() > 0:
+            chunk_ids = index.select_chunk_ids(filter_dict, self.exact_search_max_chunks)
+            if chunk_ids is not None:
+                self.last_plan = 'metadata_index'
+                return [
+                    self.vector_store.search_ids(query_embedding, chunk_ids, top_k=top_k)
+                    for query_embedding in query_embeddings
+                ]
+
+        self.last_plan = 'vector_where'
+        return self.vector_store.search_many(query_embeddings, top_k=top_k, filter=filter_dict)
+
     def search_code(self, query: str, top_k: int = 5) -> List[Dict]:
         """
         搜索代码片段
@@ -151,6 +232,9 @@ class SemanticSearch:
             title = metadata.get('title', 'N/A')
             output.append(f"\n{i}. {title}")
             output.append(f"   📁 {metadata.get('path', 'N/A')}")
+            section = result.get('chunk', {}).get('section')
+            if section and section != 'module':
+                output.append(f"   📍 {section}")
             output.append(f"   📅 {metadata.get('modified', 'N/A')}")
             output.append(f"   🎯 相似度: {similarity:.2%}")
 
@@ -2,21 +2,37 @@
 # -*- coding: utf-8 -*-
 """
 向量数据库模块
-使用ChromaDB存储和检索向量嵌入
+存储和检索向量嵌入（索引在第一次访问集合时才打开）
+
+索引后端由 vector_db.backend 选择（00_Agent_Library/vector_index）:
+chroma（默认）、hnswlib（HNSW，M/ef 可调）或 numpy（精确暴力搜索）。
+
+多个查询向量用 search_many 合并成一次 query 请求；"与文档X相关"的查询用
+query_by_ids 直接取库中已存的向量，不重新编码文档。
 """
 
+import sys
+import time
 import yaml
-import chromadb
+import numpy as np
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
 from datetime import datetime
 
+# 向量索引抽象位于 00_Agent_Library
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "00_Agent_Library"))
+
+from vector_index import open_index
+
+# 片段记录特有的元数据字段（合并为文档结果时去掉）
+CHUNK_FIELDS = ('doc_id', 'chunk_index', 'chunk_count', 'start', 'end', 'section')
+
 
 class VectorStore:
     """向量数据库封装"""
 
     def __init__(self, config_path="config.yaml"):
-        """初始化向量数据库"""
+        """初始化向量数据库（只读取配置，第一次访问集合时才打开数据库）"""
         # 加载配置
         config_path = Path(__file__).parent / config_path
         with open(config_path, 'r', encoding='utf-8') as f:
@@ -26,24 +42,49 @@ class VectorStore:
 
         # 持久化目录（相对于工作区根目录）
         workspace_root = Path(__file__).parent.parent.parent
-        persist_dir = workspace_root / db_config['persist_directory']
-        persist_dir.mkdir(parents=True, exist_ok=True)
+        self.backend = db_config.get('backend', 'chroma')
+        self.collection_name = db_config['collection_name']
+        if self.backend == 'chroma':
+            self.persist_dir = workspace_root / db_config['persist_directory']
+        else:
+            self.persist_dir = workspace_root / db_config.get(
+                'index_directory',
+                str(Path(db_config['persist_directory']).parent / "vector_index")
+            )
+        self.vector_dtype = db_config.get('vector_dtype', 'float32')
+        self.hnsw = db_config.get('hnsw') or {}
+
+        self._collection = None
+        self.open_seconds = None
 
-        print(f"📚 ChromaDB 数据目录: {persist_dir}")
+    @property
+    def collection(self):
+        """向量索引（VectorIndex，首次访问时打开）"""
+        if self._collection is None:
+            self._open()
+        return self._collection
 
-        # 创建客户端
-        self.client = chromadb.PersistentClient(path=str(persist_dir))
+    def _open(self):
+        """打开向量索引"""
+        start = time.perf_counter()
+
+        self.persist_dir.mkdir(parents=True, exist_ok=True)
+        print(f"📚 向量索引目录: {self.persist_dir} ({self.backend})")
 
         # 获取或创建集合
-        self.collection_name = db_config['collection_name']
-        self.collection = self.client.get_or_create_collection(
-            name=self.collection_name,
-            metadata={"description": "学习记忆向量数据库"}
+        self._collection = open_index(
+            self.backend,
+            self.persist_dir,
+            self.collection_name,
+            metadata={"description": "学习记忆向量数据库"},
+            dtype=self.vector_dtype,
+            hnsw=self.hnsw
         )
+        self.open_seconds = time.perf_counter() - start
 
-        print(f"✅ 向量数据库初始化完成")
+        print(f"✅ 向量数据库初始化完成 ({self.open_seconds:.2f}s)")
         print(f"   集合: {self.collection_name}")
-        print(f"   文档数: {self.collection.count()}")
+        print(f"   文档数: {self._collection.count()}")
 
     def add_documents(
         self,
@@ -51,7 +92,7 @@ class VectorStore:
         embeddings: List[List[float]],
         metadatas: List[Dict],
         ids: List[str]
-    ):
+    ) -> bool:
         """
         添加文档到向量数据库
 
@@ -60,6 +101,9 @@ class VectorStore:
             embeddings: 向量嵌入列表
             metadatas: 元数据列表
             ids: 唯一ID列表
+
+        Returns:
+            是否添加成功
         """
         if len(documents) != len(embeddings) or len(documents) != len(metadatas) or len(documents) != len(ids):
             raise ValueError("documents, embeddings, metadatas, ids 长度必须一致")
@@ -72,8 +116,10 @@ class VectorStore:
                 ids=ids
             )
             print(f"✅ 添加了 {len(documents)} 个文档")
+            return True
         except Exception as e:
             print(f"❌ 添加文档失败: {e}")
+            return False
 
     def search(
         self,
@@ -95,36 +141,311 @@ class VectorStore:
             - metadata: 元数据
             - distance: 距离（越小越相似）
         """
+        return self._query([query_embedding], top_k, filter)[0]
+
+    def _query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int,
+        filter: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        """一次 query 请求搜索多个向量，按查询顺序返回片段结果"""
         results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=top_k,
+            query_embeddings=query_embeddings,
+            n_results=n_results,
             where=filter
         )
 
         # 格式化结果
-        formatted_results = []
-        if results['documents'] and results['documents'][0]:
-            for i, doc in enumerate(results['documents'][0]):
-                formatted_results.append({
+        formatted = []
+        for q in range(len(query_embeddings)):
+            rows = []
+            documents = results['documents'][q] if results['documents'] else []
+            for i, doc in enumerate(documents or []):
+                rows.append({
                     'document': doc,
-                    'metadata': results['metadatas'][0][i] if results['metadatas'] else {},
-                    'distance': results['distances'][0][i] if results['distances'] else 0,
-                    'id': results['ids'][0][i] if results['ids'] else ''
+                    'metadata': results['metadatas'][q][i] if results['metadatas'] else {},
+                    'distance': results['distances'][q][i] if results['distances'] else 0,
+                    'id': results['ids'][q][i] if results['ids'] else ''
                 })
+            formatted.append(rows)
 
-        return formatted_results
+        return formatted
 
-    def get_document(self, doc_id: str) -> Optional[Dict]:
-        """根据ID获取文档"""
-        results = self.collection.get(ids=[doc_id])
-
-        if results['documents']:
-            return {
-                'document': results['documents'][0],
-                'metadata': results['metadatas'][0] if results['metadatas'] else {},
-                'id': doc_id
+    def search_documents(
+        self,
+        query_embedding: List[float],
+        top_k: int = 5,
+        filter: Optional[Dict] = None
+    ) -> List[Dict]:
+        """
+        向量搜索并把片段命中合并为文档结果
+
+        每个文档只保留距离最近的片段，多取片段直到凑够 top_k 个文档。
+
+        Args:
+            query_embedding: 查询向量
+            top_k: 返回的文档数
+            filter: 元数据过滤条件
+
+        Returns:
+            与 search 格式相同的结果列表，id 为文档ID，另含:
+            - chunk: 命中片段的位置 {'start', 'end', 'section'}
+            - matches: 该文档命中的片段数
+        """
+        return self.search_many([query_embedding], top_k=top_k, filter=filter)[0]
+
+    def search_many(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 5,
+        filter: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        """
+        批量向量搜索（所有查询合并为一次 query 请求），片段命中合并为文档结果
+
+        Args:
+            query_embeddings: 查询向量列表
+            top_k: 每个查询返回的文档数
+            filter: 元数据过滤条件
+
+        Returns:
+            与 query_embeddings 顺序一致的结果列表，每项格式同 search_documents
+        """
+        documents = [[] for _ in query_embeddings]
+        total = self.collection.count()
+        if total == 0 or not query_embeddings:
+            return documents
+        n_results = min(top_k * 4, total)
+
+        pending = list(range(len(query_embeddings)))
+        while pending:
+            batch = self._query([query_embeddings[q] for q in pending], n_results, filter)
+
+            # 片段集中在少数文档时扩大候选范围（过滤后的结果已取完时停止）
+            retry = []
+            for q, results in zip(pending, batch):
+                documents[q] = self._collapse_chunks(results)
+                if len(documents[q]) < top_k and n_results < total and len(results) >= n_results:
+                    retry.append(q)
+            pending = retry
+            n_results = min(n_results * 4, total)
+
+        return [docs[:top_k] for docs in documents]
+
+    def get_embeddings(self, doc_ids: List[str]) -> Dict[str, np.ndarray]:
+        """
+        读取文档已存的向量（分块存储的文档取各片段向量的平均方向，模长取片段平均）
+
+        Args:
+            doc_ids: 文档ID列表（不存在的ID会被忽略）
+
+        Returns:
+            {文档ID: 向量}
+        """
+        vectors = {}
+        if not doc_ids:
+            return vectors
+
+        direct = self.collection.get(ids=doc_ids, include=['embeddings'])
+        for doc_id, embedding in zip(direct['ids'], direct['embeddings']):
+            vectors[doc_id] = np.asarray(embedding, dtype=np.float32)
+
+        missing = [doc_id for doc_id in doc_ids if doc_id not in vectors]
+        if missing:
+            chunks = self.collection.get(
+                where={'doc_id': {'$in': missing}},
+                include=['embeddings', 'metadatas']
+            )
+            grouped = {}
+            for embedding, metadata in zip(chunks['embeddings'], chunks['metadatas']):
+                grouped.setdefault(metadata['doc_id'], []).append(embedding)
+
+            for doc_id, embeddings in grouped.items():
+                matrix = np.asarray(embeddings, dtype=np.float32)
+                centroid = matrix.mean(axis=0)
+                scale = np.linalg.norm(matrix, axis=1).mean() / max(np.linalg.norm(centroid), 1e-12)
+                vectors[doc_id] = centroid * scale
+
+        return vectors
+
+    def query_by_ids(
+        self,
+        doc_ids: List[str],
+        top_k: int = 5,
+        filter: Optional[Dict] = None
+    ) -> Dict[str, List[Dict]]:
+        """
+        查找与指定文档相似的其他文档（用库中已存的向量，一次批量搜索）
+
+        Args:
+            doc_ids: 文档ID列表
+            top_k: 每个文档返回的相关文档数（不含自身）
+            filter: 元数据过滤条件
+
+        Returns:
+            {文档ID: 相关文档结果列表}，格式同 search_documents；不存在的文档不出现
+        """
+        unique_ids = list(dict.fromkeys(doc_ids))
+        vectors = self.get_embeddings(unique_ids)
+        found = [doc_id for doc_id in unique_ids if doc_id in vectors]
+        results = self.search_many([vectors[doc_id].tolist() for doc_id in found], top_k + 1, filter)
+
+        return {
+            doc_id: [result for result in related if result['id'] != doc_id][:top_k]
+            for doc_id, related in zip(found, results)
+        }
+
+    def search_ids(
+        self,
+        query_embedding: List[float],
+        ids: List[str],
+        top_k: int = 5,
+        batch_size: int = 1000
+    ) -> List[Dict]:
+        """
+        在指定的片段中精确搜索并合并为文档结果（候选很少时比带过滤的近似搜索更快更全）
+
+        距离按集合的度量（hnsw:space）计算，与 search 的结果可直接比较。
+
+        Args:
+            query_embedding: 查询向量
+            ids: 候选片段ID（不存在的ID会被忽略）
+            top_k: 返回的文档数
+            batch_size: 每次读取的片段数
+
+        Returns:
+            与 search_documents 格式相同的结果列表
+        """
+        query = np.asarray(query_embedding, dtype=np.float32)
+        space = (self.collection.metadata or {}).get('hnsw:space', 'l2')
+
+        candidates = []
+        for i in range(0, len(ids), batch_size):
+            batch = self.collection.get(
+                ids=ids[i:i + batch_size],
+                include=['documents', 'metadatas', 'embeddings']
+            )
+            if not len(batch['ids']):
+                continue
+
+            vectors = np.asarray(batch['embeddings'], dtype=np.float32)
+            if space == 'cosine':
+                norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+                distances = 1 - vectors @ query / np.maximum(norms, 1e-12)
+            elif space == 'ip':
+                distances = 1 - vectors @ query
+            else:
+                distances = np.sum((vectors - query) ** 2, axis=1)
+
+            for j, chunk_id in enumerate(batch['ids']):
+                candidates.append({
+                    'document': batch['documents'][j],
+                    'metadata': batch['metadatas'][j] if batch['metadatas'] else {},
+                    'distance': float(distances[j]),
+                    'id': chunk_id
+                })
+
+        candidates.sort(key=lambda result: result['distance'])
+        return self._collapse_chunks(candidates)[:top_k]
+
+    def _collapse_chunks(self, results: List[Dict]) -> List[Dict]:
+        """按距离排好序的片段结果合并为文档结果（每个文档保留最近的片段）"""
+        documents = {}
+        for result in results:
+            metadata = result['metadata'] or {}
+            doc_id = metadata.get('doc_id', result['id'])
+            if doc_id in documents:
+                documents[doc_id]['matches'] += 1
+                continue
+
+            documents[doc_id] = {
+                'document': result['document'],
+                'metadata': {k: v for k, v in metadata.items() if k not in CHUNK_FIELDS},
+                'distance': result['distance'],
+                'id': doc_id,
+                'chunk': {
+                    'start': metadata.get('start', 0),
+                    'end': metadata.get('end', len(result['document'] or '')),
+                    'section': metadata.get('section', '')
+                },
+                'matches': 1
             }
-        return None
+        return list(documents.values())
+
+    def get_document(self, doc_id: str) -> Optional[Dict]:
+        """根据ID获取文档（分块存储的文档按偏移拼接回全文）"""
+        return self.get_documents([doc_id]).get(doc_id)
+
+    def get_documents(self, doc_ids: List[str], batch_size: int = 500) -> Dict[str, Dict]:
+        """
+        批量获取文档（每批一次按ID查询 + 一次按 doc_id 查询片段）
+
+        Args:
+            doc_ids: 文档ID列表
+            batch_size: 每次查询的文档数
+
+        Returns:
+            {文档ID: {'document', 'metadata', 'id'}}，不存在的文档不出现
+        """
+        documents = {}
+        for i in range(0, len(doc_ids), batch_size):
+            batch = doc_ids[i:i + batch_size]
+
+            results = self.collection.get(ids=batch)
+            for j, doc_id in enumerate(results['ids']):
+                documents[doc_id] = {
+                    'document': results['documents'][j],
+                    'metadata': results['metadatas'][j] if results['metadatas'] else {},
+                    'id': doc_id
+                }
+
+            missing = [doc_id for doc_id in batch if doc_id not in documents]
+            if not missing:
+                continue
+
+            results = self.collection.get(where={'doc_id': {'$in': missing}})
+            grouped = {}
+            for text, metadata in zip(results['documents'], results['metadatas']):
+                grouped.setdefault(metadata['doc_id'], []).append((text, metadata))
+            for doc_id, chunks in grouped.items():
+                documents[doc_id] = self._join_chunks(doc_id, chunks)
+
+        return documents
+
+    def _join_chunks(self, doc_id: str, chunks: List[Tuple[str, Dict]]) -> Dict:
+        """按片段序号拼接回全文"""
+        chunks = sorted(chunks, key=lambda item: item[1].get('chunk_index', 0))
+
+        # 滑动窗口的片段有重叠，按偏移去掉重复部分
+        parts = []
+        covered = 0
+        for text, metadata in chunks:
+            start = metadata.get('start', covered)
+            parts.append(text[max(0, covered - start):])
+            covered = max(covered, metadata.get('end', start + len(text)))
+
+        return {
+            'document': ''.join(parts),
+            'metadata': {k: v for k, v in chunks[0][1].items() if k not in CHUNK_FIELDS},
+            'id': doc_id
+        }
+
+    def get_existing_ids(self, ids: Optional[List[str]] = None, where: Optional[Dict] = None) -> Set[str]:
+        """
+        批量查询已存在的记录ID（一次查询，不读取内容和向量）
+
+        Args:
+            ids: 记录ID列表
+            where: 元数据过滤条件（如 {'doc_id': {'$in': [...]}}）
+
+        Returns:
+            已存在的ID集合
+        """
+        if ids is not None and not ids:
+            return set()
+        results = self.collection.get(ids=ids, where=where, include=[])
+        return set(results['ids'])
 
     def update_document(
         self,
@@ -151,6 +472,38 @@ class VectorStore:
         except Exception as e:
             print(f"❌ 更新失败: {e}")
 
+    def update_documents(
+        self,
+        ids: List[str],
+        documents: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict]
+    ) -> bool:
+        """
+        批量更新文档
+
+        Args:
+            ids: 文档ID列表
+            documents: 文本内容列表
+            embeddings: 向量嵌入列表
+            metadatas: 元数据列表
+
+        Returns:
+            是否更新成功
+        """
+        try:
+            self.collection.update(
+                ids=ids,
+                documents=documents,
+                embeddings=embeddings,
+                metadatas=metadatas
+            )
+            print(f"✅ 更新了 {len(ids)} 个文档")
+            return True
+        except Exception as e:
+            print(f"❌ 批量更新失败: {e}")
+            return False
+
     def delete_document(self, doc_id: str):
         """删除文档"""
         try:
@@ -159,6 +512,26 @@ class VectorStore:
         except Exception as e:
             print(f"❌ 删除失败: {e}")
 
+    def delete_documents(self, ids: List[str], batch_size: int = 1000) -> bool:
+        """
+        批量删除文档
+
+        Args:
+            ids: 文档ID列表
+            batch_size: 每次删除的数量（ChromaDB 单次请求有上限）
+
+        Returns:
+            是否删除成功
+        """
+        try:
+            for i in range(0, len(ids), batch_size):
+                self.collection.delete(ids=ids[i:i + batch_size])
+            print(f"✅ 删除了 {len(ids)} 个文档")
+            return True
+        except Exception as e:
+            print(f"❌ 批量删除失败: {e}")
+            return False
+
     def count(self) -> int:
         """返回文档总数"""
         return self.collection.count()
@@ -167,11 +540,7 @@ class VectorStore:
         """清空所有文档（危险操作）"""
         confirm = input("⚠️  确定要清空所有文档吗？(yes/no): ")
         if confirm.lower() == 'yes':
-            self.client.delete_collection(self.collection_name)
-            self.collection = self.client.create_collection(
-                name=self.collection_name,
-                metadata={"description": "学习记忆向量数据库"}
-            )
+            self.collection.reset()
             print("✅ 已清空所有文档")
         else:
             print("❌ 取消操作")
@@ -180,6 +549,7 @@ class VectorStore:
         """获取数据库统计信息"""
         return {
             'collection_name': self.collection_name,
+            'backend': self.backend,
             'total_documents': self.collection.count(),
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
@@ -143,7 +143,15 @@ class MemoryAgentNode(Node):
 class InterToolWorkflow:
     """工具间通信工作流"""
 
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 4, ocr_timeout: float = 120):
+        """
+        参数:
+            max_concurrency: 并行分支的最大并发数
+            ocr_timeout: OCR + 申请书生成节点的超时（秒）
+        """
+        self.max_concurrency = max_concurrency
+        self.ocr_timeout = ocr_timeout
+
         # 创建节点
         self.organize_node = FileOrganizerNode()
         self.generate_node = ApplicationGeneratorNode()
@@ -154,11 +162,12 @@ class InterToolWorkflow:
 
     def _build_workflow(self) -> WorkflowGraph:
         """构建工作流图"""
-        wf = WorkflowGraph("inter_tool_communication", enable_checkpoints=True)
+        wf = WorkflowGraph("inter_tool_communication", enable_checkpoints=True,
+                           max_concurrency=self.max_concurrency)
 
-        # 添加节点 (name, node)
+        # 添加节点 (name, node)；OCR 可能卡住，给生成节点设置超时
         wf.add_node("organize", self.organize_node)
-        wf.add_node("generate", self.generate_node)
+        wf.add_node("generate", self.generate_node, timeout=self.ocr_timeout)
         wf.add_node("memory", self.memory_node)
 
         # 设置入口
@@ -166,6 +175,7 @@ class InterToolWorkflow:
 
         # 定义边（工具间通信路径）
         # organize → generate → memory → END
+        # 三步之间有数据依赖，保持串行；可并行的步骤用 wf.add_parallel_edges 分叉
         wf.add_edge("organize", "generate")
         wf.add_edge("generate", "memory")
         wf.add_edge("memory", END)
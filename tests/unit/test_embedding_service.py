@@ -0,0 +1,217 @@
+"""
+共享嵌入服务单元测试
+
+测试内容：
+- 批量请求中相同文本只编码一次
+- 磁盘缓存命中（跨服务实例、跨进程重开）
+- 向量文件扩容
+- 维度不需要加载模型即可从缓存得到
+- 模型在第一次缓存未命中时才加载
+- 不同后端/序列长度使用独立缓存，大批量分发到多进程编码池
+- 查询向量 LRU：规范化后的查询只编码一次，超出容量时淘汰最久未用的
+"""
+
+import numpy as np
+import pytest
+
+from embedding_service import EmbeddingCache, EmbeddingService, normalize_query, text_key
+
+
+class CountingEncoder:
+    """确定性的编码器：记录每次 encode 收到的文本"""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.calls = []
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, convert_to_numpy=True):
+        self.calls.append(list(texts))
+        return np.array([
+            np.random.default_rng(int.from_bytes(text_key(t)[:4], 'little')).standard_normal(self.dim)
+            for t in texts
+        ], dtype=np.float32)
+
+
+def _service(tmp_path, encoder=None, **kwargs):
+    return EmbeddingService('test-model', cache_dir=tmp_path, model=encoder or CountingEncoder(), **kwargs)
+
+
+class TestEmbeddingService:
+    """嵌入服务测试"""
+
+    @pytest.mark.unit
+    def test_duplicates_encoded_once(self, tmp_path):
+        encoder = CountingEncoder()
+        service = _service(tmp_path, encoder, use_cache=False)
+
+        vectors = service.encode(['工作流', 'LangGraph', '工作流'])
+
+        assert encoder.calls == [['工作流', 'LangGraph']]
+        assert vectors.shape == (3, 8)
+        np.testing.assert_array_equal(vectors[0], vectors[2])
+        assert service.stats['duplicates'] == 1
+
+    @pytest.mark.unit
+    def test_cache_hit_across_instances(self, tmp_path):
+        first = _service(tmp_path)
+        expected = first.encode(['检查点', '状态管理'])
+
+        encoder = CountingEncoder()
+        second = EmbeddingService('test-model', cache_dir=tmp_path, model=encoder)
+        second.cache = EmbeddingCache(tmp_path)  # 模拟另一个进程重新打开
+        vectors = second.encode(['状态管理', '检查点', '新文本'])
+
+        assert encoder.calls == [['新文本']]
+        assert second.stats == {'hits': 2, 'misses': 1, 'duplicates': 0}
+        np.testing.assert_array_equal(vectors[:2], expected[::-1])
+        second.cache.close()
+
+    @pytest.mark.unit
+    def test_cached_and_fresh_vectors_identical(self, tmp_path):
+        service = _service(tmp_path)
+
+        fresh = service.encode_one('语义记忆')
+        cached = service.encode_one('语义记忆')
+
+        np.testing.assert_array_equal(fresh, cached)
+        assert fresh.dtype == np.float32
+
+    @pytest.mark.unit
+    def test_models_cached_separately(self, tmp_path):
+        service = _service(tmp_path)
+        service.encode(['文本'])
+
+        other = EmbeddingService('other-model', cache_dir=tmp_path, model=CountingEncoder(dim=4))
+        assert other.encode(['文本']).shape == (1, 4)
+        assert other.stats['misses'] == 1
+
+    @pytest.mark.unit
+    def test_vector_file_grows(self, tmp_path, monkeypatch):
+        monkeypatch.setattr('embedding_service.GROW_ROWS', 4)
+        service = _service(tmp_path)
+        texts = [f'文本{i}' for i in range(50)]
+
+        for i in range(0, 50, 7):
+            service.encode(texts[i:i + 7])
+        vectors = service.encode(texts)
+
+        assert service.stats['misses'] == 50
+        assert service.cache.stats()['test-model'] == {'dim': 8, 'entries': 50}
+        np.testing.assert_array_equal(vectors, CountingEncoder().encode(texts).astype(np.float16))
+
+    @pytest.mark.unit
+    def test_dimension_from_cache_without_model(self, tmp_path):
+        _service(tmp_path).encode(['文本'])
+
+        service = EmbeddingService('test-model', cache_dir=tmp_path)
+        assert service.dimension == 8
+        assert service._model is None
+        assert service.encode(['文本']).shape == (1, 8)
+        assert service._model is None
+
+    @pytest.mark.unit
+    def test_model_loaded_on_first_miss(self, tmp_path, monkeypatch):
+        import embedding_service
+
+        loads = []
+        monkeypatch.setattr(embedding_service, 'load_model',
+                            lambda name, *args: loads.append(name) or CountingEncoder())
+
+        service = EmbeddingService('test-model', cache_dir=tmp_path)
+        assert loads == [] and 'model_load' not in service.timings
+
+        service.encode(['文本'])
+        assert loads == ['test-model']
+        assert service.timings['model_load'] >= 0
+
+    @pytest.mark.unit
+    def test_backend_and_seq_length_cached_separately(self, tmp_path):
+        torch_service = _service(tmp_path)
+        int8_service = _service(tmp_path, backend='onnx-int8', max_seq_length=64)
+        assert torch_service.cache_id == 'test-model'
+        assert int8_service.cache_id == 'test-model@onnx-int8@seq64'
+
+        torch_service.encode(['文本'])
+        int8_service.encode(['文本'])
+        assert set(torch_service.cache.stats()) == {'test-model', 'test-model@onnx-int8@seq64'}
+
+    @pytest.mark.unit
+    def test_unknown_backend_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            _service(tmp_path, backend='tensorrt')
+
+    @pytest.mark.unit
+    def test_large_batches_use_process_pool(self, tmp_path):
+        from embedding_service import MIN_TEXTS_PER_WORKER
+
+        class PoolEncoder(CountingEncoder):
+            def start_multi_process_pool(self, devices):
+                self.devices = devices
+                return 'pool'
+
+            def encode_multi_process(self, texts, pool, batch_size=32):
+                self.pooled = len(texts)
+                return self.encode(texts)
+
+            def stop_multi_process_pool(self, pool):
+                self.devices = None
+
+        encoder = PoolEncoder()
+        service = _service(tmp_path, encoder=encoder, use_cache=False, workers=2)
+
+        service.encode(['短批量'])
+        assert not hasattr(encoder, 'pooled')
+
+        texts = [f'文本{i}' for i in range(2 * MIN_TEXTS_PER_WORKER)]
+        service.encode(texts)
+        assert encoder.devices == ['cpu', 'cpu'] and encoder.pooled == len(texts)
+
+        service.close()
+        assert encoder.devices is None
+
+
+class TestQueryCache:
+    """查询向量 LRU 测试"""
+
+    @pytest.mark.unit
+    def test_normalize_query(self):
+        assert normalize_query('  向量   数据库\n') == '向量 数据库'
+        assert normalize_query('ＬａｎｇＧｒａｐｈ') == 'LangGraph'
+
+    @pytest.mark.unit
+    def test_repeated_queries_encoded_once(self, tmp_path):
+        encoder = CountingEncoder()
+        service = _service(tmp_path, encoder, use_cache=False)
+
+        first = service.encode_query('检查点  恢复')
+        second = service.encode_query(' 检查点 恢复 ')
+        batch = service.encode_queries(['检查点 恢复', '状态管理', '状态管理'])
+
+        assert encoder.calls == [['检查点 恢复'], ['状态管理']]
+        np.testing.assert_array_equal(first, second)
+        np.testing.assert_array_equal(batch[0], first)
+        assert service.query_hits == 2
+
+    @pytest.mark.unit
+    def test_lru_eviction(self, tmp_path):
+        encoder = CountingEncoder()
+        service = _service(tmp_path, encoder, use_cache=False, query_cache_size=2)
+
+        service.encode_query('a')
+        service.encode_query('b')
+        service.encode_query('a')      # a 变为最近使用
+        service.encode_query('c')      # 淘汰 b
+        service.encode_query('a')
+        service.encode_query('b')
+
+        assert encoder.calls == [['a'], ['b'], ['c'], ['b']]
+
+    @pytest.mark.unit
+    def test_returned_vector_is_a_copy(self, tmp_path):
+        service = _service(tmp_path, use_cache=False)
+        vector = service.encode_query('工作流')
+        vector[:] = 0
+        assert np.any(service.encode_query('工作流') != 0)
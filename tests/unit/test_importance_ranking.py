@@ -0,0 +1,103 @@
+"""
+重要性评分缓存与排名单元测试
+
+测试内容：
+- 静态分按内容哈希缓存
+- 向量化分数与逐条计算一致
+- Top-K 小顶堆的增量维护与分档边界失效
+- MemoryStore 写入时不计算排名，首次重要性查询时构建
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from claude_memory import ImportanceRanking, ImportanceScorer, MemoryStore
+
+
+def _memory(days_ago: float, topic: str = 'Python', priority: str = 'normal') -> dict:
+    return {
+        'timestamp': (datetime.now() - timedelta(days=days_ago)).isoformat(),
+        'topic': topic,
+        'summary': '记忆系统' * 20,
+        'outcomes': 'ok',
+        'priority': priority,
+    }
+
+
+class TestImportanceScorer:
+    """评分器缓存测试"""
+
+    @pytest.mark.unit
+    def test_static_score_cached_by_content(self):
+        scorer = ImportanceScorer()
+        memory = _memory(0)
+        first = scorer.calculate(memory)
+
+        assert len(scorer._static_cache) == 1
+        assert scorer.calculate(dict(memory)) == first
+        assert len(scorer._static_cache) == 1
+
+        scorer.calculate(dict(memory, priority='high'))
+        assert len(scorer._static_cache) == 2
+
+
+class TestImportanceRanking:
+    """重要性排名测试"""
+
+    @pytest.mark.unit
+    def test_scores_match_scorer(self):
+        scorer = ImportanceScorer()
+        memories = [_memory(d, priority=p) for d in (0, 3, 10, 45, 200)
+                    for p in ('high', 'low')]
+        memories.append({'topic': '无时间戳'})
+        ranking = ImportanceRanking(scorer)
+        ranking.sync(memories)
+
+        assert ranking.scores() == pytest.approx([scorer.calculate(m) for m in memories])
+
+    @pytest.mark.unit
+    def test_top_is_stable_and_incremental(self):
+        scorer = ImportanceScorer()
+        memories = [_memory(d) for d in (100, 50, 20, 5, 0)]
+        ranking = ImportanceRanking(scorer)
+        ranking.sync(memories)
+
+        assert [doc_id for doc_id, _ in ranking.top(2)] == [4, 3]
+
+        memories.append(_memory(0, priority='high'))
+        ranking.sync(memories)
+        assert [doc_id for doc_id, _ in ranking.top(2)] == [5, 4]
+
+    @pytest.mark.unit
+    def test_heap_invalidated_at_bucket_boundary(self):
+        scorer = ImportanceScorer()
+        now = datetime.now().timestamp()
+        memories = [_memory(0.5, priority='low'), _memory(6.5, priority='high')]
+        ranking = ImportanceRanking(scorer)
+        ranking.sync(memories)
+
+        assert [doc_id for doc_id, _ in ranking.top(1, now=now)] == [1]
+        # 1.6 天后第 1 条超过 7 天档，新鲜度降为 10 分，堆必须重新计算
+        later = now + 1.6 * 86400
+        assert ranking.top(1, now=later)[0][1] == pytest.approx(scorer.static_score(memories[1]) + 10)
+
+
+class TestMemoryStoreRanking:
+    """MemoryStore 中排名的构建时机测试"""
+
+    @pytest.mark.unit
+    def test_ranking_built_on_first_importance_query(self, temp_dir: Path):
+        store = MemoryStore(temp_dir)
+        store.add_context({'topic': 'Python', 'summary': '记忆系统'})
+        store.close()
+
+        reopened = MemoryStore(temp_dir)
+        reopened.add_context({'topic': '工作流', 'summary': '检查点', 'priority': 'high'})
+        assert reopened.ranking.doc_count == 0
+
+        top = reopened.get_top_memories(limit=2)
+        assert reopened.ranking.doc_count == 2
+        assert {m['topic'] for m in top} == {'Python', '工作流'}
+        assert all('_importance_score' in m for m in top)
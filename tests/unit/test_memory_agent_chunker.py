@@ -0,0 +1,147 @@
+"""
+memory_agent 文档分块单元测试
+
+测试内容：
+- Markdown 按标题切分，代码块中的 # 不当作标题
+- Python 按顶层函数/类切分，装饰器归属函数，过大的类按方法切分
+- 过短的章节并入相邻章节
+- 超长章节按行组成滑动窗口，相邻窗口重叠，偏移与原文一致
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "01_Active_Projects" / "memory_agent"))
+
+from chunker import DocumentChunker, approx_token_count
+
+
+def _words(text: str) -> int:
+    return len(text.split())
+
+
+def _assert_offsets(content: str, chunks):
+    for chunk in chunks:
+        assert content[chunk['start']:chunk['end']] == chunk['text']
+
+
+class TestMarkdown:
+    """Markdown 切分测试"""
+
+    @pytest.mark.unit
+    def test_split_by_heading_ignores_fences(self):
+        content = (
+            "# 安装\n"
+            "pip install a b c d e f\n"
+            "```bash\n"
+            "# 这不是标题 只是注释 内容 内容\n"
+            "```\n"
+            "## 使用\n"
+            "import a then call run with args\n"
+        )
+        chunker = DocumentChunker(max_tokens=50, min_tokens=3, count_tokens=_words)
+
+        chunks = chunker.chunk(content, '.md')
+
+        assert [chunk['section'] for chunk in chunks] == ['安装', '使用']
+        assert '# 这不是标题' in chunks[0]['text']
+        _assert_offsets(content, chunks)
+
+    @pytest.mark.unit
+    def test_short_sections_are_merged(self):
+        content = "# 标题\n\n## 小节\n正文 一 二 三 四 五 六\n"
+        chunker = DocumentChunker(max_tokens=50, min_tokens=4, count_tokens=_words)
+
+        chunks = chunker.chunk(content, '.md')
+
+        assert len(chunks) == 1
+        assert chunks[0]['start'] == 0 and chunks[0]['end'] == len(content)
+
+
+class TestPython:
+    """Python 切分测试"""
+
+    @pytest.mark.unit
+    def test_functions_with_decorators(self):
+        content = (
+            "import os\n"
+            "\n"
+            "@cache\n"
+            "@trace(level=1)\n"
+            "def load(path):\n"
+            "    return open(path).read()\n"
+            "\n"
+            "class Store:\n"
+            "    def get(self, key):\n"
+            "        return self.data[key]\n"
+        )
+        chunker = DocumentChunker(max_tokens=200, min_tokens=1, count_tokens=approx_token_count)
+
+        chunks = chunker.chunk(content, '.py')
+        by_section = {chunk['section']: chunk for chunk in chunks}
+
+        assert by_section['load']['text'].startswith('@cache\n@trace(level=1)\ndef load')
+        assert by_section['Store']['text'].strip().startswith('class Store:')
+        _assert_offsets(content, chunks)
+
+    @pytest.mark.unit
+    def test_large_class_split_by_method(self):
+        methods = ''.join(
+            f"    def method_{i}(self):\n        return {' + '.join(str(j) for j in range(10))}\n\n"
+            for i in range(4)
+        )
+        content = f"class Big:\n    '''文档'''\n\n{methods}"
+        chunker = DocumentChunker(max_tokens=40, min_tokens=1, count_tokens=approx_token_count)
+
+        sections = [chunk['section'] for chunk in chunker.chunk(content, '.py')]
+
+        assert [s for s in sections if s.startswith('Big.')] == [f'Big.method_{i}' for i in range(4)]
+
+    @pytest.mark.unit
+    def test_syntax_error_falls_back_to_windows(self):
+        content = "def broken(:\n" + "x = 1\n" * 30
+        chunker = DocumentChunker(max_tokens=12, overlap_tokens=0, min_tokens=1, count_tokens=_words)
+
+        chunks = chunker.chunk(content, '.py')
+
+        assert len(chunks) > 1
+        assert {chunk['section'] for chunk in chunks} == {''}
+        _assert_offsets(content, chunks)
+
+
+class TestWindows:
+    """滑动窗口测试"""
+
+    @pytest.mark.unit
+    def test_overlap_and_offsets(self):
+        content = ''.join(f"line{i} a b c\n" for i in range(20))
+        chunker = DocumentChunker(max_tokens=12, overlap_tokens=4, min_tokens=1, count_tokens=_words)
+
+        chunks = chunker.chunk(content, '.txt')
+
+        assert len(chunks) > 2
+        assert all(_words(chunk['text']) <= 12 for chunk in chunks)
+        _assert_offsets(content, chunks)
+        for previous, current in zip(chunks, chunks[1:]):
+            # 每个窗口从上一个窗口末尾回退一整行（4 个词）开始，且整体向前推进
+            overlap = content[current['start']:previous['end']]
+            assert overlap.count('\n') == 1 and overlap.endswith('\n')
+            assert current['start'] > previous['start']
+        assert chunks[0]['start'] == 0 and chunks[-1]['end'] == len(content)
+
+    @pytest.mark.unit
+    def test_long_single_line_is_split(self):
+        content = "词 " * 100
+        chunker = DocumentChunker(max_tokens=20, overlap_tokens=0, min_tokens=1, count_tokens=_words)
+
+        chunks = chunker.chunk(content, '.txt')
+
+        assert len(chunks) > 1
+        assert all(_words(chunk['text']) <= 20 for chunk in chunks)
+        _assert_offsets(content, chunks)
+
+    @pytest.mark.unit
+    def test_blank_content(self):
+        assert DocumentChunker().chunk("  \n\n", '.md') == []
@@ -0,0 +1,174 @@
+"""
+memory_agent 增量索引单元测试
+
+测试内容：
+- 修改时间和大小未变的文件直接跳过，不读取、不嵌入
+- 只改了修改时间（内容哈希不变）的文件只更新清单
+- 内容变化的文件重新嵌入，变短后多余的旧片段被删除
+- 已删除文件的向量、侧索引记录和清单条目被清除
+- 嵌入模型标识变化后全量重建
+"""
+
+import hashlib
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "01_Active_Projects" / "memory_agent"))
+
+from indexer import DocumentIndexer
+
+
+class _Service:
+    def __init__(self, cache_id: str):
+        self.cache_id = cache_id
+
+
+class _Embedder:
+    """按文本哈希生成确定向量的嵌入器，记录嵌入过的文本"""
+
+    max_seq_length = 128
+
+    def __init__(self, cache_id: str = 'test-embedder'):
+        self.service = _Service(cache_id)
+        self.embedded = []
+
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+
+    def embed_texts(self, texts):
+        self.embedded.extend(texts)
+        vectors = []
+        for text in texts:
+            seed = int(hashlib.md5(text.encode('utf-8')).hexdigest()[:8], 16)
+            vector = np.random.default_rng(seed).standard_normal(8)
+            vectors.append((vector / np.linalg.norm(vector)).tolist())
+        return vectors
+
+
+def _config(root: Path) -> Path:
+    """临时工作区的配置（numpy 向量后端，路径均为绝对路径）"""
+    config = {
+        'vector_db': {
+            'persist_directory': str(root / 'memory' / 'chroma_db'),
+            'collection_name': 'test_memory',
+            'manifest_path': str(root / 'memory' / 'index_manifest.json'),
+            'metadata_index_path': str(root / 'memory' / 'metadata_index.db'),
+            'backend': 'numpy',
+        },
+        'chunking': {'max_tokens': 40, 'overlap_tokens': 8, 'min_tokens': 4},
+        'sources': {
+            'learning_journal': {'path': str(root / 'journal'), 'patterns': ['**/*.md']},
+            'projects': {'path': str(root / 'projects'), 'patterns': ['**/*.py']},
+        },
+    }
+    path = root / 'config.yaml'
+    path.write_text(yaml.safe_dump(config, allow_unicode=True), encoding='utf-8')
+    return path
+
+
+def _indexer(root: Path, embedder: _Embedder = None) -> DocumentIndexer:
+    indexer = DocumentIndexer(_config(root))
+    indexer.workspace_root = root
+    indexer._embedder = embedder or _Embedder()
+    return indexer
+
+
+@pytest.fixture
+def workspace(temp_dir: Path) -> Path:
+    (temp_dir / 'journal' / 'daily_logs').mkdir(parents=True)
+    (temp_dir / 'projects').mkdir()
+    (temp_dir / 'journal' / 'daily_logs' / 'day1.md').write_text(
+        "# 第一天\n\n学习了 SQLite 的 WAL 模式和索引。\n", encoding='utf-8')
+    (temp_dir / 'projects' / 'tool.py').write_text(
+        "def add(a, b):\n    return a + b\n", encoding='utf-8')
+    return temp_dir
+
+
+def _chunk_doc_ids(indexer: DocumentIndexer) -> set:
+    records = indexer.vector_store.collection.get(include=['metadatas'])
+    return {metadata['doc_id'] for metadata in records['metadatas']}
+
+
+class TestIncrementalIndex:
+    """增量索引测试"""
+
+    @pytest.mark.unit
+    def test_unchanged_files_are_skipped(self, workspace: Path):
+        first = _indexer(workspace)
+        first.build_index()
+        assert first.stats['indexed'] == 2
+        assert first.metadata_index.count() == 2
+
+        embedder = _Embedder()
+        second = _indexer(workspace, embedder)
+        second.build_index()
+
+        assert second.stats['indexed'] == 0 and second.stats['skipped'] == 2
+        assert embedder.embedded == []
+
+    @pytest.mark.unit
+    def test_touched_file_only_refreshes_manifest(self, workspace: Path):
+        _indexer(workspace).build_index()
+        note = workspace / 'journal' / 'daily_logs' / 'day1.md'
+        stat = note.stat()
+        os.utime(note, (stat.st_atime, stat.st_mtime + 100))
+
+        embedder = _Embedder()
+        indexer = _indexer(workspace, embedder)
+        indexer.build_index()
+
+        assert indexer.stats['indexed'] == 0 and indexer.stats['skipped'] == 2
+        assert embedder.embedded == []
+        assert indexer.manifest[str(note)]['mtime'] == stat.st_mtime + 100
+
+    @pytest.mark.unit
+    def test_changed_file_is_reindexed(self, workspace: Path):
+        note = workspace / 'journal' / 'daily_logs' / 'day1.md'
+        note.write_text("# 第一天\n\n" + "很长的一段笔记内容 " * 60 + "\n", encoding='utf-8')
+        first = _indexer(workspace)
+        first.build_index()
+        doc_id = first.manifest[str(note)]['id']
+        assert first.manifest[str(note)]['chunks'] > 1
+
+        note.write_text("# 第一天\n\n改短了。\n", encoding='utf-8')
+        embedder = _Embedder()
+        second = _indexer(workspace, embedder)
+        second.build_index()
+
+        assert second.stats['indexed'] == 1 and second.stats['skipped'] == 1
+        assert all('改短了' in text for text in embedder.embedded)
+        # 变短后多出来的旧片段被删除
+        stored = second.vector_store.collection.get(where={'doc_id': doc_id})
+        assert len(stored['ids']) == second.manifest[str(note)]['chunks'] == 1
+
+    @pytest.mark.unit
+    def test_deleted_file_is_purged(self, workspace: Path):
+        first = _indexer(workspace)
+        first.build_index()
+        script = workspace / 'projects' / 'tool.py'
+        doc_id = first.manifest[str(script)]['id']
+
+        script.unlink()
+        second = _indexer(workspace)
+        second.build_index()
+
+        assert second.stats['deleted'] == 1
+        assert str(script) not in second.manifest
+        assert doc_id not in _chunk_doc_ids(second)
+        assert second.metadata_index.count() == 1
+
+    @pytest.mark.unit
+    def test_embedding_change_rebuilds(self, workspace: Path):
+        _indexer(workspace).build_index()
+
+        embedder = _Embedder('other-model')
+        indexer = _indexer(workspace, embedder)
+        indexer.build_index()
+
+        assert indexer.stats['indexed'] == 2
+        assert embedder.embedded
@@ -0,0 +1,131 @@
+"""
+memory_agent 复习队列单元测试
+
+测试内容：
+- SM-2：前两次答对的间隔、之后按易度因子增长并受上限约束、答错重置、易度因子下限
+- ReviewStore：到期条目按时间升序、按 (next_review, doc_id) 翻页不重不漏
+- ReviewStore：计数、更新、删除，重复添加被忽略
+- 旧版 JSON 记录只在数据库新建时导入一次
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "01_Active_Projects" / "memory_agent"))
+
+from review_scheduler import MIN_EASE_FACTOR, sm2
+from review_store import ReviewStore
+
+INTERVALS = [1, 3, 7, 14, 30, 90]
+
+
+def _record(doc_id: str, next_review: float, **values) -> dict:
+    record = {
+        'doc_id': doc_id, 'repetitions': 0, 'interval_days': 0, 'ease_factor': 2.5,
+        'review_count': 0, 'last_review': None, 'next_review': next_review, 'created_at': 0.0,
+    }
+    record.update(values)
+    return record
+
+
+class TestSM2:
+    """SM-2 调度测试"""
+
+    @pytest.mark.unit
+    def test_interval_progression(self):
+        record = _record('a', 0.0)
+        intervals = []
+        for _ in range(6):
+            record.update(sm2(record, 5, INTERVALS))
+            intervals.append(record['interval_days'])
+
+        # 前两次取配置的前两个间隔，之后乘以易度因子（每次 +0.1），最多 90 天
+        assert intervals[:2] == [1, 3]
+        assert intervals[2] == pytest.approx(3 * 2.8)
+        assert intervals[3] == pytest.approx(round(3 * 2.8, 2) * 2.9, abs=0.01)
+        assert intervals[-1] == 90
+        assert record['repetitions'] == 6
+        assert record['ease_factor'] == pytest.approx(3.1)
+
+    @pytest.mark.unit
+    def test_ease_factor_by_quality(self):
+        base = _record('a', 0.0, repetitions=3, interval_days=10)
+
+        assert sm2(base, 4, INTERVALS)['ease_factor'] == pytest.approx(2.5)
+        assert sm2(base, 3, INTERVALS)['ease_factor'] == pytest.approx(2.36)
+        assert sm2(base, 3, INTERVALS)['interval_days'] == pytest.approx(23.6)
+
+    @pytest.mark.unit
+    def test_failure_resets_and_floor(self):
+        record = _record('a', 0.0, repetitions=4, interval_days=40, ease_factor=1.4)
+
+        result = sm2(record, 1, INTERVALS)
+
+        assert result['repetitions'] == 0
+        assert result['interval_days'] == 1
+        assert result['ease_factor'] == MIN_EASE_FACTOR
+
+
+class TestReviewStore:
+    """复习记录存储测试"""
+
+    @pytest.mark.unit
+    def test_due_keyset_paging(self, temp_dir: Path):
+        store = ReviewStore(temp_dir / 'reviews.db')
+        # 同一时间到期的多个条目按 doc_id 排序
+        store.upsert([_record(f"doc{i:02d}", float(i // 3)) for i in range(12)])
+
+        pages, after = [], None
+        while True:
+            page = store.due(now=2.0, limit=4, after=after)
+            if not page:
+                break
+            pages.append([record['doc_id'] for record in page])
+            after = (page[-1]['next_review'], page[-1]['doc_id'])
+
+        assert pages == [['doc00', 'doc01', 'doc02', 'doc03'],
+                         ['doc04', 'doc05', 'doc06', 'doc07'],
+                         ['doc08']]
+        assert store.count(due_before=2.0) == 9
+        assert store.count(due_before=2.0, strict=True) == 6
+        assert store.count() == 12
+
+    @pytest.mark.unit
+    def test_add_update_delete(self, temp_dir: Path):
+        store = ReviewStore(temp_dir / 'reviews.db')
+
+        assert store.add(_record('a', 5.0))
+        assert not store.add(_record('a', 1.0))
+        assert store.get('a')['next_review'] == 5.0
+
+        store.update('a', next_review=1.0, review_count=1)
+        assert store.due(now=1.0, limit=10)[0]['review_count'] == 1
+
+        store.delete(['a'])
+        assert store.get('a') is None and store.count() == 0
+
+    @pytest.mark.unit
+    def test_legacy_json_imported_once(self, temp_dir: Path):
+        legacy = temp_dir / 'review_schedule.json'
+        legacy.write_text(json.dumps({'records': {
+            'old': {
+                'interval_index': 2, 'ease_factor': 2.2, 'review_count': 3,
+                'last_review': '2026-01-01 08:00:00', 'next_review': '2026-01-08 08:00:00',
+                'created_at': '2025-12-20 08:00:00',
+            },
+        }}), encoding='utf-8')
+
+        store = ReviewStore(temp_dir / 'reviews.db', legacy_json=legacy, intervals=INTERVALS)
+        record = store.get('old')
+        assert record['repetitions'] == 2 and record['interval_days'] == 7
+        assert record['ease_factor'] == 2.2 and record['review_count'] == 3
+        store.delete(['old'])
+        store.close()
+
+        # 数据库已存在时不再导入
+        reopened = ReviewStore(temp_dir / 'reviews.db', legacy_json=legacy, intervals=INTERVALS)
+        assert reopened.count() == 0
+        assert legacy.exists()
@@ -0,0 +1,157 @@
+"""
+memory_agent 过滤条件下推单元测试
+
+测试内容：
+- 元数据侧索引把 where 条件编译为 SQL，不支持的字段/运算返回 None
+- 按条件估算命中规模，足够有选择性时返回全部片段ID
+- SemanticSearch 按侧索引估算选择执行方式，精确搜索与带过滤的向量搜索结果一致
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "01_Active_Projects" / "memory_agent"))
+
+from metadata_index import MetadataIndex
+from search import SemanticSearch
+from vector_store import VectorStore
+
+DAY = 86400.0
+
+
+def _documents():
+    """(文档ID, 元数据, 片段数)：前 8 个为 Markdown 笔记，后 2 个为 Python 文件"""
+    documents = []
+    for i in range(10):
+        python = i >= 8
+        documents.append((f"doc{i}", {
+            'path': f"file{i}{'.py' if python else '.md'}",
+            'type': 'project' if python else 'journal',
+            'extension': '.py' if python else '.md',
+            'category': None if python else ('daily_logs' if i % 2 else 'code_patterns'),
+            'modified_timestamp': 1_700_000_000.0 + i * DAY,
+        }, 3))
+    return documents
+
+
+@pytest.fixture
+def index(temp_dir: Path) -> MetadataIndex:
+    index = MetadataIndex(temp_dir / 'metadata_index.db')
+    index.upsert(_documents())
+    return index
+
+
+class TestMetadataIndex:
+    """元数据侧索引测试"""
+
+    @pytest.mark.unit
+    def test_compile(self, index: MetadataIndex):
+        sql, params = index.compile({'$and': [
+            {'extension': {'$in': ['.py', '.md']}},
+            {'modified_timestamp': {'$gte': 1.0, '$lt': 2.0}},
+        ]})
+        assert sql == '(extension IN (?,?) AND modified_timestamp >= ? AND modified_timestamp < ?)'
+        assert params == ['.py', '.md', 1.0, 2.0]
+
+        # 侧索引没有的字段、不支持的运算，整个条件都不能下推
+        assert index.compile({'$and': [{'extension': '.py'}, {'title': 'x'}]}) is None
+        assert index.compile({'extension': {'$contains': 'p'}}) is None
+        assert index.compile({}) is None
+
+    @pytest.mark.unit
+    def test_estimate_and_select(self, index: MetadataIndex):
+        last_week = {'modified_timestamp': {'$gte': 1_700_000_000.0 + 7 * DAY}}
+
+        assert index.estimate({'extension': '.py'}) == (2, 6)
+        assert index.estimate({'$or': [{'category': 'daily_logs'}, last_week]}) == (6, 18)
+        assert index.estimate({'title': 'x'}) is None
+
+        chunk_ids = index.select_chunk_ids({'$and': [{'type': 'journal'}, last_week]}, max_chunks=10)
+        assert chunk_ids == ['doc7#0', 'doc7#1', 'doc7#2']
+        # 命中片段超过上限时交给向量库过滤
+        assert index.select_chunk_ids({'type': 'journal'}, max_chunks=10) is None
+
+    @pytest.mark.unit
+    def test_delete_and_clear(self, index: MetadataIndex):
+        index.delete(['doc8'])
+        assert index.estimate({'extension': '.py'}) == (1, 3)
+
+        index.clear()
+        assert index.count() == 0
+
+
+class _Embedder:
+    """查询向量取一个固定方向"""
+
+    def embed_queries(self, queries):
+        return [[1.0] + [0.0] * 7 for _ in queries]
+
+
+@pytest.fixture
+def engine(temp_dir: Path) -> SemanticSearch:
+    config = {
+        'vector_db': {
+            'persist_directory': str(temp_dir / 'memory' / 'chroma_db'),
+            'collection_name': 'test_memory',
+            'metadata_index_path': str(temp_dir / 'memory' / 'metadata_index.db'),
+            'backend': 'numpy',
+        },
+        'embedding': {'model_name': 'test-model', 'device': 'cpu', 'use_cache': False},
+        'search': {'top_k': 5, 'similarity_threshold': -1.0, 'exact_search_max_chunks': 20},
+    }
+    config_path = temp_dir / 'config.yaml'
+    config_path.write_text(yaml.safe_dump(config), encoding='utf-8')
+
+    # 片段向量与查询方向的夹角随文档编号和片段序号增大
+    store = VectorStore(config_path)
+    ids, embeddings, metadatas = [], [], []
+    for doc_id, metadata, chunks in _documents():
+        for i in range(chunks):
+            angle = (int(doc_id[3:]) * 3 + i) * 0.03
+            ids.append(f"{doc_id}#{i}")
+            embeddings.append([np.cos(angle), np.sin(angle)] + [0.0] * 6)
+            metadatas.append({**metadata, 'category': metadata['category'] or '', 'doc_id': doc_id,
+                              'chunk_index': i, 'chunk_count': chunks, 'start': 0, 'end': 1, 'section': ''})
+    store.add_documents(documents=ids, embeddings=embeddings, metadatas=metadatas, ids=ids)
+    MetadataIndex(temp_dir / 'memory' / 'metadata_index.db').upsert(_documents())
+
+    engine = SemanticSearch(config_path)
+    engine.embedder = _Embedder()
+    return engine
+
+
+class TestSearchPlan:
+    """执行方式选择测试"""
+
+    @pytest.mark.unit
+    def test_selective_filter_uses_side_index(self, engine: SemanticSearch):
+        results = engine.search('查询', top_k=3, where={'extension': '.py'})
+
+        assert engine.last_plan == 'metadata_index'
+        assert [r['id'] for r in results] == ['doc8', 'doc9']
+        assert results[0]['chunk']['section'] == ''
+
+    @pytest.mark.unit
+    def test_broad_filter_goes_to_vector_store(self, engine: SemanticSearch):
+        exact = engine.search('查询', top_k=3, where={'category': 'daily_logs'})
+        assert engine.last_plan == 'metadata_index'
+
+        engine.exact_search_max_chunks = 3
+        filtered = engine.search('查询', top_k=3, where={'category': 'daily_logs'})
+        assert engine.last_plan == 'vector_where'
+
+        assert [r['id'] for r in filtered] == [r['id'] for r in exact] == ['doc1', 'doc3', 'doc5']
+        np.testing.assert_allclose([r['similarity'] for r in filtered],
+                                   [r['similarity'] for r in exact], atol=1e-5)
+
+    @pytest.mark.unit
+    def test_no_filter_and_unsupported_field(self, engine: SemanticSearch):
+        assert [r['id'] for r in engine.search('查询', top_k=2)] == ['doc0', 'doc1']
+        assert engine.last_plan == 'vector'
+
+        engine.search('查询', top_k=2, where={'title': 'file1'})
+        assert engine.last_plan == 'vector_where'
@@ -0,0 +1,161 @@
+"""
+memory_agent 向量库批量查询单元测试
+
+测试内容：
+- search_many 把多个查询合并为一次 query 请求，结果与逐个 search_documents 一致
+- get_embeddings 读取已存向量，分块文档取片段向量的平均方向与平均模长
+- query_by_ids 忽略不存在的ID、去掉重复ID，相关结果不含文档自身
+- search_ids 只在候选片段中精确搜索，距离与向量搜索可直接比较
+- SmartRecommender.relate_many 批量关联文档并排除自身
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parents[2] / "01_Active_Projects" / "memory_agent"))
+
+from recommender import SmartRecommender
+from vector_store import VectorStore
+
+Q1 = [1.0, 0.0, 0.0, 0.0]
+Q2 = [0.0, 1.0, 0.0, 0.0]
+
+
+def _records():
+    """(ID, 向量, 元数据)：a/b/c 为整篇存储的文档，big 分成两个片段"""
+    chunk = {'doc_id': 'big', 'chunk_count': 2, 'start': 0, 'end': 1, 'section': '', 'title': 'big'}
+    return [
+        ('a', [1.0, 0.0, 0.0, 0.0], {'title': 'a'}),
+        ('b', [0.8, 0.6, 0.0, 0.0], {'title': 'b'}),
+        ('c', [0.0, 0.0, 0.5, 0.0], {'title': 'c'}),
+        ('big#0', [0.0, 1.0, 0.0, 0.0], {**chunk, 'chunk_index': 0}),
+        ('big#1', [0.0, 0.0, 0.0, 1.0], {**chunk, 'chunk_index': 1}),
+    ]
+
+
+@pytest.fixture
+def config_path(temp_dir: Path) -> Path:
+    config = {
+        'vector_db': {
+            'persist_directory': str(temp_dir / 'memory' / 'chroma_db'),
+            'collection_name': 'test_memory',
+            'backend': 'numpy',
+        },
+        'embedding': {'model_name': 'test-model', 'device': 'cpu', 'use_cache': False},
+    }
+    config_path = temp_dir / 'config.yaml'
+    config_path.write_text(yaml.safe_dump(config), encoding='utf-8')
+
+    ids, embeddings, metadatas = zip(*_records())
+    VectorStore(config_path).add_documents(
+        documents=list(ids), embeddings=list(embeddings), metadatas=list(metadatas), ids=list(ids)
+    )
+    return config_path
+
+
+@pytest.fixture
+def store(config_path: Path) -> VectorStore:
+    return VectorStore(config_path)
+
+
+class TestSearchMany:
+    """批量向量搜索测试"""
+
+    @pytest.mark.unit
+    def test_single_query_request(self, store: VectorStore):
+        calls = []
+        query = store.collection.query
+        store.collection.query = lambda *args, **kwargs: calls.append(kwargs) or query(*args, **kwargs)
+
+        results = store.search_many([Q1, Q2], top_k=2)
+
+        assert len(calls) == 1
+        assert len(calls[0]['query_embeddings']) == 2
+        assert [[r['id'] for r in rows] for rows in results] == [['a', 'b'], ['big', 'b']]
+
+    @pytest.mark.unit
+    def test_matches_search_documents(self, store: VectorStore):
+        batched = store.search_many([Q1, Q2], top_k=3)
+
+        for query, rows in zip([Q1, Q2], batched):
+            single = store.search_documents(query, top_k=3)
+            assert [r['id'] for r in rows] == [r['id'] for r in single]
+            np.testing.assert_allclose([r['distance'] for r in rows], [r['distance'] for r in single])
+
+    @pytest.mark.unit
+    def test_chunks_collapsed(self, store: VectorStore):
+        # top_k=2 时候选片段数（top_k * 4）覆盖全部记录
+        top = store.search_many([Q2], top_k=2)[0][0]
+
+        assert top['id'] == 'big'
+        assert top['matches'] == 2
+        assert top['metadata'] == {'title': 'big'}
+
+    @pytest.mark.unit
+    def test_empty_queries(self, store: VectorStore):
+        assert store.search_many([], top_k=3) == []
+
+
+class TestStoredVectors:
+    """已存向量读取与按ID查询测试"""
+
+    @pytest.mark.unit
+    def test_get_embeddings(self, store: VectorStore):
+        vectors = store.get_embeddings(['a', 'big', 'missing'])
+
+        assert set(vectors) == {'a', 'big'}
+        np.testing.assert_allclose(vectors['a'], [1.0, 0.0, 0.0, 0.0])
+        # 片段 [0,1,0,0] 与 [0,0,0,1] 的平均方向，模长取片段平均（1）
+        np.testing.assert_allclose(vectors['big'], [0.0, 2 ** -0.5, 0.0, 2 ** -0.5], rtol=1e-6)
+        assert store.get_embeddings([]) == {}
+
+    @pytest.mark.unit
+    def test_query_by_ids(self, store: VectorStore):
+        related = store.query_by_ids(['a', 'big', 'missing', 'a'], top_k=2)
+
+        assert list(related) == ['a', 'big']
+        assert [r['id'] for r in related['a']] == ['b', 'c']
+        assert [r['id'] for r in related['big']] == ['b', 'c']
+
+    @pytest.mark.unit
+    def test_query_by_ids_all_missing(self, store: VectorStore):
+        assert store.query_by_ids(['missing'], top_k=2) == {}
+
+    @pytest.mark.unit
+    def test_search_ids(self, store: VectorStore):
+        results = store.search_ids(Q1, ['big#1', 'b', 'missing'], top_k=5)
+
+        assert [r['id'] for r in results] == ['b', 'big']
+        assert results[1]['chunk'] == {'start': 0, 'end': 1, 'section': ''}
+
+        # 距离与向量搜索使用同一度量
+        searched = {r['id']: r['distance'] for r in store.search_documents(Q1, top_k=4)}
+        np.testing.assert_allclose(results[0]['distance'], searched['b'], rtol=1e-6)
+
+
+class TestRelateMany:
+    """批量文档关联测试"""
+
+    @pytest.mark.unit
+    def test_excludes_self(self, config_path: Path):
+        recommender = SmartRecommender(config_path)
+
+        related = recommender.relate_many(['a', 'b', 'missing'], top_k=3)
+
+        assert list(related) == ['a', 'b']
+        for doc_id, results in related.items():
+            ids = [r['id'] for r in results]
+            assert doc_id not in ids
+            assert len(ids) == 3
+        assert related['b'][0]['id'] == 'a'
+        assert related['b'][0]['similarity'] == pytest.approx(1 - 0.4, abs=1e-6)
+
+    @pytest.mark.unit
+    def test_relate_documents_missing(self, config_path: Path):
+        recommender = SmartRecommender(config_path)
+
+        assert recommender.relate_documents('missing') == []
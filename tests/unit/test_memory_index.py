@@ -0,0 +1,319 @@
+"""
+记忆倒排索引单元测试
+
+测试内容：
+- 中英文分词
+- 布尔匹配与 BM25 排序
+- 增量同步与持久化
+- NumPy 向量化匹配/评分与逐条计算结果一致，增量追加后缓存失效、词表保持有序
+- MemoryStore 检索接口
+- LexicalIndex 词法检索（单字扩展走汉字→二元组映射）、增量日志重放与倒数排名融合
+"""
+
+from pathlib import Path
+
+import pytest
+
+from claude_memory import MemoryStore
+from memory_index import (NUMPY_AVAILABLE, LexicalIndex, MemoryIndex, reciprocal_rank_fusion,
+                          tokenize)
+
+
+CONTEXTS = [
+    {'timestamp': '2026-01-01T00:00:00', 'topic': '多Agent系统开发',
+     'summary': '创建了基于WorkflowEngine的多Agent演示系统', 'tags': ['agent']},
+    {'timestamp': '2026-01-02T00:00:00', 'topic': '项目_market_supervision_agent',
+     'summary': '市场监管智能体的申请书生成', 'tags': ['project']},
+    {'timestamp': '2026-01-03T00:00:00', 'topic': 'LangGraph 深度研究',
+     'summary': '检查点和状态管理', 'key_points': ['Supervisor 模式'], 'tags': ['agent']},
+]
+
+
+def _index() -> MemoryIndex:
+    index = MemoryIndex()
+    index.rebuild(CONTEXTS)
+    return index
+
+
+class TestTokenize:
+    """分词测试"""
+
+    @pytest.mark.unit
+    def test_cjk_bigrams_and_ascii_words(self):
+        assert tokenize('工作流 LangGraph') == ['工作', '作流', 'langgraph']
+
+    @pytest.mark.unit
+    def test_identifier_parts(self):
+        assert tokenize('market_supervision') == ['market_supervision', 'market', 'supervision']
+
+
+class TestMemoryIndex:
+    """倒排索引测试"""
+
+    @pytest.mark.unit
+    def test_match_requires_all_tokens(self):
+        index = _index()
+        assert index.match('多Agent') == {0}
+        assert index.match('市场监管 申请书') == {1}
+        assert index.match('市场监管 LangGraph') == set()
+
+    @pytest.mark.unit
+    def test_match_field_restriction(self):
+        index = _index()
+        assert index.match('supervisor') == {2}
+        assert index.match('supervisor', fields=['topic', 'summary']) == set()
+
+    @pytest.mark.unit
+    def test_prefix_and_single_char_expansion(self):
+        index = _index()
+        assert index.match('lang') == {2}
+        assert index.match('检') == {2}
+
+    @pytest.mark.unit
+    def test_search_ranks_topic_hits_first(self):
+        index = _index()
+        ranked = index.search('agent', top_k=3)
+        assert ranked[0][0] == 0
+        assert {doc_id for doc_id, _ in ranked} == {0, 1, 2}
+
+    @pytest.mark.unit
+    def test_sync_appends_and_rebuilds(self):
+        index = MemoryIndex()
+        assert index.sync(CONTEXTS[:2]) is False
+        assert index.sync(CONTEXTS) is False
+        assert index.doc_count == 3
+        assert index.sync(CONTEXTS[1:]) is True
+        assert index.match('多Agent') == set()
+
+    @pytest.mark.unit
+    def test_save_and_load(self, temp_dir: Path):
+        index = _index()
+        path = temp_dir / "contexts.index.json"
+        index.save(path)
+
+        loaded = MemoryIndex.load(path)
+        assert loaded.doc_count == 3
+        assert loaded.search('检查点') == index.search('检查点')
+        assert loaded.docs_with_tag('agent') == [0, 2]
+
+
+def _synthetic(size: int):
+    words = ['工作流', '检查点', '状态管理', '记忆系统', 'LangGraph', 'Playwright', 'SQLite']
+    return [{'timestamp': f'2026-01-01T00:00:{i:06d}',
+             'topic': f'{words[i % 7]}{words[(i * 3) % 7]}',
+             'summary': ' '.join(words[(i + j) % 7] for j in range(i % 4 + 1)),
+             'key_points': [words[(i * 5) % 7]], 'tags': []} for i in range(size)]
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="需要 NumPy")
+class TestVectorizedQueries:
+    """向量化查询测试"""
+
+    def _pair(self, contexts):
+        vectorized, plain = MemoryIndex(), MemoryIndex()
+        vectorized.VECTORIZE_MIN_POSTINGS = 0
+        plain.VECTORIZE_MIN_POSTINGS = float('inf')
+        vectorized.rebuild(contexts)
+        plain.rebuild(contexts)
+        return vectorized, plain
+
+    @pytest.mark.unit
+    def test_same_results_as_pure_python(self):
+        vectorized, plain = self._pair(_synthetic(300))
+
+        for query in ['工作流', '状态管理 lang', '检', 'sqlite playwright', '不存在']:
+            for fields in (None, ['topic', 'summary']):
+                for require_all in (True, False):
+                    assert vectorized.match(query, fields, require_all) == \
+                        plain.match(query, fields, require_all)
+                    assert vectorized.search(query, 10, fields, require_all) == \
+                        plain.search(query, 10, fields, require_all)
+            candidates = plain.match(query, require_all=False)
+            assert vectorized.score(query, candidates) == plain.score(query, candidates)
+
+    @pytest.mark.unit
+    def test_incremental_add_after_query(self):
+        contexts = _synthetic(300)
+        vectorized, plain = self._pair(contexts)
+        vectorized.search('工作流 lang')
+
+        extra = [{'timestamp': '2026-02-01T00:00:00', 'topic': '工作流 LangChain',
+                  'summary': '工作流', 'tags': []}]
+        vectorized.sync(contexts + extra)
+        plain.sync(contexts + extra)
+
+        # 新词按序插入词表，缓存的倒排数组和长度矩阵随追加更新
+        assert not vectorized._vocab_dirty
+        assert vectorized._ascii_vocab == sorted(vectorized._ascii_vocab)
+        assert vectorized.match('langc') == {300}
+        assert vectorized.search('工作流 lang', top_k=5) == plain.search('工作流 lang', top_k=5)
+
+
+class TestMemoryStoreRetrieval:
+    """MemoryStore 检索接口测试"""
+
+    @pytest.mark.unit
+    def test_store_queries_use_index(self, temp_dir: Path):
+        store = MemoryStore(temp_dir)
+        for ctx in CONTEXTS:
+            store.add_context(ctx)
+
+        assert [c['topic'] for c in store.get_relevant_contexts('多Agent')] == ['多Agent系统开发']
+        assert len(store.get_contexts_by_tag('agent')) == 2
+        assert [c['topic'] for c in store.search_all_contexts('状态管理')] == ['LangGraph 深度研究']
+        results = store.semantic_search('LangGraph 检查点')
+        assert results[0]['topic'] == 'LangGraph 深度研究'
+        assert '_relevance_score' in results[0]
+
+    @pytest.mark.unit
+    def test_substring_hits_follow_token_hits(self, temp_dir: Path):
+        store = MemoryStore(temp_dir)
+        for ctx in CONTEXTS:
+            store.add_context(ctx)
+        store.add_context({'topic': 'MemoryStore 重构', 'summary': '追加日志后端'})
+        store.add_context({'topic': '对象存储', 'summary': 'store 接口设计'})
+
+        # 词项命中（整词 store）在前，单词内部的子串命中（MemoryStore）补在后面
+        assert [c['topic'] for c in store.get_relevant_contexts('store')] == \
+            ['对象存储', 'MemoryStore 重构']
+        assert [c['topic'] for c in store.get_relevant_contexts('store', limit=1)] == ['对象存储']
+        # 没有词项命中时只有子串命中
+        assert [c['topic'] for c in store.get_relevant_contexts('ervis')] == [CONTEXTS[1]['topic']]
+        assert [c['topic'] for c in store.search_all_contexts('ervisor 模')] == ['LangGraph 深度研究']
+        assert [c['topic'] for c in store.search_all_contexts('检查点')] == ['LangGraph 深度研究']
+
+    @pytest.mark.unit
+    def test_semantic_search_keeps_importance_only_matches(self, temp_dir: Path):
+        store = MemoryStore(temp_dir)
+        for ctx in CONTEXTS:
+            store.add_context(ctx)
+        importance = {c['topic']: store.calculate_importance(c) * 0.5 for c in CONTEXTS}
+        min_score = min(importance.values())
+
+        # 只有一条记忆命中文本，其余记忆仅凭重要性也能够得上 min_score
+        results = store.semantic_search('申请书', top_k=5, min_score=min_score)
+        assert results[0]['topic'] == CONTEXTS[1]['topic']
+        assert {r['topic'] for r in results} == set(importance)
+        # 按词项一条都没命中时逐条扫描，与不带索引时一致
+        unindexed = store.retriever.search(store.memory['contexts']['contexts'], 'zzz',
+                                           top_k=5, min_score=min_score)
+        assert [r['topic'] for r in store.semantic_search('zzz', 5, min_score)] == \
+            [r['topic'] for r in unindexed]
+        assert unindexed
+
+    @pytest.mark.unit
+    def test_index_persisted_and_caught_up(self, temp_dir: Path):
+        store = MemoryStore(temp_dir)
+        store.add_context(CONTEXTS[0])
+        # 只写入、未查询时不加载也不保存索引
+        assert store._index is None
+        store.close()
+        assert not store.index_path.exists()
+
+        store = MemoryStore(temp_dir)
+        assert store.get_relevant_contexts('多Agent')
+        store.add_context(CONTEXTS[1])
+        # 写入路径不重写索引文件，close() 时才保存
+        assert not store.index_path.exists()
+        store.close()
+        assert MemoryIndex.load(store.index_path).doc_count == 1
+
+        store = MemoryStore(temp_dir)
+        store.add_context(CONTEXTS[2])
+        # 不调用 close()，索引文件落后一条，首次查询时补齐尾部
+        reopened = MemoryStore(temp_dir)
+        assert reopened._index is None
+        assert reopened.get_relevant_contexts('检查点')[0]['topic'] == CONTEXTS[2]['topic']
+        assert reopened.index.doc_count == 3
+
+
+class TestLexicalIndex:
+    """向量集合旁的词法索引测试"""
+
+    def _lexical(self) -> LexicalIndex:
+        index = LexicalIndex()
+        index.add('a', '身份证号 110101199003074514 校验失败')
+        index.add('b', '调用 load_model 时报 ModuleNotFoundError')
+        index.add('c', '营业执照 OCR 识别结果整理')
+        return index
+
+    @pytest.mark.unit
+    def test_exact_identifier_hits(self):
+        index = self._lexical()
+        assert index.search('110101199003074514')[0][0] == 'a'
+        assert index.search('ModuleNotFoundError')[0][0] == 'b'
+        assert index.search('load_model')[0][0] == 'b'
+        assert index.search('营业执照识别')[0][0] == 'c'
+
+    @pytest.mark.unit
+    def test_remove_and_reindex(self):
+        index = self._lexical()
+        index.remove('b')
+        assert 'b' not in index
+        assert index.search('load_model') == []
+
+        index.add('c', '新的 load_model 说明')
+        assert len(index) == 2
+        assert index.search('load_model')[0][0] == 'c'
+        assert index.search('营业执照') == []
+
+    @pytest.mark.unit
+    def test_single_char_expansion_tracks_vocabulary(self, temp_dir: Path):
+        index = self._lexical()
+        assert sorted(index._expand('执')) == ['业执', '执照']
+        assert index.search('执')[0][0] == 'c'
+
+        # 二元组从词表中消失后，单字映射随之清理
+        index.remove('c')
+        assert index._expand('执') == [] and '执' not in index._by_char
+        assert index.search('执') == []
+
+        index.save(temp_dir / 'memories.lexical.json')
+        loaded = LexicalIndex.load(temp_dir / 'memories.lexical.json')
+        assert loaded._by_char == index._by_char
+        assert loaded.search('校')[0][0] == 'a'
+
+    @pytest.mark.unit
+    def test_save_and_load(self, temp_dir: Path):
+        index = self._lexical()
+        path = temp_dir / 'memories.lexical.json'
+        index.save(path)
+
+        loaded = LexicalIndex.load(path)
+        assert len(loaded) == 3
+        assert loaded.total_length == index.total_length
+        assert loaded.search('ModuleNotFoundError') == index.search('ModuleNotFoundError')
+        assert LexicalIndex.load(temp_dir / 'missing.json') is None
+
+    @pytest.mark.unit
+    def test_delta_log_replayed_on_load(self, temp_dir: Path):
+        path = temp_dir / 'memories.lexical.json'
+        self._lexical().save(path)
+
+        LexicalIndex.append_log(path, LexicalIndex.delta(added={'d': '错误码 E1001'}, removed=['a']))
+        # 写到一半的行在重放时跳过，之后的追加另起一行
+        with open(LexicalIndex.log_path(path), 'ab') as f:
+            f.write(b'{"op":"add","id":"x","ter')
+        LexicalIndex.append_log(path, LexicalIndex.delta(added={'b': '改写后的 load_model 说明'}))
+
+        loaded = LexicalIndex.load(path)
+        assert 'a' not in loaded and 'x' not in loaded
+        assert loaded.search('e1001')[0][0] == 'd'
+        assert loaded.search('ModuleNotFoundError') == []
+        assert loaded.log_entries == 3
+
+        # 写出快照后日志清空，重新加载结果不变
+        loaded.save(path)
+        assert not LexicalIndex.log_path(path).exists()
+        reloaded = LexicalIndex.load(path)
+        assert reloaded.docs == loaded.docs and reloaded.log_entries == 0
+
+    @pytest.mark.unit
+    def test_reciprocal_rank_fusion(self):
+        fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['d', 'b']], k=60)
+        assert max(fused, key=fused.get) == 'b'
+        assert fused['d'] == pytest.approx(1 / 61)
+
+        # 只出现在一路中的结果，权重足够时也能排在前面
+        weighted = reciprocal_rank_fusion([['a', 'b'], ['c']], weights=[0.3, 0.7])
+        assert max(weighted, key=weighted.get) == 'c'
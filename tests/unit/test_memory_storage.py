@@ -0,0 +1,188 @@
+"""
+记忆存储后端单元测试
+
+测试追加日志后端的各项功能：
+- 增量记录与重放
+- 日志压缩（快照折叠）
+- 旧版 JSON 迁移（含向量库迁移读取日志尾部）
+- 崩溃恢复（半行日志、未删除的旧日志段）
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from claude_memory import MemoryStore
+from memory_storage import AppendLogBackend, apply_op, migrate_json_to_log
+
+
+MEMORY_TYPES = ['contexts', 'decisions', 'preferences', 'projects', 'evolution', 'conversations']
+
+
+def _memory_dir(root: Path) -> Path:
+    return root / "06_Learning_Journal" / "claude_memory"
+
+
+def _add(store: MemoryStore, i: int):
+    store.add_context({'topic': f'主题{i % 3}', 'summary': f'摘要{i}', 'tags': ['t']})
+
+
+class TestApplyOp:
+    """日志操作测试"""
+
+    @pytest.mark.unit
+    def test_append_incr_set(self):
+        data = {}
+        apply_op(data, {'op': 'append', 'path': ['items'], 'value': 1})
+        apply_op(data, {'op': 'incr', 'path': ['stats', 'a'], 'by': 2})
+        apply_op(data, {'op': 'set', 'path': ['name'], 'value': 'x'})
+
+        assert data == {'items': [1], 'stats': {'a': 2}, 'name': 'x'}
+
+
+class TestAppendLogBackend:
+    """追加日志后端测试"""
+
+    @pytest.mark.unit
+    def test_roundtrip(self, temp_dir: Path):
+        store = MemoryStore(temp_dir, backend='jsonl')
+        for i in range(5):
+            _add(store, i)
+        store.update_preferences({'coding_style': {'language': 'Python'}})
+        store.close()
+
+        reopened = MemoryStore(temp_dir, backend='jsonl')
+        contexts = reopened.memory['contexts']
+        assert contexts['total_contexts'] == 5
+        assert [c['summary'] for c in contexts['contexts']] == [f'摘要{i}' for i in range(5)]
+        assert contexts['contexts_by_topic'] == {'主题0': 2, '主题1': 2, '主题2': 1}
+        assert reopened.memory['preferences']['coding_style'] == {'language': 'Python'}
+
+    @pytest.mark.unit
+    def test_append_does_not_rewrite_snapshot(self, temp_dir: Path):
+        store = MemoryStore(temp_dir, backend='jsonl')
+        store.backend.write('contexts', store.memory['contexts'])
+        snapshot = _memory_dir(temp_dir) / "contexts.snapshot.json"
+        before = snapshot.stat().st_mtime_ns
+
+        _add(store, 0)
+
+        assert snapshot.stat().st_mtime_ns == before
+        assert list(_memory_dir(temp_dir).glob("contexts.log.*.jsonl"))
+
+    @pytest.mark.unit
+    def test_compaction_folds_log(self, temp_dir: Path):
+        store = MemoryStore(temp_dir, backend='jsonl')
+        store.backend = AppendLogBackend(_memory_dir(temp_dir), MEMORY_TYPES,
+                                         compact_threshold=6, background=False)
+        store.memory = store._load_all()
+        for i in range(10):
+            _add(store, i)
+        store.close()
+
+        snapshot = json.loads((_memory_dir(temp_dir) / "contexts.snapshot.json").read_text(encoding='utf-8'))
+        assert len(snapshot['data']['contexts']) >= 6
+
+        reopened = MemoryStore(temp_dir, backend='jsonl')
+        assert reopened.memory['contexts']['total_contexts'] == 10
+        assert len(reopened.memory['contexts']['contexts']) == 10
+
+    @pytest.mark.unit
+    def test_cleanup_writes_snapshot(self, temp_dir: Path):
+        store = MemoryStore(temp_dir, backend='jsonl')
+        for i in range(3):
+            _add(store, i)
+        store.memory['contexts']['contexts'] = store.memory['contexts']['contexts'][:1]
+        store.save('contexts')
+        store.close()
+
+        assert not list(_memory_dir(temp_dir).glob("contexts.log.*.jsonl"))
+        reopened = MemoryStore(temp_dir, backend='jsonl')
+        assert len(reopened.memory['contexts']['contexts']) == 1
+
+    @pytest.mark.unit
+    def test_torn_last_line_is_ignored(self, temp_dir: Path):
+        store = MemoryStore(temp_dir, backend='jsonl')
+        _add(store, 0)
+        store.close()
+        segment = next(_memory_dir(temp_dir).glob("contexts.log.*.jsonl"))
+        with open(segment, 'a', encoding='utf-8') as f:
+            f.write('{"op": "append", "path": ["contex')
+
+        reopened = MemoryStore(temp_dir, backend='jsonl')
+        assert len(reopened.memory['contexts']['contexts']) == 1
+
+        # 恢复后继续写入，再次加载时不能丢失
+        _add(reopened, 1)
+        _add(reopened, 2)
+        reopened.close()
+        assert not segment.read_bytes().endswith(b'contex')
+
+        again = MemoryStore(temp_dir, backend='jsonl')
+        assert len(again.memory['contexts']['contexts']) == 3
+
+    @pytest.mark.unit
+    def test_corrupt_middle_line_is_skipped(self, temp_dir: Path):
+        store = MemoryStore(temp_dir, backend='jsonl')
+        _add(store, 0)
+        store.close()
+        segment = next(_memory_dir(temp_dir).glob("contexts.log.*.jsonl"))
+        with open(segment, 'a', encoding='utf-8') as f:
+            f.write('{"op": "app\n')
+
+        reopened = MemoryStore(temp_dir, backend='jsonl')
+        _add(reopened, 1)
+        reopened.close()
+
+        again = MemoryStore(temp_dir, backend='jsonl')
+        assert len(again.memory['contexts']['contexts']) == 2
+
+
+class TestMigration:
+    """旧版 JSON 迁移测试"""
+
+    @pytest.mark.unit
+    def test_auto_migrate_from_json(self, temp_dir: Path):
+        legacy = MemoryStore(temp_dir, backend='json')
+        for i in range(4):
+            _add(legacy, i)
+
+        store = MemoryStore(temp_dir, backend='jsonl')
+        assert store.memory['contexts']['total_contexts'] == 4
+        assert (_memory_dir(temp_dir) / "contexts.json").exists()
+
+    @pytest.mark.unit
+    def test_migrate_json_to_log(self, temp_dir: Path):
+        legacy = MemoryStore(temp_dir, backend='json')
+        _add(legacy, 0)
+
+        result = migrate_json_to_log(_memory_dir(temp_dir), MEMORY_TYPES)
+        assert result['contexts'] == 'migrated'
+        assert migrate_json_to_log(_memory_dir(temp_dir), MEMORY_TYPES)['contexts'] == 'skipped'
+
+    @pytest.mark.unit
+    def test_vector_migration_reads_log_tail(self, temp_dir: Path):
+        from semantic_memory import MemoryMigrator
+
+        class _Semantic:
+            def __init__(self):
+                self.ids = []
+
+            def add_memories_batch(self, memories):
+                self.ids.extend(m['metadata']['topic'] for m in memories)
+                return {'success': len(memories), 'failed': 0}
+
+        legacy = MemoryStore(temp_dir, backend='json')
+        _add(legacy, 0)
+        store = MemoryStore(temp_dir, backend='jsonl')
+        _add(store, 1)
+        store.close()
+
+        semantic = _Semantic()
+        store = MemoryStore(temp_dir)
+        result = MemoryMigrator(semantic).migrate_contexts(store.memory['contexts']['contexts'])
+        store.close()
+
+        assert result['success'] == 2
+        assert semantic.ids == ['主题0', '主题1']
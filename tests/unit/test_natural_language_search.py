@@ -0,0 +1,115 @@
+"""
+自然语言搜索过滤下推单元测试
+
+测试内容：
+- 时间范围、文件类型、分类编译为 ChromaDB where 条件
+- 支持 where 的基础引擎收到下推的条件和 top_k
+- 不支持 where 的基础引擎退回到按元数据在内存中过滤
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from natural_language_search import EnhancedSearchEngine, QueryType
+
+
+class WhereEngine:
+    """记录调用参数的基础引擎（支持 where）"""
+
+    def __init__(self):
+        self.calls = []
+
+    def search(self, query, top_k=None, where=None):
+        self.calls.append({'query': query, 'top_k': top_k, 'where': where})
+        return [{'content': query, 'metadata': {}}]
+
+
+class PlainEngine:
+    """只接受查询文本的基础引擎"""
+
+    def __init__(self, results):
+        self.results = results
+
+    def search(self, query):
+        return list(self.results)
+
+
+def _result(name, extension, days_ago):
+    return {
+        'content': name,
+        'metadata': {
+            'path': f'notes/{name}{extension}',
+            'extension': extension,
+            'modified_timestamp': (datetime.now() - timedelta(days=days_ago)).timestamp(),
+        }
+    }
+
+
+class TestFilterPushDown:
+    """过滤下推测试"""
+
+    @pytest.mark.unit
+    def test_build_where_time_and_extension(self):
+        engine = EnhancedSearchEngine()
+        parsed = engine.parser.parse("最近7天的 python 代码")
+
+        where = engine.build_where(parsed)
+        conditions = where['$and']
+        assert {'extension': {'$in': ['.py']}} in conditions
+
+        start = conditions[0]['modified_timestamp']['$gte']
+        end = conditions[1]['modified_timestamp']['$lte']
+        assert end - start == pytest.approx(7 * 86400, abs=1)
+
+    @pytest.mark.unit
+    def test_build_where_category_only(self):
+        engine = EnhancedSearchEngine()
+        parsed = engine.parser.parse("踩坑记录")
+
+        assert parsed.categories == ['challenges_solved']
+        assert engine.build_where(parsed) == {'category': {'$in': ['challenges_solved']}}
+
+    @pytest.mark.unit
+    def test_no_filters_no_where(self):
+        engine = EnhancedSearchEngine()
+        assert engine.build_where(engine.parser.parse("向量数据库")) is None
+
+    @pytest.mark.unit
+    def test_file_type_search_pushed_down(self):
+        base = WhereEngine()
+        engine = EnhancedSearchEngine(base_search_engine=base)
+
+        result = engine.search("markdown 文档", top_k=3)
+
+        assert result['parsed'].query_type == QueryType.FILE_TYPE_BASED
+        assert result['count'] == 1
+        assert base.calls == [{
+            'query': '文档',
+            'top_k': 3,
+            'where': {'extension': {'$in': ['.markdown', '.md']}}
+        }]
+
+    @pytest.mark.unit
+    def test_time_only_query_uses_original_text(self):
+        base = WhereEngine()
+        engine = EnhancedSearchEngine(base_search_engine=base)
+
+        engine.search("今天")
+
+        assert base.calls[0]['query'] == '今天'
+        assert 'modified_timestamp' in str(base.calls[0]['where'])
+
+    @pytest.mark.unit
+    def test_post_filter_fallback(self):
+        base = PlainEngine([
+            _result('old', '.py', 30),
+            _result('recent_md', '.md', 1),
+            _result('recent_py', '.py', 1),
+        ])
+        engine = EnhancedSearchEngine(base_search_engine=base)
+        assert not engine.supports_where
+
+        result = engine.search("最近7天的 python 代码")
+
+        assert [r['content'] for r in result['results']] == ['recent_py']
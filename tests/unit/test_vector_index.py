@@ -0,0 +1,146 @@
+"""
+向量索引抽象单元测试
+
+测试内容：
+- where 条件编译为 SQL
+- numpy 后端：增删改查、过滤搜索、与精确距离一致、重新打开后数据仍在
+- hnswlib 后端：召回与 numpy 基准一致，图写盘后重新载入，删除后不再返回
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from vector_index import HnswIndex, NumpyIndex, compile_where, open_index
+
+
+def _data(n: int = 300, dim: int = 16, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    ids = [f"doc{i}" for i in range(n)]
+    metadatas = [{'type': 'journal' if i % 3 else 'project', 'rank': i} for i in range(n)]
+    return ids, vectors, metadatas
+
+
+class TestCompileWhere:
+    """过滤条件编译测试"""
+
+    @pytest.mark.unit
+    def test_nested_conditions(self):
+        sql, params = compile_where({'$and': [{'type': 'journal'}, {'rank': {'$gte': 3, '$lt': 9}}]})
+        assert sql.count('json_extract') == 3
+        assert params == ['journal', 3, 9]
+
+    @pytest.mark.unit
+    def test_unsupported_operator(self):
+        with pytest.raises(ValueError):
+            compile_where({'title': {'$contains': 'x'}})
+
+
+class TestNumpyIndex:
+    """numpy 后端测试"""
+
+    @pytest.mark.unit
+    def test_query_matches_exact_l2(self, temp_dir: Path):
+        ids, vectors, metadatas = _data()
+        index = open_index('numpy', temp_dir, 'memories')
+        index.add(ids=ids, embeddings=vectors, documents=ids, metadatas=metadatas)
+
+        result = index.query(query_embeddings=vectors[:2], n_results=5)
+
+        expected = np.argsort(np.sum((vectors - vectors[0]) ** 2, axis=1))[:5]
+        assert result['ids'][0] == [ids[i] for i in expected]
+        assert result['distances'][0][0] == pytest.approx(0, abs=1e-4)
+        assert result['ids'][1][0] == 'doc1'
+        assert result['metadatas'][0][0] == metadatas[0]
+
+    @pytest.mark.unit
+    def test_where_get_update_delete(self, temp_dir: Path):
+        ids, vectors, metadatas = _data()
+        index = open_index('numpy', temp_dir, 'memories', metadata={'hnsw:space': 'cosine'})
+        index.add(ids=ids, embeddings=vectors, documents=ids, metadatas=metadatas)
+
+        result = index.query(query_embeddings=[vectors[0]], n_results=10, where={'type': 'project'})
+        assert all(m['type'] == 'project' for m in result['metadatas'][0])
+        assert result['ids'][0][0] == 'doc0'
+
+        index.update(ids=['doc3'], metadatas=[{'type': 'journal', 'rank': 3}])
+        assert index.get(where={'type': 'project'}, limit=2)['ids'] == ['doc0', 'doc6']
+
+        index.delete(ids=['doc0'])
+        index.delete(where={'rank': {'$gte': 290}})
+        assert index.count() == 289
+        assert 'doc0' not in index.query(query_embeddings=[vectors[0]], n_results=3)['ids'][0]
+
+        # 已存在的ID被忽略（与 ChromaDB 一致）
+        index.add(ids=['doc1'], embeddings=vectors[:1], documents=['changed'])
+        assert index.get(ids=['doc1'])['documents'] == ['doc1']
+
+    @pytest.mark.unit
+    def test_reopen_and_float16(self, temp_dir: Path):
+        ids, vectors, metadatas = _data(50)
+        index = open_index('numpy', temp_dir, 'memories', dtype='float16')
+        index.add(ids=ids, embeddings=vectors, documents=ids, metadatas=metadatas)
+        index.close()
+
+        reopened = NumpyIndex(temp_dir, 'memories')
+        assert reopened.dtype == np.float16
+        assert reopened.count() == 50
+        stored = reopened.get(ids=['doc7'], include=['embeddings'])['embeddings'][0]
+        np.testing.assert_allclose(stored, vectors[7], atol=1e-2)
+
+        reopened.reset()
+        assert reopened.count() == 0
+        assert reopened.query(query_embeddings=[vectors[0]], n_results=3)['ids'] == [[]]
+
+
+    @pytest.mark.unit
+    def test_rejected_write_leaves_index_unchanged(self, temp_dir: Path):
+        ids, vectors, metadatas = _data(10)
+        index = open_index('numpy', temp_dir, 'memories')
+
+        # 没有写入任何记录的批次不能定下维度
+        index.update(ids=ids, embeddings=vectors[:, :8])
+        with pytest.raises(ValueError):
+            index.add(ids=ids, embeddings=vectors[:5])
+        assert index.dim is None
+
+        index.add(ids=ids, embeddings=vectors, metadatas=metadatas)
+        with pytest.raises(ValueError):
+            index.add(ids=['extra'], embeddings=vectors[:1, :8])
+
+        # 行号计数与记录一起落盘
+        reopened = NumpyIndex(temp_dir, 'memories')
+        assert reopened.dim == 16 and reopened.next_row == 10
+        assert reopened._settings()['version'] == str(index.version)
+
+
+class TestHnswIndex:
+    """hnswlib 后端测试"""
+
+    @pytest.mark.unit
+    def test_recall_persist_and_delete(self, temp_dir: Path):
+        pytest.importorskip('hnswlib')
+        ids, vectors, metadatas = _data(2000, 32)
+        exact = open_index('numpy', temp_dir, 'exact', metadata={'hnsw:space': 'cosine'})
+        exact.add(ids=ids, embeddings=vectors, metadatas=metadatas)
+        index = open_index('hnswlib', temp_dir, 'memories', metadata={'hnsw:space': 'cosine'},
+                           hnsw={'M': 16, 'ef_search': 100})
+        index.add(ids=ids, embeddings=vectors, metadatas=metadatas)
+
+        queries = vectors[:20] + 0.1
+        truth = exact.query(query_embeddings=queries, n_results=10)['ids']
+        found = index.query(query_embeddings=queries, n_results=10)['ids']
+        recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(truth, found)])
+        assert recall >= 0.9
+
+        index.delete(ids=['doc0'])
+        index.close()
+
+        reopened = HnswIndex(temp_dir, 'memories')
+        assert reopened.graph.get_current_count() == 2000   # 载入已保存的图，而不是重建
+        assert 'doc0' not in reopened.query(query_embeddings=[vectors[0]], n_results=5)['ids'][0]
+
+        filtered = reopened.query(query_embeddings=[vectors[1]], n_results=5, where={'type': 'project'})
+        assert all(m['type'] == 'project' for m in filtered['metadatas'][0])
@@ -0,0 +1,100 @@
+"""
+工作流异步执行单元测试
+
+测试内容：
+- AsyncNode 在 ainvoke 中被 await，同步节点在线程池执行
+- 并行分支中的异步 I/O 相互重叠
+- astream 事件流
+- AsyncNode 在同步 invoke 中可用
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from workflow_engine import END, AsyncNode, Node, State, WorkflowGraph
+
+
+class SleepNode(AsyncNode):
+    """模拟浏览器等待的异步节点"""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__(name, "异步等待")
+        self.delay = delay
+
+    async def execute(self, state: State) -> State:
+        await asyncio.sleep(self.delay)
+        state['data'][self.name] = True
+        return state
+
+
+class SyncNode(Node):
+    """同步节点"""
+
+    def __init__(self, name: str):
+        super().__init__(name, "同步节点")
+
+    def execute(self, state: State) -> State:
+        state['data'][self.name] = True
+        return state
+
+
+def _graph() -> WorkflowGraph:
+    graph = WorkflowGraph("test_async")
+    graph.add_node("start", SyncNode("start"))
+    graph.add_node("page_a", SleepNode("page_a", 0.2))
+    graph.add_node("page_b", SleepNode("page_b", 0.2))
+    graph.add_node("save", SyncNode("save"))
+    graph.add_parallel_edges("start", ["page_a", "page_b"], join="save")
+    graph.add_edge("save", END)
+    graph.set_entry_point("start")
+    return graph
+
+
+class TestAsyncWorkflow:
+    """异步工作流测试"""
+
+    @pytest.mark.unit
+    def test_ainvoke_overlaps_async_branches(self):
+        workflow = _graph().compile()
+
+        began = time.perf_counter()
+        result = asyncio.run(workflow.ainvoke(save_checkpoints=False))
+        elapsed = time.perf_counter() - began
+
+        assert result['success']
+        assert set(result['state']['data']) == {'start', 'page_a', 'page_b', 'save'}
+        assert elapsed < 0.35
+
+    @pytest.mark.unit
+    def test_astream_events(self):
+        async def collect():
+            return [event async for event in _graph().compile().astream(save_checkpoints=False)]
+
+        events = asyncio.run(collect())
+        types = [event['type'] for event in events]
+
+        assert types[0] == 'node_start' and events[0]['node'] == 'start'
+        assert types.count('node_end') == 4
+        assert 'parallel_start' in types and 'parallel_end' in types
+        assert types[-1] == 'end' and events[-1]['result']['success']
+        assert all(event['duration'] >= 0 for event in events if event['type'] == 'node_end')
+
+    @pytest.mark.unit
+    def test_async_timeout(self):
+        graph = WorkflowGraph("test_async_timeout")
+        graph.add_node("slow", SleepNode("slow", 2), timeout=0.1)
+        graph.set_entry_point("slow")
+
+        result = asyncio.run(graph.compile().ainvoke(save_checkpoints=False))
+
+        assert not result['success']
+        assert '超时' in result['errors'][0]
+
+    @pytest.mark.unit
+    def test_async_node_in_sync_invoke(self):
+        result = _graph().compile().invoke(save_checkpoints=False)
+
+        assert result['success']
+        assert result['state']['data']['page_b'] is True
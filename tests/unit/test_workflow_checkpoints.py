@@ -0,0 +1,127 @@
+"""
+工作流检查点存储单元测试
+
+测试内容：
+- 结构化差异的生成与应用
+- 差异块与完整状态块交替写入、按需重建
+- 清理旧检查点时按引用计数删除块（重新加载后同样沿差异链释放）
+- 旧格式索引（内联状态）的兼容读取
+"""
+
+import json
+
+import pytest
+
+from workflow_engine import CheckpointManager, _apply_state_diff, _state_diff
+
+
+def _state(step: int) -> dict:
+    return {
+        'data': {'step': step, 'payload': 'x' * 200},
+        'nodes_executed': [f'node_{i}' for i in range(step)],
+        'errors': [],
+    }
+
+
+class TestStateDiff:
+    """结构化差异测试"""
+
+    @pytest.mark.unit
+    def test_roundtrip(self):
+        old = {'a': 1, 'b': {'c': [1, 2], 'd': 'x'}, 'e': [3, 4], 'gone': True}
+        new = {'a': 2, 'b': {'c': [1, 2, 3], 'd': 'x'}, 'e': [4], 'f': None}
+
+        patch = _state_diff(old, new)
+
+        assert patch['c']['b'] == {'c': {'c': {'a': [3]}}}
+        assert patch['d'] == ['gone']
+        assert _apply_state_diff(json.loads(json.dumps(old)), patch) == new
+
+    @pytest.mark.unit
+    def test_identical_returns_none(self):
+        assert _state_diff({'a': [1]}, {'a': [1]}) is None
+        assert _state_diff(1, True) == {'r': True}
+
+
+class TestCheckpointManager:
+    """检查点管理器测试"""
+
+    @pytest.mark.unit
+    def test_save_and_load_delta_chain(self, temp_dir):
+        manager = CheckpointManager('wf', storage_path=temp_dir)
+        ids = [manager.save(_state(i), current_node=f'node_{i}') for i in range(25)]
+
+        blobs = [manager.checkpoints[cid] for cid in ids]
+        keyframes = [entry for entry in blobs if entry['base'] is None]
+        assert len(keyframes) == 3
+
+        reopened = CheckpointManager('wf', storage_path=temp_dir)
+        for i, cid in enumerate(ids):
+            assert reopened.get_state_at(cid) == _state(i)
+        assert reopened.load(ids[-1])['current_node'] == 'node_24'
+        assert 'state' not in reopened.list_history()[0]
+
+    @pytest.mark.unit
+    def test_index_has_no_state(self, temp_dir):
+        manager = CheckpointManager('wf', storage_path=temp_dir)
+        manager.save(_state(3), current_node='a')
+
+        with open(manager.index_file, encoding='utf-8') as f:
+            entry = json.loads(f.readline())
+        assert 'state' not in entry
+        assert (manager.blob_path / f"{entry['blob']}.json").exists()
+
+    @pytest.mark.unit
+    def test_clear_keeps_referenced_bases(self, temp_dir):
+        manager = CheckpointManager('wf', storage_path=temp_dir)
+        ids = [manager.save(_state(i), current_node='n') for i in range(15)]
+
+        manager.clear_old_checkpoints(keep_last=3)
+
+        reopened = CheckpointManager('wf', storage_path=temp_dir)
+        assert set(reopened.checkpoints) == set(ids[-3:])
+        for i in range(12, 15):
+            assert reopened.get_state_at(ids[i]) == _state(i)
+        # 保留的检查点以第 11 个为关键帧，之前的块都应被删除
+        assert len(list(manager.blob_path.glob('*.json'))) == 4
+
+        manager.clear_old_checkpoints(keep_last=0)
+        assert list(manager.blob_path.glob('*.json')) == []
+        assert CheckpointManager('wf', storage_path=temp_dir).checkpoints == {}
+
+    @pytest.mark.unit
+    def test_reload_releases_delta_bases(self, temp_dir):
+        first = CheckpointManager('wf', storage_path=temp_dir)
+        first.save(_state(0), current_node='a')
+        first.save(_state(1), current_node='b')       # 以第一个块为基准的差异块
+        second = CheckpointManager('wf', storage_path=temp_dir)
+        kept = [second.save(_state(i), current_node='c') for i in (0, 2, 3)]   # 第一个与首个块内容相同
+
+        # 删除首个关键帧和差异块（墓碑行少于有效条目，索引不重写），关键帧块仍被引用
+        second.clear_old_checkpoints(keep_last=3)
+        assert len(list(second.blob_path.glob('*.json'))) == 3
+
+        reopened = CheckpointManager('wf', storage_path=temp_dir)
+        assert set(reopened.checkpoints) == set(kept) and reopened._tombstones == 2
+        assert [reopened.get_state_at(cid) for cid in kept] == [_state(0), _state(2), _state(3)]
+        reopened.clear_old_checkpoints(keep_last=0)
+        assert list(reopened.blob_path.glob('*.json')) == []
+
+    @pytest.mark.unit
+    def test_legacy_index(self, temp_dir):
+        storage = temp_dir / 'wf'
+        storage.mkdir()
+        checkpoint = {
+            'id': 'old', 'workflow_id': 'wf', 'timestamp': '2026-01-01T00:00:00',
+            'current_node': 'a', 'state': _state(2), 'metadata': {}
+        }
+        (storage / 'index.jsonl').write_text(json.dumps(checkpoint) + '\n', encoding='utf-8')
+        (storage / 'old.json').write_text(json.dumps(checkpoint), encoding='utf-8')
+
+        manager = CheckpointManager('wf', storage_path=temp_dir)
+        assert 'state' not in manager.checkpoints['old']
+        assert manager.load('old')['state'] == _state(2)
+
+        manager.save(_state(3), current_node='b')
+        manager.clear_old_checkpoints(keep_last=1)
+        assert not (storage / 'old.json').exists()
@@ -0,0 +1,139 @@
+"""
+工作流并行执行单元测试
+
+测试内容：
+- 并行分叉/汇合与默认状态归并
+- 自定义归并函数与最大并发数
+- 节点超时
+- 有界循环
+"""
+
+import threading
+import time
+
+import pytest
+
+from workflow_engine import END, Node, State, WorkflowGraph
+
+
+class FuncNode(Node):
+    """用函数实现的测试节点"""
+
+    def __init__(self, name: str, func):
+        super().__init__(name, "测试节点")
+        self.func = func
+
+    def execute(self, state: State) -> State:
+        self.func(state)
+        return state
+
+
+def _set(key, value, delay: float = 0.0):
+    def func(state):
+        time.sleep(delay)
+        state['data'][key] = value
+    return func
+
+
+def _graph(**kwargs) -> WorkflowGraph:
+    graph = WorkflowGraph("test_parallel", **kwargs)
+    graph.add_node("start", FuncNode("start", _set('start', True)))
+    graph.add_node("ocr_a", FuncNode("ocr_a", _set('a', 1, 0.2)))
+    graph.add_node("ocr_b", FuncNode("ocr_b", _set('b', 2, 0.2)))
+    graph.add_node("join", FuncNode("join", lambda s: s['data'].update(total=s['data']['a'] + s['data']['b'])))
+    graph.set_entry_point("start")
+    graph.add_edge("join", END)
+    return graph
+
+
+class TestParallelEdges:
+    """并行边测试"""
+
+    @pytest.mark.unit
+    def test_fan_out_and_join(self):
+        graph = _graph()
+        graph.add_parallel_edges("start", ["ocr_a", "ocr_b"], join="join")
+
+        began = time.perf_counter()
+        result = graph.compile().invoke(save_checkpoints=False)
+        elapsed = time.perf_counter() - began
+
+        assert result['success']
+        assert result['state']['data']['total'] == 3
+        assert result['state']['metadata']['nodes_executed'] == ['start', 'ocr_a', 'ocr_b', 'join']
+        assert elapsed < 0.35
+
+    @pytest.mark.unit
+    def test_max_concurrency_one_runs_serially(self):
+        graph = _graph(max_concurrency=1)
+        graph.add_parallel_edges("start", ["ocr_a", "ocr_b"], join="join")
+
+        began = time.perf_counter()
+        graph.compile().invoke(save_checkpoints=False)
+        assert time.perf_counter() - began >= 0.4
+
+    @pytest.mark.unit
+    def test_custom_reducer(self):
+        def reducer(base, branches):
+            base['data']['a'] = sum(b['data'].get('a', 0) for b in branches)
+            base['data']['b'] = len(branches)
+            return base
+
+        graph = _graph()
+        graph.add_parallel_edges("start", ["ocr_a", "ocr_b"], join="join", reducer=reducer)
+        result = graph.compile().invoke(save_checkpoints=False)
+
+        assert result['state']['data']['total'] == 3
+        assert 'start' in result['state']['data']
+
+    @pytest.mark.unit
+    def test_branch_error_stops_workflow(self):
+        graph = _graph()
+        graph.add_node("ocr_b", FuncNode("ocr_b", lambda s: 1 / 0))
+        graph.add_parallel_edges("start", ["ocr_a", "ocr_b"], join="join")
+        result = graph.compile().invoke(save_checkpoints=False)
+
+        assert not result['success']
+        assert 'join' not in result['state']['metadata']['nodes_executed']
+
+    @pytest.mark.unit
+    def test_unknown_target_rejected(self):
+        with pytest.raises(ValueError):
+            _graph().add_parallel_edges("start", ["missing"], join="join")
+
+
+class TestExecutionLimits:
+    """超时与循环限制测试"""
+
+    @pytest.mark.unit
+    def test_node_timeout(self):
+        release = threading.Event()
+        graph = WorkflowGraph("test_timeout")
+        graph.add_node("slow", FuncNode("slow", lambda s: release.wait(2)), timeout=0.1)
+        graph.set_entry_point("slow")
+
+        result = graph.compile().invoke(save_checkpoints=False)
+        release.set()
+
+        assert not result['success']
+        assert '超时' in result['errors'][0]
+
+    @pytest.mark.unit
+    def test_bounded_loop(self):
+        def bump(state):
+            state['data']['count'] = state['data'].get('count', 0) + 1
+
+        graph = WorkflowGraph("test_loop", max_iterations=5)
+        graph.add_node("work", FuncNode("work", bump))
+        graph.add_conditional_edge(
+            "work",
+            lambda s: "again" if s['data']['count'] < 3 else "done",
+            {"again": "work", "done": END}
+        )
+        graph.set_entry_point("work")
+        assert graph.compile().invoke(save_checkpoints=False)['state']['data']['count'] == 3
+
+        graph.add_node("work", FuncNode("work", bump), max_iterations=2)
+        result = graph.compile().invoke(save_checkpoints=False)
+        assert not result['success']
+        assert '检测到循环' in result['errors'][0]
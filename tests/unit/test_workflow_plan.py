@@ -0,0 +1,95 @@
+"""
+工作流执行计划单元测试
+
+测试内容：
+- 编译期路由表与原有优先级一致（条件边优先）
+- 不存在的目标节点、无法结束的循环在编译时报错
+- 不可达节点检测
+- 执行计划不可修改，编译后修改图不影响已编译工作流
+"""
+
+import pytest
+
+from workflow_engine import END, Node, State, WorkflowGraph
+
+
+class PassNode(Node):
+    """空节点"""
+
+    def execute(self, state: State) -> State:
+        return state
+
+
+def _graph(*names: str) -> WorkflowGraph:
+    graph = WorkflowGraph("test_plan")
+    for name in names:
+        graph.add_node(name, PassNode(name))
+    graph.set_entry_point(names[0])
+    return graph
+
+
+class TestExecutionPlan:
+    """执行计划测试"""
+
+    @pytest.mark.unit
+    def test_conditional_edge_takes_precedence(self):
+        graph = _graph("a", "b", "c")
+        graph.add_edge("a", "b")
+        graph.add_conditional_edge("a", lambda s: "go", {"go": "c"})
+
+        plan = graph.compile().plan
+
+        assert plan.next_node("a", {}) == "c"
+        assert plan.successors["a"] == frozenset({"c"})
+        assert plan.unreachable == frozenset({"b"})
+
+    @pytest.mark.unit
+    def test_unknown_branch_target_fails_at_compile(self):
+        graph = _graph("a")
+        graph.add_conditional_edge("a", lambda s: "x", {"x": "missing", "end": END})
+
+        with pytest.raises(ValueError, match="missing"):
+            graph.compile()
+
+    @pytest.mark.unit
+    def test_dead_end_cycle_fails_at_compile(self):
+        graph = _graph("a", "b", "c")
+        graph.add_edge("a", "b")
+        graph.add_edge("b", "c")
+        graph.add_edge("c", "b")
+
+        with pytest.raises(ValueError, match="b, c"):
+            graph.compile()
+
+    @pytest.mark.unit
+    def test_loop_with_exit_compiles(self):
+        graph = _graph("gen", "review")
+        graph.add_edge("gen", "review")
+        graph.add_conditional_edge("review", lambda s: "end", {"retry": "gen", "end": END})
+
+        plan = graph.compile().plan
+
+        assert plan.dead_ends == frozenset()
+        assert plan.reachable == frozenset({"gen", "review"})
+
+    @pytest.mark.unit
+    def test_parallel_targets_reachable(self):
+        graph = _graph("src", "a", "b", "join")
+        graph.add_parallel_edges("src", ["a", "b"], join="join")
+
+        assert graph.compile().plan.unreachable == frozenset()
+
+    @pytest.mark.unit
+    def test_plan_is_immutable_snapshot(self):
+        graph = _graph("a", "b")
+        graph.add_edge("a", "b")
+        workflow = graph.compile()
+
+        with pytest.raises(AttributeError):
+            workflow.plan.entry_point = "b"
+        with pytest.raises(TypeError):
+            workflow.plan.static_next["a"] = END
+
+        graph.add_node("b", PassNode("replaced"))
+        assert workflow.invoke(save_checkpoints=False)['state']['metadata']['nodes_executed'] == ['a', 'b']
+        assert workflow.plan.nodes["b"].name == "b"
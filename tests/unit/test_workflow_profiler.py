@@ -0,0 +1,91 @@
+"""
+工作流剖析器单元测试
+
+测试内容：
+- 节点、检查点、路由开销的记录与汇总
+- Chrome trace 导出
+- HTML 可视化叠加节点耗时
+"""
+
+import json
+import time
+
+import pytest
+
+from workflow_engine import END, CheckpointManager, Node, State, WorkflowGraph, WorkflowProfiler
+
+
+class SleepNode(Node):
+    """耗时可控的测试节点"""
+
+    def __init__(self, name: str, delay: float):
+        super().__init__(name, "测试节点")
+        self.delay = delay
+
+    def execute(self, state: State) -> State:
+        time.sleep(self.delay)
+        state['data'][self.name] = 'x' * 100
+        return state
+
+
+def _workflow(temp_dir):
+    graph = WorkflowGraph("test_profile", enable_profiling=True)
+    graph.checkpoint_manager = CheckpointManager("test_profile", storage_path=temp_dir)
+    graph.add_node("fast", SleepNode("fast", 0.0))
+    graph.add_node("slow", SleepNode("slow", 0.05))
+    graph.add_edge("fast", "slow")
+    graph.add_edge("slow", END)
+    graph.set_entry_point("fast")
+    return graph
+
+
+class TestWorkflowProfiler:
+    """剖析器测试"""
+
+    @pytest.mark.unit
+    def test_summary_covers_nodes_checkpoints_routing(self, temp_dir):
+        graph = _workflow(temp_dir)
+        graph.compile().invoke()
+
+        rows = {(row['category'], row['name']): row for row in graph.profiler.summary()}
+
+        assert rows[('node', 'slow')]['mean_ms'] >= 50
+        assert rows[('node', 'fast')]['cpu_ms'] is not None
+        assert rows[('checkpoint', 'slow')]['bytes'] > 0
+        assert rows[('checkpoint', 'END')]['count'] == 1
+        assert ('routing', 'fast') in rows
+        assert 'slow' in graph.profiler.format_summary()
+
+    @pytest.mark.unit
+    def test_chrome_trace(self, temp_dir):
+        graph = _workflow(temp_dir)
+        graph.compile().invoke()
+
+        path = graph.profiler.save_chrome_trace(str(temp_dir / "trace.json"))
+        trace = json.loads(open(path, encoding='utf-8').read())
+
+        events = trace['traceEvents']
+        assert {event['cat'] for event in events} == {'node', 'checkpoint', 'routing'}
+        assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in events)
+
+    @pytest.mark.unit
+    def test_html_latency_overlay(self, temp_dir):
+        graph = _workflow(temp_dir)
+        graph.compile().invoke(save_checkpoints=False)
+
+        html = open(graph.save_visualization(str(temp_dir / "wf.html")), encoding='utf-8').read()
+
+        assert "class slow slow" in html
+        assert "class fast fast" in html
+        assert " ms" in html and "执行剖析" in html
+
+    @pytest.mark.unit
+    def test_disabled_by_default(self):
+        assert WorkflowGraph("plain").profiler is None
+
+    @pytest.mark.unit
+    def test_reset(self):
+        profiler = WorkflowProfiler()
+        profiler.record(WorkflowProfiler.CATEGORY_ROUTING, "a", 0.0, 0.001)
+        profiler.reset()
+        assert profiler.summary() == []